@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+NL-FHIR Keyword Matcher Benchmark
+Purpose: Compare the single-pass Aho-Corasick keyword pass against the previous
+per-keyword str.find scan as the medication list grows to formulary size
+
+Synthetic medication names are appended to the built-in keyword list; both
+implementations are checked for identical output before timing.
+"""
+
+import argparse
+import random
+import statistics
+import string
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from nl_fhir.services.nlp.entity_extractor import EntityType, MedicalEntityExtractor  # noqa: E402
+
+SAMPLE_ORDERS = [
+    "Start patient on metformin 500mg twice daily and check HbA1c in 3 months",
+    "Prescribe amoxicillin 500mg three times daily for 10 days; order CBC and BMP",
+    "Continue lisinopril 10mg daily, add atorvastatin 40mg at bedtime, lipid panel in 6 weeks",
+    "Albuterol nebulizer q4h PRN wheezing, oxygen 2L via nasal cannula, chest x-ray today",
+]
+
+
+def synthetic_medication_names(count: int, seed: int = 42) -> List[str]:
+    """Generate pronounceable, unique fake drug names"""
+    rng = random.Random(seed)
+    suffixes = ["mab", "pril", "olol", "statin", "sartan", "cillin", "mycin", "azole", "tinib", "pine"]
+    names = set()
+    while len(names) < count:
+        stem = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 8)))
+        names.add(stem + rng.choice(suffixes))
+    return sorted(names)
+
+
+def scan_keyword_entities(extractor: MedicalEntityExtractor, text: str) -> List[tuple]:
+    """Previous implementation: one str.find loop per keyword"""
+    entities = []
+    text_lower = text.lower()
+    for keywords, entity_type in ((extractor._medication_keywords, EntityType.MEDICATION),
+                                  (extractor._lab_test_keywords, EntityType.LAB_TEST)):
+        for keyword in keywords:
+            start = 0
+            while True:
+                pos = text_lower.find(keyword.lower(), start)
+                if pos == -1:
+                    break
+                if (pos == 0 or not text[pos-1].isalnum()) and \
+                   (pos + len(keyword) == len(text) or not text[pos + len(keyword)].isalnum()):
+                    entities.append((pos, pos + len(keyword), entity_type))
+                start = pos + 1
+    return entities
+
+
+def time_per_call_us(func: Callable[[], object], iterations: int, repeats: int) -> Dict[str, float]:
+    """Run func iterations times per repeat and return per-call timings in microseconds"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        samples.append((time.perf_counter() - start) / iterations * 1e6)
+    return {"median_us": statistics.median(samples), "min_us": min(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyword matcher benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 1000, 5000, 10000, 20000],
+                        help="Synthetic medication names added to the built-in list")
+    parser.add_argument("--iterations", type=int, default=20, help="Calls per timing sample")
+    parser.add_argument("--repeats", type=int, default=3, help="Timing samples per case")
+    args = parser.parse_args()
+
+    text = " ".join(SAMPLE_ORDERS)
+    print("🚀 NL-FHIR Keyword Matcher Benchmark")
+    print(f"📝 Text length: {len(text)} chars")
+    print("=" * 78)
+    print(f"{'keywords':>9}  {'build ms':>9}  {'scan µs':>12}  {'automaton µs':>13}  {'speedup':>8}")
+
+    for size in args.sizes:
+        extractor = MedicalEntityExtractor()
+        extractor._medication_keywords = extractor._medication_keywords + synthetic_medication_names(size)
+        build_start = time.perf_counter()
+        extractor._keyword_matcher = extractor._build_keyword_matcher()
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        automaton = [(e.start_char, e.end_char, e.entity_type) for e in extractor._extract_keyword_entities(text)]
+        if automaton != scan_keyword_entities(extractor, text):
+            print(f"❌ Output mismatch at {size} synthetic keywords")
+            sys.exit(1)
+
+        scan = time_per_call_us(lambda: scan_keyword_entities(extractor, text), args.iterations, args.repeats)
+        single = time_per_call_us(lambda: extractor._extract_keyword_entities(text), args.iterations, args.repeats)
+        keyword_count = len(extractor._medication_keywords) + len(extractor._lab_test_keywords)
+        print(f"{keyword_count:>9}  {build_ms:>9.1f}  {scan['median_us']:>12.1f}  "
+              f"{single['median_us']:>13.1f}  {scan['median_us'] / max(single['median_us'], 1e-9):>7.1f}x")
+
+    print("=" * 78)
+    print("✅ Outputs identical for all sizes")
+
+
+if __name__ == "__main__":
+    main()
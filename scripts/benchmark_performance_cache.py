@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+NL-FHIR Performance Manager Cache Benchmark
+Purpose: Compare the striped O(1) LRU caches of FHIRPerformanceManager against the
+previous dict caches (global RLock, O(n) min-timestamp eviction) under concurrent load
+
+Every thread runs the same mix of validation-result lookups and stores over a key
+space larger than the cache, so the cache stays full and most stores evict.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from nl_fhir.services.fhir.performance_manager import FHIRPerformanceManager  # noqa: E402
+
+RESULT = {"is_valid": True, "issues": [], "validation_source": "local", "bundle_quality_score": 1.0}
+
+
+class LegacyValidationCache:
+    """Previous implementation: dict cache, global RLock, eviction by min() over all timestamps"""
+
+    def __init__(self, cache_size: int, ttl_seconds: float = 3600):
+        self.cache_size = cache_size
+        self.ttl_seconds = ttl_seconds
+        self.validation_cache: Dict[str, Dict[str, Any]] = {}
+        self.cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._cache_lock = threading.RLock()
+
+    def cache_validation_result(self, bundle_hash: str, validation_result: Dict[str, Any]) -> None:
+        with self._cache_lock:
+            if len(self.validation_cache) >= self.cache_size:
+                oldest_key = min(self.validation_cache.keys(), key=lambda k: self.validation_cache[k]["timestamp"])
+                del self.validation_cache[oldest_key]
+                self.cache_stats["evictions"] += 1
+            self.validation_cache[bundle_hash] = {"result": validation_result,
+                                                  "timestamp": datetime.now(timezone.utc), "access_count": 0}
+
+    def get_cached_validation_result(self, bundle_hash: str) -> Optional[Dict[str, Any]]:
+        with self._cache_lock:
+            if bundle_hash in self.validation_cache:
+                cache_entry = self.validation_cache[bundle_hash]
+                age = (datetime.now(timezone.utc) - cache_entry["timestamp"]).total_seconds()
+                if age > self.ttl_seconds:
+                    del self.validation_cache[bundle_hash]
+                    self.cache_stats["evictions"] += 1
+                    return None
+                cache_entry["access_count"] += 1
+                self.cache_stats["hits"] += 1
+                return cache_entry["result"]
+            self.cache_stats["misses"] += 1
+            return None
+
+
+def run_threads(cache, threads: int, ops: int, key_space: int, put_ratio: float) -> Dict[str, float]:
+    """Run the workload on all threads at once; returns throughput and per-op latency percentiles"""
+    barrier = threading.Barrier(threads + 1)
+    latencies: List[List[float]] = [[] for _ in range(threads)]
+
+    def worker(index: int) -> None:
+        rng = random.Random(index)
+        keys = [f"bundle-{rng.randrange(key_space)}" for _ in range(ops)]
+        puts = [rng.random() < put_ratio for _ in range(ops)]
+        samples = latencies[index]
+        barrier.wait()
+        for key, put in zip(keys, puts):
+            start = time.perf_counter()
+            if put or cache.get_cached_validation_result(key) is None:
+                cache.cache_validation_result(key, RESULT)
+            samples.append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    all_samples = sorted(sample for samples in latencies for sample in samples)
+    return {
+        "ops_per_s": len(all_samples) / elapsed,
+        "p50_us": all_samples[len(all_samples) // 2] * 1e6,
+        "p99_us": all_samples[int(len(all_samples) * 0.99)] * 1e6,
+        "hit_rate": cache.cache_stats["hits"] / max(cache.cache_stats["hits"] + cache.cache_stats["misses"], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Performance manager cache benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000], help="Cache sizes (entries)")
+    parser.add_argument("--threads", type=int, default=32, help="Concurrent threads")
+    parser.add_argument("--ops", type=int, default=2000, help="Operations per thread")
+    parser.add_argument("--put-ratio", type=float, default=0.2, help="Share of operations that store")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per case (median reported)")
+    args = parser.parse_args()
+
+    print("🚀 NL-FHIR Performance Manager Cache Benchmark")
+    print(f"📝 {args.threads} threads x {args.ops} ops, {args.put_ratio:.0%} stores, key space 2x cache size")
+    print("=" * 78)
+    print(f"{'entries':>8}  {'cache':>8}  {'ops/s':>10}  {'p50 us':>8}  {'p99 us':>9}  {'hit rate':>8}  {'speedup':>8}")
+
+    for size in args.sizes:
+        results = {}
+        for label, factory in (("legacy", lambda: LegacyValidationCache(size)),
+                               ("striped", lambda: FHIRPerformanceManager(cache_size=size))):
+            runs = [run_threads(factory(), args.threads, args.ops, size * 2, args.put_ratio)
+                    for _ in range(args.repeats)]
+            results[label] = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+        for label in ("legacy", "striped"):
+            r = results[label]
+            speedup = r["ops_per_s"] / results["legacy"]["ops_per_s"]
+            print(f"{size:>8}  {label:>8}  {r['ops_per_s']:>10.0f}  {r['p50_us']:>8.1f}  {r['p99_us']:>9.1f}  "
+                  f"{r['hit_rate']:>8.2f}  {speedup:>7.1f}x")
+
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
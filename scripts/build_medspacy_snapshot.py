@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+NL-FHIR MedSpaCy Pipeline Snapshot Builder
+Purpose: Serialize the configured MedSpaCy clinical pipeline into the snapshot
+directory read through MEDSPACY_SNAPSHOT_PATH, signed with MEDSPACY_SNAPSHOT_HMAC_KEY
+
+Builds the pipeline exactly as MedSpacyManager does at startup (medspaCy defaults plus
+the clinical target rules), writes it with a fingerprint manifest, then reloads it and
+checks that it produces the same entities and ConText flags as the freshly built
+pipeline. Rebuild after upgrading spaCy/medspaCy or changing the target rules; stale
+snapshots are ignored at startup and the pipeline is built as before.
+
+Example:
+    MEDSPACY_SNAPSHOT_HMAC_KEY=... python scripts/build_medspacy_snapshot.py /srv/nl-fhir/medspacy-snapshot
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from nl_fhir.config import get_settings  # noqa: E402
+from nl_fhir.services.nlp.model_managers import medspacy_snapshot  # noqa: E402
+from nl_fhir.services.nlp.model_managers.medspacy_manager import MedSpacyManager  # noqa: E402
+
+CHECK_TEXTS = [
+    "Patient John Doe denies chest pain. Start 500mg amoxicillin twice daily.",
+    "Give children's tylenol 160mg by mouth every 8 hours as needed for fever.",
+    "No history of hypertension. Order CBC and lipid panel. Albuterol nebulizer STAT.",
+]
+
+
+def describe(nlp, text):
+    return [(ent.start_char, ent.end_char, ent.label_, ent._.is_negated) for ent in nlp(text).ents]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the MedSpaCy pipeline snapshot")
+    parser.add_argument("output", type=Path, help="Snapshot directory to write")
+    parser.add_argument("--base-model", default="en_core_web_sm", help="Base model name used for the fingerprint")
+    args = parser.parse_args()
+
+    manager = MedSpacyManager()
+    if not manager.is_available():
+        print("❌ MedSpaCy is not installed")
+        return 2
+
+    key = get_settings().medspacy_snapshot_hmac_key
+    if not key:
+        print("❌ MEDSPACY_SNAPSHOT_HMAC_KEY is not set; the service refuses unsigned snapshots")
+        return 2
+    key = key.encode("utf-8")
+
+    start_time = time.perf_counter()
+    nlp = manager.build_medspacy_clinical_engine()
+    build_seconds = time.perf_counter() - start_time
+
+    fingerprint = manager.pipeline_fingerprint(args.base_model)
+    manifest = medspacy_snapshot.save_pipeline_snapshot(nlp, args.output, fingerprint, key)
+
+    start_time = time.perf_counter()
+    restored = medspacy_snapshot.load_pipeline_snapshot(args.output, fingerprint, key)
+    load_seconds = time.perf_counter() - start_time
+    if restored is None:
+        print(f"❌ Snapshot in {args.output} could not be loaded back")
+        return 1
+
+    for text in CHECK_TEXTS:
+        if describe(nlp, text) != describe(restored, text):
+            print(f"❌ Restored pipeline disagrees with the built pipeline on: {text!r}")
+            return 1
+
+    print(f"✅ Wrote {manifest['payload_bytes'] / 1024:.0f} KiB snapshot to {args.output} "
+          f"(fingerprint {fingerprint}, {manifest['target_rules']} target rules)")
+    print(f"   build {build_seconds:.2f}s -> load {load_seconds:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
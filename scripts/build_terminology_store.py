@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+NL-FHIR Terminology Store Builder
+Purpose: Compile code tables into the memory-mapped store read through
+TERMINOLOGY_STORE_PATH
+
+Starts from the built-in tables (RAG knowledge base, ClinicalResourceFactory LOINC and
+condition mappings, drug brand-name normalizer) so a store built without extra sources
+behaves exactly like the defaults, then layers external releases on top:
+
+    --rxnconso RXNCONSO.RRF         RxNorm concept names -> "medication"
+    --loinc Loinc.csv               LOINC table core -> "lab_test" and "lab_test_loinc"
+    --csv TABLE=path.csv            generic CSV: a "key" column plus either a "value"
+                                    column or any other columns as the value object
+
+The lexical postings of the RAG sections are compiled into the same file, so workers
+look terms up through the mmap instead of indexing every row at startup
+(--no-rag-index leaves them out).
+
+Example:
+    python scripts/build_terminology_store.py terminology.nlts \\
+        --rxnconso rrf/RXNCONSO.RRF --loinc Loinc.csv --csv condition_codes=conditions.csv
+"""
+
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from nl_fhir.services.nlp.terminology_index import terminology_index_tables  # noqa: E402
+from nl_fhir.services.terminology_store import TerminologyStore, build_terminology_store  # noqa: E402
+
+RXNORM_SYSTEM = "http://www.nlm.nih.gov/research/umls/rxnorm"
+LOINC_SYSTEM = "http://loinc.org"
+
+# RXNCONSO.RRF columns (pipe-delimited, no header)
+RXN_RXCUI, RXN_LAT, RXN_SAB, RXN_TTY, RXN_STR, RXN_SUPPRESS = 0, 1, 11, 12, 14, 16
+# Ingredients, precise/multiple ingredients and brand names
+RXNORM_TERM_TYPES = {"IN", "PIN", "MIN", "BN"}
+
+
+def default_tables() -> Dict[str, Dict[str, Any]]:
+    """The tables currently hardcoded in the services, under their store table names"""
+    from nl_fhir.services.fhir.factories.clinical_factory import ClinicalResourceFactory
+    from nl_fhir.services.nlp.rag_service import RAGService
+    from nl_fhir.services.safety.interaction_checker import DrugInteractionChecker
+
+    tables: Dict[str, Dict[str, Any]] = dict(RAGService()._load_default_medical_knowledge())
+    factory = ClinicalResourceFactory(None, None, None)
+    tables["lab_test_loinc"] = dict(factory._lab_test_loinc)
+    tables["condition_codes"] = dict(factory._condition_codes)
+    tables["drug_normalizer"] = DrugInteractionChecker()._initialize_drug_normalizer()
+    return tables
+
+
+def rag_sections() -> List[str]:
+    """Tables the RAG service indexes for code lookup"""
+    from nl_fhir.services.nlp.rag_service import RAGService
+
+    return list(RAGService()._load_default_medical_knowledge())
+
+
+def read_rxnconso(path: Path) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """Current English RxNorm ingredient and brand names"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("|")
+            if len(fields) <= RXN_SUPPRESS:
+                continue
+            if (fields[RXN_SAB] != "RXNORM" or fields[RXN_LAT] != "ENG"
+                    or fields[RXN_TTY] not in RXNORM_TERM_TYPES or fields[RXN_SUPPRESS] != "N"):
+                continue
+            name = fields[RXN_STR]
+            yield name.lower(), {"code": fields[RXN_RXCUI], "system": RXNORM_SYSTEM, "display": name}
+
+
+def read_loinc(path: Path) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """Active LOINC codes keyed by long common name and short name"""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            if row.get("STATUS", "ACTIVE") != "ACTIVE":
+                continue
+            display = row.get("LONG_COMMON_NAME") or row.get("COMPONENT") or row["LOINC_NUM"]
+            code_info = {"code": row["LOINC_NUM"], "system": LOINC_SYSTEM, "display": display}
+            for name in (row.get("LONG_COMMON_NAME"), row.get("SHORTNAME")):
+                if name:
+                    yield name.lower(), code_info
+
+
+def read_csv_table(path: Path) -> Iterator[Tuple[str, Any]]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames or "key" not in reader.fieldnames:
+            raise ValueError(f"{path} needs a 'key' column")
+        for row in reader:
+            key = row.pop("key")
+            yield key, row["value"] if set(row) == {"value"} else row
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the memory-mapped terminology store")
+    parser.add_argument("output", type=Path, help="Store file to write")
+    parser.add_argument("--rxnconso", type=Path, help="RxNorm RXNCONSO.RRF")
+    parser.add_argument("--loinc", type=Path, help="LOINC table core (Loinc.csv)")
+    parser.add_argument("--csv", action="append", default=[], metavar="TABLE=PATH",
+                        help="Generic CSV table (repeatable)")
+    parser.add_argument("--no-defaults", action="store_true",
+                        help="Leave out the built-in tables")
+    parser.add_argument("--no-rag-index", action="store_true",
+                        help="Leave out the stored RAG lookup postings")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    tables: Dict[str, Dict[str, Any]] = {} if args.no_defaults else default_tables()
+
+    if args.rxnconso:
+        print(f"💊 Reading RxNorm names from {args.rxnconso}")
+        tables.setdefault("medication", {}).update(read_rxnconso(args.rxnconso))
+    if args.loinc:
+        print(f"🧪 Reading LOINC codes from {args.loinc}")
+        for name, code_info in read_loinc(args.loinc):
+            tables.setdefault("lab_test", {})[name] = code_info
+            tables.setdefault("lab_test_loinc", {}).setdefault(name, code_info["code"])
+    for spec in args.csv:
+        table, _, csv_path = spec.partition("=")
+        if not table or not csv_path:
+            parser.error(f"--csv expects TABLE=PATH, got {spec!r}")
+        print(f"📄 Reading {table} from {csv_path}")
+        tables.setdefault(table, {}).update(read_csv_table(Path(csv_path)))
+
+    if not args.no_rag_index:
+        for section in rag_sections():
+            if section in tables:
+                print(f"🔎 Indexing {section} for RAG lookup")
+                tables.update(terminology_index_tables(section, tables[section]))
+
+    build_terminology_store(args.output, tables)
+    with TerminologyStore(args.output) as store:
+        stats = store.get_stats()
+
+    print(f"✅ Wrote {stats['entries']} entries ({stats['bytes'] / 1024:.1f} KiB) "
+          f"to {args.output} in {time.time() - start_time:.1f}s")
+    for table, count in stats["tables"].items():
+        print(f"   {table:<28} {count:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+NL-FHIR Tier 2 NER Backend Parity Harness
+Purpose: Check that the ONNX Runtime (optionally int8) NER backend agrees with the
+PyTorch pipeline before switching NLP_NER_BACKEND=onnx on a node
+
+Runs both backends over the clinical texts in the repo's test corpora, compares
+entities on (entity_group, start, end), and reports precision/recall/F1 of the ONNX
+output against PyTorch together with per-text latency for each backend. Exits
+non-zero when F1 falls below --min-f1.
+
+Requires: pip install "optimum[onnxruntime]"
+
+Example:
+    python scripts/ner_backend_parity.py --cache-dir models/onnx --threads 4
+    python scripts/ner_backend_parity.py --fp32 --corpus my_notes.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from nl_fhir.services.nlp.model_managers import onnx_ner  # noqa: E402
+
+DEFAULT_MODEL = "clinical-ai-apollo/Medical-NER"
+DEFAULT_CORPORA = [
+    REPO_ROOT / "tests" / "data" / "medication_test_cases.json",
+    REPO_ROOT / "tests" / "data" / "diagnostic_report_samples.json",
+    REPO_ROOT / "tests" / "validation" / "enhanced_p0_specialty_test_cases_20250914_213506.json",
+]
+TEXT_FIELDS = ("clinical_text", "text")
+
+
+def iter_texts(node: Any) -> Iterator[str]:
+    """Every clinical_text/text string anywhere in a corpus file"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in TEXT_FIELDS and isinstance(value, str) and value.strip():
+                yield value
+            else:
+                yield from iter_texts(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from iter_texts(item)
+
+
+def load_corpus(paths: List[Path], limit: int) -> List[str]:
+    texts: List[str] = []
+    seen = set()
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for text in iter_texts(json.load(f)):
+                if text not in seen:
+                    seen.add(text)
+                    texts.append(text)
+    return texts[:limit] if limit else texts
+
+
+def run_backend(ner_pipeline: Callable, texts: List[str]) -> Dict[str, Any]:
+    ner_pipeline(texts[0])  # first call pays graph and allocator setup
+    outputs, latencies = [], []
+    for text in texts:
+        start = time.perf_counter()
+        outputs.append(ner_pipeline(text))
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "outputs": outputs,
+        "median_ms": statistics.median(latencies),
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare ONNX Runtime and PyTorch Tier 2 NER output")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Hugging Face NER model")
+    parser.add_argument("--revision", default="main", help="Hub revision (branch, tag or commit sha)")
+    parser.add_argument("--cache-dir", type=Path, default=Path("models/onnx"), help="ONNX export directory")
+    parser.add_argument("--fp32", action="store_true", help="Compare the unquantized ONNX export")
+    parser.add_argument("--threads", type=int, default=0, help="onnxruntime intra-op threads (0 = default)")
+    parser.add_argument("--corpus", type=Path, action="append", help="JSON corpus (repeatable)")
+    parser.add_argument("--limit", type=int, default=0, help="Use at most this many texts")
+    parser.add_argument("--min-f1", type=float, default=0.97, help="Fail below this entity F1")
+    parser.add_argument("--show-mismatches", type=int, default=5, help="Texts with differences to print")
+    args = parser.parse_args()
+
+    if not onnx_ner.ONNX_AVAILABLE:
+        print('❌ optimum[onnxruntime] is not installed: pip install "optimum[onnxruntime]"')
+        return 2
+
+    from transformers import pipeline
+
+    texts = load_corpus(args.corpus or DEFAULT_CORPORA, args.limit)
+    quantize = not args.fp32
+    print(f"📄 {len(texts)} clinical texts")
+
+    print(f"🔥 PyTorch backend: {args.model}")
+    reference = run_backend(
+        pipeline("ner", model=args.model, revision=args.revision, aggregation_strategy="simple", device=-1), texts
+    )
+
+    print(f"⚡ ONNX Runtime backend ({'int8' if quantize else 'fp32'}, threads={args.threads or 'default'})")
+    candidate = run_backend(
+        onnx_ner.load_onnx_ner_pipeline(args.model, args.cache_dir, quantize, args.threads, args.revision), texts
+    )
+
+    parity = onnx_ner.compare_ner_outputs(reference["outputs"], candidate["outputs"])
+    speedup = reference["median_ms"] / candidate["median_ms"] if candidate["median_ms"] else 0.0
+
+    print(f"\n{'backend':<10} {'median ms':>10} {'p95 ms':>10}")
+    print(f"{'pytorch':<10} {reference['median_ms']:>10.2f} {reference['p95_ms']:>10.2f}")
+    print(f"{'onnx':<10} {candidate['median_ms']:>10.2f} {candidate['p95_ms']:>10.2f}")
+    print(f"\nSpeedup (median): {speedup:.2f}x")
+    print(f"Entity precision {parity['precision']:.4f}  recall {parity['recall']:.4f}  F1 {parity['f1']:.4f}")
+    print(f"Identical entity sets on {parity['identical_text_rate']:.1%} of texts, "
+          f"max score delta {parity['max_score_delta']:.4f}")
+
+    for index in parity["mismatched_texts"][:args.show_mismatches]:
+        print(f"\n  text #{index}: {texts[index][:80]!r}")
+        print(f"    pytorch: {[(e['entity_group'], e['word']) for e in reference['outputs'][index]]}")
+        print(f"    onnx:    {[(e['entity_group'], e['word']) for e in candidate['outputs'][index]]}")
+
+    if parity["f1"] < args.min_f1:
+        print(f"\n❌ Entity F1 {parity['f1']:.4f} is below {args.min_f1}")
+        return 1
+    print(f"\n✅ ONNX backend within parity threshold (F1 >= {args.min_f1})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,11 +4,15 @@ HIPAA Compliant: No PHI logging
 Medical Safety: Input validation required
 """
 
+import json
 import time
 import logging
+from typing import List
 from uuid import uuid4
 
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 
 from ..dependencies import get_conversion_service, get_monitoring_service
 from ...models.request import BulkConversionRequest, ClinicalRequestAdvanced
@@ -42,18 +46,15 @@ async def bulk_convert(
 
     try:
         # Convert to advanced requests for processing
-        advanced_requests = []
-        for order in request.orders:
-            advanced_request = ClinicalRequestAdvanced(
-                clinical_text=order.clinical_text,
-                patient_ref=order.patient_ref,
-                priority="routine",  # Default for bulk processing
-                context_metadata={"batch_id": batch_id, "batch_processing": True},
-            )
-            advanced_requests.append(advanced_request)
+        advanced_requests = _to_advanced_requests(request, batch_id)
 
         # Process bulk conversion
-        result = await conversion_service.bulk_convert(advanced_requests, batch_id)
+        result = await conversion_service.bulk_convert(
+            advanced_requests,
+            batch_id,
+            max_concurrency=request.max_concurrency,
+            order_timeout_seconds=request.order_timeout_seconds,
+        )
 
         # Record batch metrics
         processing_time_ms = (time.time() - start_time) * 1000
@@ -78,3 +79,83 @@ async def bulk_convert(
                 "message": "Unable to process batch request",
             },
         )
+
+
+@router.post("/bulk-convert/stream")
+async def bulk_convert_stream(
+    request: BulkConversionRequest,
+    conversion_service=Depends(get_conversion_service),
+    monitoring_service: MonitoringService = Depends(get_monitoring_service),
+):
+    """
+    Streaming bulk clinical order conversion
+
+    Same input as /bulk-convert, but responds with NDJSON: one line per order,
+    emitted as soon as that order completes (each line carries its order_index),
+    followed by a final summary line. Clients never hold the whole batch in memory.
+    """
+    batch_id = request.batch_id or f"batch_{str(uuid4())[:8]}"
+    advanced_requests = _to_advanced_requests(request, batch_id)
+
+    async def ndjson_lines():
+        start_time = time.time()
+        successful_count = 0
+        failed_count = 0
+
+        try:
+            async for item in conversion_service.bulk_convert_stream(
+                advanced_requests,
+                batch_id,
+                max_concurrency=request.max_concurrency,
+                order_timeout_seconds=request.order_timeout_seconds,
+            ):
+                if item["status"] == "completed":
+                    successful_count += 1
+                else:
+                    failed_count += 1
+                yield json.dumps(jsonable_encoder({"type": "result", **item})) + "\n"
+
+        except Exception as e:
+            logger.error(
+                f"Streaming bulk conversion {batch_id}: Processing error - {type(e).__name__}"
+            )
+            yield json.dumps(
+                {
+                    "type": "error",
+                    "batch_id": batch_id,
+                    "error": "Bulk processing failed",
+                    "message": "Unable to process remaining batch orders",
+                }
+            ) + "\n"
+
+        processing_time_ms = (time.time() - start_time) * 1000
+        total_orders = len(advanced_requests)
+        monitoring_service.record_request(
+            successful_count / total_orders > 0.5, processing_time_ms
+        )
+
+        yield json.dumps(
+            {
+                "type": "summary",
+                "batch_id": batch_id,
+                "total_orders": total_orders,
+                "successful_orders": successful_count,
+                "failed_orders": failed_count,
+                "processing_time_ms": processing_time_ms,
+            }
+        ) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+def _to_advanced_requests(request: BulkConversionRequest, batch_id: str) -> List[ClinicalRequestAdvanced]:
+    """Convert bulk orders to advanced requests for processing"""
+    return [
+        ClinicalRequestAdvanced(
+            clinical_text=order.clinical_text,
+            patient_ref=order.patient_ref,
+            priority="routine",  # Default for bulk processing
+            context_metadata={"batch_id": batch_id, "batch_processing": True},
+        )
+        for order in request.orders
+    ]
@@ -181,6 +181,8 @@ async def convert_advanced(
     - **ordering_provider**: Provider identifier
     - **department**: Ordering department
     - **context_metadata**: Additional context for processing
+    - **previous_result_id**: result_id of an earlier conversion of this note; only the
+      edited sentences are re-extracted and only changed FHIR resources are rebuilt
 
     Returns detailed conversion response with validation results and Epic placeholders.
     """
@@ -189,7 +191,7 @@ async def convert_advanced(
 
     try:
         # Use advanced conversion service
-        response = await conversion_service.convert_advanced(request, request_id)
+        response = await conversion_service.convert_advanced(request, request_id, store_snapshot=True)
 
         # Record metrics
         processing_time_ms = (time.time() - start_time) * 1000
@@ -15,6 +15,7 @@ from pydantic import BaseModel, Field
 from ...services.fhir.unified_pipeline import get_unified_fhir_pipeline
 from ...services.fhir.quality_optimizer import get_quality_optimizer
 from ...services.fhir.performance_manager import get_performance_manager
+from ...services.fhir.validation_cache import get_validation_cache_stats
 from ...services.fhir.failover_manager import get_failover_manager
 
 logger = logging.getLogger(__name__)
@@ -285,6 +286,7 @@ async def get_performance_metrics():
             "performance_summary": performance_summary,
             "real_time_metrics": real_time_metrics,
             "auto_optimization": optimization_result,
+            "validation_cache": get_validation_cache_stats(),
             "performance_health": {
                 "overall_status": "healthy"
                 if performance_summary.get("overall_statistics", {}).get(
@@ -61,6 +61,8 @@ class Settings(BaseSettings):
     rate_limit_requests_per_minute: int = Field(default=100, env="RATE_LIMIT_REQUESTS_PER_MINUTE")
     rate_limit_window_seconds: int = Field(default=60, env="RATE_LIMIT_WINDOW_SECONDS")
     workers: int = Field(default=4, env="WORKERS")
+    bulk_max_concurrency: int = Field(default=4, env="BULK_MAX_CONCURRENCY")
+    bulk_order_timeout_seconds: float = Field(default=60.0, env="BULK_ORDER_TIMEOUT_SECONDS")
     
     # Logging Settings
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
@@ -79,12 +81,55 @@ class Settings(BaseSettings):
     medspacy_enabled: bool = Field(default=False, env="MEDSPACY_ENABLED")
     nlp_cache_enabled: bool = Field(default=False, env="NLP_CACHE_ENABLED")
     nlp_cache_ttl_seconds: int = Field(default=3600, env="NLP_CACHE_TTL_SECONDS")
+    nlp_cache_max_entries: int = Field(default=1024, env="NLP_CACHE_MAX_ENTRIES")
+    nlp_cache_memory_enabled: bool = Field(default=True, env="NLP_CACHE_MEMORY_ENABLED")
+    nlp_cache_disk_path: Optional[str] = Field(default=None, env="NLP_CACHE_DISK_PATH")
+    nlp_cache_disk_max_entries: int = Field(default=10000, env="NLP_CACHE_DISK_MAX_ENTRIES")
+    nlp_cache_hmac_key: Optional[str] = Field(default=None, env="NLP_CACHE_HMAC_KEY")
+    nlp_batch_size: int = Field(default=32, env="NLP_BATCH_SIZE")
+    nlp_batch_n_process: int = Field(default=1, env="NLP_BATCH_N_PROCESS")
+    nlp_process_pool_enabled: bool = Field(default=False, env="NLP_PROCESS_POOL_ENABLED")
+    nlp_process_pool_workers: int = Field(default=2, env="NLP_PROCESS_POOL_WORKERS")
+    nlp_process_pool_queue_depth: int = Field(default=64, env="NLP_PROCESS_POOL_QUEUE_DEPTH")
+    nlp_process_pool_preload_models: bool = Field(default=True, env="NLP_PROCESS_POOL_PRELOAD_MODELS")
+    nlp_ner_batching_enabled: bool = Field(default=False, env="NLP_NER_BATCHING_ENABLED")
+    nlp_ner_batch_max_size: int = Field(default=16, env="NLP_NER_BATCH_MAX_SIZE")
+    nlp_ner_batch_max_wait_ms: float = Field(default=10.0, env="NLP_NER_BATCH_MAX_WAIT_MS")
+    nlp_segmentation_enabled: bool = Field(default=False, env="NLP_SEGMENTATION_ENABLED")
+    nlp_segment_min_chars: int = Field(default=2000, env="NLP_SEGMENT_MIN_CHARS")
+    nlp_segment_max_chars: int = Field(default=1000, env="NLP_SEGMENT_MAX_CHARS")
+    nlp_segment_workers: int = Field(default=4, env="NLP_SEGMENT_WORKERS")
+    nlp_ner_backend: str = Field(default="pytorch", env="NLP_NER_BACKEND")
+    nlp_ner_model_revision: str = Field(default="main", env="NLP_NER_MODEL_REVISION")
+    nlp_ner_onnx_cache_dir: str = Field(default="models/onnx", env="NLP_NER_ONNX_CACHE_DIR")
+    nlp_ner_onnx_quantize: bool = Field(default=True, env="NLP_NER_ONNX_QUANTIZE")
+    nlp_ner_onnx_intra_op_threads: int = Field(default=0, env="NLP_NER_ONNX_INTRA_OP_THREADS")
+    rag_semantic_search_enabled: bool = Field(default=False, env="RAG_SEMANTIC_SEARCH_ENABLED")
+    rag_embedding_model: str = Field(default="sentence-transformers/all-MiniLM-L6-v2", env="RAG_EMBEDDING_MODEL")
+    rag_semantic_threshold: float = Field(default=0.75, env="RAG_SEMANTIC_THRESHOLD")
+    terminology_store_path: Optional[str] = Field(default=None, env="TERMINOLOGY_STORE_PATH")
+    model_warmup_background: bool = Field(default=True, env="MODEL_WARMUP_BACKGROUND")
+    medspacy_snapshot_path: Optional[str] = Field(default=None, env="MEDSPACY_SNAPSHOT_PATH")
+    medspacy_snapshot_hmac_key: Optional[str] = Field(default=None, env="MEDSPACY_SNAPSHOT_HMAC_KEY")
+    incremental_conversion_enabled: bool = Field(default=False, env="INCREMENTAL_CONVERSION_ENABLED")
+    incremental_snapshot_max_entries: int = Field(default=256, env="INCREMENTAL_SNAPSHOT_MAX_ENTRIES")
+    incremental_snapshot_ttl_seconds: int = Field(default=1800, env="INCREMENTAL_SNAPSHOT_TTL_SECONDS")
     
     # Future Epic 3 - FHIR Integration
     hapi_fhir_url: Optional[str] = Field(default=None, env="HAPI_FHIR_URL")
     hapi_fhir_timeout_seconds: int = Field(default=10, env="HAPI_FHIR_TIMEOUT_SECONDS")
+    hapi_fhir_max_connections: int = Field(default=20, env="HAPI_FHIR_MAX_CONNECTIONS")
+    hapi_fhir_max_keepalive_connections: int = Field(default=10, env="HAPI_FHIR_MAX_KEEPALIVE_CONNECTIONS")
+    hapi_fhir_keepalive_expiry_seconds: float = Field(default=30.0, env="HAPI_FHIR_KEEPALIVE_EXPIRY_SECONDS")
+    hapi_fhir_http2_enabled: bool = Field(default=True, env="HAPI_FHIR_HTTP2_ENABLED")
+    hapi_fhir_batch_concurrency: int = Field(default=8, env="HAPI_FHIR_BATCH_CONCURRENCY")
     fhir_validation_enabled: bool = Field(default=False, env="FHIR_VALIDATION_ENABLED")
     fhir_version: str = Field(default="R4", env="FHIR_VERSION")
+    fhir_validation_cache_enabled: bool = Field(default=True, env="FHIR_VALIDATION_CACHE_ENABLED")
+    fhir_validation_cache_max_entries: int = Field(default=1024, env="FHIR_VALIDATION_CACHE_MAX_ENTRIES")
+    fhir_validation_cache_ttl_seconds: int = Field(default=3600, env="FHIR_VALIDATION_CACHE_TTL_SECONDS")
+    fhir_validation_resource_memo_max_entries: int = Field(default=8192, env="FHIR_VALIDATION_RESOURCE_MEMO_MAX_ENTRIES")
+    fhir_validation_cache_hmac_key: Optional[str] = Field(default=None, env="FHIR_VALIDATION_CACHE_HMAC_KEY")
     
     # Observation/Vitals Feature Flag
     observations_enabled: bool = Field(default=True, env="OBSERVATIONS_ENABLED")
@@ -103,6 +148,7 @@ class Settings(BaseSettings):
     openai_temperature: float = Field(default=0.1, env="OPENAI_TEMPERATURE")
     openai_max_tokens: int = Field(default=2000, env="OPENAI_MAX_TOKENS")
     openai_timeout_seconds: int = Field(default=30, env="OPENAI_TIMEOUT_SECONDS")
+    openai_base_url: Optional[str] = Field(default=None, env="OPENAI_BASE_URL")
     
     # LLM Feature Flags
     llm_enabled: bool = Field(default=True, env="LLM_ENABLED")
@@ -115,6 +161,21 @@ class Settings(BaseSettings):
     llm_escalation_confidence_check: str = Field(default="weighted_average", env="LLM_ESCALATION_CONFIDENCE_CHECK")
     llm_escalation_min_entities: int = Field(default=3, env="LLM_ESCALATION_MIN_ENTITIES")
 
+    # Tier prediction: start extraction at the tier the regex-pass features say will settle the note
+    tier_prediction_enabled: bool = Field(default=False, env="TIER_PREDICTION_ENABLED")
+    tier_prediction_min_samples: int = Field(default=20, env="TIER_PREDICTION_MIN_SAMPLES")
+    tier_prediction_min_confidence: float = Field(default=0.9, env="TIER_PREDICTION_MIN_CONFIDENCE")
+    tier_prediction_audit_rate: float = Field(default=0.1, env="TIER_PREDICTION_AUDIT_RATE")
+    tier_prediction_state_path: Optional[str] = Field(default=None, env="TIER_PREDICTION_STATE_PATH")
+
+    # Async LLM client: shared connection pool, concurrency cap, in-flight dedupe, micro-batching
+    llm_async_client_enabled: bool = Field(default=False, env="LLM_ASYNC_CLIENT_ENABLED")
+    llm_max_concurrency: int = Field(default=8, env="LLM_MAX_CONCURRENCY")
+    llm_batch_enabled: bool = Field(default=False, env="LLM_BATCH_ENABLED")
+    llm_batch_max_size: int = Field(default=4, env="LLM_BATCH_MAX_SIZE")
+    llm_batch_window_ms: float = Field(default=20.0, env="LLM_BATCH_WINDOW_MS")
+    llm_batch_max_chars: int = Field(default=600, env="LLM_BATCH_MAX_CHARS")
+
     # FHIR Factory Registry Feature Flags (REFACTOR-001)
     use_legacy_factory: bool = Field(default=False, env="USE_LEGACY_FACTORY")
     use_new_patient_factory: bool = Field(default=True, env="USE_NEW_PATIENT_FACTORY")
@@ -50,23 +50,29 @@ async def lifespan(app: FastAPI):
     """
     # Startup: Model warmup
     logger = logging.getLogger(__name__)
-    logger.info("Starting application with model warmup for optimal performance...")
-    warmup_result = await model_warmup_service.warmup_models()
-
-    if warmup_result["models_loaded"]:
-        logger.info(
-            f"✅ Model warmup successful - Application ready in {warmup_result['total_time_seconds']:.2f}s"
-        )
+    if settings.model_warmup_background:
+        # Tiers load concurrently while requests are served by the tiers already available
+        logger.info("Starting application with background model warmup...")
+        model_warmup_service.start_background_warmup()
     else:
-        logger.warning(
-            f"⚠️ Model warmup completed with errors in {warmup_result['total_time_seconds']:.2f}s - "
-            "Some models may not be available"
-        )
+        logger.info("Starting application with model warmup for optimal performance...")
+        warmup_result = await model_warmup_service.warmup_models()
+
+        if warmup_result["models_loaded"]:
+            logger.info(
+                f"✅ Model warmup successful - Application ready in {warmup_result['total_time_seconds']:.2f}s"
+            )
+        else:
+            logger.warning(
+                f"⚠️ Model warmup completed with errors in {warmup_result['total_time_seconds']:.2f}s - "
+                "Some models may not be available"
+            )
 
     yield  # Application runs here
 
     # Shutdown: Cleanup
     logger.info("Application shutting down - cleaning up resources...")
+    await model_warmup_service.stop_background_warmup()
     # Model cleanup is handled automatically by garbage collection
 
 
@@ -103,6 +103,12 @@ class ClinicalRequestAdvanced(ClinicalRequest):
         None,
         description="Client-side request timestamp"
     )
+    previous_result_id: Optional[str] = Field(
+        None,
+        description="result_id of an earlier conversion of this note; only edited sentences are re-extracted",
+        max_length=64,
+        pattern=r'^[A-Za-z0-9\-]*$'
+    )
     
     @field_validator('priority')
     @classmethod
@@ -140,6 +146,18 @@ class BulkConversionRequest(BaseModel):
         default_factory=dict,
         description="Processing configuration options"
     )
+    max_concurrency: Optional[int] = Field(
+        None,
+        ge=1,
+        le=50,
+        description="Maximum orders processed concurrently (server default when omitted)"
+    )
+    order_timeout_seconds: Optional[float] = Field(
+        None,
+        gt=0,
+        le=300,
+        description="Per-order processing timeout in seconds (server default when omitted)"
+    )
     
     @field_validator('orders')
     @classmethod
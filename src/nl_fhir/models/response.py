@@ -131,6 +131,16 @@ class ConvertResponseAdvanced(BaseModel):
         description="Human-readable bundle summary (Epic 4)"
     )
 
+    # Incremental re-extraction
+    result_id: Optional[str] = Field(
+        None,
+        description="Handle for an incremental re-conversion of an edited note (previous_result_id)"
+    )
+    incremental: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Reuse statistics when the conversion ran incrementally"
+    )
+
 
 class ErrorResponse(BaseModel):
     """Standardized error response model"""
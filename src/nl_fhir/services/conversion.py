@@ -4,9 +4,12 @@ HIPAA Compliant: No PHI logging, uses request IDs for correlation
 Medical Safety: Comprehensive validation and error handling
 """
 
+import copy
 import time
+import asyncio
 import logging
-from typing import Optional, Dict, Any, List
+from functools import partial
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
 from datetime import datetime
 from uuid import uuid4
 
@@ -21,6 +24,14 @@ from .fhir.bundle_assembler import FHIRBundleAssembler
 from .fhir.hapi_client import get_hapi_client
 from .fhir.validator import get_fhir_validator
 from .task_workflow_service import get_task_workflow_service
+from .incremental_conversion import (
+    ConversionSnapshot, ResourceReuse, entities_from_response, get_snapshot_store,
+    index_entities, reextract_entities
+)
+from .medication_context import ORAL_MEDICATIONS, MedicationContextIndex
+from .nlp.entity_extractor import get_entity_extractor
+from .nlp.entity_record import EntityRecord
+from .nlp.extraction_cache import extraction_fingerprint
 from ..config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -71,10 +82,23 @@ class ConversionService:
             logger.error(f"Request {request_id}: Basic conversion error after {processing_time:.3f}s - {type(e).__name__}")
             raise e
     
-    async def convert_advanced(self, request: ClinicalRequestAdvanced, request_id: Optional[str] = None) -> ConvertResponseAdvanced:
+    async def convert_advanced(self, request: ClinicalRequestAdvanced, request_id: Optional[str] = None,
+                               precomputed_entities: Optional[List[Any]] = None,
+                               store_snapshot: bool = False) -> ConvertResponseAdvanced:
         """
         Advanced conversion with full Epic integration placeholders
         Prepares response structure for future Epic 2-4 integration
+
+        precomputed_entities: entities already extracted for this text (bulk conversion
+        extracts a whole batch in one pass); when given, NLP Stage 1 is skipped.
+
+        With request.previous_result_id naming a stored conversion, only the sentences
+        that differ from that conversion's text are re-extracted and only FHIR resources
+        whose inputs changed are built and validated again.
+
+        store_snapshot: keep this conversion for such a later edit and return its
+        result_id. Only callers that hand result_id back to a client (/api/v1/convert)
+        ask for it; bulk items, which carry precomputed_entities, never store one.
         """
         if not request_id:
             request_id = str(uuid4())
@@ -102,15 +126,42 @@ class ConversionService:
                 complexity_score=self._assess_input_complexity(request.clinical_text)
             )
             
+            # Incremental re-extraction against an earlier conversion of the same note
+            store_snapshot = store_snapshot and precomputed_entities is None
+            snapshot_store = get_snapshot_store() if get_settings().incremental_conversion_enabled else None
+            fingerprint = extraction_fingerprint() if snapshot_store is not None else None
+            snapshot = None
+            incremental_stats = None
+            if snapshot_store is not None and request.previous_result_id and precomputed_entities is None:
+                snapshot = snapshot_store.get(request.previous_result_id, fingerprint)
+                if snapshot is None:
+                    logger.info(f"Request {request_id}: Previous result unavailable, running full conversion")
+                    incremental_stats = {"applied": False, "reason": "previous_result_unavailable"}
+                else:
+                    # Edited sentences skip per-sentence LLM escalation; the note is escalated once
+                    entity_extractor = get_entity_extractor()
+                    precomputed_entities, entity_stats = await asyncio.to_thread(
+                        reextract_entities, request.clinical_text, snapshot,
+                        partial(entity_extractor.extract_entities_batch, escalate_to_llm=False),
+                        get_settings().nlp_segment_max_chars, entity_extractor.escalate_note_entities
+                    )
+                    incremental_stats = {"applied": True, **entity_stats}
+                    logger.info(f"Request {request_id}: Incremental extraction re-extracted "
+                               f"{entity_stats['reextracted_sentences']}/{entity_stats['sentences']} sentences")
+            resource_reuse = ResourceReuse(snapshot.resources if snapshot else None)
+            
             # Epic 2: Full NLP pipeline with MedSpaCy Clinical Intelligence Engine
             # Uses 4-tier medical safety escalation: MedSpaCy → Transformers → Regex → LLM
             nlp_pipeline = await get_nlp_pipeline()
-            nlp_results = await nlp_pipeline.process_clinical_text(request.clinical_text, request_id)
+            nlp_results = await nlp_pipeline.process_clinical_text(
+                request.clinical_text, request_id, entities=precomputed_entities
+            )
             
             # Epic 3: FHIR Resource Creation and Bundle Assembly
             fhir_bundle = None
             fhir_validation_results = None
             bundle_summary = None
+            bundle_entries = None
             
             try:
                 # Create FHIR resources from NLP structured data
@@ -155,7 +206,10 @@ class ConversionService:
                     patient_data["patient_ref"] = request.patient_ref
                     logger.info(f"Request {request_id}: Using provided patient reference: {request.patient_ref}")
 
-                patient_resource = resource_factory.create_patient_resource(patient_data, request_id)
+                patient_resource = resource_reuse.get_or_create(
+                    "Patient", patient_data,
+                    lambda: resource_factory.create_patient_resource(patient_data, request_id)
+                )
                 fhir_resources.append(patient_resource)
                 patient_ref = patient_resource['id']  # Use just the ID, not Patient/ID
                 
@@ -167,7 +221,10 @@ class ConversionService:
                         "identifier": "temp-practitioner"
                     }
                 
-                practitioner_resource = resource_factory.create_practitioner_resource(practitioner_data, request_id)
+                practitioner_resource = resource_reuse.get_or_create(
+                    "Practitioner", practitioner_data,
+                    lambda: resource_factory.create_practitioner_resource(practitioner_data, request_id)
+                )
                 fhir_resources.append(practitioner_resource)
                 practitioner_ref = practitioner_resource['id']  # Use just the ID, not Practitioner/ID
                 
@@ -177,7 +234,11 @@ class ConversionService:
                     "class": "AMB",  # Ambulatory
                     "period": {"start": datetime.now().isoformat()}
                 }
-                encounter_resource = resource_factory.create_encounter_resource(encounter_data, patient_ref, request_id)
+                # The period start is left out of the reuse key: an edit keeps its encounter
+                encounter_resource = resource_reuse.get_or_create(
+                    "Encounter", [encounter_data["status"], encounter_data["class"], patient_ref],
+                    lambda: resource_factory.create_encounter_resource(encounter_data, patient_ref, request_id)
+                )
                 fhir_resources.append(encounter_resource)
                 encounter_ref = encounter_resource['id']  # Use just the ID, not Encounter/ID
                 
@@ -195,15 +256,16 @@ class ConversionService:
 
                 # Process entities from the NLP pipeline format
                 logger.info(f"Request {request_id}: Processing {len(raw_entities)} raw entities from NLP pipeline")
+                context_index: Optional[MedicationContextIndex] = None
 
                 for entity in raw_entities:
                     entity_type = entity.get("type", "unknown")
                     entity_text = entity.get("text", "")
-                    entity_data = {
-                        "text": entity_text,
-                        "confidence": entity.get("confidence", 0.0),
-                        "source": entity.get("source", "nlp_pipeline")
-                    }
+                    entity_data = EntityRecord(
+                        text=entity_text,
+                        confidence=entity.get("confidence", 0.0),
+                        source=entity.get("source", "nlp_pipeline")
+                    )
 
                     # Entity type correction - fix common NLP misclassifications
                     corrected_type = self._correct_entity_type(entity_type, entity_text, request_id)
@@ -220,9 +282,12 @@ class ConversionService:
 
                         # Try to extract route, dosage, and frequency from clinical text context for this medication
                         medication_text = entity_data.get("text", "")
-                        route = self._extract_route_from_context(medication_text, request.clinical_text, request_id)
-                        dosage = self._extract_dosage_from_context(medication_text, request.clinical_text, request_id)
-                        frequency = self._extract_frequency_from_context(medication_text, request.clinical_text, request_id)
+                        # The note is indexed once; each medication is a lookup in it
+                        if context_index is None:
+                            context_index = MedicationContextIndex(request.clinical_text)
+                        route = self._extract_route_from_context(medication_text, request.clinical_text, request_id, context_index)
+                        dosage = self._extract_dosage_from_context(medication_text, request.clinical_text, request_id, context_index)
+                        frequency = self._extract_frequency_from_context(medication_text, request.clinical_text, request_id, context_index)
 
                         entity_data.update({
                             "dosage": attributes.get("dosage", dosage),
@@ -257,9 +322,12 @@ class ConversionService:
                         "intent": "order"
                     }
 
-                    med_request = resource_factory.create_medication_request(
-                        medication_data, patient_ref, request_id,
-                        practitioner_ref=practitioner_ref, encounter_ref=encounter_ref
+                    med_request = resource_reuse.get_or_create(
+                        "MedicationRequest", [medication_data, patient_ref, practitioner_ref, encounter_ref],
+                        lambda: resource_factory.create_medication_request(
+                            medication_data, patient_ref, request_id,
+                            practitioner_ref=practitioner_ref, encounter_ref=encounter_ref
+                        )
                     )
                     fhir_resources.append(med_request)
                 
@@ -275,9 +343,12 @@ class ConversionService:
                         "intent": "order"
                     }
                     
-                    service_request = resource_factory.create_service_request(
-                        service_data, patient_ref, request_id,
-                        practitioner_ref=practitioner_ref, encounter_ref=encounter_ref
+                    service_request = resource_reuse.get_or_create(
+                        "ServiceRequest", [service_data, patient_ref, practitioner_ref, encounter_ref],
+                        lambda: resource_factory.create_service_request(
+                            service_data, patient_ref, request_id,
+                            practitioner_ref=practitioner_ref, encounter_ref=encounter_ref
+                        )
                     )
                     fhir_resources.append(service_request)
                 
@@ -290,9 +361,12 @@ class ConversionService:
                         "verification_status": "provisional"
                     }
                     
-                    condition_resource = resource_factory.create_condition_resource(
-                        condition_data, patient_ref, request_id, 
-                        encounter_ref=encounter_ref
+                    condition_resource = resource_reuse.get_or_create(
+                        "Condition", [condition_data, patient_ref, encounter_ref],
+                        lambda: resource_factory.create_condition_resource(
+                            condition_data, patient_ref, request_id,
+                            encounter_ref=encounter_ref
+                        )
                     )
                     fhir_resources.append(condition_resource)
 
@@ -327,11 +401,14 @@ class ConversionService:
 
                     # Create Observation resources
                     for obs_data in observations_to_create:
-                        obs_resource = resource_factory.create_observation_resource(
-                            obs_data,
-                            patient_ref,
-                            request_id,
-                            encounter_ref=encounter_ref
+                        obs_resource = resource_reuse.get_or_create(
+                            "Observation", [obs_data, patient_ref, encounter_ref],
+                            lambda: resource_factory.create_observation_resource(
+                                obs_data,
+                                patient_ref,
+                                request_id,
+                                encounter_ref=encounter_ref
+                            )
                         )
                         fhir_resources.append(obs_resource)
                 except Exception as e:
@@ -448,8 +525,13 @@ class ConversionService:
                 bundle_assembler = FHIRBundleAssembler()
                 bundle_assembler.initialize()
                 
-                # Create transaction bundle
-                fhir_bundle = bundle_assembler.create_transaction_bundle(fhir_resources, request_id)
+                # Create transaction bundle; unchanged resources keep their validated entries
+                if snapshot_store is not None:
+                    bundle_entries = {
+                        resource_id: entry for resource_id, entry in (snapshot.bundle_entries if snapshot else {}).items()
+                        if resource_id in resource_reuse.reused_ids
+                    }
+                fhir_bundle = bundle_assembler.create_transaction_bundle(fhir_resources, request_id, bundle_entries)
                 
                 # Optimize bundle for HAPI FHIR processing
                 fhir_bundle = bundle_assembler.optimize_bundle(fhir_bundle, request_id)
@@ -516,6 +598,15 @@ class ConversionService:
                     "validation_source": "nl_fhir_error"
                 }
             
+            result_id = None
+            if store_snapshot and snapshot_store is not None and nlp_results.get("status") == "completed":
+                result_id = self._store_snapshot(
+                    snapshot_store, request_id, request.clinical_text, fingerprint,
+                    nlp_results, resource_reuse, bundle_entries
+                )
+            if incremental_stats and incremental_stats["applied"]:
+                incremental_stats.update(resource_reuse.get_stats())
+            
             # Create advanced response with Epic 2 NLP + Epic 3 FHIR integration
             response = ConvertResponseAdvanced(
                 request_id=request_id,
@@ -536,7 +627,10 @@ class ConversionService:
                 
                 # Epic 4 placeholders (Reverse Validation)
                 safety_checks=None,  # Will be populated in Epic 4
-                human_readable_summary=None  # Will be populated in Epic 4
+                human_readable_summary=None,  # Will be populated in Epic 4
+                
+                result_id=result_id,
+                incremental=incremental_stats
             )
             
             logger.info(f"Request {request_id}: Advanced conversion completed in {processing_time_ms:.2f}ms")
@@ -547,6 +641,29 @@ class ConversionService:
             logger.error(f"Request {request_id}: Advanced conversion error after {processing_time:.3f}s - {type(e).__name__}")
             raise e
     
+    def _store_snapshot(self, snapshot_store, request_id: str, clinical_text: str, fingerprint: str,
+                        nlp_results: Dict[str, Any], resource_reuse: ResourceReuse,
+                        bundle_entries: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Keep what a later incremental conversion of this note can reuse; returns the result handle"""
+        try:
+            raw_entities = nlp_results.get("extracted_entities", {}).get("entities", [])
+            sentence_entities, note_entities = index_entities(
+                clinical_text, entities_from_response(raw_entities), get_settings().nlp_segment_max_chars
+            )
+            snapshot_store.set(request_id, ConversionSnapshot(
+                fingerprint=fingerprint,
+                sentence_entities=sentence_entities,
+                note_entities=note_entities,
+                # Copies: the resources and entries handed out with this response may be modified downstream
+                resources=copy.deepcopy(resource_reuse.resources),
+                bundle_entries=copy.deepcopy(bundle_entries or {})
+            ))
+            return request_id
+        except Exception as e:
+            # A snapshot failure only costs the next edit a full conversion
+            logger.warning(f"Request {request_id}: Conversion snapshot not stored: {type(e).__name__}")
+            return None
+    
     async def _validate_clinical_input(self, request: ClinicalRequestAdvanced, request_id: str) -> ValidationResult:
         """
         Comprehensive validation of clinical input
@@ -633,13 +750,12 @@ class ConversionService:
         Combines entity extraction with pattern matching
         """
         import re
-        from .nlp.entity_extractor import MedicalEntityExtractor, EntityType
+        from .nlp.entity_extractor import get_entity_extractor, EntityType
         
         text_lower = clinical_text.lower()
         
-        # Initialize entity extractor
-        entity_extractor = MedicalEntityExtractor()
-        entity_extractor.initialize()
+        # Shared entity extractor (built and initialized once per process)
+        entity_extractor = get_entity_extractor()
         
         # Extract entities using the entity extractor
         entities = entity_extractor.extract_entities(clinical_text, request_id)
@@ -670,45 +786,44 @@ class ConversionService:
                         if abs(other_entity.start_char - entity.start_char) < 30:
                             frequency = other_entity.text
                 
-                medication_data = {
-                    "text": entity.text,  # Changed from "name" to "text" for FHIR compatibility
-                    "dosage": dosage,
-                    "frequency": frequency,
-                    "confidence": entity.confidence,
-                    "source": entity.source
-                }
+                medication_data = EntityRecord(
+                    text=entity.text,  # Changed from "name" to "text" for FHIR compatibility
+                    confidence=entity.confidence,
+                    source=entity.source,
+                    extra={"dosage": dosage, "frequency": frequency}
+                )
                 extracted_entities["medications"].append(medication_data)
             
             elif entity.entity_type == EntityType.LAB_TEST:
-                lab_data = {
-                    "text": entity.text,  # Changed from "name" to "text" for FHIR compatibility
-                    "confidence": entity.confidence,
-                    "source": entity.source
-                }
+                lab_data = EntityRecord(
+                    text=entity.text,  # Changed from "name" to "text" for FHIR compatibility
+                    confidence=entity.confidence,
+                    source=entity.source
+                )
                 extracted_entities["lab_tests"].append(lab_data)
             
             elif entity.entity_type == EntityType.PROCEDURE:
-                procedure_data = {
-                    "text": entity.text,  # Changed from "name" to "text" for FHIR compatibility
-                    "confidence": entity.confidence,
-                    "source": entity.source
-                }
+                procedure_data = EntityRecord(
+                    text=entity.text,  # Changed from "name" to "text" for FHIR compatibility
+                    confidence=entity.confidence,
+                    source=entity.source
+                )
                 extracted_entities["procedures"].append(procedure_data)
             
             elif entity.entity_type == EntityType.CONDITION:
-                condition_data = {
-                    "text": entity.text,  # Changed from "name" to "text" for FHIR compatibility
-                    "confidence": entity.confidence,
-                    "source": entity.source
-                }
+                condition_data = EntityRecord(
+                    text=entity.text,  # Changed from "name" to "text" for FHIR compatibility
+                    confidence=entity.confidence,
+                    source=entity.source
+                )
                 extracted_entities["conditions"].append(condition_data)
             
             elif entity.entity_type == EntityType.PERSON:
-                person_data = {
-                    "text": entity.text,
-                    "confidence": entity.confidence,
-                    "source": entity.source
-                }
+                person_data = EntityRecord(
+                    text=entity.text,
+                    confidence=entity.confidence,
+                    source=entity.source
+                )
                 extracted_entities["patients"].append(person_data)  # Changed from "persons" to "patients"
         
         # Deduplicate extracted entities to prevent duplicate FHIR resources
@@ -805,76 +920,23 @@ class ConversionService:
             "confidence_score": 0.8  # Higher confidence for entity extractor
         }
 
-    def _extract_route_from_context(self, medication_text: str, clinical_text: str, request_id: str) -> str:
+    def _extract_route_from_context(self, medication_text: str, clinical_text: str, request_id: str,
+                                    context_index: Optional[MedicationContextIndex] = None) -> str:
         """Extract route of administration from clinical text context"""
-        import re
-
-        # Convert to lowercase for case-insensitive matching
-        text_lower = clinical_text.lower()
-        med_lower = medication_text.lower()
-
-        # First check if medication is typically oral (most common medications)
-        oral_medications = {
-            'metformin', 'lisinopril', 'amlodipine', 'simvastatin', 'omeprazole', 'levothyroxine',
-            'sertraline', 'fluoxetine', 'aspirin', 'ibuprofen', 'acetaminophen', 'amoxicillin',
-            'azithromycin', 'ciprofloxacin', 'prednisone', 'hydrochlorothiazide', 'metoprolol',
-            'warfarin', 'furosemide', 'gabapentin', 'cephalexin', 'captopril', 'enalapril', 'ramipril'
-        }
-
-        # Find the position of the medication in the text
-        med_pos = text_lower.find(med_lower)
-        if med_pos == -1:
-            # If medication is in our oral list, default to oral, otherwise generic oral
-            default_route = "oral" if med_lower in oral_medications else "oral"
-            logger.info(f"Request {request_id}: Medication '{medication_text}' not found in text, defaulting to {default_route}")
-            return default_route
-
-        # Look for route keywords within a reasonable distance of the medication
-        # Check 25 characters before and after the medication for more precise matching
-        context_start = max(0, med_pos - 25)
-        context_end = min(len(text_lower), med_pos + len(med_lower) + 25)
-        context = text_lower[context_start:context_end]
-
-        # Route patterns to look for - longer form keywords only to avoid false matches
-        route_patterns = {
-            "iv": ["intravenous", "intravenously"],
-            "oral": ["oral", "orally", "by mouth"],
-            "im": ["intramuscular", "intramuscularly"],
-            "subcutaneous": ["subcutaneous", "subcutaneously", "subq"],
-            "topical": ["topical", "topically", "applied"],
-            "inhaled": ["inhaled", "inhalation", "nebulized"],
-            "nasal": ["nasal", "nasally", "intranasal"],
-            "rectal": ["rectal", "rectally"],
-            "sublingual": ["sublingual", "sublingually"]
-        }
+        context_index = context_index or MedicationContextIndex(clinical_text)
 
-        # Special patterns that need word boundary checking (short abbreviations)
-        special_patterns = {
-            "iv": [r'\biv\b'],
-            "im": [r'\bim\b'],
-            "subcutaneous": [r'\bsc\b'],  # Only match "sc" as a complete word
-            "oral": [r'\bpo\b'],
-            "rectal": [r'\bpr\b'],
-            "sublingual": [r'\bsl\b']
-        }
+        if context_index.locate(medication_text) == -1:
+            logger.info(f"Request {request_id}: Medication '{medication_text}' not found in text, defaulting to oral")
+            return "oral"
 
-        # First check special patterns with word boundaries
-        import re
-        for route_name, patterns in special_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, context, re.IGNORECASE):
-                    logger.info(f"Request {request_id}: Found route '{route_name}' for medication '{medication_text}' using pattern '{pattern}'")
-                    return route_name
-
-        # Then check regular keywords (longer forms to avoid false matches)
-        for route_name, keywords in route_patterns.items():
-            for keyword in keywords:
-                if keyword in context:
-                    logger.info(f"Request {request_id}: Found route '{route_name}' for medication '{medication_text}' using keyword '{keyword}'")
-                    return route_name
+        found = context_index.route(medication_text)
+        if found:
+            route_name, keyword = found
+            logger.info(f"Request {request_id}: Found route '{route_name}' for medication '{medication_text}' using keyword '{keyword}'")
+            return route_name
 
         # Smart defaulting based on medication type
-        if med_lower in oral_medications:
+        if medication_text.lower() in ORAL_MEDICATIONS:
             logger.info(f"Request {request_id}: No specific route found for oral medication '{medication_text}', defaulting to oral")
             return "oral"
 
@@ -882,113 +944,36 @@ class ConversionService:
         logger.info(f"Request {request_id}: No specific route found for medication '{medication_text}', defaulting to oral")
         return "oral"
 
-    def _extract_dosage_from_context(self, medication_text: str, clinical_text: str, request_id: str) -> str:
+    def _extract_dosage_from_context(self, medication_text: str, clinical_text: str, request_id: str,
+                                     context_index: Optional[MedicationContextIndex] = None) -> str:
         """Extract dosage from clinical text context"""
-        import re
-
-        # Convert to lowercase for case-insensitive matching
-        text_lower = clinical_text.lower()
-        med_lower = medication_text.lower()
+        context_index = context_index or MedicationContextIndex(clinical_text)
 
-        # Find the position of the medication in the text
-        med_pos = text_lower.find(med_lower)
-        if med_pos == -1:
+        if context_index.locate(medication_text) == -1:
             return "As directed"  # Default fallback
 
-        # Look for dosage patterns within a reasonable distance of the medication
-        # Check 30 characters before and after the medication
-        context_start = max(0, med_pos - 30)
-        context_end = min(len(text_lower), med_pos + len(med_lower) + 30)
-        context = clinical_text[context_start:context_end]  # Use original case for dosage extraction
-
-        # Dosage patterns to look for (with units)
-        dosage_patterns = [
-            r'(\d+(?:\.\d+)?\s*mg(?:/m²)?)',  # mg or mg/m²
-            r'(\d+(?:\.\d+)?\s*g)',          # grams
-            r'(\d+(?:\.\d+)?\s*ml)',         # milliliters
-            r'(\d+(?:\.\d+)?\s*mcg)',        # micrograms
-            r'(\d+(?:\.\d+)?\s*units?)',     # units
-            r'(\d+(?:\.\d+)?\s*iu)',         # international units
-            r'(\d+(?:\.\d+)?\s*tablets?)',   # tablets
-            r'(\d+(?:\.\d+)?\s*capsules?)',  # capsules
-            r'(\d+(?:\.\d+)?\s*drops?)',     # drops
-            r'(\d+(?:\.\d+)?\s*l\b)',        # liters (with word boundary)
-        ]
-
-        # Search for dosage patterns in the context
-        for pattern in dosage_patterns:
-            matches = re.findall(pattern, context, re.IGNORECASE)
-            if matches:
-                dosage = matches[0].strip()
-                logger.info(f"Request {request_id}: Found dosage '{dosage}' for medication '{medication_text}'")
-                return dosage
+        dosage = context_index.dosage(medication_text)
+        if dosage:
+            logger.info(f"Request {request_id}: Found dosage '{dosage}' for medication '{medication_text}'")
+            return dosage
 
         # Default to "As directed" if no specific dosage found
         logger.info(f"Request {request_id}: No specific dosage found for medication '{medication_text}', defaulting to 'As directed'")
         return "As directed"
 
-    def _extract_frequency_from_context(self, medication_text: str, clinical_text: str, request_id: str) -> str:
+    def _extract_frequency_from_context(self, medication_text: str, clinical_text: str, request_id: str,
+                                        context_index: Optional[MedicationContextIndex] = None) -> str:
         """Extract frequency from clinical text context"""
-        import re
+        context_index = context_index or MedicationContextIndex(clinical_text)
 
-        # Convert to lowercase for case-insensitive matching
-        text_lower = clinical_text.lower()
-        med_lower = medication_text.lower()
-
-        # Find the position of the medication in the text
-        med_pos = text_lower.find(med_lower)
-        if med_pos == -1:
+        if context_index.locate(medication_text) == -1:
             return "As needed"  # Default fallback
 
-        # Look for frequency patterns within a reasonable distance of the medication
-        # Check 30 characters before and after the medication for more precise matching
-        context_start = max(0, med_pos - 30)
-        context_end = min(len(text_lower), med_pos + len(med_lower) + 30)
-        context = text_lower[context_start:context_end]
-
-        # Frequency patterns to look for
-        frequency_patterns = {
-            "once daily": ["once daily", "once a day", "qd", "od"],
-            "twice daily": ["twice daily", "twice a day", "bid", "b.i.d.", "2x daily"],
-            "three times daily": ["three times daily", "three times a day", "tid", "t.i.d.", "3x daily"],
-            "four times daily": ["four times daily", "four times a day", "qid", "q.i.d.", "4x daily"],
-            "every 6 hours": ["every 6 hours", "q6h", "6 hourly"],
-            "every 8 hours": ["every 8 hours", "q8h", "8 hourly"],
-            "every 12 hours": ["every 12 hours", "q12h", "12 hourly"],
-            "every 2 weeks": ["every 2 weeks", "every two weeks", "biweekly"],
-            "every 3 weeks": ["every 3 weeks", "every three weeks"],
-            "every 4 weeks": ["every 4 weeks", "every four weeks", "monthly"],
-            "weekly": ["weekly", "once weekly", "every week"],
-            "as needed": ["as needed", "prn", "p.r.n.", "when needed"],
-            "before meals": ["before meals", "ac", "a.c.", "pre-meal"],
-            "after meals": ["after meals", "pc", "p.c.", "post-meal"],
-            "at bedtime": ["at bedtime", "qhs", "q.h.s.", "bedtime"],
-        }
-
-        # Check for frequency keywords in the context
-        # Sort by length (longest first) to avoid partial matches
-        sorted_patterns = sorted(frequency_patterns.items(), key=lambda x: max(len(k) for k in x[1]), reverse=True)
-
-        for frequency_name, keywords in sorted_patterns:
-            for keyword in keywords:
-                if keyword in context:
-                    logger.info(f"Request {request_id}: Found frequency '{frequency_name}' for medication '{medication_text}' using keyword '{keyword}'")
-                    return frequency_name
-
-        # Look for numeric patterns like "2x" or "3 times"
-        numeric_patterns = [
-            (r'\b(\d+)\s*x\s+daily\b', lambda m: f"{m.group(1)} times daily"),
-            (r'\b(\d+)\s+times?\s+daily\b', lambda m: f"{m.group(1)} times daily"),
-            (r'\b(\d+)\s*x\s+per\s+day\b', lambda m: f"{m.group(1)} times daily"),
-            (r'\bevery\s+(\d+)\s+hours?\b', lambda m: f"every {m.group(1)} hours"),
-        ]
-
-        for pattern, formatter in numeric_patterns:
-            match = re.search(pattern, context)
-            if match:
-                frequency = formatter(match)
-                logger.info(f"Request {request_id}: Found numeric frequency '{frequency}' for medication '{medication_text}'")
-                return frequency
+        found = context_index.frequency(medication_text)
+        if found:
+            frequency, keyword = found
+            logger.info(f"Request {request_id}: Found frequency '{frequency}' for medication '{medication_text}' using '{keyword}'")
+            return frequency
 
         # Default to "As needed" if no specific frequency found
         logger.info(f"Request {request_id}: No specific frequency found for medication '{medication_text}', defaulting to 'As needed'")
@@ -1248,36 +1233,34 @@ class ConversionService:
         logger.info(f"Request {request_id}: Deduplicated {len(medications)} medications to {len(result)} unique medications")
         return result
 
-    async def bulk_convert(self, requests: List[ClinicalRequestAdvanced], batch_id: Optional[str] = None) -> Dict[str, Any]:
+    async def bulk_convert(self, requests: List[ClinicalRequestAdvanced], batch_id: Optional[str] = None,
+                           max_concurrency: Optional[int] = None,
+                           order_timeout_seconds: Optional[float] = None) -> Dict[str, Any]:
         """
         Bulk conversion processing (Story 1.3 advanced feature)
         Processes multiple clinical orders in a single batch
+
+        Orders run concurrently, bounded by max_concurrency (defaults to BULK_MAX_CONCURRENCY;
+        1 keeps the original serial behaviour). Each order is limited to order_timeout_seconds.
+        Results are returned in the same order as the requests.
         """
         if not batch_id:
             batch_id = f"batch_{str(uuid4())[:8]}"
         
         start_time = time.time()
-        results = []
+        results: List[Any] = [None] * len(requests)
         successful_count = 0
         failed_count = 0
         
         logger.info(f"Starting bulk conversion {batch_id} - {len(requests)} orders")
         
-        for i, request in enumerate(requests):
-            try:
-                result = await self.convert_advanced(request, f"{batch_id}_order_{i+1}")
-                results.append(result)
+        async for index, result, success in self._iter_bulk_results(
+            requests, batch_id, max_concurrency, order_timeout_seconds
+        ):
+            results[index] = result
+            if success:
                 successful_count += 1
-            except Exception as e:
-                error_response = ErrorResponse(
-                    request_id=f"{batch_id}_order_{i+1}",
-                    error_code="CONVERSION_FAILED",
-                    error_type="processing_error",
-                    message=f"Failed to process order {i+1}: {str(e)}",
-                    timestamp=datetime.now(),
-                    suggestions=["Review clinical text format", "Try processing individually"]
-                )
-                results.append(error_response)
+            else:
                 failed_count += 1
         
         total_time_ms = (time.time() - start_time) * 1000
@@ -1299,6 +1282,111 @@ class ConversionService:
                 "processing_date": datetime.now().isoformat()
             }
         }
+    
+    async def bulk_convert_stream(self, requests: List[ClinicalRequestAdvanced], batch_id: Optional[str] = None,
+                                  max_concurrency: Optional[int] = None,
+                                  order_timeout_seconds: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming bulk conversion: yields each order result as soon as it completes
+        Order of emission follows completion; every item carries its original order index
+        """
+        if not batch_id:
+            batch_id = f"batch_{str(uuid4())[:8]}"
+        
+        logger.info(f"Starting streaming bulk conversion {batch_id} - {len(requests)} orders")
+        
+        async for index, result, success in self._iter_bulk_results(
+            requests, batch_id, max_concurrency, order_timeout_seconds
+        ):
+            yield {
+                "batch_id": batch_id,
+                "order_index": index,
+                "request_id": f"{batch_id}_order_{index+1}",
+                "status": "completed" if success else "failed",
+                "result": result
+            }
+    
+    async def _iter_bulk_results(self, requests: List[ClinicalRequestAdvanced], batch_id: str,
+                                 max_concurrency: Optional[int],
+                                 order_timeout_seconds: Optional[float]) -> AsyncIterator[Tuple[int, Any, bool]]:
+        """Run batch orders under a concurrency limit, yielding (index, result, success) as each completes"""
+        settings = get_settings()
+        max_concurrency = max(1, max_concurrency or settings.bulk_max_concurrency)
+        order_timeout_seconds = order_timeout_seconds or settings.bulk_order_timeout_seconds
+        
+        batch_entities = await self._extract_batch_entities(requests, batch_id)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run_order(index: int, request: ClinicalRequestAdvanced) -> Tuple[int, Any, bool]:
+            async with semaphore:
+                return await self._convert_bulk_order(
+                    index, request, batch_id, batch_entities[index], order_timeout_seconds
+                )
+        
+        tasks = [asyncio.ensure_future(run_order(i, request)) for i, request in enumerate(requests)]
+        try:
+            for next_completed in asyncio.as_completed(tasks):
+                yield await next_completed
+        finally:
+            # Client disconnects on the streaming endpoint close this generator early
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    async def _convert_bulk_order(self, index: int, request: ClinicalRequestAdvanced, batch_id: str,
+                                  precomputed_entities: Optional[List[Any]],
+                                  timeout_seconds: float) -> Tuple[int, Any, bool]:
+        """Convert one batch order, turning failures and timeouts into ErrorResponse results"""
+        request_id = f"{batch_id}_order_{index+1}"
+        try:
+            result = await asyncio.wait_for(
+                self.convert_advanced(request, request_id, precomputed_entities=precomputed_entities),
+                timeout=timeout_seconds
+            )
+            return index, result, True
+        except asyncio.TimeoutError:
+            logger.warning(f"Bulk conversion {batch_id}: order {index+1} timed out after {timeout_seconds}s")
+            error_response = ErrorResponse(
+                request_id=request_id,
+                error_code="CONVERSION_TIMEOUT",
+                error_type="timeout_error",
+                message=f"Order {index+1} exceeded the {timeout_seconds}s processing limit",
+                timestamp=datetime.now(),
+                suggestions=["Try processing individually", "Reduce clinical text length"]
+            )
+            return index, error_response, False
+        except Exception as e:
+            error_response = ErrorResponse(
+                request_id=request_id,
+                error_code="CONVERSION_FAILED",
+                error_type="processing_error",
+                message=f"Failed to process order {index+1}: {str(e)}",
+                timestamp=datetime.now(),
+                suggestions=["Review clinical text format", "Try processing individually"]
+            )
+            return index, error_response, False
+    
+    async def _extract_batch_entities(self, requests: List[ClinicalRequestAdvanced], batch_id: str) -> List[Optional[List[Any]]]:
+        """
+        Extract entities for every order of a batch in one nlp.pipe pass
+        Returns None per order when batching fails so each order falls back to per-request extraction
+        """
+        if not requests:
+            return []
+        
+        settings = get_settings()
+        try:
+            nlp_pipeline = await get_nlp_pipeline()
+            return await nlp_pipeline.extract_entities_batch_async(
+                [request.clinical_text for request in requests],
+                [f"{batch_id}_order_{i+1}" for i in range(len(requests))],
+                batch_size=settings.nlp_batch_size,
+                n_process=settings.nlp_batch_n_process
+            )
+        except Exception as e:
+            logger.warning(f"Bulk conversion {batch_id}: batched extraction unavailable, "
+                           f"extracting per order - {type(e).__name__}")
+            return [None] * len(requests)
 
 
 # Legacy function for backward compatibility with existing tests
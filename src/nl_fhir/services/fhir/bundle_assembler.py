@@ -4,6 +4,7 @@ Assembles FHIR resources into transaction bundles
 HIPAA Compliant: Secure bundle creation and validation
 """
 
+import copy
 import logging
 from typing import Dict, List, Any, Optional, TYPE_CHECKING
 from datetime import datetime, timezone
@@ -60,8 +61,15 @@ class FHIRBundleAssembler:
             logger.error(f"Failed to initialize FHIR bundle assembler: {e}")
             return False
     
-    def create_transaction_bundle(self, resources: List[Dict[str, Any]], request_id: Optional[str] = None) -> Dict[str, Any]:
-        """Create FHIR transaction bundle from list of resources"""
+    def create_transaction_bundle(self, resources: List[Dict[str, Any]], request_id: Optional[str] = None,
+                                  entry_cache: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Create FHIR transaction bundle from list of resources
+
+        entry_cache: validated bundle entries by resource id. Resources found in it
+        reuse their entry instead of being validated again, and every entry built
+        is added to it (incremental conversion passes the entries of unchanged resources).
+        """
         
         if not self.initialized:
             self.initialize()
@@ -71,7 +79,7 @@ class FHIRBundleAssembler:
         
         # Try FHIR bundle creation first, fallback only if needed
         try:
-            return self._create_fhir_bundle(resources, request_id)
+            return self._create_fhir_bundle(resources, request_id, entry_cache)
         except Exception as e:
             logger.warning(f"[{request_id}] FHIR bundle creation failed, using fallback: {e}")
             return self._create_fallback_bundle(resources, request_id)
@@ -361,7 +369,8 @@ class FHIRBundleAssembler:
             "total_references": len(references)
         }
 
-    def _create_fhir_bundle(self, resources: List[Dict[str, Any]], request_id: Optional[str]) -> Dict[str, Any]:
+    def _create_fhir_bundle(self, resources: List[Dict[str, Any]], request_id: Optional[str],
+                            entry_cache: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Create bundle using proper FHIR objects with improved validation handling"""
 
         try:
@@ -377,6 +386,12 @@ class FHIRBundleAssembler:
                     logger.warning(f"[{request_id}] Resource missing type or id, skipping: {resource}")
                     continue
 
+                if entry_cache is not None and resource_id in entry_cache:
+                    cached_entry = entry_cache[resource_id]
+                    # Dict entries may end up in the returned bundle as-is
+                    entries.append(copy.deepcopy(cached_entry) if isinstance(cached_entry, dict) else cached_entry)
+                    continue
+
                 # Create entry dict that BundleEntry can handle
                 entry_dict = {
                     "resource": resource,
@@ -390,10 +405,12 @@ class FHIRBundleAssembler:
                 # Try to create BundleEntry, fallback to dict if needed
                 try:
                     entry = BundleEntry.parse_obj(entry_dict)
-                    entries.append(entry)
                 except Exception as be_error:
                     logger.warning(f"[{request_id}] BundleEntry creation failed for {resource_type}, using dict: {be_error}")
-                    entries.append(entry_dict)
+                    entry = entry_dict
+                entries.append(entry)
+                if entry_cache is not None:
+                    entry_cache[resource_id] = entry
 
             if not entries:
                 raise ValueError("No valid entries created for bundle")
@@ -0,0 +1,305 @@
+"""
+Bounded In-Memory Caches for the FHIR Pipeline
+LRUTTLCache keeps entries in recency order, so get, put and eviction are O(1), and a
+second map in insertion order lets expired entries be dropped from the front without
+scanning the rest. Limits apply to entry count and, optionally, to the approximate
+serialized size of the cached values. StripedLRUCache splits keys over independently
+locked LRUTTLCache stripes so concurrent requests rarely wait on one another; LRU order
+and limits are kept per stripe. CacheSweeper expires entries in the background so
+caches that are written but seldom read do not hold stale results until the next read.
+HIPAA Compliant: Cached values stay in process memory, only counts and sizes are reported
+"""
+
+import json
+import logging
+import math
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def approximate_size(value: Any) -> int:
+    """Bytes of the compact JSON form of value, or its shallow size when it is not JSON data"""
+    try:
+        return len(json.dumps(value, separators=(",", ":"), default=str))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
+
+class LRUTTLCache:
+    """Thread-safe LRU store whose entries also expire ttl_seconds after they were stored"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600, name: str = "cache",
+                 max_bytes: Optional[int] = None, sizeof: Callable[[Any], int] = approximate_size):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        # key -> (value, size), least recently used first
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        # key -> stored at; the TTL is shared, so insertion order is expiry order
+        self._stored_at: "OrderedDict[str, float]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expirations": 0, "rejected": 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            if now - self._stored_at[key] > self.ttl_seconds:
+                self._remove(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[0]
+
+    def put(self, key: str, value: Any) -> None:
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        now = time.monotonic()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                # Larger than the whole cache: storing it would only flush everything else
+                self._stats["rejected"] += 1
+                return
+            self._entries[key] = (value, size)
+            self._stored_at[key] = now
+            self._bytes += size
+            self._stats["stores"] += 1
+            self._evict_over_limits()
+
+    def discard(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def sweep_expired(self) -> int:
+        """Drop every expired entry; only the expired ones are visited"""
+        now = time.monotonic()
+        expired = 0
+        with self._lock:
+            while self._stored_at:
+                key, stored_at = next(iter(self._stored_at.items()))
+                if now - stored_at <= self.ttl_seconds:
+                    break
+                self._remove(key)
+                expired += 1
+            self._stats["expirations"] += expired
+        return expired
+
+    def resize(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max(1, int(max_entries))
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict_over_limits()
+
+    def clear(self) -> int:
+        with self._lock:
+            cleared = len(self._entries)
+            self._entries.clear()
+            self._stored_at.clear()
+            self._bytes = 0
+            return cleared
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = self._empty_stats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                **self._stats,
+            }
+
+    def _remove(self, key: str) -> None:
+        _, size = self._entries.pop(key)
+        del self._stored_at[key]
+        self._bytes -= size
+
+    def _evict_over_limits(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self._stats["evictions"] += 1
+
+
+class StripedLRUCache:
+    """LRUTTLCache split into independently locked stripes by key hash"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600, name: str = "cache",
+                 max_bytes: Optional[int] = None, stripes: int = 16,
+                 sizeof: Callable[[Any], int] = approximate_size):
+        self.name = name
+        # No more stripes than entries, so small caches keep roughly their configured size
+        stripe_count = max(1, min(stripes, int(max_entries)))
+        self._stripes: List[LRUTTLCache] = [
+            LRUTTLCache(1, ttl_seconds, name=f"{name}[{i}]", sizeof=sizeof) for i in range(stripe_count)
+        ]
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.resize(max_entries, max_bytes)
+
+    @property
+    def stripes(self) -> int:
+        return len(self._stripes)
+
+    @property
+    def ttl_seconds(self) -> float:
+        return self._stripes[0].ttl_seconds
+
+    @ttl_seconds.setter
+    def ttl_seconds(self, value: float) -> None:
+        for stripe in self._stripes:
+            stripe.ttl_seconds = value
+
+    def _stripe(self, key: str) -> LRUTTLCache:
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._stripe(key).get(key)
+
+    def put(self, key: str, value: Any) -> None:
+        self._stripe(key).put(key, value)
+
+    def discard(self, key: str) -> bool:
+        return self._stripe(key).discard(key)
+
+    def sweep_expired(self) -> int:
+        return sum(stripe.sweep_expired() for stripe in self._stripes)
+
+    def resize(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        """Split new limits evenly over the stripes"""
+        if max_entries is not None:
+            self.max_entries = int(max_entries)
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        per_stripe_entries = math.ceil(self.max_entries / len(self._stripes))
+        per_stripe_bytes = None if self.max_bytes is None else max(1, self.max_bytes // len(self._stripes))
+        for stripe in self._stripes:
+            stripe.resize(per_stripe_entries)
+            stripe.max_bytes = per_stripe_bytes
+            stripe.resize()
+
+    def clear(self) -> int:
+        return sum(stripe.clear() for stripe in self._stripes)
+
+    def reset_stats(self) -> None:
+        for stripe in self._stripes:
+            stripe.reset_stats()
+
+    def __len__(self) -> int:
+        return sum(len(stripe) for stripe in self._stripes)
+
+    @property
+    def bytes(self) -> int:
+        return sum(stripe.bytes for stripe in self._stripes)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stripe_stats = [stripe.get_stats() for stripe in self._stripes]
+        totals = {key: sum(stats[key] for stats in stripe_stats)
+                  for key in ("entries", "bytes", "hits", "misses", "stores", "evictions", "expirations", "rejected")}
+        lookups = totals["hits"] + totals["misses"]
+        return {
+            "name": self.name,
+            "stripes": len(self._stripes),
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hit_rate": totals["hits"] / lookups if lookups else 0.0,
+            **totals,
+        }
+
+
+class CacheSweeper:
+    """Daemon thread that periodically drops expired entries from the registered caches"""
+
+    def __init__(self, interval_seconds: float = 60.0):
+        self.interval_seconds = interval_seconds
+        self._caches: "weakref.WeakSet" = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.sweeps = 0
+        self.expired = 0
+
+    def register(self, cache) -> None:
+        """Sweep cache (anything with sweep_expired) until it is garbage collected"""
+        with self._lock:
+            self._caches.add(cache)
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="cache-sweeper", daemon=True)
+                self._thread.start()
+
+    def sweep_once(self) -> int:
+        with self._lock:
+            caches = list(self._caches)
+        expired = 0
+        for cache in caches:
+            try:
+                expired += cache.sweep_expired()
+            except Exception as e:
+                logger.warning(f"Cache sweep failed for {getattr(cache, 'name', 'cache')}: {e}")
+        self.sweeps += 1
+        self.expired += expired
+        return expired
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.sweep_once()
+
+
+_cache_sweeper: Optional[CacheSweeper] = None
+_cache_sweeper_lock = threading.Lock()
+
+
+def get_cache_sweeper() -> CacheSweeper:
+    """Shared background sweeper; one thread serves every cache in the process"""
+    global _cache_sweeper
+    if _cache_sweeper is None:
+        with _cache_sweeper_lock:
+            if _cache_sweeper is None:
+                _cache_sweeper = CacheSweeper()
+    return _cache_sweeper
@@ -11,6 +11,7 @@ from typing import Dict, List, Any, Optional, Set
 from datetime import datetime
 
 from .base import BaseResourceFactory
+from ...terminology_store import TermMentionIndex, terminology_table
 
 
 logger = logging.getLogger(__name__)
@@ -55,6 +56,12 @@ class ClinicalResourceFactory(BaseResourceFactory):
         self._init_condition_mapping()
         self._init_allergy_mapping()
 
+        # Large code tables come from the compiled terminology store when configured
+        self._lab_test_loinc = terminology_table('lab_test_loinc', self._lab_test_loinc)
+        self._condition_codes = terminology_table('condition_codes', self._condition_codes)
+        self._lab_test_index = TermMentionIndex(self._lab_test_loinc)
+        self._condition_index = TermMentionIndex(self._condition_codes)
+
         self.logger.info("ClinicalResourceFactory initialized with comprehensive medical coding support")
 
     def supports(self, resource_type: str) -> bool:
@@ -1238,18 +1245,19 @@ class ClinicalResourceFactory(BaseResourceFactory):
                 }
 
         # Look up LOINC code for lab tests
-        for lab_test, loinc_code in self._lab_test_loinc.items():
-            if lab_test.replace('_', ' ') in obs_name or lab_test in obs_name:
-                display_name = lab_test.replace('_', ' ').upper()
-                # Create text-based concept with LOINC reference for now
-                return {
-                    'text': display_name,
-                    'coding': [{
-                        'system': 'http://loinc.org',
-                        'code': loinc_code,
-                        'display': display_name
-                    }]
-                }
+        lab_test_match = self._lab_test_index.lookup(obs_name)
+        if lab_test_match is not None:
+            lab_test, loinc_code = lab_test_match
+            display_name = lab_test.replace('_', ' ').upper()
+            # Create text-based concept with LOINC reference for now
+            return {
+                'text': display_name,
+                'coding': [{
+                    'system': 'http://loinc.org',
+                    'code': loinc_code,
+                    'display': display_name
+                }]
+            }
 
         # Fallback to text-only concept
         return {'text': data.get('name') or data.get('code') or data.get('text', 'Clinical observation')}
@@ -1457,10 +1465,11 @@ class ClinicalResourceFactory(BaseResourceFactory):
         service_name = (data.get('name') or data.get('service') or data.get('text', '')).lower().strip()
 
         # Look up LOINC codes for lab tests
-        for lab_test, loinc_code in self._lab_test_loinc.items():
-            if lab_test.replace('_', ' ') in service_name or lab_test in service_name:
-                display_name = lab_test.replace('_', ' ').upper()
-                return {'text': display_name, 'coding': [{'system': 'http://loinc.org', 'code': loinc_code, 'display': display_name}]}
+        lab_test_match = self._lab_test_index.lookup(service_name)
+        if lab_test_match is not None:
+            lab_test, loinc_code = lab_test_match
+            display_name = lab_test.replace('_', ' ').upper()
+            return {'text': display_name, 'coding': [{'system': 'http://loinc.org', 'code': loinc_code, 'display': display_name}]}
 
         # Look up SNOMED codes for diagnostic procedures
         for procedure, snomed_code in self._diagnostic_procedures_snomed.items():
@@ -1544,25 +1553,26 @@ class ClinicalResourceFactory(BaseResourceFactory):
         condition_name = (data.get('name') or data.get('condition') or data.get('text', '')).lower().strip()
 
         # Look up common conditions
-        for condition, codes in self._condition_codes.items():
-            if condition.replace('_', ' ') in condition_name or condition in condition_name:
-                display_name = condition.replace('_', ' ').title()
-                # Prefer ICD-10 with SNOMED as additional coding
-                return {
-                    'coding': [
-                        {
-                            'system': 'http://hl7.org/fhir/sid/icd-10-cm',
-                            'code': codes['icd10'],
-                            'display': display_name
-                        },
-                        {
-                            'system': 'http://snomed.info/sct',
-                            'code': codes['snomed'],
-                            'display': display_name
-                        }
-                    ],
-                    'text': display_name
-                }
+        condition_match = self._condition_index.lookup(condition_name)
+        if condition_match is not None:
+            condition, codes = condition_match
+            display_name = condition.replace('_', ' ').title()
+            # Prefer ICD-10 with SNOMED as additional coding
+            return {
+                'coding': [
+                    {
+                        'system': 'http://hl7.org/fhir/sid/icd-10-cm',
+                        'code': codes['icd10'],
+                        'display': display_name
+                    },
+                    {
+                        'system': 'http://snomed.info/sct',
+                        'code': codes['snomed'],
+                        'display': display_name
+                    }
+                ],
+                'text': display_name
+            }
 
         # Check for specific ICD-10 code in data
         if 'icd10_code' in data:
@@ -1,6 +1,7 @@
 """
 HAPI FHIR Failover Manager for Story 3.3
 Manages multiple HAPI FHIR endpoints with automatic failover and health monitoring
+Each endpoint keeps its own pooled HAPIFHIRClient, reused for operations and health checks
 HIPAA Compliant: Secure endpoint management with no PHI exposure
 """
 
@@ -12,6 +13,8 @@ from datetime import datetime, timedelta
 from enum import Enum
 from dataclasses import dataclass
 
+from .hapi_client import HAPIFHIRClient
+
 logger = logging.getLogger(__name__)
 
 
@@ -96,6 +99,7 @@ class HAPIFailoverManager:
     def __init__(self):
         self.endpoints: List[HAPIEndpoint] = []
         self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self.clients: Dict[str, HAPIFHIRClient] = {}
         self.current_primary: Optional[str] = None
         self.health_check_task: Optional[asyncio.Task] = None
         self.initialized = False
@@ -155,18 +159,36 @@ class HAPIFailoverManager:
         
         logger.info(f"Added HAPI endpoint: {name} ({url}) with priority {priority}")
     
-    def remove_endpoint(self, name: str):
-        """Remove endpoint from failover pool"""
+    async def remove_endpoint(self, name: str):
+        """Remove endpoint from failover pool and close its pooled connections"""
         
         self.endpoints = [ep for ep in self.endpoints if ep.name != name]
         if name in self.circuit_breakers:
             del self.circuit_breakers[name]
+        client = self.clients.pop(name, None)
+        if client is not None:
+            await client.aclose()
         
         if self.current_primary == name:
             self.current_primary = None
         
         logger.info(f"Removed HAPI endpoint: {name}")
     
+    async def get_client(self, endpoint: HAPIEndpoint) -> HAPIFHIRClient:
+        """Pooled client for an endpoint, created on first use and reused afterwards"""
+        
+        client = self.clients.get(endpoint.name)
+        if client is None or client.base_url != endpoint.url.rstrip('/'):
+            old_client = client
+            client = HAPIFHIRClient(base_url=endpoint.url, timeout=endpoint.timeout)
+            # Reachability is tracked by the health checks, not by the client's own probe
+            client.initialized = True
+            self.clients[endpoint.name] = client
+            # The endpoint moved: release the connections pooled for its old URL
+            if old_client is not None:
+                await old_client.aclose()
+        return client
+    
     async def initialize(self) -> bool:
         """Initialize failover manager and start health monitoring"""
         
@@ -232,13 +254,16 @@ class HAPIFailoverManager:
                 continue
             
             try:
-                # Update endpoint URL in client if needed
-                if hasattr(operation, '__self__') and hasattr(operation.__self__, 'base_url'):
+                # Run HAPI client operations on the endpoint's pooled client
+                endpoint_operation = operation
+                if isinstance(getattr(operation, '__self__', None), HAPIFHIRClient):
+                    endpoint_operation = getattr(await self.get_client(endpoint), operation.__name__)
+                elif hasattr(operation, '__self__') and hasattr(operation.__self__, 'base_url'):
                     operation.__self__.base_url = endpoint.url.rstrip('/')
                 
                 # Execute operation
                 start_time = time.time()
-                result = await operation(*args, **kwargs)
+                result = await endpoint_operation(*args, **kwargs)
                 execution_time = time.time() - start_time
                 
                 # Record success
@@ -306,13 +331,10 @@ class HAPIFailoverManager:
         """Check health of a specific endpoint"""
         
         try:
-            import requests
-            
             # Simple metadata endpoint check
-            health_url = f"{endpoint.url.rstrip('/')}/metadata"
-            
             start_time = time.time()
-            response = requests.get(health_url, timeout=5)
+            client = await self.get_client(endpoint)
+            response = await client.request("GET", "/metadata", timeout=5)
             response_time = time.time() - start_time
             
             endpoint.last_health_check = datetime.now()
@@ -435,7 +457,8 @@ class HAPIFailoverManager:
                 "consecutive_failures": endpoint.consecutive_failures,
                 "last_health_check": endpoint.last_health_check.isoformat() if endpoint.last_health_check else None,
                 "last_error": endpoint.last_error,
-                "circuit_breaker_state": self.circuit_breakers[endpoint.name].state.value
+                "circuit_breaker_state": self.circuit_breakers[endpoint.name].state.value,
+                "connection_pool": self.clients[endpoint.name].get_pool_stats() if endpoint.name in self.clients else None
             })
         
         return {
@@ -475,6 +498,10 @@ class HAPIFailoverManager:
             except asyncio.CancelledError:
                 pass
         
+        for client in self.clients.values():
+            await client.aclose()
+        self.clients.clear()
+        
         logger.info("HAPI Failover Manager shutdown complete")
 
 
@@ -1,34 +1,69 @@
 """
 HAPI FHIR Client for Epic 3
 Communicates with HAPI FHIR servers for validation and processing
+Requests reuse pooled keep-alive connections: an httpx.AsyncClient serves the async API
+(over HTTP/2 when the h2 package is installed) and a requests.Session serves the
+blocking connection checks, so a conversion no longer pays a TCP/TLS handshake per call.
+Batches of bundles are validated concurrently over that pool under a concurrency cap,
+and searches can be read page by page, following link[rel=next] one page ahead
 HIPAA Compliant: Secure FHIR server communication
 """
 
 import logging
-import json
-from typing import Dict, List, Any, Optional, Union
-from urllib.parse import urljoin
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Any, Optional
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from ...config import get_settings
 
 try:
+    import httpx
     import requests
-    import aiohttp
+    from requests.adapters import HTTPAdapter
     HTTP_AVAILABLE = True
 except ImportError:
     HTTP_AVAILABLE = False
 
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+FHIR_JSON_HEADERS = {
+    'Content-Type': 'application/fhir+json',
+    'Accept': 'application/fhir+json'
+}
+FHIR_ACCEPT_HEADERS = {
+    'Accept': 'application/fhir+json'
+}
+
+
+class HAPISearchPageError(RuntimeError):
+    """A page after the first of a paged search could not be fetched"""
+
 
 class HAPIFHIRClient:
     """Client for communicating with HAPI FHIR servers"""
     
-    def __init__(self, base_url: str = "http://localhost:8080/fhir", timeout: int = 30):
+    def __init__(self, base_url: str = "http://localhost:8080/fhir", timeout: int = 30,
+                 max_connections: Optional[int] = None, max_keepalive_connections: Optional[int] = None,
+                 keepalive_expiry: Optional[float] = None, http2: Optional[bool] = None):
+        settings = get_settings()
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
+        self.max_connections = max_connections or settings.hapi_fhir_max_connections
+        self.max_keepalive_connections = max_keepalive_connections or settings.hapi_fhir_max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry if keepalive_expiry is not None else settings.hapi_fhir_keepalive_expiry_seconds
+        self.http2 = (settings.hapi_fhir_http2_enabled if http2 is None else http2) and HTTP2_AVAILABLE
+        self.batch_concurrency = settings.hapi_fhir_batch_concurrency
         self.initialized = False
         self._session = None
+        self._async_client = None
+        self._async_client_loop = None
+        self._pool_stats = {"requests": 0, "async_clients_created": 0, "search_pages": 0}
     
     def _serialize_bundle(self, bundle: Dict[str, Any]) -> Dict[str, Any]:
         """Convert datetime objects to ISO strings for JSON serialization"""
@@ -45,7 +80,64 @@ class HAPIFHIRClient:
                 return obj
         
         return convert_datetimes(bundle)
-        
+    
+    def _get_session(self):
+        """Pooled keep-alive session for blocking calls"""
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_connections)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
+        return self._session
+    
+    def _get_async_client(self):
+        """Pooled keep-alive client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop or self._async_client.is_closed:
+            # Pooled connections belong to the loop that opened them, so a new loop gets a new pool
+            self._async_client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_keepalive_connections,
+                                    keepalive_expiry=self.keepalive_expiry),
+                timeout=self.timeout
+            )
+            self._async_client_loop = loop
+            self._pool_stats["async_clients_created"] += 1
+        return self._async_client
+    
+    async def request(self, method: str, path: str, **kwargs) -> "httpx.Response":
+        """Send a request to base_url + path (or to an absolute URL) over the pooled client"""
+        url = path if path.startswith(("http://", "https://")) else f"{self.base_url}{path}"
+        kwargs.setdefault("headers", FHIR_ACCEPT_HEADERS)
+        self._pool_stats["requests"] += 1
+        return await self._get_async_client().request(method, url, **kwargs)
+    
+    async def aclose(self) -> None:
+        """Close pooled connections"""
+        if self._async_client is not None:
+            try:
+                if self._async_client_loop is asyncio.get_running_loop():
+                    await self._async_client.aclose()
+            except Exception as e:
+                logger.debug(f"Failed to close HAPI client pool for {self.base_url}: {e}")
+            self._async_client = self._async_client_loop = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Connection pool configuration and usage"""
+        return {
+            "base_url": self.base_url,
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "keepalive_expiry_seconds": self.keepalive_expiry,
+            **self._pool_stats
+        }
+    
     def initialize(self) -> bool:
         """Initialize HAPI FHIR client"""
         
@@ -53,11 +145,11 @@ class HAPIFHIRClient:
             logger.warning("HTTP libraries not available - using fallback implementation")
             self.initialized = True
             return True
-            
+        
         try:
             # Test connection to HAPI FHIR server
             test_url = f"{self.base_url}/metadata"
-            response = requests.get(test_url, timeout=5)
+            response = self._get_session().get(test_url, timeout=5)
             
             if response.status_code == 200:
                 logger.info(f"HAPI FHIR client initialized - server: {self.base_url}")
@@ -67,7 +159,7 @@ class HAPIFHIRClient:
                 logger.warning(f"HAPI FHIR server not accessible at {self.base_url} - using fallback")
                 self.initialized = True
                 return True
-                
+        
         except Exception as e:
             logger.warning(f"Failed to connect to HAPI FHIR server: {e} - using fallback")
             self.initialized = True
@@ -78,198 +170,133 @@ class HAPIFHIRClient:
         
         if not self.initialized:
             self.initialize()
-            
+        
         if not HTTP_AVAILABLE:
             return self._fallback_validation(bundle, request_id)
-            
-        try:
-            # Use ThreadPoolExecutor for sync HTTP calls in async context
-            loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor() as executor:
-                result = await loop.run_in_executor(
-                    executor, 
-                    self._sync_validate_bundle, 
-                    bundle, 
-                    request_id
-                )
-                return result
-                
-        except Exception as e:
-            logger.error(f"[{request_id}] Bundle validation failed: {e}")
-            return self._fallback_validation(bundle, request_id)
-    
-    def _sync_validate_bundle(self, bundle: Dict[str, Any], request_id: Optional[str]) -> Dict[str, Any]:
-        """Synchronous bundle validation"""
         
         try:
             # Use HAPI FHIR $validate operation
-            validate_url = f"{self.base_url}/Bundle/$validate"
-            
-            headers = {
-                'Content-Type': 'application/fhir+json',
-                'Accept': 'application/fhir+json'
-            }
-            
             # Serialize bundle to handle datetime objects
-            serialized_bundle = self._serialize_bundle(bundle)
-            
-            response = requests.post(
-                validate_url,
-                json=serialized_bundle,
-                headers=headers,
-                timeout=self.timeout
+            response = await self.request(
+                "POST",
+                "/Bundle/$validate",
+                json=self._serialize_bundle(bundle),
+                headers=FHIR_JSON_HEADERS
             )
             
             if response.status_code == 200:
-                validation_result = response.json()
-                
-                # Process OperationOutcome
-                issues = validation_result.get('issue', [])
-                errors = [issue for issue in issues if issue.get('severity') in ['error', 'fatal']]
-                warnings = [issue for issue in issues if issue.get('severity') == 'warning']
-                
-                result = {
-                    "is_valid": len(errors) == 0,
-                    "errors": [issue.get('diagnostics', 'Unknown error') for issue in errors],
-                    "warnings": [issue.get('diagnostics', 'Unknown warning') for issue in warnings],
-                    "hapi_response": validation_result,
-                    "validation_source": "hapi_fhir"
-                }
-                
-                logger.info(f"[{request_id}] HAPI validation completed - valid: {result['is_valid']}")
-                return result
-                
+                return self._process_validation_response(response.json(), request_id)
             else:
                 logger.error(f"[{request_id}] HAPI validation failed with status {response.status_code}")
                 return self._fallback_validation(bundle, request_id)
-                
+        
         except Exception as e:
             logger.error(f"[{request_id}] HAPI validation error: {e}")
             return self._fallback_validation(bundle, request_id)
     
+    async def validate_bundles(self, bundles: List[Dict[str, Any]], request_id: Optional[str] = None,
+                               max_concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Validate many bundles concurrently; results are in input order"""
+        
+        # More requests in flight than pooled connections would only queue inside the pool
+        limit = max(1, min(max_concurrency or self.batch_concurrency, self.max_connections))
+        semaphore = asyncio.Semaphore(limit)
+        
+        async def validate_one(index: int, bundle: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.validate_bundle(bundle, f"{request_id}-{index}" if request_id else None)
+        
+        results = await asyncio.gather(*(validate_one(i, bundle) for i, bundle in enumerate(bundles)))
+        
+        valid = sum(1 for result in results if result.get("is_valid"))
+        logger.info(f"[{request_id}] Batch validation completed - {valid}/{len(results)} valid, concurrency {limit}")
+        return list(results)
+    
+    def _process_validation_response(self, validation_result: Dict[str, Any], request_id: Optional[str]) -> Dict[str, Any]:
+        """Summarize the OperationOutcome returned by $validate"""
+        
+        issues = validation_result.get('issue', [])
+        errors = [issue for issue in issues if issue.get('severity') in ['error', 'fatal']]
+        warnings = [issue for issue in issues if issue.get('severity') == 'warning']
+        
+        result = {
+            "is_valid": len(errors) == 0,
+            "errors": [issue.get('diagnostics', 'Unknown error') for issue in errors],
+            "warnings": [issue.get('diagnostics', 'Unknown warning') for issue in warnings],
+            "hapi_response": validation_result,
+            "validation_source": "hapi_fhir"
+        }
+        
+        logger.info(f"[{request_id}] HAPI validation completed - valid: {result['is_valid']}")
+        return result
+    
     async def submit_bundle(self, bundle: Dict[str, Any], request_id: Optional[str] = None) -> Dict[str, Any]:
         """Submit transaction bundle to HAPI FHIR server"""
         
         if not self.initialized:
             self.initialize()
-            
+        
         if not HTTP_AVAILABLE:
             return self._fallback_submission(bundle, request_id)
-            
-        try:
-            # Use ThreadPoolExecutor for sync HTTP calls in async context
-            loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor() as executor:
-                result = await loop.run_in_executor(
-                    executor, 
-                    self._sync_submit_bundle, 
-                    bundle, 
-                    request_id
-                )
-                return result
-                
-        except Exception as e:
-            logger.error(f"[{request_id}] Bundle submission failed: {e}")
-            return self._fallback_submission(bundle, request_id)
-    
-    def _sync_submit_bundle(self, bundle: Dict[str, Any], request_id: Optional[str]) -> Dict[str, Any]:
-        """Synchronous bundle submission"""
         
         try:
             # Submit transaction bundle
-            submit_url = f"{self.base_url}/"
-            
-            headers = {
-                'Content-Type': 'application/fhir+json',
-                'Accept': 'application/fhir+json'
-            }
-            
-            # Serialize bundle to handle datetime objects
-            serialized_bundle = self._serialize_bundle(bundle)
-            
-            response = requests.post(
-                submit_url,
-                json=serialized_bundle,
-                headers=headers,
-                timeout=self.timeout
+            response = await self.request(
+                "POST",
+                "/",
+                json=self._serialize_bundle(bundle),
+                headers=FHIR_JSON_HEADERS
             )
             
             if response.status_code in [200, 201]:
-                result_bundle = response.json()
-                
-                # Process bundle response
-                entries = result_bundle.get('entry', [])
-                successful_entries = []
-                failed_entries = []
-                
-                for entry in entries:
-                    response_data = entry.get('response', {})
-                    status = response_data.get('status', '')
-                    
-                    if status.startswith('2'):  # 2xx success codes
-                        successful_entries.append(entry)
-                    else:
-                        failed_entries.append(entry)
-                
-                result = {
-                    "success": len(failed_entries) == 0,
-                    "total_resources": len(entries),
-                    "successful_resources": len(successful_entries),
-                    "failed_resources": len(failed_entries),
-                    "bundle_response": result_bundle,
-                    "submission_source": "hapi_fhir"
-                }
-                
-                logger.info(f"[{request_id}] Bundle submission completed - success: {result['success']}")
-                return result
-                
+                return self._process_submission_response(response.json(), request_id)
             else:
                 logger.error(f"[{request_id}] Bundle submission failed with status {response.status_code}")
                 return self._fallback_submission(bundle, request_id)
-                
+        
         except Exception as e:
             logger.error(f"[{request_id}] Bundle submission error: {e}")
             return self._fallback_submission(bundle, request_id)
     
+    def _process_submission_response(self, result_bundle: Dict[str, Any], request_id: Optional[str]) -> Dict[str, Any]:
+        """Count successful and failed entries of a transaction-response bundle"""
+        
+        entries = result_bundle.get('entry', [])
+        successful_entries = []
+        failed_entries = []
+        
+        for entry in entries:
+            response_data = entry.get('response', {})
+            status = response_data.get('status', '')
+            
+            if status.startswith('2'):  # 2xx success codes
+                successful_entries.append(entry)
+            else:
+                failed_entries.append(entry)
+        
+        result = {
+            "success": len(failed_entries) == 0,
+            "total_resources": len(entries),
+            "successful_resources": len(successful_entries),
+            "failed_resources": len(failed_entries),
+            "bundle_response": result_bundle,
+            "submission_source": "hapi_fhir"
+        }
+        
+        logger.info(f"[{request_id}] Bundle submission completed - success: {result['success']}")
+        return result
+    
     async def get_patient(self, patient_id: str, request_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Retrieve patient resource from HAPI FHIR server"""
         
         if not self.initialized:
             self.initialize()
-            
+        
         if not HTTP_AVAILABLE:
             return None
-            
-        try:
-            loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor() as executor:
-                result = await loop.run_in_executor(
-                    executor, 
-                    self._sync_get_patient, 
-                    patient_id, 
-                    request_id
-                )
-                return result
-                
-        except Exception as e:
-            logger.error(f"[{request_id}] Patient retrieval failed: {e}")
-            return None
-    
-    def _sync_get_patient(self, patient_id: str, request_id: Optional[str]) -> Optional[Dict[str, Any]]:
-        """Synchronous patient retrieval"""
         
         try:
-            patient_url = f"{self.base_url}/Patient/{patient_id}"
-            
-            headers = {
-                'Accept': 'application/fhir+json'
-            }
-            
-            response = requests.get(
-                patient_url,
-                headers=headers,
-                timeout=self.timeout
-            )
+            response = await self.request("GET", f"/Patient/{patient_id}")
             
             if response.status_code == 200:
                 patient = response.json()
@@ -278,115 +305,140 @@ class HAPIFHIRClient:
             else:
                 logger.warning(f"[{request_id}] Patient {patient_id} not found (status: {response.status_code})")
                 return None
-                
+        
         except Exception as e:
             logger.error(f"[{request_id}] Patient retrieval error: {e}")
             return None
     
     async def search_resources(self, resource_type: str, search_params: Dict[str, str], request_id: Optional[str] = None) -> Dict[str, Any]:
-        """Search for resources on HAPI FHIR server"""
+        """Search for resources on HAPI FHIR server (first page only; see iter_search_resources)"""
         
         if not self.initialized:
             self.initialize()
-            
+        
         if not HTTP_AVAILABLE:
             return self._fallback_search(resource_type, search_params, request_id)
-            
-        try:
-            loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor() as executor:
-                result = await loop.run_in_executor(
-                    executor, 
-                    self._sync_search_resources, 
-                    resource_type, 
-                    search_params, 
-                    request_id
-                )
-                return result
-                
-        except Exception as e:
-            logger.error(f"[{request_id}] Resource search failed: {e}")
-            return self._fallback_search(resource_type, search_params, request_id)
-    
-    def _sync_search_resources(self, resource_type: str, search_params: Dict[str, str], request_id: Optional[str]) -> Dict[str, Any]:
-        """Synchronous resource search"""
         
         try:
-            search_url = f"{self.base_url}/{resource_type}"
-            
-            headers = {
-                'Accept': 'application/fhir+json'
-            }
-            
-            response = requests.get(
-                search_url,
-                params=search_params,
-                headers=headers,
-                timeout=self.timeout
-            )
+            response = await self.request("GET", f"/{resource_type}", params=search_params)
             
             if response.status_code == 200:
-                search_bundle = response.json()
-                
-                entries = search_bundle.get('entry', [])
-                resources = [entry.get('resource') for entry in entries if entry.get('resource')]
-                
-                result = {
-                    "success": True,
-                    "total": search_bundle.get('total', len(resources)),
-                    "resources": resources,
-                    "search_bundle": search_bundle
-                }
-                
-                logger.info(f"[{request_id}] Search completed - found {len(resources)} {resource_type} resources")
-                return result
-                
+                return self._process_search_response(resource_type, response.json(), request_id)
             else:
                 logger.error(f"[{request_id}] Resource search failed with status {response.status_code}")
                 return self._fallback_search(resource_type, search_params, request_id)
-                
+        
         except Exception as e:
             logger.error(f"[{request_id}] Resource search error: {e}")
             return self._fallback_search(resource_type, search_params, request_id)
     
-    async def get_server_capabilities(self, request_id: Optional[str] = None) -> Dict[str, Any]:
-        """Get HAPI FHIR server capabilities"""
+    async def iter_search_resources(self, resource_type: str, search_params: Dict[str, str],
+                                    request_id: Optional[str] = None,
+                                    max_pages: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every matching resource, following link[rel=next] page by page
+        
+        The next page is requested as soon as the current one arrives, so it downloads
+        while the caller works through the current page. A first page that cannot be
+        fetched yields nothing, like search_resources falling back; a later page raises
+        HAPISearchPageError so a truncated result is never mistaken for a complete one.
+        """
         
         if not self.initialized:
             self.initialize()
             
         if not HTTP_AVAILABLE:
-            return self._fallback_capabilities(request_id)
-            
+            return
+        
+        pending = asyncio.ensure_future(self._fetch_search_page(f"/{resource_type}", search_params, request_id))
+        pages = 0
         try:
-            loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor() as executor:
-                result = await loop.run_in_executor(
-                    executor, 
-                    self._sync_get_capabilities, 
-                    request_id
-                )
-                return result
+            while pending is not None:
+                search_bundle = await pending
+                pending = None
+                if search_bundle is None:
+                    if pages:
+                        raise HAPISearchPageError(
+                            f"{resource_type} search page {pages + 1} could not be fetched after {pages} page(s)"
+                        )
+                    return
+                pages += 1
                 
-        except Exception as e:
-            logger.error(f"[{request_id}] Capabilities retrieval failed: {e}")
-            return self._fallback_capabilities(request_id)
+                next_url = self._next_page_url(search_bundle)
+                if next_url and (max_pages is None or pages < max_pages):
+                    pending = asyncio.ensure_future(self._fetch_search_page(next_url, None, request_id))
+                
+                for entry in search_bundle.get('entry', []):
+                    if entry.get('resource'):
+                        yield entry['resource']
+        finally:
+            # The caller stopped early: drop the prefetched page
+            if pending is not None:
+                pending.cancel()
+            logger.info(f"[{request_id}] Paged search read {pages} {resource_type} page(s)")
     
-    def _sync_get_capabilities(self, request_id: Optional[str]) -> Dict[str, Any]:
-        """Synchronous capabilities retrieval"""
+    async def _fetch_search_page(self, url: str, search_params: Optional[Dict[str, str]],
+                                 request_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """One searchset page, or None when it cannot be fetched"""
         
         try:
-            capabilities_url = f"{self.base_url}/metadata"
+            response = await self.request("GET", url, params=search_params)
             
-            headers = {
-                'Accept': 'application/fhir+json'
-            }
-            
-            response = requests.get(
-                capabilities_url,
-                headers=headers,
-                timeout=self.timeout
-            )
+            if response.status_code == 200:
+                self._pool_stats["search_pages"] += 1
+                return response.json()
+            else:
+                logger.error(f"[{request_id}] Search page request failed with status {response.status_code}")
+                return None
+                
+        except Exception as e:
+            logger.error(f"[{request_id}] Search page request error: {e}")
+            return None
+    
+    def _next_page_url(self, search_bundle: Dict[str, Any]) -> Optional[str]:
+        """Absolute link[rel=next] URL on the configured server
+        
+        Relative links are resolved against base_url. A link to another scheme or host
+        (a proxied server reporting its internal address, or a hostile redirect) keeps
+        its path and query but is rebased onto base_url, so paging never leaves the
+        configured endpoint.
+        """
+        for link in search_bundle.get('link', []):
+            if link.get('relation') == 'next' and link.get('url'):
+                next_url = urlsplit(urljoin(f"{self.base_url}/", link['url']))
+                base = urlsplit(self.base_url)
+                if (next_url.scheme, next_url.netloc) != (base.scheme, base.netloc):
+                    logger.warning(f"Search next link points to another host; rebasing onto {base.netloc}")
+                    next_url = next_url._replace(scheme=base.scheme, netloc=base.netloc)
+                return urlunsplit(next_url)
+        return None
+    
+    def _process_search_response(self, resource_type: str, search_bundle: Dict[str, Any], request_id: Optional[str]) -> Dict[str, Any]:
+        """Pull the resources out of a searchset bundle"""
+        
+        entries = search_bundle.get('entry', [])
+        resources = [entry.get('resource') for entry in entries if entry.get('resource')]
+        
+        result = {
+            "success": True,
+            "total": search_bundle.get('total', len(resources)),
+            "resources": resources,
+            "search_bundle": search_bundle
+        }
+        
+        logger.info(f"[{request_id}] Search completed - found {len(resources)} {resource_type} resources")
+        return result
+    
+    async def get_server_capabilities(self, request_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get HAPI FHIR server capabilities"""
+        
+        if not self.initialized:
+            self.initialize()
+        
+        if not HTTP_AVAILABLE:
+            return self._fallback_capabilities(request_id)
+        
+        try:
+            response = await self.request("GET", "/metadata")
             
             if response.status_code == 200:
                 capability_statement = response.json()
@@ -413,15 +465,15 @@ class HAPIFHIRClient:
                 
                 logger.info(f"[{request_id}] Server capabilities retrieved - FHIR {result['fhir_version']}")
                 return result
-                
+            
             else:
                 logger.error(f"[{request_id}] Capabilities retrieval failed with status {response.status_code}")
                 return self._fallback_capabilities(request_id)
-                
+        
         except Exception as e:
             logger.error(f"[{request_id}] Capabilities retrieval error: {e}")
             return self._fallback_capabilities(request_id)
-    
+
     # Fallback methods when HAPI FHIR server is not available
     
     def _fallback_validation(self, bundle: Dict[str, Any], request_id: Optional[str]) -> Dict[str, Any]:
@@ -498,7 +550,7 @@ class HAPIFHIRClient:
             
             # Quick health check
             test_url = f"{self.base_url}/metadata"
-            response = requests.get(test_url, timeout=5)
+            response = self._get_session().get(test_url, timeout=5)
             
             return {
                 "connected": response.status_code == 200,
@@ -506,7 +558,7 @@ class HAPIFHIRClient:
                 "status": f"HTTP {response.status_code}",
                 "response_time_ms": response.elapsed.total_seconds() * 1000
             }
-            
+        
         except Exception as e:
             return {
                 "connected": False,
@@ -10,11 +10,12 @@ import asyncio
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timezone, timedelta
 from collections import deque, defaultdict
-import hashlib
-import json
 from dataclasses import dataclass, asdict
 import threading
 
+from .cache_store import StripedLRUCache, get_cache_sweeper
+from .validation_cache import get_bundle_validation_cache, get_content_hasher, get_resource_validation_memo
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,8 +36,10 @@ class PerformanceMetrics:
 class FHIRPerformanceManager:
     """Manages FHIR pipeline performance and optimization"""
     
-    def __init__(self, cache_size: int = 1000, max_metrics_history: int = 10000):
+    def __init__(self, cache_size: int = 1000, max_metrics_history: int = 10000,
+                 cache_max_bytes: Optional[int] = 64 * 1024 * 1024, cache_stripes: int = 16):
         self.cache_size = cache_size
+        self.cache_max_bytes = cache_max_bytes
         self.max_metrics_history = max_metrics_history
         
         # Performance tracking
@@ -50,15 +53,14 @@ class FHIRPerformanceManager:
             "success_rate": 0.95
         }
         
-        # Caching system
-        self.validation_cache = {}
-        self.resource_cache = {}
-        self.bundle_cache = {}
-        self.cache_stats = {
-            "hits": 0,
-            "misses": 0,
-            "evictions": 0
-        }
+        # Caching system: LRU with O(1) get/put/evict, striped locks, entry and byte limits
+        ttl_seconds = 3600  # 1 hour
+        self.validation_cache = StripedLRUCache(cache_size, ttl_seconds, name="validation",
+                                                max_bytes=cache_max_bytes, stripes=cache_stripes)
+        self.resource_cache = StripedLRUCache(cache_size, ttl_seconds, name="resource",
+                                              max_bytes=cache_max_bytes, stripes=cache_stripes)
+        self.bundle_cache = StripedLRUCache(cache_size, ttl_seconds, name="bundle",
+                                            max_bytes=cache_max_bytes, stripes=cache_stripes)
         
         # Connection pooling
         self.connection_pools = {}
@@ -69,17 +71,20 @@ class FHIRPerformanceManager:
             "enable_validation_cache": True,
             "enable_resource_cache": True,
             "enable_bundle_cache": True,
-            "cache_ttl_seconds": 3600,  # 1 hour
+            "cache_ttl_seconds": ttl_seconds,
             "max_concurrent_requests": 10,
             "request_timeout_seconds": 30,
             "retry_attempts": 3,
             "retry_backoff_factor": 2.0
         }
         
-        # Thread safety
-        self._cache_lock = threading.RLock()
+        # Thread safety (the caches lock per stripe)
         self._metrics_lock = threading.RLock()
         
+        # Expired entries are dropped in the background rather than only on lookup
+        for cache in (self.validation_cache, self.resource_cache, self.bundle_cache):
+            get_cache_sweeper().register(cache)
+        
     def start_performance_tracking(self, operation_type: str, resource_count: int = 0) -> str:
         """Start tracking performance for an operation"""
         tracking_id = f"{operation_type}-{int(time.time() * 1000000)}"
@@ -143,102 +148,46 @@ class FHIRPerformanceManager:
         if not self.optimization_settings["enable_validation_cache"]:
             return
         
-        with self._cache_lock:
-            # Implement LRU eviction if cache is full
-            if len(self.validation_cache) >= self.cache_size:
-                self._evict_oldest_cache_entry("validation")
-            
-            self.validation_cache[bundle_hash] = {
-                "result": validation_result,
-                "timestamp": datetime.now(timezone.utc),
-                "access_count": 0
-            }
+        self.validation_cache.put(bundle_hash, validation_result)
     
     def get_cached_validation_result(self, bundle_hash: str) -> Optional[Dict[str, Any]]:
         """Retrieve cached validation result"""
         if not self.optimization_settings["enable_validation_cache"]:
             return None
         
-        with self._cache_lock:
-            if bundle_hash in self.validation_cache:
-                cache_entry = self.validation_cache[bundle_hash]
-                
-                # Check TTL
-                age = (datetime.now(timezone.utc) - cache_entry["timestamp"]).total_seconds()
-                if age > self.optimization_settings["cache_ttl_seconds"]:
-                    del self.validation_cache[bundle_hash]
-                    self.cache_stats["evictions"] += 1
-                    return None
-                
-                # Update access statistics
-                cache_entry["access_count"] += 1
-                self.cache_stats["hits"] += 1
-                
-                return cache_entry["result"]
-            
-            self.cache_stats["misses"] += 1
-            return None
+        return self.validation_cache.get(bundle_hash)
     
     def cache_fhir_resource(self, resource_key: str, resource_data: Dict[str, Any]) -> None:
         """Cache FHIR resource for reuse"""
         if not self.optimization_settings["enable_resource_cache"]:
             return
         
-        with self._cache_lock:
-            if len(self.resource_cache) >= self.cache_size:
-                self._evict_oldest_cache_entry("resource")
-            
-            self.resource_cache[resource_key] = {
-                "resource": resource_data,
-                "timestamp": datetime.now(timezone.utc),
-                "access_count": 0
-            }
+        self.resource_cache.put(resource_key, resource_data)
     
     def get_cached_fhir_resource(self, resource_key: str) -> Optional[Dict[str, Any]]:
         """Retrieve cached FHIR resource"""
         if not self.optimization_settings["enable_resource_cache"]:
             return None
         
-        with self._cache_lock:
-            if resource_key in self.resource_cache:
-                cache_entry = self.resource_cache[resource_key]
-                
-                # Check TTL
-                age = (datetime.now(timezone.utc) - cache_entry["timestamp"]).total_seconds()
-                if age > self.optimization_settings["cache_ttl_seconds"]:
-                    del self.resource_cache[resource_key]
-                    return None
-                
-                cache_entry["access_count"] += 1
-                return cache_entry["resource"]
-            
-            return None
+        return self.resource_cache.get(resource_key)
+    
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """Validation cache hits and misses, and entries dropped from the validation and resource caches"""
+        validation = self.validation_cache.get_stats()
+        resource = self.resource_cache.get_stats()
+        return {
+            "hits": validation["hits"],
+            "misses": validation["misses"],
+            "evictions": validation["evictions"] + validation["expirations"] + resource["evictions"]
+        }
     
     def generate_bundle_hash(self, bundle: Dict[str, Any]) -> str:
-        """Generate hash for bundle caching (PHI-safe)"""
+        """Generate hash for bundle caching (PHI-safe keyed digest of the full bundle content)"""
         try:
-            # Create a PHI-safe representation for hashing
-            safe_bundle = {
-                "resourceType": bundle.get("resourceType"),
-                "type": bundle.get("type"),
-                "entry_count": len(bundle.get("entry", [])),
-                "resource_types": []
-            }
-            
-            # Add resource types and structure without PHI
-            for entry in bundle.get("entry", []):
-                if "resource" in entry:
-                    resource = entry["resource"]
-                    safe_bundle["resource_types"].append({
-                        "resourceType": resource.get("resourceType"),
-                        "field_count": len(resource.keys()),
-                        "has_identifier": "identifier" in resource,
-                        "has_reference": any("reference" in str(v) for v in resource.values() if isinstance(v, (str, dict)))
-                    })
-            
-            # Generate hash
-            bundle_json = json.dumps(safe_bundle, sort_keys=True)
-            return hashlib.sha256(bundle_json.encode()).hexdigest()[:16]
+            # Bundles share a hash only when their content is identical, so a cached
+            # validation result is never served for a different bundle of the same shape
+            return get_content_hasher().digest(bundle)
             
         except Exception as e:
             logger.error(f"Failed to generate bundle hash: {e}")
@@ -275,8 +224,9 @@ class FHIRPerformanceManager:
                     }
                 
                 # Cache statistics
-                total_cache_requests = self.cache_stats["hits"] + self.cache_stats["misses"]
-                cache_hit_rate = self.cache_stats["hits"] / max(total_cache_requests, 1)
+                cache_stats = self.cache_stats
+                total_cache_requests = cache_stats["hits"] + cache_stats["misses"]
+                cache_hit_rate = cache_stats["hits"] / max(total_cache_requests, 1)
                 
                 # Recent performance (last 100 operations)
                 recent_metrics = list(self.metrics_history)[-100:]
@@ -295,13 +245,15 @@ class FHIRPerformanceManager:
                     "operation_breakdown": operation_averages,
                     "cache_performance": {
                         "hit_rate": cache_hit_rate,
-                        "hits": self.cache_stats["hits"],
-                        "misses": self.cache_stats["misses"],
-                        "evictions": self.cache_stats["evictions"],
+                        "hits": cache_stats["hits"],
+                        "misses": cache_stats["misses"],
+                        "evictions": cache_stats["evictions"],
                         "target_met": cache_hit_rate >= self.performance_targets["cache_hit_rate"],
                         "validation_cache_size": len(self.validation_cache),
                         "resource_cache_size": len(self.resource_cache),
-                        "bundle_cache_size": len(self.bundle_cache)
+                        "bundle_cache_size": len(self.bundle_cache),
+                        "cache_bytes": self.validation_cache.bytes + self.resource_cache.bytes + self.bundle_cache.bytes,
+                        "cache_max_bytes": self.cache_max_bytes
                     },
                     "performance_targets": self.performance_targets,
                     "optimization_recommendations": self._generate_optimization_recommendations()
@@ -317,20 +269,23 @@ class FHIRPerformanceManager:
             recommendations = []
             
             # Analyze cache performance
-            total_cache_requests = self.cache_stats["hits"] + self.cache_stats["misses"]
+            cache_stats = self.cache_stats
+            total_cache_requests = cache_stats["hits"] + cache_stats["misses"]
             if total_cache_requests > 0:
-                hit_rate = self.cache_stats["hits"] / total_cache_requests
+                hit_rate = cache_stats["hits"] / total_cache_requests
                 
                 if hit_rate < 0.5:
                     # Increase cache TTL
                     old_ttl = self.optimization_settings["cache_ttl_seconds"]
                     self.optimization_settings["cache_ttl_seconds"] = min(old_ttl * 1.5, 7200)
+                    self._apply_cache_limits()
                     recommendations.append(f"Increased cache TTL from {old_ttl}s to {self.optimization_settings['cache_ttl_seconds']}s")
                 
-                if hit_rate > 0.9 and self.cache_stats["evictions"] > 100:
+                if hit_rate > 0.9 and cache_stats["evictions"] > 100:
                     # Increase cache size
                     old_size = self.cache_size
-                    self.cache_size = min(old_size * 1.2, 5000)
+                    self.cache_size = int(min(old_size * 1.2, 5000))
+                    self._apply_cache_limits()
                     recommendations.append(f"Increased cache size from {old_size} to {self.cache_size}")
             
             # Analyze operation performance
@@ -412,47 +367,34 @@ class FHIRPerformanceManager:
     
     def clear_caches(self) -> Dict[str, int]:
         """Clear all caches and return cleared counts"""
-        with self._cache_lock:
-            validation_count = len(self.validation_cache)
-            resource_count = len(self.resource_cache)
-            bundle_count = len(self.bundle_cache)
-            
-            self.validation_cache.clear()
-            self.resource_cache.clear()
-            self.bundle_cache.clear()
-            
-            # Reset cache stats
-            self.cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
-            
-            logger.info(f"Cleared caches: {validation_count} validation, {resource_count} resource, {bundle_count} bundle")
-            
-            return {
-                "validation_entries_cleared": validation_count,
-                "resource_entries_cleared": resource_count,
-                "bundle_entries_cleared": bundle_count
-            }
+        validation_count = self.validation_cache.clear()
+        resource_count = self.resource_cache.clear()
+        bundle_count = self.bundle_cache.clear()
+        
+        # Reset cache stats
+        for cache in (self.validation_cache, self.resource_cache, self.bundle_cache):
+            cache.reset_stats()
+        
+        # Content-addressed validation results shared by the validation services
+        bundle_validation_count = get_bundle_validation_cache().clear()
+        resource_validation_count = get_resource_validation_memo().clear()
+        
+        logger.info(f"Cleared caches: {validation_count} validation, {resource_count} resource, {bundle_count} bundle, "
+                    f"{bundle_validation_count} bundle validation, {resource_validation_count} resource validation")
+        
+        return {
+            "validation_entries_cleared": validation_count,
+            "resource_entries_cleared": resource_count,
+            "bundle_entries_cleared": bundle_count,
+            "bundle_validation_entries_cleared": bundle_validation_count,
+            "resource_validation_entries_cleared": resource_validation_count
+        }
     
-    def _evict_oldest_cache_entry(self, cache_type: str) -> None:
-        """Evict oldest cache entry using LRU strategy"""
-        try:
-            if cache_type == "validation" and self.validation_cache:
-                oldest_key = min(
-                    self.validation_cache.keys(),
-                    key=lambda k: self.validation_cache[k]["timestamp"]
-                )
-                del self.validation_cache[oldest_key]
-                self.cache_stats["evictions"] += 1
-                
-            elif cache_type == "resource" and self.resource_cache:
-                oldest_key = min(
-                    self.resource_cache.keys(),
-                    key=lambda k: self.resource_cache[k]["timestamp"]
-                )
-                del self.resource_cache[oldest_key]
-                self.cache_stats["evictions"] += 1
-                
-        except Exception as e:
-            logger.error(f"Failed to evict cache entry: {e}")
+    def _apply_cache_limits(self) -> None:
+        """Push the current cache size and TTL settings to the caches"""
+        for cache in (self.validation_cache, self.resource_cache, self.bundle_cache):
+            cache.ttl_seconds = self.optimization_settings["cache_ttl_seconds"]
+            cache.resize(self.cache_size, self.cache_max_bytes)
     
     def _get_memory_usage(self) -> float:
         """Get current memory usage in MB"""
@@ -471,10 +413,11 @@ class FHIRPerformanceManager:
         """Calculate cache hit rate for recent operations"""
         # This is a simplified calculation - in a real implementation,
         # you might want to track cache stats over time windows
-        total_requests = self.cache_stats["hits"] + self.cache_stats["misses"]
+        cache_stats = self.cache_stats
+        total_requests = cache_stats["hits"] + cache_stats["misses"]
         if total_requests == 0:
             return 0.0
-        return self.cache_stats["hits"] / total_requests
+        return cache_stats["hits"] / total_requests
     
     def _generate_optimization_recommendations(self) -> List[str]:
         """Generate optimization recommendations based on performance data"""
@@ -482,14 +425,15 @@ class FHIRPerformanceManager:
         
         try:
             # Cache recommendations
-            total_cache_requests = self.cache_stats["hits"] + self.cache_stats["misses"]
+            cache_stats = self.cache_stats
+            total_cache_requests = cache_stats["hits"] + cache_stats["misses"]
             if total_cache_requests > 0:
-                hit_rate = self.cache_stats["hits"] / total_cache_requests
+                hit_rate = cache_stats["hits"] / total_cache_requests
                 
                 if hit_rate < 0.6:
                     recommendations.append("Consider increasing cache TTL or cache size for better hit rates")
                 
-                if self.cache_stats["evictions"] > self.cache_stats["hits"] * 0.1:
+                if cache_stats["evictions"] > cache_stats["hits"] * 0.1:
                     recommendations.append("High cache eviction rate - consider increasing cache size")
             
             # Performance recommendations
@@ -4,6 +4,7 @@ Complete end-to-end FHIR processing pipeline integration
 HIPAA Compliant: Production-ready pipeline with comprehensive monitoring
 """
 
+import copy
 import logging
 import time
 import asyncio
@@ -17,6 +18,7 @@ from .bundle_assembler import get_bundle_assembler
 from .validation_service import get_validation_service
 from .execution_service import get_execution_service
 from .failover_manager import get_failover_manager
+from ..nlp.entity_record import entity_dicts, entity_records
 
 logger = logging.getLogger(__name__)
 
@@ -54,9 +56,19 @@ class FHIRProcessingResult:
         result = asdict(self)
         # Convert datetime objects to ISO strings
         result['processing_metadata']['start_time'] = self.processing_metadata.start_time.isoformat()
+        # Entity records become plain dicts at the API boundary (asdict would expose their slots)
+        result['nlp_entities'] = copy.deepcopy(_entity_lists_as_dicts(self.nlp_entities))
+        result['bundle_summary_data'] = copy.deepcopy(_entity_lists_as_dicts(self.bundle_summary_data))
         return result
 
 
+def _entity_lists_as_dicts(data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Copy of data with every entity list in its dict view"""
+    if not data:
+        return data
+    return {key: entity_dicts(value) if isinstance(value, list) else value for key, value in data.items()}
+
+
 class UnifiedFHIRPipeline:
     """Production-ready unified FHIR processing pipeline"""
     
@@ -153,6 +165,8 @@ class UnifiedFHIRPipeline:
             request_id = f"fhir-pipeline-{str(uuid4())[:8]}"
         
         start_time = time.time()
+        # Entities arrive as API dicts; from here to the FHIR factories they travel as records
+        nlp_entities = entity_records(nlp_entities or {})
         processing_metadata = ProcessingMetadata(
             request_id=request_id,
             start_time=datetime.now(timezone.utc),
@@ -283,7 +297,7 @@ class UnifiedFHIRPipeline:
             return result
     
     async def _create_fhir_resources(self, nlp_entities: Dict[str, Any], request_id: str) -> List[Dict[str, Any]]:
-        """Create FHIR resources from NLP entities"""
+        """Create FHIR resources from NLP entities; the factories read the EntityRecords directly"""
         resources = []
         
         try:
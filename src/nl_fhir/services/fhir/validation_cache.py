@@ -0,0 +1,99 @@
+"""
+Content-Addressed FHIR Validation Cache
+Validation results are keyed by an HMAC-SHA256 of the canonical JSON of the bundle
+(or of one resource), so two bundles share a cache entry only when their content is
+identical. The HMAC key never leaves the process: a key cannot be recomputed from a
+guessed bundle, so cache keys, logs and metrics reveal nothing about the PHI in it.
+Entries live in bounded LRU stores with a TTL (see cache_store); a second, per-resource store lets a
+new bundle reuse the results of the entry resources it shares with earlier bundles.
+HIPAA Compliant: Only keyed digests are stored as keys, clinical content is never logged
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from ...config import get_settings
+from .cache_store import LRUTTLCache, get_cache_sweeper
+
+logger = logging.getLogger(__name__)
+
+
+class ContentHasher:
+    """Keyed digest of the canonical JSON form of FHIR content"""
+
+    def __init__(self, key: Optional[bytes] = None):
+        # Without a configured key each process draws its own, which is enough for in-memory caches
+        self._key = key or os.urandom(32)
+
+    @staticmethod
+    def canonical_json(content: Any) -> bytes:
+        """Key order and whitespace independent serialization"""
+        return json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False,
+                          default=str).encode("utf-8")
+
+    def digest(self, content: Any) -> str:
+        return hmac.new(self._key, self.canonical_json(content), hashlib.sha256).hexdigest()
+
+
+# Shared instances: bundle and resource results are reused across requests and services
+_content_hasher: Optional[ContentHasher] = None
+_bundle_cache: Optional[LRUTTLCache] = None
+_resource_memo: Optional[LRUTTLCache] = None
+_caches_lock = threading.Lock()
+
+
+def _ensure_initialized() -> None:
+    global _content_hasher, _bundle_cache, _resource_memo
+    if _content_hasher is not None:
+        return
+    with _caches_lock:
+        if _content_hasher is not None:
+            return
+        settings = get_settings()
+        key = settings.fhir_validation_cache_hmac_key
+        _bundle_cache = LRUTTLCache(settings.fhir_validation_cache_max_entries,
+                                    settings.fhir_validation_cache_ttl_seconds, name="bundle_validation")
+        _resource_memo = LRUTTLCache(settings.fhir_validation_resource_memo_max_entries,
+                                     settings.fhir_validation_cache_ttl_seconds, name="resource_validation")
+        _content_hasher = ContentHasher(key.encode("utf-8") if key else None)
+        get_cache_sweeper().register(_bundle_cache)
+        get_cache_sweeper().register(_resource_memo)
+
+
+def get_content_hasher() -> ContentHasher:
+    """Shared keyed hasher for validation cache keys"""
+    _ensure_initialized()
+    return _content_hasher
+
+
+def get_bundle_validation_cache() -> LRUTTLCache:
+    """Shared store of whole-bundle validation results"""
+    _ensure_initialized()
+    return _bundle_cache
+
+
+def get_resource_validation_memo() -> LRUTTLCache:
+    """Shared store of per-resource validation results"""
+    _ensure_initialized()
+    return _resource_memo
+
+
+def get_validation_cache_stats() -> Dict[str, Any]:
+    """Hit rates and sizes of the validation caches, for /performance/metrics"""
+    return {
+        "enabled": get_settings().fhir_validation_cache_enabled,
+        "bundle_cache": get_bundle_validation_cache().get_stats(),
+        "resource_memo": get_resource_validation_memo().get_stats(),
+    }
+
+
+def reset_validation_caches() -> None:
+    """Drop the shared hasher and stores so the next use re-reads FHIR_VALIDATION_CACHE_* settings"""
+    global _content_hasher, _bundle_cache, _resource_memo
+    with _caches_lock:
+        _content_hasher = _bundle_cache = _resource_memo = None
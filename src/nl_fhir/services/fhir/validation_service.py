@@ -4,14 +4,17 @@ Provides comprehensive bundle validation using HAPI FHIR server
 HIPAA Compliant: Secure validation with no PHI exposure
 """
 
+import copy
 import logging
 import time
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from enum import Enum
 
+from ...config import get_settings
 from .hapi_client import get_hapi_client
 from .validator import get_fhir_validator
+from .validation_cache import get_bundle_validation_cache, get_content_hasher
 
 logger = logging.getLogger(__name__)
 
@@ -42,7 +45,8 @@ class FHIRValidationService:
             "validation_errors": 0,
             "validation_warnings": 0
         }
-        self.cache = {}  # Simple validation cache
+        # Content-addressed, bounded and expiring; shared with other validation service instances
+        self.cache = get_bundle_validation_cache()
         
     async def initialize(self) -> bool:
         """Initialize validation service"""
@@ -78,11 +82,13 @@ class FHIRValidationService:
         start_time = time.time()
         
         # Check cache if enabled
-        if use_cache:
-            cache_key = self._generate_cache_key(bundle)
-            if cache_key in self.cache:
+        use_cache = use_cache and get_settings().fhir_validation_cache_enabled
+        cache_key = self._generate_cache_key(bundle) if use_cache else None
+        if cache_key:
+            cached_result = self.cache.get(cache_key)
+            if cached_result is not None:
                 logger.info(f"[{request_id}] Using cached validation result")
-                return self.cache[cache_key]
+                return copy.deepcopy(cached_result)
         
         try:
             # Update metrics
@@ -112,8 +118,8 @@ class FHIRValidationService:
             enhanced_result["validation_time"] = f"{validation_time:.3f}s"
             
             # Cache result if enabled
-            if use_cache and cache_key:
-                self.cache[cache_key] = enhanced_result
+            if cache_key:
+                self.cache.put(cache_key, copy.deepcopy(enhanced_result))
             
             logger.info(f"[{request_id}] Bundle validation completed in {validation_time:.3f}s - "
                        f"Result: {enhanced_result['validation_result']}")
@@ -362,18 +368,13 @@ class FHIRValidationService:
         return recommendations
     
     def _generate_cache_key(self, bundle: Dict[str, Any]) -> Optional[str]:
-        """Generate cache key for bundle validation results"""
+        """Generate cache key for bundle validation results: keyed digest of the full content"""
         
         try:
-            # Use bundle ID and entry count for simple caching
-            bundle_id = bundle.get("id", "")
-            entry_count = len(bundle.get("entry", []))
+            return f"bundle:{get_content_hasher().digest(bundle)}"
             
-            if bundle_id:
-                return f"{bundle_id}_{entry_count}"
-            return None
-            
-        except Exception:
+        except Exception as e:
+            logger.warning(f"Could not hash bundle for validation cache, validating uncached: {e}")
             return None
     
     def _create_error_response(self, error_msg: str, request_id: Optional[str]) -> Dict[str, Any]:
@@ -4,6 +4,7 @@ Comprehensive FHIR R4 resource and bundle validation
 HIPAA Compliant: Secure validation with detailed reporting
 """
 
+import copy
 import logging
 import json
 import re
@@ -24,6 +25,9 @@ try:
 except ImportError:
     FHIR_AVAILABLE = False
 
+from .validation_cache import ContentHasher, LRUTTLCache, get_content_hasher, get_resource_validation_memo
+from ...config import get_settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -68,12 +72,42 @@ class ValidationIssue:
         }
 
 
+class _TreeScan:
+    """References and codings found in one walk of a resource or bundle"""
+    
+    __slots__ = ("references", "codings", "spans")
+    
+    def __init__(self):
+        self.references: List[Tuple[str, str]] = []
+        self.codings: List[Tuple[str, Any]] = []
+        # mark id -> (subtree path, (references, codings) start, (references, codings) end)
+        self.spans: Dict[int, Tuple[str, Tuple[int, int], Tuple[int, int]]] = {}
+    
+    def slice(self, mark: Optional[int]) -> Optional["_TreeScan"]:
+        """Items found inside a marked subtree, with paths relative to it; None if it was not walked"""
+        
+        span = self.spans.get(mark) if mark is not None else None
+        if span is None:
+            return None
+        path, start, end = span
+        prefix = len(path) + 1
+        part = _TreeScan()
+        part.references = [(item_path[prefix:] if item_path != path else "", value)
+                           for item_path, value in self.references[start[0]:end[0]]]
+        part.codings = [(item_path[prefix:] if item_path != path else "", value)
+                        for item_path, value in self.codings[start[1]:end[1]]]
+        return part
+
+
 class FHIRValidator:
     """Comprehensive FHIR R4 validator"""
     
-    def __init__(self):
+    def __init__(self, resource_memo: Optional[LRUTTLCache] = None, content_hasher: Optional[ContentHasher] = None):
         self.initialized = False
         self.validation_rules = {}
+        # Per-resource results keyed by content, reused when a resource reappears in a later bundle
+        self.resource_memo = resource_memo
+        self.content_hasher = content_hasher or (ContentHasher() if resource_memo is not None else None)
         
     def initialize(self) -> bool:
         """Initialize FHIR validator"""
@@ -155,6 +189,19 @@ class FHIRValidator:
         if not self.initialized:
             self.initialize()
         
+        return self._validate_scanned_resource(resource, request_id)
+    
+    def _validate_scanned_resource(self, resource: Dict[str, Any], request_id: Optional[str],
+                                   scan: Optional["_TreeScan"] = None,
+                                   structure_issues: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Validate a resource whose tree scan and structural parse may already be done.
+        
+        validate_bundle scans the bundle once and parses it once, then hands each entry its
+        slice of the scan and, when the bundle parse already vouched for it, an empty list of
+        structural issues, so the entry is neither walked nor parsed a second time.
+        """
+        
         try:
             resource_type = resource.get("resourceType")
             if not resource_type:
@@ -174,19 +221,24 @@ class FHIRValidator:
             
             # Structural validation with fhir.resources if available
             if FHIR_AVAILABLE:
-                fhir_issues = self._validate_with_fhir_resources(resource, resource_type)
-                issues.extend(fhir_issues)
+                if structure_issues is None:
+                    structure_issues = self._validate_with_fhir_resources(resource, resource_type)
+                issues.extend(structure_issues)
             
             # Custom business rule validation
             custom_issues = self._validate_business_rules(resource, resource_type)
             issues.extend(custom_issues)
             
+            # References and codings come from a single walk of the resource
+            if scan is None:
+                scan = self._scan_tree(resource)
+            
             # Reference validation
-            reference_issues = self._validate_references(resource)
+            reference_issues = self._reference_format_issues(scan.references)
             issues.extend(reference_issues)
             
             # Terminology validation
-            terminology_issues = self._validate_terminology(resource, resource_type)
+            terminology_issues = self._coding_issues(scan.codings)
             issues.extend(terminology_issues)
             
             # Determine overall validity
@@ -225,17 +277,37 @@ class FHIRValidator:
         
         try:
             issues = []
+            entries = bundle.get("entry", [])
+            
+            # One walk of the whole bundle; each entry resource's references and codings
+            # are a contiguous slice of it, so entries are not walked again
+            entry_marks = self._entry_resource_marks(entries)
+            scan = self._scan_tree(bundle, marks=entry_marks)
+            
+            # Entry resources already validated as part of an earlier bundle
+            entry_keys, memo_hits = self._lookup_entry_memo(entry_marks)
+            
+            # One structural parse of the whole bundle, which already parses every entry
+            # resource with its own class; only entries it reports problems in are re-parsed.
+            # Memoized resources that parsed cleanly add nothing to it and are left out
+            bundle_structure_issues = None
+            reparse_entries = None
+            if FHIR_AVAILABLE and isinstance(bundle, dict) and bundle.get("resourceType"):
+                parse_target = self._without_clean_memoized_resources(bundle, entries, memo_hits)
+                bundle_structure_issues = self._validate_with_fhir_resources(parse_target, bundle["resourceType"])
+                reparse_entries = self._entries_with_structure_issues(bundle_structure_issues)
             
             # Validate bundle structure
-            bundle_validation = self.validate_resource(bundle, request_id)
+            bundle_validation = self._validate_scanned_resource(bundle, request_id, scan, bundle_structure_issues)
             issues.extend(bundle_validation.get("issues", []))
             
             # Validate each entry
-            entries = bundle.get("entry", [])
             resource_validations = []
+            entry_references = {}
             
             for i, entry in enumerate(entries):
                 # Handle both dict and BundleEntry object entries
+                entry_scan = None
                 if hasattr(entry, 'resource'):
                     # BundleEntry object
                     resource = entry.resource
@@ -244,11 +316,25 @@ class FHIRValidator:
                 elif isinstance(entry, dict):
                     # Dict entry
                     resource = entry.get("resource")
+                    entry_scan = scan.slice(entry_marks.get(f"entry[{i}].resource", (None, None))[1])
                 else:
                     resource = None
 
                 if resource:
-                    resource_result = self.validate_resource(resource, request_id)
+                    structure_issues = None
+                    if reparse_entries is not None and entry_scan is not None and i not in reparse_entries:
+                        structure_issues = []
+                    if i in memo_hits:
+                        resource_result = copy.deepcopy(memo_hits[i]["result"])
+                    else:
+                        resource_result = self._validate_scanned_resource(resource, request_id, entry_scan, structure_issues)
+                        if i in entry_keys:
+                            self.resource_memo.put(entry_keys[i], {
+                                "result": copy.deepcopy(resource_result),
+                                "structure_clean": structure_issues is not None,
+                            })
+                    if entry_scan is not None:
+                        entry_references[i] = entry_scan.references
                     resource_validations.append(resource_result)
 
                     # Add location context to issues
@@ -266,7 +352,7 @@ class FHIRValidator:
                     })
             
             # Bundle-specific validations
-            bundle_issues = self._validate_bundle_integrity(bundle, request_id)
+            bundle_issues = self._validate_bundle_integrity(bundle, request_id, entry_references)
             issues.extend(bundle_issues)
             
             # Transaction-specific validations for transaction bundles
@@ -511,8 +597,12 @@ class FHIRValidator:
     def _validate_references(self, resource: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Validate resource references"""
         
+        return self._reference_format_issues(self._extract_references(resource))
+    
+    def _reference_format_issues(self, references: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Format warnings for extracted (path, reference) pairs"""
+        
         issues = []
-        references = self._extract_references(resource)
         
         for ref_path, ref_value in references:
             if ref_value:
@@ -563,10 +653,13 @@ class FHIRValidator:
     def _validate_terminology(self, resource: Dict[str, Any], resource_type: str) -> List[Dict[str, Any]]:
         """Validate terminology and coding"""
         
-        issues = []
-        
         # Find all CodeableConcept and Coding elements
-        codings = self._extract_codings(resource)
+        return self._coding_issues(self._extract_codings(resource))
+    
+    def _coding_issues(self, codings: List[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+        """Terminology warnings for extracted (path, coding) pairs"""
+        
+        issues = []
         
         for coding_path, coding in codings:
             if isinstance(coding, dict):
@@ -616,6 +709,110 @@ class FHIRValidator:
         
         return codings
     
+    def _scan_tree(self, obj: Any, marks: Optional[Dict[str, Tuple[Any, int]]] = None) -> "_TreeScan":
+        """
+        Collect references and codings in one walk.
+        
+        The lists match _extract_references and _extract_codings over the same object,
+        item for item and in order. Subtrees listed in marks (path -> (node, mark id))
+        have the range of items found inside them recorded, so the references and
+        codings of one bundle entry can be taken from a walk of the whole bundle.
+        """
+        
+        scan = _TreeScan()
+        self._scan_node(obj, "", scan, True, marks or {})
+        return scan
+    
+    def _scan_node(self, obj: Any, path: str, scan: "_TreeScan", collect_codings: bool,
+                   marks: Dict[str, Tuple[Any, int]]) -> None:
+        if isinstance(obj, dict):
+            mark = marks.get(path)
+            if mark is not None and mark[0] is not obj:
+                mark = None
+            if mark is not None:
+                start = (len(scan.references), len(scan.codings))
+            
+            # _extract_codings does not descend into "coding", but references under it still count
+            if collect_codings:
+                if "system" in obj and "code" in obj:
+                    scan.codings.append((path, obj))
+                if "coding" in obj and isinstance(obj["coding"], list):
+                    for i, coding in enumerate(obj["coding"]):
+                        coding_path = f"{path}.coding[{i}]" if path else f"coding[{i}]"
+                        scan.codings.append((coding_path, coding))
+            
+            for key, value in obj.items():
+                current_path = f"{path}.{key}" if path else key
+                if key == "reference" and isinstance(value, str):
+                    scan.references.append((current_path, value))
+                else:
+                    self._scan_node(value, current_path, scan, collect_codings and key != "coding", marks)
+            
+            if mark is not None:
+                scan.spans[mark[1]] = (path, start, (len(scan.references), len(scan.codings)))
+                    
+        elif isinstance(obj, list):
+            for i, item in enumerate(obj):
+                current_path = f"{path}[{i}]" if path else f"[{i}]"
+                self._scan_node(item, current_path, scan, collect_codings, marks)
+    
+    def _entry_resource_marks(self, entries: Any) -> Dict[str, Tuple[Any, int]]:
+        """Bundle walk marks for every dict entry resource, keyed by its path in the bundle"""
+        
+        marks = {}
+        if isinstance(entries, list):
+            for i, entry in enumerate(entries):
+                if isinstance(entry, dict) and isinstance(entry.get("resource"), dict):
+                    marks[f"entry[{i}].resource"] = (entry["resource"], i)
+        return marks
+    
+    def _lookup_entry_memo(self, entry_marks: Dict[str, Tuple[Any, int]]) -> Tuple[Dict[int, str], Dict[int, Dict[str, Any]]]:
+        """Content keys of the dict entry resources, and the memoized results found for them"""
+        
+        entry_keys = {}
+        memo_hits = {}
+        if self.resource_memo is None:
+            return entry_keys, memo_hits
+        
+        for resource, i in entry_marks.values():
+            try:
+                key = self.content_hasher.digest(resource)
+            except (TypeError, ValueError):
+                continue
+            entry_keys[i] = key
+            memoized = self.resource_memo.get(key)
+            if memoized is not None:
+                memo_hits[i] = memoized
+        return entry_keys, memo_hits
+    
+    def _without_clean_memoized_resources(self, bundle: Dict[str, Any], entries: Any,
+                                          memo_hits: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+        """Bundle to parse: entries whose memoized resource parsed cleanly keep everything but the resource"""
+        
+        clean = {i for i, memoized in memo_hits.items() if memoized["structure_clean"]}
+        if not clean:
+            return bundle
+        return {**bundle, "entry": [
+            {key: value for key, value in entry.items() if key != "resource"} if i in clean else entry
+            for i, entry in enumerate(entries)
+        ]}
+    
+    def _entries_with_structure_issues(self, structure_issues: List[Dict[str, Any]]) -> Optional[Set[int]]:
+        """
+        Entry indexes that a whole-bundle parse reported problems in.
+        
+        None means the parse failed outright or reported a problem outside the entries,
+        which may have kept it from checking them, so every entry needs its own parse.
+        """
+        
+        entries = set()
+        for issue in structure_issues:
+            parts = str(issue.get("location", "")).split(".")
+            if issue.get("severity") != "error" or len(parts) < 2 or parts[0] != "entry" or not parts[1].isdigit():
+                return None
+            entries.add(int(parts[1]))
+        return entries
+    
     def _validate_coding(self, system: str, code: str) -> Dict[str, Any]:
         """Validate a specific coding"""
         
@@ -638,10 +835,12 @@ class FHIRValidator:
         
         return {"valid": True, "message": ""}
     
-    def _validate_bundle_integrity(self, bundle: Dict[str, Any], request_id: Optional[str]) -> List[Dict[str, Any]]:
-        """Validate bundle referential integrity"""
+    def _validate_bundle_integrity(self, bundle: Dict[str, Any], request_id: Optional[str],
+                                   entry_references: Optional[Dict[int, List[Tuple[str, str]]]] = None) -> List[Dict[str, Any]]:
+        """Validate bundle referential integrity, reusing already extracted entry references"""
         
         issues = []
+        entry_references = entry_references or {}
         
         try:
             entries = bundle.get("entry", [])
@@ -650,7 +849,7 @@ class FHIRValidator:
             resource_ids = set()
             all_references = []
             
-            for entry in entries:
+            for i, entry in enumerate(entries):
                 resource = entry.get("resource", {})
                 resource_type = resource.get("resourceType")
                 resource_id = resource.get("id")
@@ -659,7 +858,9 @@ class FHIRValidator:
                     resource_ids.add(f"{resource_type}/{resource_id}")
                 
                 # Extract references from this resource
-                refs = self._extract_references(resource)
+                refs = entry_references.get(i)
+                if refs is None:
+                    refs = self._extract_references(resource)
                 all_references.extend(refs)
             
             # Check if all internal references are satisfied
@@ -792,7 +993,10 @@ async def get_fhir_validator() -> FHIRValidator:
     global _fhir_validator
     
     if _fhir_validator is None:
-        _fhir_validator = FHIRValidator()
+        if get_settings().fhir_validation_cache_enabled:
+            _fhir_validator = FHIRValidator(get_resource_validation_memo(), get_content_hasher())
+        else:
+            _fhir_validator = FHIRValidator()
         _fhir_validator.initialize()
     
     return _fhir_validator
@@ -0,0 +1,274 @@
+"""
+Incremental Re-Extraction for Edited Clinical Text
+Keeps a snapshot of each conversion (sentence-level entities, FHIR resources and
+validated bundle entries) under its request id, so a follow-up conversion of the
+edited note only re-extracts the sentences that changed and only builds the FHIR
+resources whose inputs changed.
+HIPAA Compliant: Snapshots live in process memory only, clinical text is never logged
+"""
+
+import bisect
+import copy
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config import get_settings
+from .nlp.entity_extractor import EntityType, MedicalEntity
+from .nlp.segmenter import TextSegment, split_sentences
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ConversionSnapshot:
+    """What a later incremental conversion can reuse from one conversion"""
+    fingerprint: str
+    # Entities of each sentence, keyed by sentence text, at sentence-local offsets
+    sentence_entities: Dict[str, List[MedicalEntity]]
+    # Entities that could not be placed inside a single sentence, at note offsets
+    note_entities: List[MedicalEntity]
+    # FHIR resources keyed by ResourceReuse key, and bundle entries keyed by resource id
+    resources: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    bundle_entries: Dict[str, Any] = field(default_factory=dict)
+
+
+def entities_from_response(raw_entities: List[Dict[str, Any]]) -> List[MedicalEntity]:
+    """Rebuild MedicalEntity objects from the pipeline's formatted entity list"""
+    entities = []
+    for entity in raw_entities:
+        try:
+            entity_type = EntityType(entity.get("type", "unknown"))
+        except ValueError:
+            entity_type = EntityType.UNKNOWN
+        entities.append(MedicalEntity(
+            text=entity.get("text", ""),
+            entity_type=entity_type,
+            start_char=entity.get("start_char", 0),
+            end_char=entity.get("end_char", 0),
+            confidence=entity.get("confidence", 0.0),
+            attributes=entity.get("attributes", {}),
+            source=entity.get("source", "nlp_pipeline")
+        ))
+    return entities
+
+
+def index_entities(text: str, entities: List[MedicalEntity],
+                   max_chars: int) -> Tuple[Dict[str, List[MedicalEntity]], List[MedicalEntity]]:
+    """
+    Group note entities by the sentence that contains them
+    Returns sentence text -> entities at sentence-local offsets, plus the entities
+    that cross a sentence boundary or cannot be found in the note. Entities without
+    a span (e.g. from LLM escalation) are placed by their text and keep their empty
+    span. Every sentence gets an entry, so sentences without entities are reused too.
+    """
+    sentences = split_sentences(text, max_chars)
+    starts = [sentence.start for sentence in sentences]
+    sentence_entities: Dict[str, List[MedicalEntity]] = {sentence.text: [] for sentence in sentences}
+    note_entities: List[MedicalEntity] = []
+    text_lower = text.lower()
+    # Repeated spanless mentions map to successive occurrences
+    search_from: Dict[Tuple[EntityType, str], int] = {}
+
+    for entity in entities:
+        spanless = entity.end_char <= entity.start_char
+        start, end = entity.start_char, entity.end_char
+        if spanless and entity.text:
+            needle = entity.text.lower()
+            start = text_lower.find(needle, search_from.get((entity.entity_type, needle), 0))
+            if start < 0:
+                start = text_lower.find(needle)
+            end = start + len(needle)
+            if start >= 0:
+                search_from[entity.entity_type, needle] = end
+
+        position = bisect.bisect_right(starts, start) - 1
+        if start >= 0 and end > start and position >= 0 and end <= sentences[position].end:
+            sentence = sentences[position]
+            sentence_entities[sentence.text].append(entity if spanless else replace(
+                entity,
+                start_char=entity.start_char - sentence.start,
+                end_char=entity.end_char - sentence.start
+            ))
+        else:
+            note_entities.append(entity)
+
+    return sentence_entities, note_entities
+
+
+def reextract_entities(text: str, snapshot: ConversionSnapshot,
+                       extract_batch: Callable[[List[str]], List[List[MedicalEntity]]],
+                       max_chars: int,
+                       escalate: Optional[Callable[[str, List[MedicalEntity]], List[MedicalEntity]]] = None
+                       ) -> Tuple[List[MedicalEntity], Dict[str, Any]]:
+    """
+    Entities for the edited text, extracting only sentences the snapshot has not seen
+    Unchanged sentences reuse their snapshot entities shifted to their new offsets,
+    wherever they moved. New or edited sentences are extracted in one batch call.
+    Note-level entities are kept while their text still occurs in the note.
+
+    When extract_batch does not escalate sentences to the LLM, escalate(text, entities)
+    is applied once to the assembled note instead, so an edit costs at most one LLM call.
+    """
+    sentences = split_sentences(text, max_chars)
+    changed: List[TextSegment] = []
+    for sentence in sentences:
+        if sentence.text not in snapshot.sentence_entities:
+            changed.append(sentence)
+
+    # Repeated new sentences are extracted once
+    changed_texts = list(dict.fromkeys(sentence.text for sentence in changed))
+    extracted = dict(zip(changed_texts, extract_batch(changed_texts), strict=True)) if changed_texts else {}
+
+    entities: List[MedicalEntity] = []
+    for sentence in sentences:
+        local_entities = snapshot.sentence_entities.get(sentence.text)
+        if local_entities is None:
+            # Fresh results come back at sentence-local offsets
+            local_entities = extracted.get(sentence.text, [])
+        for entity in local_entities:
+            if entity.end_char <= entity.start_char:
+                entities.append(entity)
+                continue
+            entities.append(replace(
+                entity,
+                start_char=entity.start_char + sentence.start,
+                end_char=entity.end_char + sentence.start
+            ))
+
+    text_lower = text.lower()
+    kept_note_entities = 0
+    for entity in snapshot.note_entities:
+        if entity.text and entity.text.lower() in text_lower:
+            entities.append(entity)
+            kept_note_entities += 1
+
+    entities.sort(key=lambda e: e.start_char)
+    escalated = False
+    if escalate is not None and changed:
+        assembled = entities
+        entities = escalate(text, entities)
+        escalated = entities is not assembled
+    stats = {
+        "sentences": len(sentences),
+        "reextracted_sentences": len(changed),
+        "reused_sentences": len(sentences) - len(changed),
+        "reused_note_entities": kept_note_entities,
+        "llm_escalated": escalated,
+    }
+    return entities, stats
+
+
+def resource_fingerprint(kind: str, inputs: Any) -> str:
+    """Digest of the inputs a FHIR resource was built from"""
+    encoded = json.dumps([kind, inputs], sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:24]
+
+
+class ResourceReuse:
+    """
+    Builds FHIR resources through a memo of the previous conversion's resources
+    A resource whose kind and inputs (including the references it points at) match
+    one from the previous conversion is reused with its id, so references between
+    reused resources stay valid. Identical inputs within one conversion are told
+    apart by occurrence, so a reused resource never appears twice in a bundle.
+    """
+
+    def __init__(self, previous: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.previous = previous or {}
+        self.resources: Dict[str, Dict[str, Any]] = {}
+        self.reused_ids: set = set()
+        self.created = 0
+        self._occurrences: Counter = Counter()
+
+    def get_or_create(self, kind: str, inputs: Any,
+                      create: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        fingerprint = resource_fingerprint(kind, inputs)
+        self._occurrences[fingerprint] += 1
+        key = f"{fingerprint}:{self._occurrences[fingerprint]}"
+
+        resource = self.previous.get(key)
+        if resource is not None:
+            resource = copy.deepcopy(resource)
+            self.reused_ids.add(resource.get("id"))
+        else:
+            resource = create()
+            self.created += 1
+        if resource:
+            self.resources[key] = resource
+        return resource
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"reused_resources": len(self.reused_ids), "created_resources": self.created}
+
+
+class ConversionSnapshotStore:
+    """LRU+TTL store of conversion snapshots keyed by request id"""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 1800):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._snapshots: "OrderedDict[str, Tuple[float, ConversionSnapshot]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, result_id: str, fingerprint: Optional[str] = None) -> Optional[ConversionSnapshot]:
+        """Snapshot for result_id, or None when unknown, expired or built by other models"""
+        now = time.time()
+        with self._lock:
+            entry = self._snapshots.get(result_id)
+            if entry is not None and entry[0] <= now:
+                del self._snapshots[result_id]
+                self._stats["expirations"] += 1
+                entry = None
+            if entry is None or (fingerprint is not None and entry[1].fingerprint != fingerprint):
+                self._stats["misses"] += 1
+                return None
+            self._snapshots.move_to_end(result_id)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def set(self, result_id: str, snapshot: ConversionSnapshot) -> None:
+        with self._lock:
+            self._stats["stores"] += 1
+            self._snapshots[result_id] = (time.time() + self.ttl_seconds, snapshot)
+            self._snapshots.move_to_end(result_id)
+            while len(self._snapshots) > self.max_entries:
+                self._snapshots.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._snapshots),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                **self._stats,
+            }
+
+
+_snapshot_store: Optional[ConversionSnapshotStore] = None
+_snapshot_store_lock = threading.Lock()
+
+
+def get_snapshot_store() -> ConversionSnapshotStore:
+    """Process-wide snapshot store sized from settings"""
+    global _snapshot_store
+    if _snapshot_store is None:
+        with _snapshot_store_lock:
+            if _snapshot_store is None:
+                settings = get_settings()
+                _snapshot_store = ConversionSnapshotStore(
+                    max_entries=settings.incremental_snapshot_max_entries,
+                    ttl_seconds=settings.incremental_snapshot_ttl_seconds
+                )
+    return _snapshot_store
@@ -0,0 +1,213 @@
+"""
+Medication Context Index
+Route, dosage and frequency enrichment for the medications of one clinical note.
+The note is lowercased and scanned once for every route and frequency keyword, and
+the keyword offsets are kept sorted; each medication then finds the keywords in its
+context window with a binary search, and only its short window is matched against
+the precompiled dosage and numeric frequency patterns. Rules are checked in the same
+priority order and on the same windows as the per-medication scans they replace.
+HIPAA Compliant: Offsets only, clinical text is never logged
+"""
+
+import bisect
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Characters around the medication name that count as its context
+ROUTE_WINDOW = 25
+DOSAGE_WINDOW = 30
+FREQUENCY_WINDOW = 30
+
+ORAL_MEDICATIONS = frozenset({
+    'metformin', 'lisinopril', 'amlodipine', 'simvastatin', 'omeprazole', 'levothyroxine',
+    'sertraline', 'fluoxetine', 'aspirin', 'ibuprofen', 'acetaminophen', 'amoxicillin',
+    'azithromycin', 'ciprofloxacin', 'prednisone', 'hydrochlorothiazide', 'metoprolol',
+    'warfarin', 'furosemide', 'gabapentin', 'cephalexin', 'captopril', 'enalapril', 'ramipril'
+})
+
+# Short abbreviations only count as whole words; checked before the keywords
+ROUTE_ABBREVIATIONS = [
+    ("iv", "iv"),
+    ("im", "im"),
+    ("subcutaneous", "sc"),
+    ("oral", "po"),
+    ("rectal", "pr"),
+    ("sublingual", "sl"),
+]
+
+# Longer route keywords, matched anywhere in the window
+ROUTE_KEYWORDS = {
+    "iv": ["intravenous", "intravenously"],
+    "oral": ["oral", "orally", "by mouth"],
+    "im": ["intramuscular", "intramuscularly"],
+    "subcutaneous": ["subcutaneous", "subcutaneously", "subq"],
+    "topical": ["topical", "topically", "applied"],
+    "inhaled": ["inhaled", "inhalation", "nebulized"],
+    "nasal": ["nasal", "nasally", "intranasal"],
+    "rectal": ["rectal", "rectally"],
+    "sublingual": ["sublingual", "sublingually"]
+}
+
+DOSAGE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'\d+(?:\.\d+)?\s*mg(?:/m²)?',  # mg or mg/m²
+    r'\d+(?:\.\d+)?\s*g',          # grams
+    r'\d+(?:\.\d+)?\s*ml',         # milliliters
+    r'\d+(?:\.\d+)?\s*mcg',        # micrograms
+    r'\d+(?:\.\d+)?\s*units?',     # units
+    r'\d+(?:\.\d+)?\s*iu',         # international units
+    r'\d+(?:\.\d+)?\s*tablets?',   # tablets
+    r'\d+(?:\.\d+)?\s*capsules?',  # capsules
+    r'\d+(?:\.\d+)?\s*drops?',     # drops
+    r'\d+(?:\.\d+)?\s*l\b',        # liters (with word boundary)
+)]
+
+FREQUENCY_KEYWORDS = {
+    "once daily": ["once daily", "once a day", "qd", "od"],
+    "twice daily": ["twice daily", "twice a day", "bid", "b.i.d.", "2x daily"],
+    "three times daily": ["three times daily", "three times a day", "tid", "t.i.d.", "3x daily"],
+    "four times daily": ["four times daily", "four times a day", "qid", "q.i.d.", "4x daily"],
+    "every 6 hours": ["every 6 hours", "q6h", "6 hourly"],
+    "every 8 hours": ["every 8 hours", "q8h", "8 hourly"],
+    "every 12 hours": ["every 12 hours", "q12h", "12 hourly"],
+    "every 2 weeks": ["every 2 weeks", "every two weeks", "biweekly"],
+    "every 3 weeks": ["every 3 weeks", "every three weeks"],
+    "every 4 weeks": ["every 4 weeks", "every four weeks", "monthly"],
+    "weekly": ["weekly", "once weekly", "every week"],
+    "as needed": ["as needed", "prn", "p.r.n.", "when needed"],
+    "before meals": ["before meals", "ac", "a.c.", "pre-meal"],
+    "after meals": ["after meals", "pc", "p.c.", "post-meal"],
+    "at bedtime": ["at bedtime", "qhs", "q.h.s.", "bedtime"],
+}
+
+# Groups whose longest keyword is longest come first, so longer phrases win over fragments
+_FREQUENCY_RULES = sorted(FREQUENCY_KEYWORDS.items(), key=lambda item: max(len(k) for k in item[1]), reverse=True)
+
+NUMERIC_FREQUENCY_PATTERNS: List[Tuple[re.Pattern, Callable[[re.Match], str]]] = [
+    (re.compile(r'\b(\d+)\s*x\s+daily\b'), lambda m: f"{m.group(1)} times daily"),
+    (re.compile(r'\b(\d+)\s+times?\s+daily\b'), lambda m: f"{m.group(1)} times daily"),
+    (re.compile(r'\b(\d+)\s*x\s+per\s+day\b'), lambda m: f"{m.group(1)} times daily"),
+    (re.compile(r'\bevery\s+(\d+)\s+hours?\b'), lambda m: f"every {m.group(1)} hours"),
+]
+
+_WORD_CHAR = re.compile(r'\w')
+
+
+class _KeywordMentions:
+    """Every occurrence of one keyword, overlapping ones included"""
+
+    __slots__ = ("length", "starts")
+
+    def __init__(self, text: str, keyword: str):
+        self.length = len(keyword)
+        self.starts: List[int] = []
+        position = text.find(keyword)
+        while position != -1:
+            self.starts.append(position)
+            position = text.find(keyword, position + 1)
+
+    def first_inside(self, window_start: int, window_end: int) -> Optional[int]:
+        index = bisect.bisect_left(self.starts, window_start)
+        if index < len(self.starts) and self.starts[index] + self.length <= window_end:
+            return self.starts[index]
+        return None
+
+
+class _WordMentions(_KeywordMentions):
+    """Occurrences of a short token that only count as a whole word (regex \\b on the window)"""
+
+    __slots__ = ("left_bounded", "right_bounded")
+
+    def __init__(self, text: str, keyword: str):
+        super().__init__(text, keyword)
+        self.left_bounded = [start == 0 or not _WORD_CHAR.match(text, start - 1) for start in self.starts]
+        self.right_bounded = [not _WORD_CHAR.match(text, start + self.length) for start in self.starts]
+
+    def first_inside(self, window_start: int, window_end: int) -> Optional[int]:
+        # A window edge is a word boundary for the window, wherever it falls in the note
+        index = bisect.bisect_left(self.starts, window_start)
+        while index < len(self.starts):
+            start = self.starts[index]
+            end = start + self.length
+            if end > window_end:
+                return None
+            if (start == window_start or self.left_bounded[index]) and \
+                    (end == window_end or self.right_bounded[index]):
+                return start
+            index += 1
+        return None
+
+
+class MedicationContextIndex:
+    """Route, dosage and frequency mentions of one note, looked up per medication"""
+
+    def __init__(self, clinical_text: str):
+        self.text = clinical_text
+        self.text_lower = clinical_text.lower()
+        self._positions: Dict[str, int] = {}
+
+        self._route_abbreviations = [
+            (route, token, _WordMentions(self.text_lower, token)) for route, token in ROUTE_ABBREVIATIONS
+        ]
+        self._route_keywords = [
+            (route, keyword, _KeywordMentions(self.text_lower, keyword))
+            for route, keywords in ROUTE_KEYWORDS.items() for keyword in keywords
+        ]
+        self._frequency_keywords = [
+            (frequency, keyword, _KeywordMentions(self.text_lower, keyword))
+            for frequency, keywords in _FREQUENCY_RULES for keyword in keywords
+        ]
+
+    def locate(self, medication_text: str) -> int:
+        """Offset of the first mention of the medication, or -1"""
+        medication_lower = medication_text.lower()
+        position = self._positions.get(medication_lower)
+        if position is None:
+            position = self._positions[medication_lower] = self.text_lower.find(medication_lower)
+        return position
+
+    def _window(self, medication_text: str, radius: int) -> Optional[Tuple[int, int]]:
+        position = self.locate(medication_text)
+        if position == -1:
+            return None
+        end = position + len(medication_text.lower())
+        return max(0, position - radius), min(len(self.text_lower), end + radius)
+
+    def route(self, medication_text: str) -> Optional[Tuple[str, str]]:
+        """(route, matched keyword) for the medication, or None when its context names no route"""
+        window = self._window(medication_text, ROUTE_WINDOW)
+        if window is None:
+            return None
+        for rules in (self._route_abbreviations, self._route_keywords):
+            for route, keyword, mentions in rules:
+                if mentions.first_inside(*window) is not None:
+                    return route, keyword
+        return None
+
+    def dosage(self, medication_text: str) -> Optional[str]:
+        """Dosage mentioned near the medication, or None"""
+        window = self._window(medication_text, DOSAGE_WINDOW)
+        if window is None:
+            return None
+        # Dosages keep the note's original case; the patterns have no leading anchor, so
+        # matching within pos/endpos is the same as matching the window slice
+        for pattern in DOSAGE_PATTERNS:
+            match = pattern.search(self.text, *window)
+            if match is not None:
+                return match.group(0).strip()
+        return None
+
+    def frequency(self, medication_text: str) -> Optional[Tuple[str, str]]:
+        """(frequency, matched keyword or pattern) near the medication, or None"""
+        window = self._window(medication_text, FREQUENCY_WINDOW)
+        if window is None:
+            return None
+        for frequency, keyword, mentions in self._frequency_keywords:
+            if mentions.first_inside(*window) is not None:
+                return frequency, keyword
+        # These start with \b, which must see the window edge, so match the slice itself
+        context = self.text_lower[window[0]:window[1]]
+        for pattern, formatter in NUMERIC_FREQUENCY_PATTERNS:
+            match = pattern.search(context)
+            if match is not None:
+                return formatter(match), pattern.pattern
+        return None
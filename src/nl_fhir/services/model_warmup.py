@@ -1,6 +1,8 @@
 """
 Model Warmup Service for Performance Optimization - Story 2
 Pre-loads NLP models at application startup to eliminate first-request latency.
+Tiers load concurrently in worker threads; each tier reports its own readiness so the
+service can accept traffic on the fast tiers while the heavier models finish loading.
 """
 
 import logging
@@ -10,6 +12,19 @@ from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Tier readiness states
+TIER_IDLE = "idle"
+TIER_WARMING = "warming"
+TIER_READY = "ready"
+TIER_FAILED = "failed"
+
+# Warmed tiers and the warmup result key each one reports under
+WARMUP_TIERS = {
+    "medspacy": "medspacy_clinical",
+    "transformer_ner": "transformer_ner",
+    "embeddings": "embeddings",
+}
+
 
 class ModelWarmupService:
     """Pre-loads and warms up NLP models at application startup for optimal performance"""
@@ -19,6 +34,10 @@ class ModelWarmupService:
         self.warmup_start_time: Optional[float] = None
         self.warmup_complete_time: Optional[float] = None
         self.models_loaded = False
+        # Regex patterns need no loading, so Tier 3 is ready from the start
+        self.tier_status: Dict[str, str] = {"regex": TIER_READY}
+        self.tier_status.update({tier: TIER_IDLE for tier in WARMUP_TIERS})
+        self._warmup_task: Optional[asyncio.Task] = None
 
     async def warmup_models(self) -> Dict[str, Any]:
         """
@@ -27,12 +46,17 @@ class ModelWarmupService:
         """
         logger.info("Starting model warmup for performance optimization...")
         self.warmup_start_time = time.time()
-
-        warmup_results = {
-            "medspacy_clinical": await self._warmup_medspacy(),
-            "transformer_ner": await self._warmup_transformer_ner(),
-            "embeddings": await self._warmup_embeddings(),
-        }
+        self.warmup_complete_time = None
+        for tier in WARMUP_TIERS:
+            self.tier_status[tier] = TIER_WARMING
+
+        # Model loading is blocking I/O and native code, so the tiers load side by side
+        results = await asyncio.gather(
+            self._warmup_tier("medspacy", self._warmup_medspacy),
+            self._warmup_tier("transformer_ner", self._warmup_transformer_ner),
+            self._warmup_tier("embeddings", self._warmup_embeddings),
+        )
+        warmup_results = dict(zip(WARMUP_TIERS.values(), results))
 
         self.warmup_complete_time = time.time()
         total_warmup_time = self.warmup_complete_time - self.warmup_start_time
@@ -53,8 +77,46 @@ class ModelWarmupService:
             "results": warmup_results,
         }
 
+    def start_background_warmup(self) -> asyncio.Task:
+        """
+        Run warmup_models() as a task on the running loop and return immediately
+        Tiers are marked warming before the task starts, so requests that arrive
+        first already route around the models that are still loading.
+        """
+        if self._warmup_task is None or self._warmup_task.done():
+            for tier in WARMUP_TIERS:
+                self.tier_status[tier] = TIER_WARMING
+            self._warmup_task = asyncio.create_task(self.warmup_models())
+        return self._warmup_task
+
+    async def stop_background_warmup(self) -> None:
+        """Cancel a warmup task that is still pending at shutdown"""
+        task, self._warmup_task = self._warmup_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _warmup_tier(self, tier: str, warmup) -> Dict[str, Any]:
+        result = await warmup()
+        self.tier_status[tier] = TIER_READY if result["status"] == "success" else TIER_FAILED
+        return result
+
     async def _warmup_medspacy(self) -> Dict[str, Any]:
         """Warm up MedSpaCy Clinical Intelligence Engine"""
+        return await asyncio.to_thread(self._load_medspacy)
+
+    async def _warmup_transformer_ner(self) -> Dict[str, Any]:
+        """Warm up Transformer NER model"""
+        return await asyncio.to_thread(self._load_transformer_ner)
+
+    async def _warmup_embeddings(self) -> Dict[str, Any]:
+        """Warm up sentence embeddings model"""
+        return await asyncio.to_thread(self._load_embeddings)
+
+    def _load_medspacy(self) -> Dict[str, Any]:
         try:
             from ..services.nlp.model_managers.medspacy_manager import MedSpacyManager
 
@@ -91,8 +153,7 @@ class ModelWarmupService:
             self.warmup_status["medspacy"] = "error"
             return {"status": "error", "error": str(e)}
 
-    async def _warmup_transformer_ner(self) -> Dict[str, Any]:
-        """Warm up Transformer NER model"""
+    def _load_transformer_ner(self) -> Dict[str, Any]:
         try:
             from ..services.nlp.model_managers.transformer_manager import TransformerManager
 
@@ -128,8 +189,7 @@ class ModelWarmupService:
             self.warmup_status["transformer_ner"] = "error"
             return {"status": "error", "error": str(e)}
 
-    async def _warmup_embeddings(self) -> Dict[str, Any]:
-        """Warm up sentence embeddings model"""
+    def _load_embeddings(self) -> Dict[str, Any]:
         try:
             from ..services.nlp.model_managers.transformer_manager import TransformerManager
 
@@ -188,6 +248,22 @@ class ModelWarmupService:
         """Check if model warmup is complete and models are ready"""
         return self.models_loaded
 
+    def get_tier_readiness(self) -> Dict[str, str]:
+        """Per-tier state: idle, warming, ready or failed"""
+        return dict(self.tier_status)
+
+    def is_tier_warming(self, tier: str) -> bool:
+        """True while a tier's models are loading; extraction skips it rather than waiting"""
+        return self.tier_status.get(tier) == TIER_WARMING
+
+    def fast_tiers_ready(self) -> bool:
+        """
+        Ready to serve extraction on the fast tiers (regex plus MedSpaCy)
+        A MedSpaCy tier that failed to load still counts, since extraction falls
+        through to the lower tiers; one that has not finished does not.
+        """
+        return self.tier_status.get("medspacy") in (TIER_READY, TIER_FAILED)
+
 
 # Global instance for application-wide use
 model_warmup_service = ModelWarmupService()
\ No newline at end of file
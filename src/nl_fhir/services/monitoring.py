@@ -160,6 +160,7 @@ class MonitoringService:
         """
         ready = True
         checks = {}
+        tiers = {}
         
         try:
             # Check if service can process requests
@@ -167,9 +168,11 @@ class MonitoringService:
             checks["memory_available"] = psutil.virtual_memory().percent < 95
             checks["disk_space"] = psutil.disk_usage('/').percent < 95
 
-            # Story 2: Check if NLP models are warmed up for optimal performance
+            # Story 2: Ready once the fast tiers can serve; heavier tiers keep warming
+            # in the background and are reported per tier below
             from .model_warmup import model_warmup_service
-            checks["nlp_models_loaded"] = model_warmup_service.is_ready()
+            checks["nlp_models_loaded"] = model_warmup_service.fast_tiers_ready()
+            tiers = model_warmup_service.get_tier_readiness()
             checks["fhir_server_connection"] = True  # Will be actual check in Epic 3
             
             ready = all(checks.values())
@@ -182,7 +185,8 @@ class MonitoringService:
         return {
             "ready": ready,
             "timestamp": datetime.now().isoformat(),
-            "checks": checks
+            "checks": checks,
+            "nlp_tiers": tiers
         }
     
     async def get_liveness(self) -> Dict[str, Any]:
@@ -6,13 +6,20 @@ Production Ready: Optimized for clinical text processing
 
 import logging
 import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import time
 
 # Import the proper medical NLP system
-from .models import extract_medical_entities
+from .models import escalate_merged_result, extract_medical_entities, extract_medical_entities_batch
+from .keyword_matcher import KeywordMatcher
+from .segmenter import TextSegment, merge_segment_results, segment_clinical_text
+from ...config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +39,22 @@ class EntityType(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+# Result categories of the tiered medical NLP and the entity types they map to
+_CATEGORY_ENTITY_TYPES = {
+    'medications': EntityType.MEDICATION,
+    'lab_tests': EntityType.LAB_TEST,
+    'procedures': EntityType.PROCEDURE,
+    'conditions': EntityType.CONDITION,
+    'dosages': EntityType.DOSAGE,
+    'frequencies': EntityType.FREQUENCY,
+    'routes': EntityType.ROUTE,
+    'temporal': EntityType.TEMPORAL,
+    'patients': EntityType.PERSON  # Changed from 'persons' to 'patients' to match NLP model output
+}
+_ENTITY_TYPE_CATEGORIES = {entity_type: category for category, entity_type in _CATEGORY_ENTITY_TYPES.items()}
+
+
+@dataclass(slots=True)
 class MedicalEntity:
     """Extracted medical entity with metadata"""
     text: str
@@ -43,6 +65,11 @@ class MedicalEntity:
     attributes: Dict[str, Any]
     source: str  # spacy, pattern, rule-based
 
+    def __post_init__(self):
+        # A handful of source labels repeat across every entity of a bulk job
+        if type(self.source) is str:
+            self.source = sys.intern(self.source)
+
 
 class MedicalEntityExtractor:
     """Advanced medical entity extraction using multiple techniques"""
@@ -50,8 +77,13 @@ class MedicalEntityExtractor:
     def __init__(self):
         self.nlp = None
         self._pattern_rules = self._initialize_pattern_rules()
+        self._compiled_pattern_rules = {
+            pattern_name: (re.compile(pattern, re.IGNORECASE), entity_type)
+            for pattern_name, (pattern, entity_type) in self._pattern_rules.items()
+        }
         self._medication_keywords = self._load_medication_keywords()
         self._lab_test_keywords = self._load_lab_test_keywords()
+        self._keyword_matcher = self._build_keyword_matcher()
         
     def initialize(self) -> bool:
         """Initialize NLP model and components"""
@@ -72,44 +104,14 @@ class MedicalEntityExtractor:
         
         try:
             # Use the proper medical NLP system instead of hardcoded patterns
-            nlp_results = extract_medical_entities(text)
+            segments = self.segment_text(text)
+            if segments is not None:
+                nlp_results = self._extract_segments(text, segments, request_id)
+            else:
+                nlp_results = extract_medical_entities(text)
             
             # Convert results to MedicalEntity objects
-            entity_type_mapping = {
-                'medications': EntityType.MEDICATION,
-                'lab_tests': EntityType.LAB_TEST,
-                'procedures': EntityType.PROCEDURE,
-                'conditions': EntityType.CONDITION,
-                'dosages': EntityType.DOSAGE,
-                'frequencies': EntityType.FREQUENCY,
-                'routes': EntityType.ROUTE,
-                'temporal': EntityType.TEMPORAL,
-                'patients': EntityType.PERSON  # Changed from 'persons' to 'patients' to match NLP model output
-            }
-            
-            # Process each entity type from the medical NLP results
-            for entity_category, entity_list in nlp_results.items():
-                entity_type = entity_type_mapping.get(entity_category, EntityType.UNKNOWN)
-                
-                for entity_data in entity_list:
-                    # Extract entity information
-                    text_span = entity_data.get('text', '')
-                    confidence = entity_data.get('confidence', 0.8)
-                    start_char = entity_data.get('start', 0)
-                    end_char = entity_data.get('end', len(text_span))
-                    source = entity_data.get('source', 'medical_nlp')
-                    
-                    # Create MedicalEntity object
-                    entity = MedicalEntity(
-                        text=text_span,
-                        entity_type=entity_type,
-                        start_char=start_char,
-                        end_char=end_char,
-                        confidence=confidence,
-                        attributes=entity_data.get('attributes', {}),
-                        source=source
-                    )
-                    entities.append(entity)
+            entities = self._convert_nlp_results(nlp_results)
             
             # Merge and deduplicate entities using existing logic
             entities = self._merge_overlapping_entities(entities)
@@ -123,29 +125,172 @@ class MedicalEntityExtractor:
             
         except Exception as e:
             logger.error(f"[{request_id}] Medical NLP extraction failed, falling back to patterns: {e}")
-            
-            # Fallback to pattern-based extraction if medical NLP fails
+            return self._extract_with_patterns(text, request_id, start_time)
+    
+    def extract_entities_batch(self, texts: List[str], request_ids: Optional[List[Optional[str]]] = None,
+                               batch_size: int = 32, n_process: int = 1,
+                               escalate_to_llm: bool = True) -> List[List[MedicalEntity]]:
+        """
+        Extract medical entities for many clinical texts in one batched NLP pass
+        With escalate_to_llm=False no text is escalated to the LLM (Tier 3.5); callers
+        that assemble a note from the parts decide that once with escalate_note_entities.
+        """
+        
+        start_time = time.time()
+        request_ids = request_ids or [None] * len(texts)
+        
+        # Long notes are extracted as their chunks, without per-chunk LLM escalation, and
+        # reassembled afterwards
+        text_segments = [self.segment_text(text) for text in texts]
+        whole_texts = [text for text, segments in zip(texts, text_segments) if segments is None]
+        chunk_texts = [segment.text for segments in text_segments if segments for segment in segments]
+        
+        try:
+            whole_results = iter(extract_medical_entities_batch(whole_texts, batch_size=batch_size, n_process=n_process,
+                                                                escalate_to_llm=escalate_to_llm))
+            chunk_results = iter(extract_medical_entities_batch(chunk_texts, batch_size=batch_size, n_process=n_process,
+                                                                escalate_to_llm=False))
+            batch_results = []
+            for text, segments in zip(texts, text_segments):
+                if segments is None:
+                    batch_results.append(next(whole_results))
+                else:
+                    merged = merge_segment_results(segments, [next(chunk_results) for _ in segments])
+                    batch_results.append(self._escalate_segmented_note(text, merged) if escalate_to_llm else merged)
+        except Exception as e:
+            logger.error(f"Batched medical NLP extraction failed, extracting {len(texts)} texts individually: {e}")
+            return [self.extract_entities(text, request_id) for text, request_id in zip(texts, request_ids)]
+        
+        batch_entities = []
+        for text, request_id, nlp_results in zip(texts, request_ids, batch_results):
             try:
-                # Clean and prepare text
-                cleaned_text = self._preprocess_text(text)
-                
-                # Rule-based pattern extraction as fallback
-                pattern_entities = self._extract_pattern_entities(cleaned_text)
-                entities.extend(pattern_entities)
-                
-                # Merge and deduplicate entities
-                entities = self._merge_overlapping_entities(entities)
-                
-                # Calculate processing metrics
-                processing_time = time.time() - start_time
-                
-                logger.info(f"[{request_id}] Fallback extracted {len(entities)} entities in {processing_time:.3f}s")
-                
-                return entities
+                entities = self._merge_overlapping_entities(self._convert_nlp_results(nlp_results))
+            except Exception as e:
+                logger.error(f"[{request_id}] Medical NLP result conversion failed, falling back to patterns: {e}")
+                entities = self._extract_with_patterns(text, request_id, time.time())
+            batch_entities.append(entities)
+        
+        processing_time = time.time() - start_time
+        logger.info(f"Batch extracted entities for {len(texts)} texts in {processing_time:.3f}s using medical NLP")
+        
+        return batch_entities
+    
+    def segment_text(self, text: str) -> Optional[List[TextSegment]]:
+        """Sentence-aligned chunks for a note long enough to be split, otherwise None"""
+        settings = get_settings()
+        if not settings.nlp_segmentation_enabled or len(text) < settings.nlp_segment_min_chars:
+            return None
+        segments = segment_clinical_text(text, settings.nlp_segment_max_chars)
+        return segments if len(segments) > 1 else None
+    
+    def _extract_segments(self, text: str, segments: List[TextSegment],
+                          request_id: Optional[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Run Tiers 1-3 on every chunk in parallel and merge at note offsets
+        LLM escalation is decided once on the merged note, so a long note makes at most
+        one LLM call instead of one per chunk.
+        """
+        segment_results = list(_get_segment_executor().map(
+            partial(extract_medical_entities, escalate_to_llm=False), [segment.text for segment in segments]
+        ))
+        logger.info(f"[{request_id}] Extracted {len(segments)} note segments in parallel")
+        return self._escalate_segmented_note(text, merge_segment_results(segments, segment_results))
+    
+    def _escalate_segmented_note(self, text: str,
+                                 merged: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+        """LLM escalation for the merged chunk results, with one call over the whole note"""
+        escalated = escalate_merged_result(text, merged)
+        if escalated is merged:
+            return merged
+        # LLM entities carry no spans; locate them in the note the same way as chunk results
+        return merge_segment_results([TextSegment(0, len(text), text)], [escalated])
+    
+    def escalate_note_entities(self, text: str, entities: List[MedicalEntity],
+                               request_id: Optional[str] = None) -> List[MedicalEntity]:
+        """
+        LLM escalation (Tier 3.5) for a note whose entities were put together from parts
+        extracted with escalate_to_llm=False; returns entities unchanged when the note
+        does not need it
+        """
+        nlp_results: Dict[str, List[Dict[str, Any]]] = {}
+        for entity in entities:
+            nlp_results.setdefault(_ENTITY_TYPE_CATEGORIES.get(entity.entity_type, "unknown"), []).append({
+                "text": entity.text, "confidence": entity.confidence, "start": entity.start_char,
+                "end": entity.end_char, "source": entity.source, "attributes": entity.attributes
+            })
+        escalated = self._escalate_segmented_note(text, nlp_results)
+        if escalated is nlp_results:
+            return entities
+        logger.info(f"[{request_id}] Note escalated to the LLM after assembling its entities")
+        return self._merge_overlapping_entities(self._convert_nlp_results(escalated))
+    
+    def entities_from_nlp_results(self, nlp_results: Dict[str, List[Dict[str, Any]]],
+                                  request_id: Optional[str] = None) -> List[MedicalEntity]:
+        """Build merged MedicalEntity objects from categorized results produced elsewhere (e.g. a worker process)"""
+        entities = self._merge_overlapping_entities(self._convert_nlp_results(nlp_results))
+        logger.info(f"[{request_id}] Built {len(entities)} entities from external medical NLP results")
+        return entities
+    
+    def _convert_nlp_results(self, nlp_results: Dict[str, List[Dict[str, Any]]]) -> List[MedicalEntity]:
+        """Convert categorized medical NLP results to MedicalEntity objects"""
+        
+        entities = []
+        
+        # Process each entity type from the medical NLP results
+        for entity_category, entity_list in nlp_results.items():
+            entity_type = _CATEGORY_ENTITY_TYPES.get(entity_category, EntityType.UNKNOWN)
+            
+            for entity_data in entity_list:
+                # Extract entity information
+                text_span = entity_data.get('text', '')
+                confidence = entity_data.get('confidence', 0.8)
+                start_char = entity_data.get('start', 0)
+                end_char = entity_data.get('end', len(text_span))
+                source = entity_data.get('source', 'medical_nlp')
                 
-            except Exception as fallback_error:
-                logger.error(f"[{request_id}] Both medical NLP and fallback extraction failed: {fallback_error}")
-                return []
+                # Create MedicalEntity object
+                entity = MedicalEntity(
+                    text=text_span,
+                    entity_type=entity_type,
+                    start_char=start_char,
+                    end_char=end_char,
+                    confidence=confidence,
+                    attributes=entity_data.get('attributes', {}),
+                    source=source
+                )
+                entities.append(entity)
+        
+        return entities
+    
+    def _extract_with_patterns(self, text: str, request_id: Optional[str], start_time: float) -> List[MedicalEntity]:
+        """Fallback to pattern-based extraction if medical NLP fails"""
+        
+        entities = []
+        
+        try:
+            # Clean and prepare text
+            cleaned_text = self._preprocess_text(text)
+            
+            # Rule-based pattern extraction as fallback
+            pattern_entities = self._extract_pattern_entities(cleaned_text)
+            entities.extend(pattern_entities)
+            
+            # Medication and lab test names the patterns miss (one keyword automaton pass)
+            entities.extend(self._extract_keyword_entities(cleaned_text))
+            
+            # Merge and deduplicate entities
+            entities = self._merge_overlapping_entities(entities)
+            
+            # Calculate processing metrics
+            processing_time = time.time() - start_time
+            
+            logger.info(f"[{request_id}] Fallback extracted {len(entities)} entities in {processing_time:.3f}s")
+            
+            return entities
+            
+        except Exception as fallback_error:
+            logger.error(f"[{request_id}] Both medical NLP and fallback extraction failed: {fallback_error}")
+            return []
     
     def _preprocess_text(self, text: str) -> str:
         """Clean and normalize clinical text"""
@@ -165,8 +310,8 @@ class MedicalEntityExtractor:
         """Extract entities using regex patterns"""
         entities = []
         
-        for pattern_name, (pattern, entity_type) in self._pattern_rules.items():
-            for match in re.finditer(pattern, text, re.IGNORECASE):
+        for pattern_name, (compiled_pattern, entity_type) in self._compiled_pattern_rules.items():
+            for match in compiled_pattern.finditer(text):
                 entity = MedicalEntity(
                     text=match.group(),
                     entity_type=entity_type,
@@ -181,60 +326,40 @@ class MedicalEntityExtractor:
         return entities
     
     def _extract_keyword_entities(self, text: str) -> List[MedicalEntity]:
-        """Extract entities using medical keyword matching"""
-        entities = []
+        """Extract entities using medical keyword matching (single automaton pass)"""
         text_lower = text.lower()
+        text_length = len(text)
         
-        # Check medication keywords
-        for keyword in self._medication_keywords:
-            start = 0
-            while True:
-                pos = text_lower.find(keyword.lower(), start)
-                if pos == -1:
-                    break
-                    
-                # Check word boundaries
-                if (pos == 0 or not text[pos-1].isalnum()) and \
-                   (pos + len(keyword) == len(text) or not text[pos + len(keyword)].isalnum()):
-                    
-                    entity = MedicalEntity(
-                        text=text[pos:pos+len(keyword)],
-                        entity_type=EntityType.MEDICATION,
-                        start_char=pos,
-                        end_char=pos + len(keyword),
-                        confidence=0.6,  # Keyword confidence
-                        attributes={"keyword_match": True},
-                        source="keyword"
-                    )
-                    entities.append(entity)
-                    
-                start = pos + 1
-                
-        # Check lab test keywords
-        for keyword in self._lab_test_keywords:
-            start = 0
-            while True:
-                pos = text_lower.find(keyword.lower(), start)
-                if pos == -1:
-                    break
-                    
-                if (pos == 0 or not text[pos-1].isalnum()) and \
-                   (pos + len(keyword) == len(text) or not text[pos + len(keyword)].isalnum()):
-                    
-                    entity = MedicalEntity(
-                        text=text[pos:pos+len(keyword)],
-                        entity_type=EntityType.LAB_TEST,
-                        start_char=pos,
-                        end_char=pos + len(keyword),
-                        confidence=0.6,
-                        attributes={"keyword_match": True},
-                        source="keyword"
-                    )
-                    entities.append(entity)
-                    
-                start = pos + 1
-                
-        return entities
+        # Collect word-bounded hits, then order them by keyword list position and offset
+        # so results (and merge tie-breaking) match the previous per-keyword scan
+        matches = []
+        for start, end, (keyword_index, entity_type) in self._keyword_matcher.iter_matches(text_lower):
+            if (start == 0 or not text[start-1].isalnum()) and \
+               (end == text_length or not text[end].isalnum()):
+                matches.append((keyword_index, start, end, entity_type))
+        matches.sort(key=lambda match: (match[0], match[1]))
+        
+        return [
+            MedicalEntity(
+                text=text[start:end],
+                entity_type=entity_type,
+                start_char=start,
+                end_char=end,
+                confidence=0.6,  # Keyword confidence
+                attributes={"keyword_match": True},
+                source="keyword"
+            )
+            for _, start, end, entity_type in matches
+        ]
+    
+    def _build_keyword_matcher(self) -> KeywordMatcher:
+        """Build the keyword automaton once from the medication and lab test keyword lists"""
+        keywords = [(keyword, EntityType.MEDICATION) for keyword in self._medication_keywords]
+        keywords += [(keyword, EntityType.LAB_TEST) for keyword in self._lab_test_keywords]
+        return KeywordMatcher(
+            (keyword, (keyword_index, entity_type))
+            for keyword_index, (keyword, entity_type) in enumerate(keywords)
+        )
     
     def _merge_overlapping_entities(self, entities: List[MedicalEntity]) -> List[MedicalEntity]:
         """Merge overlapping entities, keeping highest confidence"""
@@ -364,4 +489,39 @@ class MedicalEntityExtractor:
             "hba1c", "hemoglobin a1c", "glucose", "blood glucose", "creatinine",
             "bun", "electrolytes", "liver function", "thyroid function", "tsh",
             "psa", "urinalysis", "chest x-ray", "ct scan", "mri", "ecg", "ekg"
-        ]
\ No newline at end of file
+        ]
+
+
+_segment_executor: Optional[ThreadPoolExecutor] = None
+_segment_executor_lock = threading.Lock()
+
+
+def _get_segment_executor() -> ThreadPoolExecutor:
+    """Worker threads for segment extraction, shared by every request in the process"""
+    global _segment_executor
+    if _segment_executor is None:
+        with _segment_executor_lock:
+            if _segment_executor is None:
+                _segment_executor = ThreadPoolExecutor(
+                    max_workers=max(1, get_settings().nlp_segment_workers),
+                    thread_name_prefix="nlp-segment"
+                )
+    return _segment_executor
+
+
+# Shared extractor: keyword lists and compiled patterns are built once per process.
+# extract_entities keeps no per-call state on the instance, so it is safe across threads.
+_shared_extractor: Optional[MedicalEntityExtractor] = None
+_shared_extractor_lock = threading.Lock()
+
+
+def get_entity_extractor() -> MedicalEntityExtractor:
+    """Get the shared, initialized MedicalEntityExtractor instance"""
+    global _shared_extractor
+    if _shared_extractor is None:
+        with _shared_extractor_lock:
+            if _shared_extractor is None:
+                extractor = MedicalEntityExtractor()
+                extractor.initialize()
+                _shared_extractor = extractor
+    return _shared_extractor
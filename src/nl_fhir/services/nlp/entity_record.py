@@ -0,0 +1,122 @@
+"""
+Compact Entity Records for Categorized Extraction Results
+Extractors return Dict[str, List[EntityRecord]] instead of one dict per entity. A
+record keeps its fields in slots and interns the method/source labels, so the tens
+of thousands of entities in a bulk job share one copy of each label and carry no
+per-entity dict. Records read and write like the entity dicts they replace
+(record["text"], record.get("dosage"), {**record}), so consumers of the categorized
+format do not change; to_dict() gives a plain dict where JSON is needed.
+HIPAA Compliant: In-memory representation only
+"""
+
+import sys
+from collections.abc import Mapping, MutableMapping
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterator, List, Optional
+
+# Keys stored in slots, in dict-view order; any other key lives in `extra`
+_SLOT_KEYS = ("text", "confidence", "start", "end", "method", "source", "clinical_context")
+_REQUIRED_KEYS = frozenset(("text", "confidence"))
+_INTERNED_KEYS = frozenset(("method", "source"))
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+@dataclass(slots=True, eq=False, repr=False)
+class EntityRecord(MutableMapping):
+    """One extracted entity; optional fields left as None are absent from the dict view"""
+    text: str
+    confidence: float = 0.0
+    start: Optional[int] = None
+    end: Optional[int] = None
+    method: Optional[str] = None
+    source: Optional[str] = None
+    clinical_context: Optional[Dict[str, Any]] = None
+    # Rarer keys (dosage, frequency, route, attributes, ...) set by later stages
+    extra: Optional[Dict[str, Any]] = None
+
+    def __post_init__(self):
+        self.method = _intern(self.method)
+        self.source = _intern(self.source)
+
+    @classmethod
+    def from_mapping(cls, data: Mapping) -> "EntityRecord":
+        """Record with the same dict view as data"""
+        if isinstance(data, EntityRecord):
+            return data
+        record = cls(text=data.get("text", ""))
+        for key, value in data.items():
+            record[key] = value
+        return record
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _SLOT_KEYS:
+            value = getattr(self, key)
+            if value is None and key not in _REQUIRED_KEYS:
+                raise KeyError(key)
+            return value
+        if self.extra is None:
+            raise KeyError(key)
+        return self.extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in _SLOT_KEYS:
+            setattr(self, key, _intern(value) if key in _INTERNED_KEYS else value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in _REQUIRED_KEYS:
+            raise KeyError(f"{key} cannot be removed from an entity record")
+        if key in _SLOT_KEYS:
+            if getattr(self, key) is None:
+                raise KeyError(key)
+            setattr(self, key, None)
+        elif self.extra is None:
+            raise KeyError(key)
+        else:
+            del self.extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for key in _SLOT_KEYS:
+            if key in _REQUIRED_KEYS or getattr(self, key) is not None:
+                yield key
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key: object) -> bool:
+        if key in _SLOT_KEYS:
+            return key in _REQUIRED_KEYS or getattr(self, key) is not None
+        return bool(self.extra) and key in self.extra
+
+    def __repr__(self) -> str:
+        return f"EntityRecord({self.to_dict()!r})"
+
+    def copy(self) -> "EntityRecord":
+        """Shallow copy, like dict.copy()"""
+        return replace(self, extra=dict(self.extra) if self.extra else None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict view for serialization"""
+        return dict(self.items())
+
+
+def entity_records(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of categorized data whose entity lists hold EntityRecords, for data arriving as plain dicts"""
+    return {
+        key: [EntityRecord.from_mapping(entity) if isinstance(entity, Mapping) else entity for entity in value]
+        if isinstance(value, list) else value
+        for key, value in data.items()
+    }
+
+
+def entity_dicts(entities: List[Mapping]) -> List[Dict[str, Any]]:
+    """Plain dicts for a list of entity records or dicts, for API responses"""
+    return [entity.to_dict() if isinstance(entity, EntityRecord) else entity for entity in entities]
@@ -0,0 +1,329 @@
+"""
+Content-Addressed Extraction Result Cache
+Caches NLP pipeline results for repeated clinical text (standing orders, protocol
+templates) behind an LRU+TTL memory tier and an optional on-disk tier.
+HIPAA Compliant: Keys are HMAC-SHA256 digests, raw clinical text is never stored in key indexes or logs
+"""
+
+import copy
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Packages whose upgrade changes extraction output
+_FINGERPRINT_PACKAGES = ("spacy", "medspacy", "transformers", "scispacy", "sentence-transformers", "onnxruntime")
+
+# Used when no key is configured: keys then only match within this process, so a disk
+# tier shared across restarts needs a configured key
+_PROCESS_KEY = os.urandom(32)
+
+
+def normalize_clinical_text(text: str) -> str:
+    """
+    Normalize text for cache keying
+
+    Only NFC normalization is applied, and only when it keeps the text length: entity
+    offsets in cached results must stay valid for every text that maps to the key, so
+    whitespace and case are deliberately left untouched.
+    """
+    normalized = unicodedata.normalize("NFC", text)
+    return normalized if len(normalized) == len(text) else text
+
+
+@lru_cache(maxsize=1)
+def _package_versions() -> Tuple[Tuple[str, str], ...]:
+    """Installed versions of the NLP packages (static for the process lifetime)"""
+    versions = []
+    for package in _FINGERPRINT_PACKAGES:
+        try:
+            versions.append((package, metadata.version(package)))
+        except metadata.PackageNotFoundError:
+            versions.append((package, "absent"))
+    return tuple(versions)
+
+
+def _file_signature(path: Optional[str]) -> Optional[Tuple[str, int, int]]:
+    """Path, size and mtime of a data file, so a rebuilt file changes the fingerprint"""
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return (path, -1, -1)
+    return (path, stat.st_size, stat.st_mtime_ns)
+
+
+def extraction_fingerprint() -> str:
+    """
+    Fingerprint of everything that shapes extraction output
+
+    Covers the application version, NLP package versions, model/LLM settings and the
+    currently loaded model status, so loading, clearing or swapping a model changes
+    every cache key and old entries simply stop matching.
+    """
+    from ... import __version__
+    from ...config import get_settings
+    from .models import model_manager
+
+    settings = get_settings()
+    components = {
+        "app_version": __version__,
+        "packages": _package_versions(),
+        "settings": {
+            "spacy_model": settings.spacy_model,
+            "medspacy_enabled": settings.medspacy_enabled,
+            "llm_enabled": settings.llm_enabled,
+            "llm_model": settings.llm_model,
+            "openai_model": settings.openai_model,
+            "llm_escalation_enabled": settings.llm_escalation_enabled,
+            "llm_escalation_threshold": settings.llm_escalation_threshold,
+            "llm_escalation_confidence_check": settings.llm_escalation_confidence_check,
+            "llm_escalation_min_entities": settings.llm_escalation_min_entities,
+            "nlp_ner_backend": settings.nlp_ner_backend,
+            "nlp_ner_model_revision": settings.nlp_ner_model_revision,
+            "nlp_ner_onnx_quantize": settings.nlp_ner_onnx_quantize,
+            "nlp_segmentation_enabled": settings.nlp_segmentation_enabled,
+            "nlp_segment_min_chars": settings.nlp_segment_min_chars,
+            "nlp_segment_max_chars": settings.nlp_segment_max_chars,
+            "tier_prediction_enabled": settings.tier_prediction_enabled,
+            "tier_prediction_min_samples": settings.tier_prediction_min_samples,
+            "tier_prediction_min_confidence": settings.tier_prediction_min_confidence,
+            "rag_semantic_search_enabled": settings.rag_semantic_search_enabled,
+            "rag_embedding_model": settings.rag_embedding_model,
+            "rag_semantic_threshold": settings.rag_semantic_threshold,
+            "terminology_store": _file_signature(settings.terminology_store_path),
+        },
+        "models": model_manager.get_model_status(),
+    }
+    encoded = json.dumps(components, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class ExtractionCache:
+    """LRU+TTL cache of NLP pipeline results keyed by text digest and model fingerprint"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600,
+                 memory_enabled: bool = True, disk_path: Optional[str] = None,
+                 fingerprint_provider: Optional[Callable[[], str]] = None,
+                 cache_type: str = "nlp_extraction", hmac_key: Optional[bytes] = None,
+                 max_disk_entries: int = 10000):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.memory_enabled = memory_enabled
+        self.disk_path = Path(disk_path) if disk_path else None
+        self.max_disk_entries = max_disk_entries
+        self.cache_type = cache_type
+        self._fingerprint_provider = fingerprint_provider or extraction_fingerprint
+        self._hmac_key = hmac_key or _PROCESS_KEY
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._disk_entries = 0
+        self._lock = threading.RLock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+        if self.disk_path is not None:
+            try:
+                self.disk_path.mkdir(parents=True, exist_ok=True)
+                self._prune_disk()
+            except OSError as e:
+                logger.error(f"Extraction cache disk tier unavailable, using memory only: {e}")
+                self.disk_path = None
+
+    @property
+    def has_disk_tier(self) -> bool:
+        return self.disk_path is not None
+
+    def make_key(self, text: str) -> str:
+        """Keyed digest of the normalized text and the current model fingerprint"""
+        # Keyed, so short standard orders cannot be recovered from cache file names
+        digest = hmac.new(self._hmac_key, digestmod=hashlib.sha256)
+        digest.update(self._fingerprint_provider().encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(normalize_clinical_text(text).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, text: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached result for text, or None"""
+        key = self.make_key(text)
+        now = time.time()
+
+        if self.memory_enabled:
+            with self._lock:
+                entry = self._memory.get(key)
+                if entry is not None and entry[0] <= now:
+                    del self._memory[key]
+                    self._stats["expirations"] += 1
+                    entry = None
+                if entry is not None:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+            self._record_access(entry is not None, "memory")
+            if entry is not None:
+                return copy.deepcopy(entry[1])
+
+        if self.disk_path is not None:
+            disk_entry = self._read_disk(key, now)
+            self._record_access(disk_entry is not None, "disk")
+            if disk_entry is not None:
+                expires_at, result = disk_entry
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                    if self.memory_enabled:
+                        self._store_memory(key, expires_at, result)
+                return copy.deepcopy(result)
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def set(self, text: str, result: Dict[str, Any]) -> None:
+        """Cache a result for text in every enabled tier"""
+        key = self.make_key(text)
+        expires_at = time.time() + self.ttl_seconds
+        stored = copy.deepcopy(result)
+
+        with self._lock:
+            self._stats["stores"] += 1
+            if self.memory_enabled:
+                self._store_memory(key, expires_at, stored)
+
+        if self.disk_path is not None:
+            self._write_disk(key, expires_at, stored)
+
+    def clear(self) -> None:
+        """Drop all cached results from every tier"""
+        with self._lock:
+            self._memory.clear()
+        if self.disk_path is not None:
+            for entry_file in self.disk_path.glob("*.json"):
+                entry_file.unlink(missing_ok=True)
+            with self._lock:
+                self._disk_entries = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache size and hit/miss statistics"""
+        with self._lock:
+            lookups = self._stats["memory_hits"] + self._stats["disk_hits"] + self._stats["misses"]
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            return {
+                "enabled": True,
+                "memory_enabled": self.memory_enabled,
+                "disk_enabled": self.disk_path is not None,
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "disk_entries": self._disk_entries if self.disk_path is not None else 0,
+                "max_disk_entries": self.max_disk_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                **self._stats,
+            }
+
+    def _store_memory(self, key: str, expires_at: float, result: Dict[str, Any]) -> None:
+        # Caller holds self._lock
+        self._memory[key] = (expires_at, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _record_access(self, hit: bool, tier: str) -> None:
+        try:
+            from ...monitoring.metrics import MetricsCollector
+            MetricsCollector.record_cache_access(hit, f"{self.cache_type}_{tier}")
+        except Exception as e:
+            logger.debug(f"Failed to record extraction cache metrics: {e}")
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[float, Dict[str, Any]]]:
+        entry_file = self.disk_path / f"{key}.json"
+        try:
+            with open(entry_file, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable extraction cache entry: {type(e).__name__}")
+            entry_file.unlink(missing_ok=True)
+            with self._lock:
+                self._disk_entries = max(0, self._disk_entries - 1)
+            return None
+
+        if entry.get("expires_at", 0) <= now:
+            entry_file.unlink(missing_ok=True)
+            with self._lock:
+                self._stats["expirations"] += 1
+                self._disk_entries = max(0, self._disk_entries - 1)
+            return None
+        return entry["expires_at"], entry["result"]
+
+    def _write_disk(self, key: str, expires_at: float, result: Dict[str, Any]) -> None:
+        entry_file = self.disk_path / f"{key}.json"
+        temp_file = entry_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            payload = json.dumps({"expires_at": expires_at, "result": result})
+        except (TypeError, ValueError):
+            logger.debug("Extraction result not JSON serializable, skipping disk tier")
+            return
+        try:
+            is_new = not entry_file.exists()
+            with open(temp_file, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(temp_file, entry_file)
+        except OSError as e:
+            logger.warning(f"Failed to write extraction cache entry: {e}")
+            temp_file.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            if is_new:
+                self._disk_entries += 1
+            over_limit = self._disk_entries > self.max_disk_entries
+        if over_limit:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Remove expired and half-written entries, then the oldest entries over the size limit"""
+        now = time.time()
+        for temp_file in self.disk_path.glob("*.tmp"):
+            # Other writers' files are only stale once they are a minute old
+            try:
+                if temp_file.stat().st_mtime < now - 60:
+                    temp_file.unlink(missing_ok=True)
+            except OSError:
+                continue
+
+        live = []
+        for entry_file in self.disk_path.glob("*.json"):
+            if self._read_disk(entry_file.stem, now) is None:
+                continue
+            try:
+                live.append((entry_file.stat().st_mtime, entry_file))
+            except OSError:
+                continue
+
+        # Evict down to 90% of the limit so a full cache does not prune on every write
+        target = int(self.max_disk_entries * 0.9)
+        live.sort()
+        evicted = live[:max(0, len(live) - target)] if len(live) > self.max_disk_entries else []
+        for _, entry_file in evicted:
+            entry_file.unlink(missing_ok=True)
+        with self._lock:
+            self._stats["evictions"] += len(evicted)
+            self._disk_entries = len(live) - len(evicted)
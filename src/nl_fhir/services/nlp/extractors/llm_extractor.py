@@ -4,7 +4,9 @@ High-accuracy extraction using Large Language Models for escalation scenarios.
 """
 
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Optional
+
+from ..entity_record import EntityRecord
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +17,7 @@ class LLMExtractor:
     def __init__(self):
         self._llm_processor = None
 
-    def extract_entities_with_llm(self, text: str, request_id: str = "llm-extraction") -> Dict[str, List[Dict[str, Any]]]:
+    def extract_entities_with_llm(self, text: str, request_id: str = "llm-extraction") -> Dict[str, List[EntityRecord]]:
         """
         Extract medical entities using LLM escalation with CORRECT parsing methodology.
 
@@ -93,7 +95,7 @@ class LLMExtractor:
             logger.error(f"Failed to import LLMProcessor: {e}")
             return False
 
-    def _empty_result(self) -> Dict[str, List[Dict[str, Any]]]:
+    def _empty_result(self) -> Dict[str, List[EntityRecord]]:
         """Return empty result structure"""
         return {
             "medications": [],
@@ -113,51 +115,51 @@ class LLMExtractor:
                 # Add the medication name
                 med_name = med.get("name", "")
                 if med_name:
-                    extracted_entities["medications"].append({
-                        "text": med_name,
-                        "confidence": 0.9,
-                        "start": 0,  # LLM doesn't provide position info
-                        "end": 0,
-                        "method": "llm_escalation",
-                        "source": "llm"
-                    })
+                    extracted_entities["medications"].append(EntityRecord(
+                        text=med_name,
+                        confidence=0.9,
+                        start=0,  # LLM doesn't provide position info
+                        end=0,
+                        method="llm_escalation",
+                        source="llm"
+                    ))
 
                 # CRITICAL FIX: Extract embedded dosage
                 dosage = med.get("dosage", "")
                 if dosage:
-                    extracted_entities["dosages"].append({
-                        "text": str(dosage),
-                        "confidence": 0.9,
-                        "start": 0,
-                        "end": 0,
-                        "method": "llm_escalation",
-                        "source": "llm_embedded"
-                    })
+                    extracted_entities["dosages"].append(EntityRecord(
+                        text=str(dosage),
+                        confidence=0.9,
+                        start=0,
+                        end=0,
+                        method="llm_escalation",
+                        source="llm_embedded"
+                    ))
 
                 # CRITICAL FIX: Extract embedded frequency
                 frequency = med.get("frequency", "")
                 if frequency:
-                    extracted_entities["frequencies"].append({
-                        "text": str(frequency),
-                        "confidence": 0.9,
-                        "start": 0,
-                        "end": 0,
-                        "method": "llm_escalation",
-                        "source": "llm_embedded"
-                    })
+                    extracted_entities["frequencies"].append(EntityRecord(
+                        text=str(frequency),
+                        confidence=0.9,
+                        start=0,
+                        end=0,
+                        method="llm_escalation",
+                        source="llm_embedded"
+                    ))
 
                 # Extract embedded route if available
                 route = med.get("route", "")
                 if route and str(route).strip() and str(route) != "None":
                     # Add route as procedure for FHIR mapping
-                    extracted_entities["procedures"].append({
-                        "text": f"Administration route: {route}",
-                        "confidence": 0.8,
-                        "start": 0,
-                        "end": 0,
-                        "method": "llm_escalation",
-                        "source": "llm_embedded"
-                    })
+                    extracted_entities["procedures"].append(EntityRecord(
+                        text=f"Administration route: {route}",
+                        confidence=0.8,
+                        start=0,
+                        end=0,
+                        method="llm_escalation",
+                        source="llm_embedded"
+                    ))
 
     def _extract_conditions_from_llm(self, structured_output: Dict, extracted_entities: Dict) -> None:
         """Extract medical conditions from LLM output"""
@@ -166,14 +168,14 @@ class LLMExtractor:
             if isinstance(condition, dict):
                 condition_name = condition.get("name", "")
                 if condition_name:
-                    extracted_entities["conditions"].append({
-                        "text": condition_name,
-                        "confidence": 0.9,
-                        "start": 0,
-                        "end": 0,
-                        "method": "llm_escalation",
-                        "source": "llm"
-                    })
+                    extracted_entities["conditions"].append(EntityRecord(
+                        text=condition_name,
+                        confidence=0.9,
+                        start=0,
+                        end=0,
+                        method="llm_escalation",
+                        source="llm"
+                    ))
 
     def _extract_lab_tests_from_llm(self, structured_output: Dict, extracted_entities: Dict) -> None:
         """Extract lab tests from LLM output"""
@@ -182,14 +184,14 @@ class LLMExtractor:
             if isinstance(lab, dict):
                 lab_name = lab.get("name", "")
                 if lab_name:
-                    extracted_entities["lab_tests"].append({
-                        "text": lab_name,
-                        "confidence": 0.9,
-                        "start": 0,
-                        "end": 0,
-                        "method": "llm_escalation",
-                        "source": "llm"
-                    })
+                    extracted_entities["lab_tests"].append(EntityRecord(
+                        text=lab_name,
+                        confidence=0.9,
+                        start=0,
+                        end=0,
+                        method="llm_escalation",
+                        source="llm"
+                    ))
 
     def _extract_procedures_from_llm(self, structured_output: Dict, extracted_entities: Dict) -> None:
         """Extract procedures from LLM output"""
@@ -198,14 +200,14 @@ class LLMExtractor:
             if isinstance(proc, dict):
                 proc_name = proc.get("name", "")
                 if proc_name:
-                    extracted_entities["procedures"].append({
-                        "text": proc_name,
-                        "confidence": 0.9,
-                        "start": 0,
-                        "end": 0,
-                        "method": "llm_escalation",
-                        "source": "llm"
-                    })
+                    extracted_entities["procedures"].append(EntityRecord(
+                        text=proc_name,
+                        confidence=0.9,
+                        start=0,
+                        end=0,
+                        method="llm_escalation",
+                        source="llm"
+                    ))
 
     def _extract_patients_from_llm(self, structured_output: Dict, extracted_entities: Dict) -> None:
         """Extract patients from LLM output"""
@@ -214,23 +216,23 @@ class LLMExtractor:
             if isinstance(patient, dict):
                 patient_name = patient.get("name", "")
                 if patient_name:
-                    extracted_entities["patients"].append({
-                        "text": patient_name,
-                        "confidence": 0.9,
-                        "start": 0,
-                        "end": 0,
-                        "method": "llm_escalation",
-                        "source": "llm"
-                    })
+                    extracted_entities["patients"].append(EntityRecord(
+                        text=patient_name,
+                        confidence=0.9,
+                        start=0,
+                        end=0,
+                        method="llm_escalation",
+                        source="llm"
+                    ))
             elif isinstance(patient, str) and patient.strip():
-                extracted_entities["patients"].append({
-                    "text": patient.strip(),
-                    "confidence": 0.9,
-                    "start": 0,
-                    "end": 0,
-                    "method": "llm_escalation",
-                    "source": "llm"
-                })
+                extracted_entities["patients"].append(EntityRecord(
+                    text=patient.strip(),
+                    confidence=0.9,
+                    start=0,
+                    end=0,
+                    method="llm_escalation",
+                    source="llm"
+                ))
 
     def is_available(self) -> bool:
         """Check if LLM processor is available and initialized"""
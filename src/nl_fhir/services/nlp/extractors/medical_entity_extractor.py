@@ -5,17 +5,31 @@ Coordinates 4-tier extraction approach: MedSpaCy -> Transformers -> Regex -> LLM
 
 import logging
 import re
-from typing import Dict, List, Any
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional
 
 from ..model_managers.medspacy_manager import MedSpacyManager
 from ..model_managers.spacy_manager import SpacyManager
 from ..model_managers.transformer_manager import TransformerManager
+from ..entity_record import EntityRecord
 from .regex_extractor import RegexExtractor
 from .llm_extractor import LLMExtractor
+from ..quality.escalation_manager import get_escalation_manager
+from ..quality.tier_predictor import TierFeatures, get_tier_predictor
+from ...model_warmup import model_warmup_service
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class TierTrace:
+    """Which tier settled a note, and how long each tier above it took to fall through"""
+    tier: Optional[str] = None
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+    tier_warming: bool = False
+
+
 class MedicalEntityExtractor:
     """Coordinates 4-tier medical entity extraction with LLM escalation"""
 
@@ -25,26 +39,83 @@ class MedicalEntityExtractor:
         self.transformer_manager = TransformerManager()
         self.regex_extractor = RegexExtractor()
         self.llm_extractor = LLMExtractor()
+        self._escalation_manager = None
+        self.tier_predictor = get_tier_predictor()
+
+    @property
+    def escalation_manager(self):
+        """Shared escalation manager, looked up on each use so reset_escalation_manager() takes effect"""
+        return self._escalation_manager or get_escalation_manager()
+
+    @escalation_manager.setter
+    def escalation_manager(self, manager) -> None:
+        """Pin a specific manager (None returns to the shared one)"""
+        self._escalation_manager = manager
 
-    def extract_medical_entities(self, text: str) -> Dict[str, List[Dict[str, Any]]]:
+    def extract_medical_entities(self, text: str, escalate_to_llm: bool = True) -> Dict[str, List[EntityRecord]]:
         """
         Extract medical entities using 4-tier approach with LLM escalation:
         Tier 1: spaCy → Tier 2: Transformers NER → Tier 3: Regex → Tier 3.5: LLM Escalation
 
         The LLM escalation tier (3.5) is triggered when confidence is below the medical safety
         threshold (default 85%), providing high-accuracy structured output for critical medical data.
+
+        A tier whose models are still loading in the background warmup is skipped rather
+        than waited on, so early requests are served by the tiers that are already up.
+
+        With tier prediction enabled, the regex pass runs first and its features pick the
+        tier to start at; notes that confidently settle at Tier 2 or below skip the tiers
+        above it, and every full walk is recorded to calibrate the predictor.
+
+        With escalate_to_llm=False the walk stops at Tier 3 and the caller decides Tier 3.5
+        itself (see escalate_merged_result), e.g. once for all chunks of a segmented note.
         """
 
+        if not self.tier_predictor.enabled:
+            return self._extract_with_all_tiers(text, escalate_to_llm=escalate_to_llm)
+
+        regex_result = self.regex_extractor.extract_entities(text)
+        features = TierFeatures.from_regex_pass(text, regex_result)
+        prediction = self.tier_predictor.predict(features)
+
+        if prediction.skips_tiers:
+            if self.tier_predictor.should_audit():
+                self.tier_predictor.record_audit()
+            else:
+                logger.info(f"Tier prediction: starting at {prediction.start_tier} "
+                            f"(confidence {prediction.confidence:.2f} over {prediction.samples} notes)")
+                self.tier_predictor.record_short_circuit(prediction)
+                if prediction.start_tier == "transformer_ner":
+                    return self._extract_with_lower_tiers(text, regex_result, escalate_to_llm=escalate_to_llm)
+                return self._extract_with_regex_tier(text, regex_result, escalate_to_llm=escalate_to_llm)
+
+        trace = TierTrace()
+        result = self._extract_with_all_tiers(text, regex_result, trace, escalate_to_llm)
+        # A walk that skipped a warming tier says nothing about which tier would have settled the note
+        if trace.tier is not None and not trace.tier_warming:
+            self.tier_predictor.record_outcome(features, trace.tier, trace.timings_ms, prediction)
+        return result
+
+    def _extract_with_all_tiers(self, text: str, regex_result: Optional[Dict[str, List[EntityRecord]]] = None,
+                                trace: Optional[TierTrace] = None,
+                                escalate_to_llm: bool = True) -> Dict[str, List[EntityRecord]]:
+        """Walk the tiers from Tier 1 down, stopping at the first sufficient one"""
+
+        if model_warmup_service.is_tier_warming("medspacy"):
+            logger.info("Tier 1 still warming up, continuing to Tier 2")
+            if trace is not None:
+                trace.tier_warming = True
+            return self._extract_with_lower_tiers(text, regex_result, trace, escalate_to_llm)
+
+        started = time.perf_counter()
         # TIER 1: MedSpaCy Clinical Intelligence Engine (Enhanced for Epic 2.5)
         medspacy_nlp = self.medspacy_manager.load_medspacy_clinical_engine()
         if medspacy_nlp and self.medspacy_manager.is_available():
             result = self._extract_with_medspacy_clinical(text, medspacy_nlp)
             if self._is_extraction_sufficient(result, text):
-                from ..quality.escalation_manager import EscalationManager
-                escalation_manager = EscalationManager()
-                if not escalation_manager.should_escalate_to_llm(result, text):
+                if not self.escalation_manager.should_escalate_to_llm(result, text):
                     logger.info("Tier 1 (MedSpaCy Clinical) successful: sufficient confidence for medical safety")
-                    return result
+                    return self._settled(result, "medspacy", started, trace)
                 else:
                     logger.info("Tier 1 (MedSpaCy Clinical) insufficient confidence, continuing to Tier 2")
         else:
@@ -53,63 +124,216 @@ class MedicalEntityExtractor:
             if spacy_nlp:
                 result = self._extract_with_spacy_medical(text, spacy_nlp)
                 if self._is_extraction_sufficient(result, text):
-                    from ..quality.escalation_manager import EscalationManager
-                    escalation_manager = EscalationManager()
-                    if not escalation_manager.should_escalate_to_llm(result, text):
+                    if not self.escalation_manager.should_escalate_to_llm(result, text):
                         logger.info("Tier 1 (spaCy fallback) successful: sufficient confidence for medical safety")
-                        return result
+                        return self._settled(result, "medspacy", started, trace)
                     else:
                         logger.info("Tier 1 (spaCy fallback) insufficient confidence, continuing to Tier 2")
 
+        self._timed("medspacy", started, trace)
+        return self._extract_with_lower_tiers(text, regex_result, trace, escalate_to_llm)
+
+    @staticmethod
+    def _timed(tier: str, started: float, trace: Optional[TierTrace]) -> None:
+        if trace is not None:
+            trace.timings_ms[tier] = (time.perf_counter() - started) * 1000
+
+    def _settled(self, result: Dict[str, List[EntityRecord]], tier: str, started: float,
+                 trace: Optional[TierTrace]) -> Dict[str, List[EntityRecord]]:
+        self._timed(tier, started, trace)
+        if trace is not None:
+            trace.tier = tier
+        return result
+
+    def extract_medical_entities_batch(self, texts: List[str], batch_size: int = 32, n_process: int = 1,
+                                       escalate_to_llm: bool = True) -> List[Dict[str, List[EntityRecord]]]:
+        """
+        Extract medical entities for many texts with a single streamed Tier 1 pass.
+
+        Tier 1 documents are produced by nlp.pipe so spaCy's per-call overhead is paid once
+        per batch instead of once per note. Each document keeps its own tier escalation:
+        notes whose Tier 1 result is insufficient continue through Tier 2 → Tier 3 → Tier 3.5
+        exactly as in extract_medical_entities. Their Tier 2 pass is one pipeline call over
+        all of them. Results are returned in input order.
+        """
+
+        if not texts:
+            return []
+
+        if model_warmup_service.is_tier_warming("medspacy"):
+            logger.info("Tier 1 still warming up, batch continues with Tier 2")
+            return self._extract_batch_with_lower_tiers(texts, escalate_to_llm)
+
+        medspacy_nlp = self.medspacy_manager.load_medspacy_clinical_engine()
+        if medspacy_nlp and self.medspacy_manager.is_available():
+            nlp = medspacy_nlp
+            extract_from_doc = self._extract_from_medspacy_doc
+            tier_name = "Tier 1 (MedSpaCy Clinical)"
+        else:
+            nlp = self.spacy_manager.load_spacy_medical_nlp()
+            extract_from_doc = self._extract_from_spacy_doc
+            tier_name = "Tier 1 (spaCy fallback)"
+
+        if not nlp:
+            return self._extract_batch_with_lower_tiers(texts, escalate_to_llm)
+
+        try:
+            results: List[Optional[Dict[str, List[EntityRecord]]]] = []
+            unsettled: List[int] = []
+            docs = nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+            for text, doc in zip(texts, docs):
+                result = extract_from_doc(text, doc, nlp)
+                if self._is_extraction_sufficient(result, text):
+                    if not self.escalation_manager.should_escalate_to_llm(result, text):
+                        results.append(result)
+                        continue
+                unsettled.append(len(results))
+                results.append(None)
+
+            lower_tier_results = self._extract_batch_with_lower_tiers([texts[i] for i in unsettled], escalate_to_llm)
+            for position, result in zip(unsettled, lower_tier_results):
+                results[position] = result
+
+            logger.info(f"{tier_name} batch extraction processed {len(texts)} documents "
+                        f"(batch_size={batch_size}, n_process={n_process})")
+            return results
+
+        except Exception as e:
+            logger.error(f"Batched Tier 1 extraction failed, processing documents individually: {e}")
+            return [self.extract_medical_entities(text, escalate_to_llm) for text in texts]
+
+    def _extract_with_lower_tiers(self, text: str, regex_result: Optional[Dict[str, List[EntityRecord]]] = None,
+                                  trace: Optional[TierTrace] = None,
+                                  escalate_to_llm: bool = True) -> Dict[str, List[EntityRecord]]:
+        """Run Tier 2 → Tier 3 → Tier 3.5 for text that Tier 1 could not settle"""
+
         # TIER 2: Specialized medical NER model (slower, sophisticated medical entity recognition)
-        ner_model = self.transformer_manager.load_medical_ner_model()
+        ner_model = None
+        if model_warmup_service.is_tier_warming("transformer_ner"):
+            logger.info("Tier 2 still warming up, continuing to Tier 3")
+            if trace is not None:
+                trace.tier_warming = True
+        else:
+            ner_model = self.transformer_manager.load_medical_ner_model()
+        started = time.perf_counter()
         if ner_model and not isinstance(ner_model, dict):
-            result = self._extract_with_transformers(text, ner_model)
+            # Concurrent Tier 2 requests share one forward pass when batching is enabled
+            ner_batcher = self.transformer_manager.get_ner_batcher()
+            result = self._extract_with_transformers(text, ner_batcher or ner_model)
             if self._is_extraction_sufficient(result, text):
-                from ..quality.escalation_manager import EscalationManager
-                escalation_manager = EscalationManager()
-                if not escalation_manager.should_escalate_to_llm(result, text):
+                if not self.escalation_manager.should_escalate_to_llm(result, text):
                     logger.info("Tier 2 (Transformers) successful: sufficient confidence for medical safety")
-                    return result
+                    return self._settled(result, "transformer_ner", started, trace)
                 else:
                     logger.info("Tier 2 (Transformers) insufficient confidence, continuing to Tier 3")
+            self._timed("transformer_ner", started, trace)
 
-        # TIER 3: Regex fallback patterns (fastest, most basic)
-        result = self.regex_extractor.extract_entities(text)
+        return self._extract_with_regex_tier(text, regex_result, trace, escalate_to_llm)
 
-        # TIER 3.5: LLM ESCALATION (triggered by low confidence for medical safety)
-        from ..quality.escalation_manager import EscalationManager
-        escalation_manager = EscalationManager()
+    def _extract_batch_with_lower_tiers(self, texts: List[str],
+                                        escalate_to_llm: bool = True) -> List[Dict[str, List[EntityRecord]]]:
+        """
+        _extract_with_lower_tiers for several texts with one Tier 2 forward pass
+
+        The texts are already a batch, so they go to the NER pipeline directly instead of
+        queueing one by one in the NER batcher.
+        """
+        if not texts:
+            return []
+        if model_warmup_service.is_tier_warming("transformer_ner"):
+            return [self._extract_with_lower_tiers(text, escalate_to_llm=escalate_to_llm) for text in texts]
+        ner_model = self.transformer_manager.load_medical_ner_model()
+        if not ner_model or isinstance(ner_model, dict) or len(texts) == 1:
+            return [self._extract_with_lower_tiers(text, escalate_to_llm=escalate_to_llm) for text in texts]
 
-        if escalation_manager.should_escalate_to_llm(result, text):
-            logger.info("Tier 3.5: Escalating to LLM for medical safety and accuracy")
+        try:
+            batch_entities = ner_model(texts, batch_size=len(texts))
+        except Exception as e:
+            logger.error(f"Batched Tier 2 extraction failed, processing texts individually: {e}")
+            return [self._extract_with_lower_tiers(text, escalate_to_llm=escalate_to_llm) for text in texts]
 
-            # Generate unique request ID for tracking
-            import uuid
-            request_id = f"escalation-{str(uuid.uuid4())[:8]}"
+        results = []
+        for text, entities in zip(texts, batch_entities):
+            result = self._transformer_entities_to_result(text, entities)
+            if self._is_extraction_sufficient(result, text):
+                if not self.escalation_manager.should_escalate_to_llm(result, text):
+                    results.append(result)
+                    continue
+            results.append(self._extract_with_regex_tier(text, escalate_to_llm=escalate_to_llm))
+        logger.info(f"Tier 2 (Transformers) batch processed {len(texts)} texts in one forward pass")
+        return results
 
-            llm_result = self.llm_extractor.extract_entities_with_llm(text, request_id)
+    def _extract_with_regex_tier(self, text: str, regex_result: Optional[Dict[str, List[EntityRecord]]] = None,
+                                 trace: Optional[TierTrace] = None,
+                                 escalate_to_llm: bool = True) -> Dict[str, List[EntityRecord]]:
+        """Run Tier 3, escalating to Tier 3.5 when its confidence is below the safety threshold"""
 
-            # Validate LLM result has better entity coverage
-            llm_entity_count = sum(len(entities) for entities in llm_result.values())
-            regex_entity_count = sum(len(entities) for entities in result.values())
+        # TIER 3: Regex fallback patterns (fastest, most basic)
+        result = regex_result if regex_result is not None else self.regex_extractor.extract_entities(text)
 
-            if llm_entity_count >= regex_entity_count:
-                logger.info(f"LLM escalation successful: {llm_entity_count} entities vs {regex_entity_count} from regex")
-                return llm_result
-            else:
-                logger.warning(f"LLM escalation yielded fewer entities ({llm_entity_count} vs {regex_entity_count}), using regex result")
+        # TIER 3.5: LLM ESCALATION (triggered by low confidence for medical safety)
+        if self.escalation_manager.should_escalate_to_llm(result, text):
+            if not escalate_to_llm:
+                # The caller escalates the combined result instead (segmented notes)
                 return result
+            if trace is not None:
+                trace.tier = "llm"
+            return self._escalate_with_llm(text, result)
         else:
             logger.info("Tier 3 (Regex) sufficient: confidence meets medical safety threshold")
+            if trace is not None:
+                trace.tier = "regex"
             return result
 
-    def _extract_with_medspacy_clinical(self, text: str, nlp) -> Dict[str, List[Dict[str, Any]]]:
+    def escalate_merged_result(self, text: str, result: Dict[str, List[EntityRecord]]) -> Dict[str, List[EntityRecord]]:
+        """
+        Tier 3.5 for a result assembled from several extractions of text (e.g. note chunks
+        run with escalate_to_llm=False): at most one LLM call, over the whole text
+        """
+        if self.escalation_manager.should_escalate_to_llm(result, text):
+            return self._escalate_with_llm(text, result)
+        return result
+
+    def _escalate_with_llm(self, text: str, result: Dict[str, List[EntityRecord]]) -> Dict[str, List[EntityRecord]]:
+        """Replace result with the LLM extraction when it covers at least as many entities"""
+        logger.info("Tier 3.5: Escalating to LLM for medical safety and accuracy")
+
+        # Generate unique request ID for tracking
+        import uuid
+        request_id = f"escalation-{str(uuid.uuid4())[:8]}"
+
+        llm_result = self.llm_extractor.extract_entities_with_llm(text, request_id)
+
+        # Validate LLM result has better entity coverage
+        llm_entity_count = sum(len(entities) for entities in llm_result.values())
+        regex_entity_count = sum(len(entities) for entities in result.values())
+
+        if llm_entity_count >= regex_entity_count:
+            logger.info(f"LLM escalation successful: {llm_entity_count} entities vs {regex_entity_count} from regex")
+            return llm_result
+        else:
+            logger.warning(f"LLM escalation yielded fewer entities ({llm_entity_count} vs {regex_entity_count}), using regex result")
+            return result
+
+    def _extract_with_medspacy_clinical(self, text: str, nlp) -> Dict[str, List[EntityRecord]]:
         """
         Extract medical entities using MedSpaCy Clinical Intelligence Engine
         This method implements the core Epic 2.5 enhancement with clinical context detection
         """
 
+        try:
+            # Process text with MedSpaCy clinical pipeline
+            doc = nlp(text)
+        except Exception as e:
+            logger.error(f"MedSpaCy clinical extraction failed: {e}")
+            # Fallback to basic spaCy extraction
+            return self._extract_with_spacy_medical(text, nlp)
+
+        return self._extract_from_medspacy_doc(text, doc, nlp)
+
+    def _extract_from_medspacy_doc(self, text: str, doc, nlp) -> Dict[str, List[EntityRecord]]:
+        """Build Tier 1 results from an already processed MedSpaCy doc"""
+
         result = {
             "medications": [],
             "dosages": [],
@@ -122,22 +346,19 @@ class MedicalEntityExtractor:
         }
 
         try:
-            # Process text with MedSpaCy clinical pipeline
-            doc = nlp(text)
-
             # Extract entities with clinical context
             for ent in doc.ents:
                 # Get clinical context information
                 clinical_context = self._get_clinical_context(ent)
 
-                entity_info = {
-                    "text": ent.text,
-                    "confidence": 0.8,  # Base confidence for MedSpaCy entities
-                    "start": ent.start_char,
-                    "end": ent.end_char,
-                    "method": "medspacy_clinical",
-                    "clinical_context": clinical_context
-                }
+                entity_info = EntityRecord(
+                    text=ent.text,
+                    confidence=0.8,  # Base confidence for MedSpaCy entities
+                    start=ent.start_char,
+                    end=ent.end_char,
+                    method="medspacy_clinical",
+                    clinical_context=clinical_context
+                )
 
                 # Adjust confidence based on clinical context
                 entity_info["confidence"] = self._adjust_confidence_for_clinical_context(
@@ -159,13 +380,13 @@ class MedicalEntityExtractor:
             # Extract additional entities using spaCy's NER for persons
             for ent in doc.ents:
                 if ent.label_ in ["PERSON"]:
-                    entity_info = {
-                        "text": ent.text,
-                        "confidence": 0.9,  # High confidence for person entities
-                        "start": ent.start_char,
-                        "end": ent.end_char,
-                        "method": "medspacy_clinical_spacy_ner"
-                    }
+                    entity_info = EntityRecord(
+                        text=ent.text,
+                        confidence=0.9,  # High confidence for person entities
+                        start=ent.start_char,
+                        end=ent.end_char,
+                        method="medspacy_clinical_spacy_ner"
+                    )
                     result["patients"].append(entity_info)
 
             # Enhanced pattern-based extraction for dosages and frequencies
@@ -253,31 +474,38 @@ class MedicalEntityExtractor:
 
         # Extract dosages
         for match in dosage_pattern.finditer(text):
-            dosage_info = {
-                "text": match.group(0),
-                "confidence": 0.85,  # High confidence for pattern-based extraction
-                "start": match.start(),
-                "end": match.end(),
-                "method": "medspacy_clinical_pattern"
-            }
+            dosage_info = EntityRecord(
+                text=match.group(0),
+                confidence=0.85,  # High confidence for pattern-based extraction
+                start=match.start(),
+                end=match.end(),
+                method="medspacy_clinical_pattern"
+            )
             result["dosages"].append(dosage_info)
 
         # Extract frequencies
         for match in frequency_pattern.finditer(text):
-            frequency_info = {
-                "text": match.group(0),
-                "confidence": 0.85,  # High confidence for pattern-based extraction
-                "start": match.start(),
-                "end": match.end(),
-                "method": "medspacy_clinical_pattern"
-            }
+            frequency_info = EntityRecord(
+                text=match.group(0),
+                confidence=0.85,  # High confidence for pattern-based extraction
+                start=match.start(),
+                end=match.end(),
+                method="medspacy_clinical_pattern"
+            )
             result["frequencies"].append(frequency_info)
 
-    def _extract_with_transformers(self, text: str, ner_pipeline) -> Dict[str, List[Dict[str, Any]]]:
+    def _extract_with_transformers(self, text: str, ner_pipeline) -> Dict[str, List[EntityRecord]]:
         """Extract entities using transformers NER pipeline"""
         try:
             entities = ner_pipeline(text)
+        except Exception as e:
+            logger.error(f"Transformers extraction failed: {e}")
+            return self.regex_extractor.extract_entities(text)
+        return self._transformer_entities_to_result(text, entities)
 
+    def _transformer_entities_to_result(self, text: str, entities: List[Dict[str, Any]]) -> Dict[str, List[EntityRecord]]:
+        """Filter and categorize the entities one NER pipeline call returned for text"""
+        try:
             result = {
                 "medications": [],
                 "dosages": [],
@@ -298,13 +526,13 @@ class MedicalEntityExtractor:
                 if self._should_skip_entity(entity_type, entity_text, confidence):
                     continue
 
-                entity_info = {
-                    "text": entity_text,
-                    "confidence": confidence,
-                    "start": entity.get("start", 0),
-                    "end": entity.get("end", 0),
-                    "method": "transformers_ner"
-                }
+                entity_info = EntityRecord(
+                    text=entity_text,
+                    confidence=confidence,
+                    start=entity.get("start", 0),
+                    end=entity.get("end", 0),
+                    method="transformers_ner"
+                )
 
                 # Map entity types (enhanced mapping for medical accuracy)
                 self._map_entity_to_category(entity_type, entity_text, entity_info, result)
@@ -368,23 +596,23 @@ class MedicalEntityExtractor:
             else:
                 result["procedures"].append(entity_info)
 
-    def _extract_with_spacy_medical(self, text: str, nlp) -> Dict[str, List[Dict[str, Any]]]:
+    def _extract_with_spacy_medical(self, text: str, nlp) -> Dict[str, List[EntityRecord]]:
         """Extract medical entities using enhanced spaCy with medical patterns"""
 
-        result = {
-            "medications": [],
-            "dosages": [],
-            "frequencies": [],
-            "patients": [],
-            "conditions": [],
-            "procedures": [],
-            "lab_tests": [],
-            "weights": []
-        }
-
         try:
             doc = nlp(text)
+        except Exception as e:
+            logger.error(f"spaCy medical extraction failed: {e}")
+            return self._empty_result()
+
+        return self._extract_from_spacy_doc(text, doc, nlp)
+
+    def _extract_from_spacy_doc(self, text: str, doc, nlp=None) -> Dict[str, List[EntityRecord]]:
+        """Build spaCy fallback results from an already processed doc"""
 
+        result = self._empty_result()
+
+        try:
             # Enhanced medical terminology lists
             medical_terms = self._get_medical_terminology()
 
@@ -402,6 +630,20 @@ class MedicalEntityExtractor:
 
         return result
 
+    def _empty_result(self) -> Dict[str, List[EntityRecord]]:
+        """Empty result container with every entity category"""
+
+        return {
+            "medications": [],
+            "dosages": [],
+            "frequencies": [],
+            "patients": [],
+            "conditions": [],
+            "procedures": [],
+            "lab_tests": [],
+            "weights": []
+        }
+
     def _get_medical_terminology(self) -> Dict[str, set]:
         """Get medical terminology dictionaries"""
 
@@ -437,45 +679,45 @@ class MedicalEntityExtractor:
             # Medications (look for proper nouns that are medical terms)
             if (token.pos_ == "PROPN" or token.pos_ == "NOUN") and not token.is_stop:
                 if token_lower in medical_terms["medication_terms"]:
-                    result["medications"].append({
-                        'text': token.text,
-                        'confidence': 0.9,
-                        'start': token.idx,
-                        'end': token.idx + len(token.text),
-                        'method': 'spacy_medical'
-                    })
+                    result["medications"].append(EntityRecord(
+                        text=token.text,
+                        confidence=0.9,
+                        start=token.idx,
+                        end=token.idx + len(token.text),
+                        method='spacy_medical'
+                    ))
 
             # Dosages (numbers followed by units)
             if token.like_num and token.i + 1 < len(doc):
                 next_token = doc[token.i + 1]
                 if next_token.text.lower() in ["mg", "gram", "ml", "mcg", "tablet", "capsule"]:
                     dosage_text = f"{token.text}{next_token.text}"
-                    result["dosages"].append({
-                        'text': dosage_text,
-                        'confidence': 0.9,
-                        'start': token.idx,
-                        'end': next_token.idx + len(next_token.text),
-                        'method': 'spacy_medical'
-                    })
+                    result["dosages"].append(EntityRecord(
+                        text=dosage_text,
+                        confidence=0.9,
+                        start=token.idx,
+                        end=next_token.idx + len(next_token.text),
+                        method='spacy_medical'
+                    ))
 
             # Frequencies and conditions
             if token_lower in medical_terms["frequency_terms"]:
-                result["frequencies"].append({
-                    'text': token.text,
-                    'confidence': 0.8,
-                    'start': token.idx,
-                    'end': token.idx + len(token.text),
-                    'method': 'spacy_medical'
-                })
+                result["frequencies"].append(EntityRecord(
+                    text=token.text,
+                    confidence=0.8,
+                    start=token.idx,
+                    end=token.idx + len(token.text),
+                    method='spacy_medical'
+                ))
 
             if token_lower in medical_terms["condition_terms"]:
-                result["conditions"].append({
-                    'text': token.text,
-                    'confidence': 0.8,
-                    'start': token.idx,
-                    'end': token.idx + len(token.text),
-                    'method': 'spacy_medical'
-                })
+                result["conditions"].append(EntityRecord(
+                    text=token.text,
+                    confidence=0.8,
+                    start=token.idx,
+                    end=token.idx + len(token.text),
+                    method='spacy_medical'
+                ))
 
     def _extract_spacy_phrases(self, doc, medical_terms: Dict, result: Dict) -> None:
         """Extract multi-word medical terms using noun phrases"""
@@ -485,28 +727,28 @@ class MedicalEntityExtractor:
 
             if chunk_lower in medical_terms["procedure_terms"] or chunk_lower in medical_terms["lab_terms"]:
                 category = "procedures" if chunk_lower in medical_terms["procedure_terms"] else "lab_tests"
-                result[category].append({
-                    'text': chunk.text,
-                    'confidence': 0.85,
-                    'start': chunk.start_char,
-                    'end': chunk.end_char,
-                    'method': 'spacy_medical_phrase'
-                })
+                result[category].append(EntityRecord(
+                    text=chunk.text,
+                    confidence=0.85,
+                    start=chunk.start_char,
+                    end=chunk.end_char,
+                    method='spacy_medical_phrase'
+                ))
 
     def _extract_spacy_persons(self, doc, result: Dict) -> None:
         """Extract patient names using NER"""
 
         for ent in doc.ents:
             if ent.label_ == "PERSON":
-                result["patients"].append({
-                    'text': ent.text,
-                    'confidence': 0.9,
-                    'start': ent.start_char,
-                    'end': ent.end_char,
-                    'method': 'spacy_ner'
-                })
-
-    def _is_extraction_sufficient(self, result: Dict[str, List[Dict[str, Any]]], text: str) -> bool:
+                result["patients"].append(EntityRecord(
+                    text=ent.text,
+                    confidence=0.9,
+                    start=ent.start_char,
+                    end=ent.end_char,
+                    method='spacy_ner'
+                ))
+
+    def _is_extraction_sufficient(self, result: Dict[str, List[EntityRecord]], text: str) -> bool:
         """Check if extraction quality is sufficient to avoid escalation"""
 
         total_entities = sum(len(entities) for entities in result.values())
@@ -547,10 +789,10 @@ class MedicalEntityExtractor:
                 existing_weights = [w.get("text", "").lower() for w in result.get("weights", [])]
 
                 if weight_text not in existing_weights:
-                    result["weights"].append({
-                        "text": weight["text"],
-                        "confidence": weight.get("confidence", 0.8),
-                        "start": weight.get("start", 0),
-                        "end": weight.get("end", 0),
-                        "method": "medspacy_regex_weight"
-                    })
\ No newline at end of file
+                    result["weights"].append(EntityRecord(
+                        text=weight["text"],
+                        confidence=weight.get("confidence", 0.8),
+                        start=weight.get("start", 0),
+                        end=weight.get("end", 0),
+                        method="medspacy_regex_weight"
+                    ))
\ No newline at end of file
@@ -5,16 +5,42 @@ Fallback extraction using regex patterns for medical entities.
 
 import logging
 import re
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, Optional
+
+from ..entity_record import EntityRecord
 
 logger = logging.getLogger(__name__)
 
 
+class _FoldedMatch:
+    """Match found in lowercased text, reporting group text from the original text"""
+
+    __slots__ = ("_text", "_match")
+
+    def __init__(self, text: str, match: re.Match):
+        self._text = text
+        self._match = match
+
+    def group(self, index: int = 0) -> Optional[str]:
+        start, end = self._match.span(index)
+        return self._text[start:end] if start != -1 else None
+
+    def groups(self) -> tuple:
+        return tuple(self.group(index) for index in range(1, self._match.re.groups + 1))
+
+    def start(self, index: int = 0) -> int:
+        return self._match.start(index)
+
+    def end(self, index: int = 0) -> int:
+        return self._match.end(index)
+
+
 class RegexExtractor:
     """Enhanced regex-based entity extraction for medical text"""
 
     def __init__(self):
         self._patterns = self._initialize_patterns()
+        self._folded_patterns = self._initialize_folded_patterns()
 
     def _initialize_patterns(self) -> Dict[str, re.Pattern]:
         """Initialize regex patterns for medical entity extraction"""
@@ -85,7 +111,30 @@ class RegexExtractor:
             )
         }
 
-    def extract_entities(self, text: str) -> Dict[str, List[Dict[str, Any]]]:
+    def _initialize_folded_patterns(self) -> Dict[str, re.Pattern]:
+        """
+        Case-sensitive twins of the patterns for matching against lowercased ASCII text
+
+        re.IGNORECASE disables the literal-prefix scan optimisations, which makes the
+        medication/lab name alternations several times slower. For ASCII text, matching
+        the lowercased pattern against the lowercased text finds the same spans.
+        """
+        folded = {}
+        for name, pattern in self._patterns.items():
+            # Uppercase escapes (\S, \D, \W, \B) change meaning when lowercased
+            if re.search(r'\\[A-Z]', pattern.pattern):
+                continue
+            folded[name] = re.compile(pattern.pattern.lower())
+        return folded
+
+    def _finditer(self, pattern_name: str, text: str, folded_text: Optional[str] = None) -> Iterator[Any]:
+        """finditer for one pattern, on the lowercased text when available"""
+        folded_pattern = self._folded_patterns.get(pattern_name)
+        if folded_text is None or folded_pattern is None:
+            return self._patterns[pattern_name].finditer(text)
+        return (_FoldedMatch(text, match) for match in folded_pattern.finditer(folded_text))
+
+    def extract_entities(self, text: str) -> Dict[str, List[EntityRecord]]:
         """Extract medical entities using regex patterns"""
 
         result = {
@@ -100,37 +149,40 @@ class RegexExtractor:
         }
 
         try:
+            # Lowercase once for the case-sensitive fast path (offsets only line up for ASCII)
+            folded_text = text.lower() if text.isascii() else None
+
             # Extract medications using primary pattern
-            self._extract_medications(text, result)
+            self._extract_medications(text, result, folded_text)
 
             # Extract medications using simple pattern for complex text
-            self._extract_simple_medications(text, result)
+            self._extract_simple_medications(text, result, folded_text)
 
             # Extract lab tests
-            self._extract_lab_tests(text, result)
+            self._extract_lab_tests(text, result, folded_text)
 
             # Extract frequencies
-            self._extract_frequencies(text, result)
+            self._extract_frequencies(text, result, folded_text)
 
             # Extract patient names
-            self._extract_patients(text, result)
+            self._extract_patients(text, result, folded_text)
 
             # Extract medical conditions
-            self._extract_conditions(text, result)
+            self._extract_conditions(text, result, folded_text)
 
             # Extract weights (for pediatric dosing)
-            self._extract_weights(text, result)
+            self._extract_weights(text, result, folded_text)
 
         except Exception as e:
             logger.error(f"Regex extraction failed: {e}")
 
         return result
 
-    def _extract_medications(self, text: str, result: Dict) -> None:
+    def _extract_medications(self, text: str, result: Dict, folded_text: Optional[str] = None) -> None:
         """Extract medications and associated dosages"""
 
         # Primary medication pattern
-        med_matches = self._patterns["medication_pattern"].finditer(text)
+        med_matches = self._finditer("medication_pattern", text, folded_text)
         for match in med_matches:
             groups = match.groups()
             if len(groups) >= 2 and groups[1]:  # Group 2 (index 1) is the medication name
@@ -143,34 +195,34 @@ class RegexExtractor:
             dosage_before = groups[0] if len(groups) > 0 and groups[0] else None
             dosage_after = groups[2] if len(groups) > 2 and groups[2] else None
 
-            result["medications"].append({
-                "text": med_name,
-                "confidence": 0.9,
-                "start": med_start,
-                "end": med_end,
-                "method": "regex"
-            })
+            result["medications"].append(EntityRecord(
+                text=med_name,
+                confidence=0.9,
+                start=med_start,
+                end=med_end,
+                method="regex"
+            ))
 
             # Add dosage if found
             if dosage_before:
-                result["dosages"].append({
-                    "text": dosage_before,
-                    "confidence": 0.9,
-                    "start": match.start(1),
-                    "end": match.end(1),
-                    "method": "regex"
-                })
+                result["dosages"].append(EntityRecord(
+                    text=dosage_before,
+                    confidence=0.9,
+                    start=match.start(1),
+                    end=match.end(1),
+                    method="regex"
+                ))
             elif dosage_after:
-                result["dosages"].append({
-                    "text": dosage_after,
-                    "confidence": 0.9,
-                    "start": match.start(3),
-                    "end": match.end(3),
-                    "method": "regex"
-                })
+                result["dosages"].append(EntityRecord(
+                    text=dosage_after,
+                    confidence=0.9,
+                    start=match.start(3),
+                    end=match.end(3),
+                    method="regex"
+                ))
 
         # Alternative medication pattern
-        alt_med_matches = self._patterns["alt_medication_pattern"].finditer(text)
+        alt_med_matches = self._finditer("alt_medication_pattern", text, folded_text)
         for match in alt_med_matches:
             groups = match.groups()
             if len(groups) >= 2 and groups[0] and groups[1]:
@@ -179,23 +231,23 @@ class RegexExtractor:
 
                 # Check if we already found this medication to avoid duplicates
                 if not any(med["text"].lower() == med_text.lower() for med in result["medications"]):
-                    result["medications"].append({
-                        "text": med_text,
-                        "confidence": 0.85,
-                        "start": match.start(1),
-                        "end": match.end(1),
-                        "method": "regex"
-                    })
-                    result["dosages"].append({
-                        "text": dosage_text,
-                        "confidence": 0.85,
-                        "start": match.start(2),
-                        "end": match.end(2),
-                        "method": "regex"
-                    })
+                    result["medications"].append(EntityRecord(
+                        text=med_text,
+                        confidence=0.85,
+                        start=match.start(1),
+                        end=match.end(1),
+                        method="regex"
+                    ))
+                    result["dosages"].append(EntityRecord(
+                        text=dosage_text,
+                        confidence=0.85,
+                        start=match.start(2),
+                        end=match.end(2),
+                        method="regex"
+                    ))
 
         # Extract weight-based dosages (mg/kg, mg/kg/day)
-        weight_dosage_matches = self._patterns["weight_based_dosage_pattern"].finditer(text)
+        weight_dosage_matches = self._finditer("weight_based_dosage_pattern", text, folded_text)
         for match in weight_dosage_matches:
             groups = match.groups()
             if len(groups) >= 2 and groups[0] and groups[1]:
@@ -205,31 +257,31 @@ class RegexExtractor:
 
                 # Add to dosages if not already captured
                 if not any(dos["text"].lower() == full_dosage.lower() for dos in result["dosages"]):
-                    result["dosages"].append({
-                        "text": full_dosage,
-                        "confidence": 0.9,
-                        "start": match.start(),
-                        "end": match.end(),
-                        "method": "regex_weight_based"
-                    })
-
-    def _extract_frequencies(self, text: str, result: Dict) -> None:
+                    result["dosages"].append(EntityRecord(
+                        text=full_dosage,
+                        confidence=0.9,
+                        start=match.start(),
+                        end=match.end(),
+                        method="regex_weight_based"
+                    ))
+
+    def _extract_frequencies(self, text: str, result: Dict, folded_text: Optional[str] = None) -> None:
         """Extract frequency patterns"""
 
-        freq_matches = self._patterns["frequency_pattern"].finditer(text)
+        freq_matches = self._finditer("frequency_pattern", text, folded_text)
         for match in freq_matches:
-            result["frequencies"].append({
-                "text": match.group(0),
-                "confidence": 0.8,
-                "start": match.start(),
-                "end": match.end(),
-                "method": "regex"
-            })
-
-    def _extract_simple_medications(self, text: str, result: Dict) -> None:
+            result["frequencies"].append(EntityRecord(
+                text=match.group(0),
+                confidence=0.8,
+                start=match.start(),
+                end=match.end(),
+                method="regex"
+            ))
+
+    def _extract_simple_medications(self, text: str, result: Dict, folded_text: Optional[str] = None) -> None:
         """Extract medications using simple pattern for complex clinical text"""
 
-        medication_matches = self._patterns["simple_medication_pattern"].finditer(text)
+        medication_matches = self._finditer("simple_medication_pattern", text, folded_text)
         existing_medications = {med["text"].lower() for med in result["medications"]}
 
         for match in medication_matches:
@@ -238,78 +290,78 @@ class RegexExtractor:
                 medication_name = groups[0].strip()
                 # Avoid duplicates
                 if medication_name.lower() not in existing_medications:
-                    result["medications"].append({
-                        "text": medication_name,
-                        "confidence": 0.8,
-                        "start": match.start(1),
-                        "end": match.end(1),
-                        "method": "regex_simple"
-                    })
+                    result["medications"].append(EntityRecord(
+                        text=medication_name,
+                        confidence=0.8,
+                        start=match.start(1),
+                        end=match.end(1),
+                        method="regex_simple"
+                    ))
                     existing_medications.add(medication_name.lower())
 
-    def _extract_lab_tests(self, text: str, result: Dict) -> None:
+    def _extract_lab_tests(self, text: str, result: Dict, folded_text: Optional[str] = None) -> None:
         """Extract lab test orders"""
 
-        lab_matches = self._patterns["lab_test_pattern"].finditer(text)
+        lab_matches = self._finditer("lab_test_pattern", text, folded_text)
         for match in lab_matches:
             groups = match.groups()
             if len(groups) >= 1 and groups[0]:
                 lab_name = groups[0].strip()
-                result["lab_tests"].append({
-                    "text": lab_name,
-                    "confidence": 0.9,
-                    "start": match.start(1),
-                    "end": match.end(1),
-                    "method": "regex"
-                })
-
-    def _extract_patients(self, text: str, result: Dict) -> None:
+                result["lab_tests"].append(EntityRecord(
+                    text=lab_name,
+                    confidence=0.9,
+                    start=match.start(1),
+                    end=match.end(1),
+                    method="regex"
+                ))
+
+    def _extract_patients(self, text: str, result: Dict, folded_text: Optional[str] = None) -> None:
         """Extract patient names"""
 
-        patient_matches = self._patterns["patient_pattern"].finditer(text)
+        patient_matches = self._finditer("patient_pattern", text, folded_text)
         for match in patient_matches:
             groups = match.groups()
             if len(groups) >= 1 and groups[0]:
-                result["patients"].append({
-                    "text": groups[0],
-                    "confidence": 0.7,
-                    "start": match.start(1),
-                    "end": match.end(1),
-                    "method": "regex"
-                })
-
-    def _extract_conditions(self, text: str, result: Dict) -> None:
+                result["patients"].append(EntityRecord(
+                    text=groups[0],
+                    confidence=0.7,
+                    start=match.start(1),
+                    end=match.end(1),
+                    method="regex"
+                ))
+
+    def _extract_conditions(self, text: str, result: Dict, folded_text: Optional[str] = None) -> None:
         """Extract medical conditions"""
 
-        condition_matches = self._patterns["condition_pattern"].finditer(text)
+        condition_matches = self._finditer("condition_pattern", text, folded_text)
         for match in condition_matches:
             groups = match.groups()
             if len(groups) >= 1 and groups[0]:
                 condition_text = groups[0].strip()
-                result["conditions"].append({
-                    "text": condition_text,
-                    "confidence": 0.8,
-                    "start": match.start(1),
-                    "end": match.end(1),
-                    "method": "regex"
-                })
-
-    def _extract_weights(self, text: str, result: Dict) -> None:
+                result["conditions"].append(EntityRecord(
+                    text=condition_text,
+                    confidence=0.8,
+                    start=match.start(1),
+                    end=match.end(1),
+                    method="regex"
+                ))
+
+    def _extract_weights(self, text: str, result: Dict, folded_text: Optional[str] = None) -> None:
         """Extract patient weights for pediatric dosing"""
 
-        weight_matches = self._patterns["weight_pattern"].finditer(text)
+        weight_matches = self._finditer("weight_pattern", text, folded_text)
         for match in weight_matches:
             groups = match.groups()
             if len(groups) >= 1 and groups[0]:
                 weight_value = groups[0]
                 weight_text = f"{weight_value}kg"
-                result["weights"].append({
-                    "text": weight_text,
-                    "confidence": 0.9,
-                    "start": match.start(),
-                    "end": match.end(),
-                    "method": "regex"
-                })
+                result["weights"].append(EntityRecord(
+                    text=weight_text,
+                    confidence=0.9,
+                    start=match.start(),
+                    end=match.end(),
+                    method="regex"
+                ))
 
     def get_pattern_info(self) -> Dict[str, str]:
         """Get information about loaded patterns"""
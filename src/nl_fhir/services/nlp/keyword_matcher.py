@@ -0,0 +1,87 @@
+"""
+Multi-pattern Keyword Matcher (Aho-Corasick)
+Finds every occurrence of every keyword in a single pass over the text, so keyword
+extraction cost no longer grows with the number of keywords (full formularies).
+"""
+
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over lowercase keywords with arbitrary payloads"""
+
+    def __init__(self, keywords: Iterable[Tuple[str, Any]] = ()):
+        # Node i: outgoing transitions, failure link and (keyword_length, payload) outputs.
+        # _own_outputs holds keywords ending exactly at a node; _outputs adds suffix matches.
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._own_outputs: List[List[Tuple[int, Any]]] = [[]]
+        self._outputs: List[List[Tuple[int, Any]]] = [[]]
+        self._keyword_count = 0
+        self.add_keywords(keywords)
+
+    def __len__(self) -> int:
+        return self._keyword_count
+
+    def add_keywords(self, keywords: Iterable[Tuple[str, Any]]) -> None:
+        """
+        Add (keyword, payload) pairs; keywords are matched case-insensitively
+
+        Rebuilds the automaton, so call it at setup time rather than while other
+        threads are matching.
+        """
+        added = False
+        for keyword, payload in keywords:
+            keyword = keyword.lower()
+            if not keyword:
+                continue
+            node = 0
+            for char in keyword:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto.append({})
+                    self._own_outputs.append([])
+                    self._goto[node][char] = next_node
+                node = next_node
+            self._own_outputs[node].append((len(keyword), payload))
+            self._keyword_count += 1
+            added = True
+        if added:
+            self._compile()
+
+    def _compile(self) -> None:
+        """Build failure links breadth-first and fold suffix outputs into each node"""
+        own_outputs = self._own_outputs
+        self._fail = [0] * len(self._goto)
+        self._outputs = [list(outputs) for outputs in own_outputs]
+
+        # Depth-1 nodes keep the root as failure link; deeper nodes follow their parent's chain
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._outputs[child] = own_outputs[child] + self._outputs[self._fail[child]]
+                queue.append(child)
+
+    def iter_matches(self, text_lower: str) -> Iterator[Tuple[int, int, Any]]:
+        """
+        Yield (start, end, payload) for every keyword occurrence, overlaps included
+
+        text_lower must already be lowercased; offsets index into it.
+        """
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        node = 0
+        for index, char in enumerate(text_lower):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, payload in outputs[node]:
+                yield index - length + 1, index + 1, payload
@@ -23,6 +23,9 @@ from .llm_processor import (
     get_llm_processor_status,
 )
 
+# Async escalation client
+from .async_client import AsyncLLMClient, get_async_llm_client
+
 # Import processors for advanced usage
 from .processors import (
     InstructorProcessor,
@@ -56,6 +59,10 @@ __all__ = [
     'process_clinical_text',
     'get_llm_processor_status',
 
+    # Async escalation client
+    'AsyncLLMClient',
+    'get_async_llm_client',
+
     # Advanced components
     'InstructorProcessor',
     'StructuredOutputProcessor',
@@ -0,0 +1,294 @@
+"""
+Async LLM Client for Escalation Requests
+A single event loop thread owns the OpenAI connection pool. Every escalation in the
+process reuses those connections and waits on a shared concurrency cap. A note that is
+already in flight is joined rather than sent twice, and short notes can optionally be
+micro-batched into one structured request.
+HIPAA Compliant: In-flight keys are SHA-256 digests, clinical text is never logged
+"""
+
+import asyncio
+import concurrent.futures
+import copy
+import hashlib
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ....config import get_settings
+from .models import ClinicalStructure, ClinicalStructureBatch
+from .processors.prompt_builder import PromptBuilder
+
+logger = logging.getLogger(__name__)
+
+try:
+    import httpx
+    import openai
+    from instructor import from_openai
+    ASYNC_CLIENT_AVAILABLE = True
+except ImportError:
+    ASYNC_CLIENT_AVAILABLE = False
+
+
+class AsyncLLMClient:
+    """Structured clinical extraction over one shared async OpenAI client"""
+
+    def __init__(self, api_key: str, model: str = "gpt-4o-mini", base_url: Optional[str] = None,
+                 temperature: float = 0.0, max_tokens: int = 2000, timeout_seconds: float = 30,
+                 max_concurrency: int = 8, batch_enabled: bool = False, batch_max_size: int = 4,
+                 batch_window_ms: float = 20.0, batch_max_chars: int = 600):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.timeout_seconds = timeout_seconds
+        self.max_concurrency = max(1, max_concurrency)
+        self.batch_enabled = batch_enabled and batch_max_size > 1
+        self.batch_max_size = batch_max_size
+        self.batch_window_seconds = batch_window_ms / 1000
+        self.batch_max_chars = batch_max_chars
+        self.prompt_builder = PromptBuilder()
+
+        self._start_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        # Everything below is only touched from the client's event loop thread
+        self._client = None
+        self._http_client = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: List[Tuple[str, Optional[str], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._background: Set[asyncio.Task] = set()
+        self._stats = {
+            "requests": 0,
+            "coalesced": 0,
+            "api_calls": 0,
+            "batched_calls": 0,
+            "batched_notes": 0,
+            "errors": 0,
+        }
+
+    def submit(self, text: str, request_id: Optional[str] = None) -> concurrent.futures.Future:
+        """Schedule an extraction from any thread; the future resolves to a ClinicalStructure dict"""
+        loop = self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(self._extract(text, request_id), loop)
+
+    def extract(self, text: str, request_id: Optional[str] = None,
+                timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Blocking extraction for synchronous callers such as the tiered extraction chain"""
+        return self.submit(text, request_id).result(timeout)
+
+    async def aextract(self, text: str, request_id: Optional[str] = None) -> Dict[str, Any]:
+        """Extraction awaitable from any event loop without holding a worker thread"""
+        return await asyncio.wrap_future(self.submit(text, request_id))
+
+    def close(self) -> None:
+        """Close the connection pool and stop the event loop thread"""
+        with self._start_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._aclose(), loop).result(timeout=5)
+        except Exception as e:
+            logger.warning(f"Async LLM client did not close cleanly: {type(e).__name__}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "inflight": len(self._inflight),
+            "max_concurrency": self.max_concurrency,
+            "batch_enabled": self.batch_enabled,
+        }
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=self._run_loop, args=(loop,),
+                                          name="llm-async-client", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _aclose(self) -> None:
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._client = self._http_client = None
+
+    def _get_client(self):
+        if self._client is None:
+            # The pool holds one connection per concurrency slot so every call reuses a warm connection
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.max_concurrency,
+                                    max_keepalive_connections=self.max_concurrency),
+                timeout=self.timeout_seconds
+            )
+            openai_client = openai.AsyncOpenAI(api_key=self.api_key, base_url=self.base_url,
+                                               http_client=self._http_client)
+            self._client = from_openai(openai_client)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def _extract(self, text: str, request_id: Optional[str]) -> Dict[str, Any]:
+        """Single-flight: identical text already in flight shares that request's result"""
+        self._stats["requests"] += 1
+        key = hashlib.sha256(f"{self.model}\x00{text}".encode("utf-8")).hexdigest()
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(text, request_id))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._inflight.pop(key, None) if self._inflight.get(key) is done else None)
+        else:
+            self._stats["coalesced"] += 1
+            logger.info(f"[{request_id}] Joined identical in-flight LLM escalation")
+
+        # Shielded so one caller timing out does not cancel the call for the others
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    async def _fetch(self, text: str, request_id: Optional[str]) -> Dict[str, Any]:
+        if self.batch_enabled and len(text) <= self.batch_max_chars:
+            future = asyncio.get_running_loop().create_future()
+            self._pending.append((text, request_id, future))
+            if len(self._pending) >= self.batch_max_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window_seconds, self._flush)
+            return await future
+        return await self._call_single(text, request_id)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, Optional[str], asyncio.Future]]) -> None:
+        results: Dict[int, Dict[str, Any]] = {}
+        if len(batch) > 1:
+            try:
+                results = await self._call_batch([text for text, _, _ in batch])
+            except Exception as e:
+                logger.warning(f"Micro-batched LLM request for {len(batch)} notes failed, "
+                               f"sending notes individually: {type(e).__name__}")
+
+        # Notes the batch did not answer fall back to their own request
+        await asyncio.gather(*(
+            self._resolve(future, text, request_id, results.get(index))
+            for index, (text, request_id, future) in enumerate(batch)
+        ))
+
+    async def _resolve(self, future: asyncio.Future, text: str, request_id: Optional[str],
+                       result: Optional[Dict[str, Any]]) -> None:
+        try:
+            if result is None:
+                result = await self._call_single(text, request_id)
+            if not future.done():
+                future.set_result(result)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+
+    async def _call_single(self, text: str, request_id: Optional[str]) -> Dict[str, Any]:
+        client = self._get_client()
+        async with self._semaphore:
+            self._stats["api_calls"] += 1
+            try:
+                response = await client.chat.completions.create(
+                    model=self.model,
+                    response_model=ClinicalStructure,
+                    messages=[
+                        {"role": "system", "content": self.prompt_builder.build_system_prompt()},
+                        {"role": "user", "content": self.prompt_builder.build_user_prompt(text)}
+                    ],
+                    max_tokens=self.max_tokens,
+                    temperature=self.temperature,
+                    timeout=self.timeout_seconds,
+                )
+            except Exception:
+                self._stats["errors"] += 1
+                raise
+        logger.info(f"[{request_id}] Async LLM extraction successful")
+        return response.model_dump()
+
+    async def _call_batch(self, texts: List[str]) -> Dict[int, Dict[str, Any]]:
+        """One structured request for several short notes, mapped back by note_id"""
+        client = self._get_client()
+        async with self._semaphore:
+            self._stats["api_calls"] += 1
+            try:
+                response = await client.chat.completions.create(
+                    model=self.model,
+                    response_model=ClinicalStructureBatch,
+                    messages=[
+                        {"role": "system", "content": self.prompt_builder.build_system_prompt()},
+                        {"role": "user", "content": self.prompt_builder.build_batch_user_prompt(texts)}
+                    ],
+                    max_tokens=self.max_tokens * len(texts),
+                    temperature=self.temperature,
+                    timeout=self.timeout_seconds,
+                )
+            except Exception:
+                self._stats["errors"] += 1
+                raise
+
+        results = {}
+        for note in response.notes:
+            index = note.note_id - 1
+            if 0 <= index < len(texts) and index not in results:
+                results[index] = note.model_dump(exclude={"note_id"})
+        self._stats["batched_calls"] += 1
+        self._stats["batched_notes"] += len(results)
+        logger.info(f"Micro-batched LLM extraction answered {len(results)} of {len(texts)} notes")
+        return results
+
+
+_shared_client: Optional[AsyncLLMClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_async_llm_client() -> Optional[AsyncLLMClient]:
+    """Process-wide client when LLM_ASYNC_CLIENT_ENABLED is set and an API key is configured"""
+    global _shared_client
+    settings = get_settings()
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not (settings.llm_async_client_enabled and ASYNC_CLIENT_AVAILABLE and api_key):
+        return None
+
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = AsyncLLMClient(
+                api_key=api_key,
+                model=os.getenv('OPENAI_MODEL', 'gpt-4o-mini'),
+                base_url=settings.openai_base_url,
+                temperature=float(os.getenv('OPENAI_TEMPERATURE', '0.0')),
+                max_tokens=int(os.getenv('OPENAI_MAX_TOKENS', '2000')),
+                timeout_seconds=int(os.getenv('OPENAI_TIMEOUT_SECONDS', '30')),
+                max_concurrency=settings.llm_max_concurrency,
+                batch_enabled=settings.llm_batch_enabled,
+                batch_max_size=settings.llm_batch_max_size,
+                batch_window_ms=settings.llm_batch_window_ms,
+                batch_max_chars=settings.llm_batch_max_chars,
+            )
+            logger.info(f"Async LLM client created (max_concurrency={settings.llm_max_concurrency}, "
+                        f"batching={'on' if settings.llm_batch_enabled else 'off'})")
+        return _shared_client
@@ -4,6 +4,7 @@ HIPAA Compliant: Secure LLM integration with PHI protection
 Production Ready: Fast structured output with Instructor validation
 """
 
+import asyncio
 import logging
 import time
 import os
@@ -60,10 +61,8 @@ class LLMProcessor:
     def process_clinical_text(self, text: str, entities: List[Any], request_id: Optional[str] = None) -> Dict[str, Any]:
         """Process clinical text with cost-optimized regex-first, LLM escalation approach"""
 
-        if not self.initialized:
-            if not self.initialize():
-                logger.error(f"[{request_id}] LLM processing failed - not initialized")
-                return self._create_empty_structure()
+        if not self._ensure_initialized(request_id):
+            return self._create_empty_structure()
 
         start_time = time.time()
 
@@ -73,27 +72,75 @@ class LLMProcessor:
             method = "regex_enhanced"
 
             # STEP 2: Check if escalation to expensive LLM is needed
-            needs_llm_escalation = self.structured_output_processor.should_escalate_to_llm(structured_output, text)
-
-            if needs_llm_escalation and self.instructor_processor.is_available():
-                logger.info(f"[{request_id}] Escalating to LLM due to insufficient regex extraction")
+            if self._needs_llm_escalation(structured_output, text, request_id):
                 # Use expensive LLM only when needed
                 structured_output = self.instructor_processor.extract_clinical_structure(text, request_id)
                 method = "escalated_to_llm"
 
-            processing_time = time.time() - start_time
-            logger.info(f"[{request_id}] Generated structured output using {method} in {processing_time:.3f}s")
+            return self._completed_result(structured_output, method, start_time, request_id)
+
+        except Exception as e:
+            return self._failed_result(e, start_time, request_id)
+
+    @property
+    def uses_async_client(self) -> bool:
+        """True when LLM escalations go through the shared async client"""
+        return self.instructor_processor.async_client is not None
+
+    async def aprocess_clinical_text(self, text: str, entities: List[Any], request_id: Optional[str] = None,
+                                     executor=None) -> Dict[str, Any]:
+        """Async variant of process_clinical_text: the LLM round-trip is awaited instead of holding a worker"""
 
-            return self.structured_output_processor.format_processing_result(
-                structured_output, processing_time, method, "completed"
+        if not self._ensure_initialized(request_id):
+            return self._create_empty_structure()
+
+        start_time = time.time()
+
+        try:
+            loop = asyncio.get_running_loop()
+            structured_output = await loop.run_in_executor(
+                executor, self.fallback_processor.extract_clinical_structure, text
             )
+            method = "regex_enhanced"
+
+            if self._needs_llm_escalation(structured_output, text, request_id):
+                structured_output = await self.instructor_processor.aextract_clinical_structure(text, request_id)
+                method = "escalated_to_llm"
+
+            return self._completed_result(structured_output, method, start_time, request_id)
 
         except Exception as e:
-            logger.error(f"[{request_id}] LLM processing failed: {e}")
-            processing_time = time.time() - start_time
-            return self.structured_output_processor.format_processing_result(
-                self._create_empty_structure(), processing_time, "fallback", "failed", str(e)
-            )
+            return self._failed_result(e, start_time, request_id)
+
+    # Steps shared by process_clinical_text and aprocess_clinical_text
+
+    def _ensure_initialized(self, request_id: Optional[str]) -> bool:
+        if not self.initialized and not self.initialize():
+            logger.error(f"[{request_id}] LLM processing failed - not initialized")
+            return False
+        return True
+
+    def _needs_llm_escalation(self, structured_output: Any, text: str, request_id: Optional[str]) -> bool:
+        if (self.structured_output_processor.should_escalate_to_llm(structured_output, text)
+                and self.instructor_processor.is_available()):
+            logger.info(f"[{request_id}] Escalating to LLM due to insufficient regex extraction")
+            return True
+        return False
+
+    def _completed_result(self, structured_output: Any, method: str, start_time: float,
+                          request_id: Optional[str]) -> Dict[str, Any]:
+        processing_time = time.time() - start_time
+        logger.info(f"[{request_id}] Generated structured output using {method} in {processing_time:.3f}s")
+        return self.structured_output_processor.format_processing_result(
+            structured_output, processing_time, method, "completed"
+        )
+
+    def _failed_result(self, error: Exception, start_time: float, request_id: Optional[str]) -> Dict[str, Any]:
+        logger.error(f"[{request_id}] LLM processing failed: {error}")
+        processing_time = time.time() - start_time
+        return self.structured_output_processor.format_processing_result(
+            self._create_empty_structure(), processing_time, "fallback", "failed", str(error)
+        )
 
     def _create_empty_structure(self) -> Dict[str, Any]:
         """Create empty clinical structure"""
@@ -106,7 +153,8 @@ class LLMProcessor:
             "method": "instructor_llm" if self.instructor_processor.is_available() else "rule_based_enhanced",
             "api_available": self.instructor_processor.is_available(),
             "instructor_available": True,  # We have the module available
-            "fallback_active": not self.instructor_processor.is_available()
+            "fallback_active": not self.instructor_processor.is_available(),
+            "async_client": self.instructor_processor.async_client.get_stats() if self.uses_async_client else {"enabled": False}
         }
 
 
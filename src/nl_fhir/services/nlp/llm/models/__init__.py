@@ -5,7 +5,7 @@ LLM Models Package - Pydantic Models for Structured Clinical Output
 from .medication_models import MedicationOrder, MedicationRoute
 from .procedure_models import DiagnosticProcedure, LabTest, UrgencyLevel
 from .clinical_models import MedicalCondition, ClinicalSetting
-from .response_models import ClinicalStructure
+from .response_models import ClinicalStructure, ClinicalStructureBatch, NoteClinicalStructure
 
 __all__ = [
     # Enums
@@ -19,4 +19,6 @@ __all__ = [
     'LabTest',
     'MedicalCondition',
     'ClinicalStructure',
+    'NoteClinicalStructure',
+    'ClinicalStructureBatch',
 ]
\ No newline at end of file
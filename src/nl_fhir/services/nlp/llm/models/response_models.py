@@ -67,4 +67,19 @@ class ClinicalStructure(BaseModel):
         if not self.medications and not self.lab_tests and not self.procedures:
             logger.warning("No clinical orders found in structured output")
 
-        return self
\ No newline at end of file
+        return self
+
+
+class NoteClinicalStructure(ClinicalStructure):
+    """Clinical structure for one note of a micro-batched request"""
+
+    note_id: int = Field(..., description="Number of the clinical note this entry was extracted from")
+
+
+class ClinicalStructureBatch(BaseModel):
+    """Structured output for several short clinical notes sent in one LLM request"""
+
+    notes: List[NoteClinicalStructure] = Field(
+        default_factory=list,
+        description="One entry per clinical note, each extracted only from its own note"
+    )
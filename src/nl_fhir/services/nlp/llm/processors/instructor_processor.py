@@ -2,6 +2,7 @@
 Instructor-based LLM processor for structured clinical output
 """
 
+import asyncio
 import logging
 import os
 from typing import Dict, Any, Optional
@@ -9,6 +10,7 @@ from typing import Dict, Any, Optional
 from ..models import ClinicalStructure
 from .prompt_builder import PromptBuilder
 from ..utils.validation_helpers import ValidationHelpers
+from ..async_client import AsyncLLMClient, get_async_llm_client
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +29,7 @@ class InstructorProcessor:
 
     def __init__(self):
         self.client = None
+        self.async_client: Optional[AsyncLLMClient] = None
         self.api_key = None
         self.model = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
         self.temperature = float(os.getenv('OPENAI_TEMPERATURE', '0.0'))
@@ -43,7 +46,11 @@ class InstructorProcessor:
             if INSTRUCTOR_AVAILABLE and self.api_key:
                 openai_client = openai.OpenAI(api_key=self.api_key)
                 self.client = instructor.from_openai(openai_client)
-                logger.info("Instructor processor initialized successfully")
+                self.async_client = get_async_llm_client()
+                if self.async_client is not None:
+                    logger.info("Instructor processor initialized with shared async LLM client")
+                else:
+                    logger.info("Instructor processor initialized successfully")
                 return True
             else:
                 logger.info("Instructor unavailable - no API key or import failed")
@@ -59,6 +66,14 @@ class InstructorProcessor:
         if not self.client:
             raise RuntimeError("Instructor client not initialized")
 
+        if self.async_client is not None:
+            try:
+                extracted_data = self.async_client.extract(text, request_id)
+            except Exception as e:
+                logger.error(f"[{request_id}] Instructor extraction failed: {e}")
+                raise
+            return self.validation_helpers.validate_against_source(extracted_data, text, request_id)
+
         try:
             # Create prompts
             system_prompt = self.prompt_builder.build_system_prompt()
@@ -88,6 +103,19 @@ class InstructorProcessor:
             logger.error(f"[{request_id}] Instructor extraction failed: {e}")
             raise
 
+    async def aextract_clinical_structure(self, text: str, request_id: Optional[str] = None) -> Dict[str, Any]:
+        """Extract clinical structure without holding a thread for the LLM round-trip"""
+
+        if self.async_client is None:
+            return await asyncio.to_thread(self.extract_clinical_structure, text, request_id)
+
+        try:
+            extracted_data = await self.async_client.aextract(text, request_id)
+        except Exception as e:
+            logger.error(f"[{request_id}] Instructor extraction failed: {e}")
+            raise
+        return self.validation_helpers.validate_against_source(extracted_data, text, request_id)
+
     def is_available(self) -> bool:
         """Check if Instructor processing is available"""
         return bool(self.client and self.api_key and INSTRUCTOR_AVAILABLE)
\ No newline at end of file
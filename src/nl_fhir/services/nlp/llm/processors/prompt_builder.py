@@ -2,6 +2,8 @@
 Prompt building utilities for LLM processing
 """
 
+from typing import List
+
 
 class PromptBuilder:
     """Builds prompts for clinical text extraction"""
@@ -85,4 +87,22 @@ EXTRACTION RULES:
 4. For patients: Only extract if a proper name is given (not "patient" alone)
 5. Leave fields empty if information is not explicitly present
 
-Remember: It's better to extract nothing than to hallucinate information."""
\ No newline at end of file
+Remember: It's better to extract nothing than to hallucinate information."""
+
+    def build_batch_user_prompt(self, texts: List[str]) -> str:
+        """Build one user prompt for several short clinical notes, numbered from 1"""
+        notes = "\n".join(f'Note {number}: "{text}"' for number, text in enumerate(texts, start=1))
+        return f"""Extract ONLY explicitly stated information from each of these {len(texts)} clinical notes.
+The notes are unrelated: return one entry per note with its note_id, and never move
+information from one note into another.
+
+{notes}
+
+EXTRACTION RULES:
+1. Extract EXACTLY as written - do not modify, expand, or interpret
+2. For conditions: Extract the COMPLETE medical term (e.g., "rheumatoid arthritis flare" not just "arthritis")
+3. For medications: Only extract dosage/frequency/route if explicitly stated
+4. For patients: Only extract if a proper name is given (not "patient" alone)
+5. Leave fields empty if information is not explicitly present
+
+Remember: It's better to extract nothing than to hallucinate information."""
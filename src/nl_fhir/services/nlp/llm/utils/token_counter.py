@@ -3,16 +3,28 @@ Token counting utilities for LLM processing
 """
 
 import logging
-from typing import Optional
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence
 
 logger = logging.getLogger(__name__)
 
 
 class TokenCounter:
-    """Utility class for counting tokens in text"""
+    """
+    Utility class for counting tokens in text
 
-    def __init__(self):
+    Encodings are kept in a small LRU keyed by the text itself (str hashes are cached
+    by Python, so a repeat lookup does not rescan the note). Budget checks, truncation
+    and repeated counts of the same note during one request encode it once. Use one
+    counter per request, or share one; the cache is bounded and thread-safe.
+    """
+
+    def __init__(self, cache_size: int = 128):
         self.encoding = None
+        self.cache_size = cache_size
+        self._token_cache: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
         self._initialize_tokenizer()
 
     def _initialize_tokenizer(self):
@@ -24,15 +36,38 @@ class TokenCounter:
         except ImportError:
             logger.warning("tiktoken not available - using approximate token counting")
             self.encoding = None
+        except Exception as e:
+            # tiktoken downloads its BPE ranks on first use; offline hosts fall back
+            logger.warning(f"tiktoken encoding unavailable ({type(e).__name__}) - using approximate token counting")
+            self.encoding = None
 
     def count_tokens(self, text: str) -> int:
         """Count tokens in text"""
         if self.encoding:
-            return len(self.encoding.encode(text))
+            return len(self._encode(text))
         else:
             # Rough approximation: 1 token ≈ 4 characters
             return len(text) // 4
 
+    def count_tokens_many(self, texts: Sequence[str]) -> List[int]:
+        """Count tokens for several texts, encoding the uncached ones in one batch call"""
+        if not self.encoding:
+            return [len(text) // 4 for text in texts]
+
+        with self._cache_lock:
+            missing = list(dict.fromkeys(text for text in texts if text not in self._token_cache))
+        if missing:
+            encoded = self.encoding.encode_batch(missing) if len(missing) > 1 else [self.encoding.encode(missing[0])]
+            with self._cache_lock:
+                for text, tokens in zip(missing, encoded):
+                    self._store(text, tokens)
+
+        counts = []
+        for text in texts:
+            tokens = self._cached(text)
+            counts.append(len(tokens) if tokens is not None else len(self._encode(text)))
+        return counts
+
     def estimate_cost(self, input_tokens: int, output_tokens: int, model: str = "gpt-4o-mini") -> float:
         """Estimate cost based on token usage"""
         # Pricing as of 2024 (prices per 1K tokens)
@@ -57,14 +92,45 @@ class TokenCounter:
 
     def truncate_to_limit(self, text: str, max_tokens: int = 8000) -> str:
         """Truncate text to stay within token limit"""
-        if self.check_token_limit(text, max_tokens):
-            return text
-
         if self.encoding:
-            tokens = self.encoding.encode(text)
-            truncated_tokens = tokens[:max_tokens]
-            return self.encoding.decode(truncated_tokens)
+            # Same encoding the limit check used: the text is encoded at most once
+            tokens = self._encode(text)
+            if len(tokens) <= max_tokens:
+                return text
+            return self.encoding.decode(tokens[:max_tokens])
         else:
             # Rough truncation
+            if self.check_token_limit(text, max_tokens):
+                return text
             max_chars = max_tokens * 4
-            return text[:max_chars]
\ No newline at end of file
+            return text[:max_chars]
+
+    def clear_cache(self) -> None:
+        """Drop cached encodings"""
+        with self._cache_lock:
+            self._token_cache.clear()
+
+    def _encode(self, text: str) -> List[int]:
+        """Token ids for text, from the cache when this text was encoded before"""
+        tokens = self._cached(text)
+        if tokens is None:
+            tokens = self.encoding.encode(text)
+            with self._cache_lock:
+                self._store(text, tokens)
+        return tokens
+
+    def _cached(self, text: str) -> Optional[List[int]]:
+        with self._cache_lock:
+            tokens = self._token_cache.get(text)
+            if tokens is not None:
+                self._token_cache.move_to_end(text)
+            return tokens
+
+    def _store(self, text: str, tokens: List[int]) -> None:
+        # Caller holds self._cache_lock
+        if self.cache_size <= 0:
+            return
+        self._token_cache[text] = tokens
+        self._token_cache.move_to_end(text)
+        while len(self._token_cache) > self.cache_size:
+            self._token_cache.popitem(last=False)
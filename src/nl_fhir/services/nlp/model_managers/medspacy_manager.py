@@ -8,6 +8,8 @@ import threading
 import time
 from typing import Optional, Any, Dict
 
+from . import medspacy_snapshot
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -30,15 +32,21 @@ except ImportError:
 class MedSpacyManager:
     """Manages MedSpaCy Clinical Intelligence Engine with enhanced medical rules"""
 
+    # Loaded models are process-wide: startup warmup and every extractor share one copy
+    _shared_models: Dict[str, Any] = {}
+    _shared_lock = threading.Lock()
+    _shared_status: Dict[str, str] = {}
+
     def __init__(self):
-        self._models: Dict[str, Any] = {}
-        self._lock = threading.Lock()
-        self._initialization_status = {}
+        self._models = self._shared_models
+        self._lock = self._shared_lock
+        self._initialization_status = self._shared_status
 
     def load_medspacy_clinical_engine(self, base_model: str = "en_core_web_sm") -> Optional[Any]:
         """
         Load MedSpaCy Clinical Intelligence Engine with ConText and clinical NER
         This is the core enhancement for Epic 2.5 - replaces basic spaCy with clinical intelligence
+        Deserialized from the MEDSPACY_SNAPSHOT_PATH snapshot when its fingerprint matches.
         """
 
         if not MEDSPACY_AVAILABLE or not SPACY_AVAILABLE:
@@ -54,14 +62,14 @@ class MedSpacyManager:
                 logger.info("Loading MedSpaCy Clinical Intelligence Engine")
                 start_time = time.time()
 
-                # Load basic MedSpaCy with default clinical components (ConText, target matcher, etc.)
-                nlp = medspacy.load()
-
-                # Add our additional clinical target rules to enhance entity recognition
-                if "medspacy_target_matcher" in nlp.pipe_names:
-                    self._configure_enhanced_clinical_rules(nlp)
-                else:
-                    logger.warning("MedSpaCy target matcher not found, using basic functionality")
+                # A matching pipeline snapshot skips rebuilding the tokenizer and rule matchers
+                nlp = None
+                snapshot_path = self._snapshot_path()
+                if snapshot_path:
+                    nlp = medspacy_snapshot.load_pipeline_snapshot(snapshot_path, self.pipeline_fingerprint(base_model),
+                                                                   self._snapshot_key())
+                if nlp is None:
+                    nlp = self.build_medspacy_clinical_engine()
 
                 # Test clinical functionality
                 test_doc = nlp("Patient John Doe denies chest pain. Start 500mg amoxicillin twice daily.")
@@ -85,6 +93,45 @@ class MedSpacyManager:
                 self._initialization_status[medspacy_key] = "failed"
                 return None
 
+    def build_medspacy_clinical_engine(self) -> Any:
+        """Build the MedSpaCy clinical pipeline from scratch (no caching, no snapshot)"""
+
+        # Load basic MedSpaCy with default clinical components (ConText, target matcher, etc.)
+        nlp = medspacy.load()
+
+        # Add our additional clinical target rules to enhance entity recognition
+        if "medspacy_target_matcher" in nlp.pipe_names:
+            self._configure_enhanced_clinical_rules(nlp)
+        else:
+            logger.warning("MedSpaCy target matcher not found, using basic functionality")
+
+        return nlp
+
+    def pipeline_fingerprint(self, base_model: str = "en_core_web_sm") -> str:
+        """Fingerprint a pipeline snapshot must carry to be used for base_model"""
+        return medspacy_snapshot.pipeline_fingerprint(base_model, self._get_clinical_target_rules())
+
+    def save_pipeline_snapshot(self, path: str, base_model: str = "en_core_web_sm") -> Dict[str, Any]:
+        """Build the clinical pipeline and write it as a snapshot to path"""
+        if not MEDSPACY_AVAILABLE or not SPACY_AVAILABLE:
+            raise RuntimeError("MedSpaCy is not installed")
+        key = self._snapshot_key()
+        if not key:
+            raise RuntimeError("MEDSPACY_SNAPSHOT_HMAC_KEY is not set")
+        nlp = self.build_medspacy_clinical_engine()
+        return medspacy_snapshot.save_pipeline_snapshot(nlp, path, self.pipeline_fingerprint(base_model), key)
+
+    def _snapshot_path(self) -> Optional[str]:
+        from ....config import get_settings
+
+        return get_settings().medspacy_snapshot_path
+
+    def _snapshot_key(self) -> Optional[bytes]:
+        from ....config import get_settings
+
+        key = get_settings().medspacy_snapshot_hmac_key
+        return key.encode("utf-8") if key else None
+
     def _configure_enhanced_clinical_rules(self, nlp) -> None:
         """Configure MedSpaCy pipeline with enhanced clinical intelligence components"""
 
@@ -0,0 +1,143 @@
+"""
+Serialized MedSpaCy Pipeline Snapshots
+Stores a fully configured MedSpaCy clinical pipeline (tokenizer, PyRuSH sentencizer,
+target matcher with the clinical target rules, ConText with its rules) so a worker
+can deserialize it instead of rebuilding the tokenizer special cases and rule
+matchers on every cold start.
+
+A snapshot directory holds the pickled pipeline and a JSON manifest. The manifest
+records a fingerprint of everything that shapes the pipeline (package versions,
+base model, target rules) and the payload digest; a snapshot is only used when both
+match. medspaCy components do not implement spaCy's to_disk, so the spaCy Language
+pickle protocol is used for the payload. Unpickling runs code, so the manifest is
+signed with an HMAC key from settings and unsigned or forged snapshots are refused:
+whoever can write the directory cannot produce a manifest the service will trust.
+HIPAA Compliant: Model artifacts only, no clinical text is persisted
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import pickle  # nosec B403 - only HMAC-verified payloads are loaded
+import time
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 2
+PAYLOAD_FILE_NAME = "pipeline.pkl"
+MANIFEST_FILE_NAME = "snapshot.json"
+
+# Packages whose upgrade changes the pipeline or its pickled form
+_FINGERPRINT_PACKAGES = ("spacy", "medspacy", "PyRuSH")
+
+
+def _package_version(package: str) -> str:
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return "absent"
+
+
+def pipeline_fingerprint(base_model: str, target_rules: Iterable[Any]) -> str:
+    """Digest of the package versions, base model and target rules a pipeline is built from"""
+    components = {
+        "format": SNAPSHOT_FORMAT_VERSION,
+        "packages": {package: _package_version(package) for package in _FINGERPRINT_PACKAGES},
+        "base_model": base_model,
+        "target_rules": [
+            [rule.literal, rule.category, repr(getattr(rule, "pattern", None))] for rule in target_rules
+        ],
+    }
+    encoded = json.dumps(components, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def manifest_signature(manifest: Dict[str, Any], key: bytes) -> str:
+    """HMAC-SHA256 of the manifest's canonical JSON, excluding its signature field"""
+    unsigned = {name: value for name, value in manifest.items() if name != "signature"}
+    encoded = json.dumps(unsigned, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hmac.new(key, encoded, hashlib.sha256).hexdigest()
+
+
+def save_pipeline_snapshot(nlp: Any, path: Union[str, Path], fingerprint: str, key: bytes) -> Dict[str, Any]:
+    """
+    Write nlp and its manifest, signed with key, to the snapshot directory and return the manifest
+    Files are written under temporary names and renamed, so workers starting during a
+    rebuild see either the old snapshot or the new one.
+    """
+    if not key:
+        raise ValueError("A snapshot signing key is required")
+    snapshot_dir = Path(path)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+    payload = pickle.dumps(nlp, protocol=pickle.HIGHEST_PROTOCOL)
+    target_matcher = nlp.get_pipe("medspacy_target_matcher") if "medspacy_target_matcher" in nlp.pipe_names else None
+    manifest = {
+        "format": SNAPSHOT_FORMAT_VERSION,
+        "fingerprint": fingerprint,
+        "payload_sha256": hashlib.sha256(payload).hexdigest(),
+        "payload_bytes": len(payload),
+        "pipe_names": list(nlp.pipe_names),
+        "target_rules": len(target_matcher.rules) if target_matcher is not None else 0,
+        "created_at": time.time(),
+    }
+    manifest["signature"] = manifest_signature(manifest, key)
+
+    # Payload first: a manifest never points at a payload that is not there yet
+    for file_name, data in ((PAYLOAD_FILE_NAME, payload),
+                            (MANIFEST_FILE_NAME, json.dumps(manifest, indent=2).encode("utf-8"))):
+        temp_path = snapshot_dir / f".{file_name}.{os.getpid()}.tmp"
+        temp_path.write_bytes(data)
+        os.replace(temp_path, snapshot_dir / file_name)
+
+    logger.info(f"Saved MedSpaCy pipeline snapshot ({len(payload) / 1024:.0f} KiB, fingerprint {fingerprint})")
+    return manifest
+
+
+def load_pipeline_snapshot(path: Union[str, Path], fingerprint: str, key: Optional[bytes]) -> Optional[Any]:
+    """
+    The pipeline stored under path, or None when it is missing, stale, unsigned or unreadable
+    Stale means the manifest fingerprint differs from fingerprint. Nothing is unpickled
+    unless the manifest signature verifies under key and the payload digest matches it.
+    """
+    if not key:
+        logger.warning("MedSpaCy snapshot signing key is not set, building the pipeline")
+        return None
+
+    snapshot_dir = Path(path)
+    try:
+        manifest = json.loads((snapshot_dir / MANIFEST_FILE_NAME).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        logger.info(f"No MedSpaCy pipeline snapshot in {snapshot_dir}, building the pipeline")
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Unreadable MedSpaCy snapshot manifest, building the pipeline: {e}")
+        return None
+
+    signature = manifest.get("signature") if isinstance(manifest, dict) else None
+    if not isinstance(signature, str) or not hmac.compare_digest(signature, manifest_signature(manifest, key)):
+        logger.warning("MedSpaCy pipeline snapshot manifest is unsigned or forged, building the pipeline")
+        return None
+
+    if manifest.get("format") != SNAPSHOT_FORMAT_VERSION or manifest.get("fingerprint") != fingerprint:
+        logger.info("MedSpaCy pipeline snapshot is stale (fingerprint mismatch), building the pipeline")
+        return None
+
+    try:
+        start_time = time.time()
+        payload = (snapshot_dir / PAYLOAD_FILE_NAME).read_bytes()
+        if hashlib.sha256(payload).hexdigest() != manifest.get("payload_sha256"):
+            logger.warning("MedSpaCy pipeline snapshot payload does not match its manifest, building the pipeline")
+            return None
+        # Safe to unpickle: the payload digest is covered by the verified manifest signature
+        nlp = pickle.loads(payload)  # nosec B301
+        logger.info(f"Loaded MedSpaCy pipeline snapshot in {time.time() - start_time:.2f}s")
+        return nlp
+    except Exception as e:
+        logger.warning(f"Failed to load MedSpaCy pipeline snapshot, building the pipeline: {e}")
+        return None
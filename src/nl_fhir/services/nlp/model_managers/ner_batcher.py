@@ -0,0 +1,160 @@
+"""
+Dynamic Batching Queue for Transformer NER
+Concurrent Tier 2 requests are collected for a short window and run through the
+Hugging Face pipeline as one batched forward pass, so CPU inference under load is
+paid per batch instead of per request.
+HIPAA Compliant: Clinical text stays in memory, only counts and timings are recorded
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class NERBatcher:
+    """
+    Callable stand-in for a NER pipeline that batches concurrent calls
+
+    A call enqueues its text and blocks until the worker thread has run the batch it
+    joined. A batch is dispatched when it reaches max_batch_size or when its oldest
+    request has waited max_wait_ms, whichever comes first.
+    """
+
+    def __init__(self, ner_pipeline, max_batch_size: int = 16, max_wait_ms: float = 10.0,
+                 name: str = "ner"):
+        self.ner_pipeline = ner_pipeline
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_seconds = max(0.0, max_wait_ms) / 1000
+        self.name = name
+
+        self._queue: Deque[Tuple[str, float, Future]] = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name=f"{name}-batcher", daemon=True)
+        self._worker.start()
+
+        self._metrics = {
+            "requests": 0,
+            "batches": 0,
+            "batched_requests": 0,
+            "largest_batch": 0,
+            "full_batches": 0,
+            "failed_batches": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+            "total_inference_ms": 0.0,
+        }
+
+    def __call__(self, text: str) -> List[Dict[str, Any]]:
+        """Entities for one text, computed as part of whichever batch it lands in"""
+        return self.submit(text).result()
+
+    def submit(self, text: str) -> Future:
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError(f"{self.name} batcher is closed")
+            self._queue.append((text, time.perf_counter(), future))
+            self._metrics["requests"] += 1
+            self._condition.notify()
+        return future
+
+    def close(self) -> None:
+        """Stop the worker after it drains the requests already queued"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._worker.join(timeout=5)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._condition:
+            batches = self._metrics["batches"]
+            batched = self._metrics["batched_requests"]
+            return {
+                "enabled": True,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_seconds * 1000,
+                "queued": len(self._queue),
+                "requests": self._metrics["requests"],
+                "batches": batches,
+                "largest_batch": self._metrics["largest_batch"],
+                "full_batches": self._metrics["full_batches"],
+                "failed_batches": self._metrics["failed_batches"],
+                "average_batch_size": batched / batches if batches else 0.0,
+                "average_wait_ms": self._metrics["total_wait_ms"] / batched if batched else 0.0,
+                "max_wait_ms_observed": self._metrics["max_wait_ms"],
+                "average_inference_ms": self._metrics["total_inference_ms"] / batches if batches else 0.0,
+            }
+
+    def _next_batch(self) -> Optional[List[Tuple[str, float, Future]]]:
+        with self._condition:
+            while not self._queue:
+                if self._closed:
+                    return None
+                self._condition.wait()
+
+            # The window is measured from the oldest request, so none waits past the budget
+            deadline = self._queue[0][1] + self.max_wait_seconds
+            while len(self._queue) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            size = min(len(self._queue), self.max_batch_size)
+            return [self._queue.popleft() for _ in range(size)]
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[Tuple[str, float, Future]]) -> None:
+        started = time.perf_counter()
+        waits = [(started - enqueued) * 1000 for _, enqueued, _ in batch]
+        texts = [text for text, _, _ in batch]
+
+        try:
+            outputs = self.ner_pipeline(texts, batch_size=len(texts))
+            if len(texts) == 1 and outputs and isinstance(outputs[0], dict):
+                # Some pipeline versions unwrap single-item lists
+                outputs = [outputs]
+            if len(outputs) != len(texts):
+                raise ValueError(f"pipeline returned {len(outputs)} results for {len(texts)} texts")
+            results: List[Any] = list(outputs)
+            failed = False
+        except Exception as e:
+            # Keep one bad input from failing its neighbours: retry the batch item by item
+            logger.warning(f"Batched {self.name} inference for {len(texts)} texts failed, "
+                           f"running individually: {type(e).__name__}")
+            results = []
+            for text in texts:
+                try:
+                    results.append(self.ner_pipeline(text))
+                except Exception as item_error:
+                    results.append(item_error)
+            failed = True
+
+        inference_ms = (time.perf_counter() - started) * 1000
+        with self._condition:
+            self._metrics["batches"] += 1
+            self._metrics["batched_requests"] += len(batch)
+            self._metrics["largest_batch"] = max(self._metrics["largest_batch"], len(batch))
+            self._metrics["full_batches"] += len(batch) == self.max_batch_size
+            self._metrics["failed_batches"] += failed
+            self._metrics["total_wait_ms"] += sum(waits)
+            self._metrics["max_wait_ms"] = max(self._metrics["max_wait_ms"], max(waits))
+            self._metrics["total_inference_ms"] += inference_ms
+
+        for (_, _, future), result in zip(batch, results, strict=True):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,185 @@
+"""
+ONNX Runtime Backend for Transformer NER
+Exports the Tier 2 Hugging Face NER model to ONNX, optionally applies int8 dynamic
+quantization, and serves it through onnxruntime on CPU. The result is wrapped in a
+regular transformers token-classification pipeline, so entity output keeps the same
+shape as the PyTorch backend.
+HIPAA Compliant: Model artifacts only, no clinical text is persisted
+"""
+
+import logging
+import os
+import platform
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForTokenClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer, pipeline
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+QUANTIZED_FILE_NAME = "model_quantized.onnx"
+EXPORTED_FILE_NAME = "model.onnx"
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "--", name)
+
+
+def onnx_model_dir(cache_dir: Union[str, Path], model_name: str, quantize: bool,
+                   revision: str = "main") -> Path:
+    """Export location for one model revision and precision under the cache directory"""
+    return Path(cache_dir) / _slug(model_name) / _slug(revision) / ("int8" if quantize else "fp32")
+
+
+def _quantization_config():
+    """Dynamic int8 config for the host CPU's instruction set"""
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+    return AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+
+
+def _export_atomically(target_dir: Path, file_name: str, write: Callable[[Path], None]) -> None:
+    """
+    Run write into a temporary sibling of target_dir and rename it into place
+    Workers exporting the same model at once each write their own directory; the first
+    rename wins and the others discard theirs, so readers never see a partial export.
+    """
+    target_dir.parent.mkdir(parents=True, exist_ok=True)
+    temp_dir = Path(tempfile.mkdtemp(prefix=f".{target_dir.name}-", dir=target_dir.parent))
+    try:
+        write(temp_dir)
+        try:
+            os.replace(temp_dir, target_dir)
+        except OSError:
+            if not (target_dir / file_name).exists():
+                raise
+            logger.info(f"ONNX export {target_dir} was completed by another worker")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def export_onnx_ner_model(model_name: str, cache_dir: Union[str, Path], quantize: bool = True,
+                          revision: str = "main") -> Path:
+    """
+    Export model_name at the given Hub revision to ONNX under cache_dir and return the directory
+    An existing export of that revision is reused. With quantize, weights are converted to
+    int8 with dynamic (activation-time) quantization, which needs no calibration data.
+    """
+    if not ONNX_AVAILABLE:
+        raise RuntimeError("optimum[onnxruntime] is not installed")
+
+    output_dir = onnx_model_dir(cache_dir, model_name, quantize, revision)
+    model_file = output_dir / (QUANTIZED_FILE_NAME if quantize else EXPORTED_FILE_NAME)
+    if model_file.exists():
+        return output_dir
+
+    start_time = time.time()
+    export_dir = onnx_model_dir(cache_dir, model_name, quantize=False, revision=revision)
+    if not (export_dir / EXPORTED_FILE_NAME).exists():
+        logger.info(f"Exporting {model_name}@{revision} to ONNX")
+
+        def write_export(directory: Path) -> None:
+            ORTModelForTokenClassification.from_pretrained(
+                model_name, export=True, revision=revision
+            ).save_pretrained(directory)
+            AutoTokenizer.from_pretrained(model_name, revision=revision).save_pretrained(directory)
+
+        _export_atomically(export_dir, EXPORTED_FILE_NAME, write_export)
+
+    if quantize:
+        logger.info(f"Quantizing {model_name} to int8")
+
+        def write_quantized(directory: Path) -> None:
+            quantizer = ORTQuantizer.from_pretrained(export_dir, file_name=EXPORTED_FILE_NAME)
+            quantizer.quantize(save_dir=directory, quantization_config=_quantization_config())
+            AutoTokenizer.from_pretrained(export_dir).save_pretrained(directory)  # nosec B615 - local export
+
+        _export_atomically(output_dir, QUANTIZED_FILE_NAME, write_quantized)
+
+    logger.info(f"ONNX export of {model_name} ready in {time.time() - start_time:.2f}s")
+    return output_dir
+
+
+def load_onnx_ner_pipeline(model_name: str, cache_dir: Union[str, Path], quantize: bool = True,
+                           intra_op_threads: int = 0, revision: str = "main") -> Any:
+    """
+    NER pipeline backed by an onnxruntime CPU session
+    intra_op_threads sets the session's intra-op thread pool; 0 keeps the
+    onnxruntime default of one thread per physical core.
+    """
+    model_dir = export_onnx_ner_model(model_name, cache_dir, quantize, revision)
+
+    session_options = onnxruntime.SessionOptions()
+    session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if intra_op_threads > 0:
+        session_options.intra_op_num_threads = intra_op_threads
+        # Inter-op parallelism only helps graphs with independent branches
+        session_options.inter_op_num_threads = 1
+
+    model = ORTModelForTokenClassification.from_pretrained(
+        model_dir,
+        file_name=QUANTIZED_FILE_NAME if quantize else EXPORTED_FILE_NAME,
+        provider="CPUExecutionProvider",
+        session_options=session_options,
+    )
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)  # nosec B615 - local export
+    return pipeline("ner", model=model, tokenizer=tokenizer, aggregation_strategy="simple", device=-1)
+
+
+def _entity_key(entity: Dict[str, Any]) -> Tuple[str, int, int]:
+    return (str(entity.get("entity_group", "")).lower(), int(entity.get("start", 0)), int(entity.get("end", 0)))
+
+
+def compare_ner_outputs(reference: List[List[Dict[str, Any]]],
+                        candidate: List[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Entity-level agreement of a candidate backend with the reference backend
+    Entities match on (entity_group, start, end). Reports precision, recall and F1
+    of the candidate against the reference, the share of texts with identical entity
+    sets, and the largest score difference among matched entities.
+    """
+    matched = reference_total = candidate_total = identical = 0
+    max_score_delta = 0.0
+    mismatched_texts: List[int] = []
+
+    for index, (expected, actual) in enumerate(zip(reference, candidate, strict=True)):
+        expected_scores = {_entity_key(entity): float(entity.get("score", 0.0)) for entity in expected}
+        actual_scores = {_entity_key(entity): float(entity.get("score", 0.0)) for entity in actual}
+        common = expected_scores.keys() & actual_scores.keys()
+
+        matched += len(common)
+        reference_total += len(expected_scores)
+        candidate_total += len(actual_scores)
+        for key in common:
+            max_score_delta = max(max_score_delta, abs(expected_scores[key] - actual_scores[key]))
+        if expected_scores.keys() == actual_scores.keys():
+            identical += 1
+        else:
+            mismatched_texts.append(index)
+
+    precision = matched / candidate_total if candidate_total else 1.0
+    recall = matched / reference_total if reference_total else 1.0
+    texts = len(reference)
+    return {
+        "texts": texts,
+        "reference_entities": reference_total,
+        "candidate_entities": candidate_total,
+        "matched_entities": matched,
+        "precision": precision,
+        "recall": recall,
+        "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        "identical_text_rate": identical / texts if texts else 1.0,
+        "max_score_delta": max_score_delta,
+        "mismatched_texts": mismatched_texts,
+    }
@@ -22,10 +22,15 @@ except ImportError:
 class SpacyManager:
     """Manages spaCy models with caching and optimization"""
 
+    # Loaded models are process-wide: startup warmup and every extractor share one copy
+    _shared_models: Dict[str, Any] = {}
+    _shared_lock = threading.Lock()
+    _shared_status: Dict[str, str] = {}
+
     def __init__(self):
-        self._models: Dict[str, Any] = {}
-        self._lock = threading.Lock()
-        self._initialization_status = {}
+        self._models = self._shared_models
+        self._lock = self._shared_lock
+        self._initialization_status = self._shared_status
 
     def load_spacy_medical_nlp(self, model_name: str = "en_core_web_sm") -> Optional[Any]:
         """Load spaCy model for enhanced medical NLP"""
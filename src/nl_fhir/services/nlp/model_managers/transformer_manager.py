@@ -6,7 +6,10 @@ Handles loading and caching of Hugging Face transformer models for medical NER.
 import logging
 import threading
 import time
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, Tuple
+
+from .ner_batcher import NERBatcher
+from . import onnx_ner
 
 logger = logging.getLogger(__name__)
 
@@ -22,10 +25,27 @@ except ImportError:
 class TransformerManager:
     """Manages Hugging Face transformer models with caching and optimization"""
 
+    # Loaded models are process-wide: startup warmup and every extractor share one copy.
+    # _shared_lock only guards the dicts; each model key loads under its own lock, so
+    # warming one model never blocks loading another or handing out a batcher.
+    _shared_models: Dict[str, Any] = {}
+    _shared_lock = threading.Lock()
+    _shared_load_locks: Dict[str, threading.Lock] = {}
+    _shared_status: Dict[str, str] = {}
+    _shared_batchers: Dict[str, NERBatcher] = {}
+    _shared_backends: Dict[str, str] = {}
+
     def __init__(self):
-        self._models: Dict[str, Any] = {}
-        self._lock = threading.Lock()
-        self._initialization_status = {}
+        self._models = self._shared_models
+        self._lock = self._shared_lock
+        self._load_locks = self._shared_load_locks
+        self._initialization_status = self._shared_status
+        self._batchers = self._shared_batchers
+        self._backends = self._shared_backends
+
+    def _load_lock(self, model_key: str) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(model_key, threading.Lock())
 
     def load_medical_ner_model(self, model_name: str = "clinical-ai-apollo/Medical-NER") -> Optional[Any]:
         """Load and cache medical NER model with error handling"""
@@ -34,7 +54,10 @@ class TransformerManager:
             logger.warning("Transformers not available, returning None")
             return None
 
-        with self._lock:
+        if model_name not in self._models:
+            self._export_onnx_model(model_name)
+
+        with self._load_lock(model_name):
             if model_name in self._models:
                 return self._models[model_name]
 
@@ -42,13 +65,7 @@ class TransformerManager:
                 logger.info(f"Loading medical NER model: {model_name}")
                 start_time = time.time()
 
-                # Load NER pipeline for medical entities
-                ner_pipeline = pipeline(
-                    "ner",
-                    model=model_name,
-                    aggregation_strategy="simple",
-                    device=-1  # CPU inference
-                )
+                ner_pipeline, backend = self._build_ner_pipeline(model_name)
 
                 # Basic validation
                 test_result = ner_pipeline("Test medical order: 50mg Prozac daily")
@@ -56,10 +73,12 @@ class TransformerManager:
                     raise ValueError(f"Model {model_name} failed basic validation")
 
                 load_time = time.time() - start_time
-                logger.info(f"Successfully loaded {model_name} in {load_time:.2f}s")
+                logger.info(f"Successfully loaded {model_name} ({backend} backend) in {load_time:.2f}s")
 
-                self._models[model_name] = ner_pipeline
-                self._initialization_status[model_name] = "loaded"
+                with self._lock:
+                    self._models[model_name] = ner_pipeline
+                    self._backends[model_name] = backend
+                    self._initialization_status[model_name] = "loaded"
 
                 return ner_pipeline
 
@@ -68,14 +87,106 @@ class TransformerManager:
                 self._initialization_status[model_name] = "failed"
                 return None
 
+    def _export_onnx_model(self, model_name: str) -> None:
+        """
+        Write the ONNX export ahead of the load when the ONNX backend is selected
+        Runs outside every model lock; the export is published atomically, so concurrent
+        callers and worker processes at worst export twice and never read a partial one.
+        A failure here is logged and the load falls back as usual.
+        """
+        from ....config import get_settings
+
+        settings = get_settings()
+        if settings.nlp_ner_backend != "onnx" or not onnx_ner.ONNX_AVAILABLE:
+            return
+        try:
+            onnx_ner.export_onnx_ner_model(model_name, settings.nlp_ner_onnx_cache_dir,
+                                           quantize=settings.nlp_ner_onnx_quantize,
+                                           revision=settings.nlp_ner_model_revision)
+        except Exception as e:
+            logger.error(f"ONNX export of {model_name} failed: {e}")
+
+    def _build_ner_pipeline(self, model_name: str) -> Tuple[Any, str]:
+        """
+        NER pipeline on the backend selected by NLP_NER_BACKEND
+        The ONNX Runtime backend falls back to PyTorch when optimum/onnxruntime are
+        missing or the export fails, so a misconfigured node still serves Tier 2.
+        """
+        from ....config import get_settings
+
+        settings = get_settings()
+        if settings.nlp_ner_backend == "onnx":
+            if not onnx_ner.ONNX_AVAILABLE:
+                logger.warning("NLP_NER_BACKEND=onnx but optimum[onnxruntime] is not installed - using PyTorch")
+            else:
+                try:
+                    ner_pipeline = onnx_ner.load_onnx_ner_pipeline(
+                        model_name,
+                        cache_dir=settings.nlp_ner_onnx_cache_dir,
+                        quantize=settings.nlp_ner_onnx_quantize,
+                        intra_op_threads=settings.nlp_ner_onnx_intra_op_threads,
+                        revision=settings.nlp_ner_model_revision,
+                    )
+                    return ner_pipeline, "onnx-int8" if settings.nlp_ner_onnx_quantize else "onnx"
+                except Exception as e:
+                    logger.error(f"ONNX Runtime NER backend failed for {model_name}, using PyTorch: {e}")
+
+        # Load NER pipeline for medical entities
+        ner_pipeline = pipeline(
+            "ner",
+            model=model_name,
+            revision=settings.nlp_ner_model_revision,
+            aggregation_strategy="simple",
+            device=-1  # CPU inference
+        )
+        return ner_pipeline, "pytorch"
+
+    def get_ner_backend(self, model_name: str = "clinical-ai-apollo/Medical-NER") -> Optional[str]:
+        """Backend serving a loaded NER model: pytorch, onnx or onnx-int8"""
+        return self._backends.get(model_name)
+
+    def get_ner_batcher(self, model_name: str = "clinical-ai-apollo/Medical-NER") -> Optional[NERBatcher]:
+        """
+        Dynamic batching queue in front of a loaded NER pipeline
+        None when NLP_NER_BATCHING_ENABLED is off or the model is not loaded, in which
+        case callers run the pipeline directly.
+        """
+        from ....config import get_settings
+
+        settings = get_settings()
+        if not settings.nlp_ner_batching_enabled:
+            return None
+
+        with self._lock:
+            ner_pipeline = self._models.get(model_name)
+            if ner_pipeline is None:
+                return None
+            batcher = self._batchers.get(model_name)
+            if batcher is None or batcher.ner_pipeline is not ner_pipeline:
+                batcher = NERBatcher(
+                    ner_pipeline,
+                    max_batch_size=settings.nlp_ner_batch_max_size,
+                    max_wait_ms=settings.nlp_ner_batch_max_wait_ms,
+                    name=model_name.rsplit("/", 1)[-1],
+                )
+                self._batchers[model_name] = batcher
+                logger.info(f"NER batching enabled for {model_name} "
+                            f"(max_batch_size={batcher.max_batch_size}, "
+                            f"max_wait_ms={settings.nlp_ner_batch_max_wait_ms})")
+            return batcher
+
+    def get_batching_stats(self) -> Dict[str, Any]:
+        """Queue metrics per batched NER model"""
+        return {model_name: batcher.get_stats() for model_name, batcher in self._batchers.items()}
+
     def load_sentence_transformer(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2") -> Optional[Any]:
         """Load sentence transformer for embeddings"""
 
         if not TRANSFORMERS_AVAILABLE:
             return None
 
-        with self._lock:
-            embedding_key = f"embeddings_{model_name}"
+        embedding_key = f"embeddings_{model_name}"
+        with self._load_lock(embedding_key):
             if embedding_key in self._models:
                 return self._models[embedding_key]
 
@@ -93,8 +204,9 @@ class TransformerManager:
                 load_time = time.time() - start_time
                 logger.info(f"Successfully loaded embeddings model in {load_time:.2f}s")
 
-                self._models[embedding_key] = embedder
-                self._initialization_status[embedding_key] = "loaded"
+                with self._lock:
+                    self._models[embedding_key] = embedder
+                    self._initialization_status[embedding_key] = "loaded"
 
                 return embedder
 
@@ -116,4 +228,8 @@ class TransformerManager:
             for key in transformer_keys:
                 self._models.pop(key, None)
                 self._initialization_status.pop(key, None)
+                self._backends.pop(key, None)
+            for batcher in self._batchers.values():
+                batcher.close()
+            self._batchers.clear()
             logger.info("Cleared transformer model cache")
\ No newline at end of file
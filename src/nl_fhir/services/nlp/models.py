@@ -59,12 +59,21 @@ class NLPModelManager:
         }
 
     # Main extraction method - delegate to medical extractor
-    def extract_medical_entities(self, text: str) -> Dict[str, List[Dict[str, Any]]]:
+    def extract_medical_entities(self, text: str, escalate_to_llm: bool = True) -> Dict[str, List[Dict[str, Any]]]:
         """
         Extract medical entities using 4-tier approach with LLM escalation:
         Tier 1: spaCy → Tier 2: Transformers NER → Tier 3: Regex → Tier 3.5: LLM Escalation
         """
-        return self.medical_extractor.extract_medical_entities(text)
+        return self.medical_extractor.extract_medical_entities(text, escalate_to_llm)
+
+    def extract_medical_entities_batch(self, texts: List[str], batch_size: int = 32, n_process: int = 1,
+                                       escalate_to_llm: bool = True) -> List[Dict[str, List[Dict[str, Any]]]]:
+        """Extract medical entities for many texts, batching Tier 1 through nlp.pipe"""
+        return self.medical_extractor.extract_medical_entities_batch(texts, batch_size, n_process, escalate_to_llm)
+
+    def escalate_merged_result(self, text: str, results: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Tier 3.5 decided once for results assembled from several extractions of text"""
+        return self.medical_extractor.escalate_merged_result(text, results)
 
     # Quality and status methods
     def _calculate_quality_score(self, entities: Dict[str, List[Dict[str, Any]]], text: str) -> float:
@@ -127,9 +136,8 @@ class NLPModelManager:
 
     def _should_escalate_to_llm(self, result: Dict[str, List[Dict[str, Any]]], text: str) -> bool:
         """Legacy method - delegates to escalation manager"""
-        from .quality.escalation_manager import EscalationManager
-        escalation_manager = EscalationManager()
-        return escalation_manager.should_escalate_to_llm(result, text)
+        from .quality.escalation_manager import get_escalation_manager
+        return get_escalation_manager().should_escalate_to_llm(result, text)
 
     def _extract_with_llm_escalation(self, text: str, request_id: str = "llm-escalation") -> Dict[str, List[Dict[str, Any]]]:
         """Legacy method - delegates to LLM extractor"""
@@ -167,9 +175,20 @@ def get_medical_nlp_model():
     return model_manager.load_medical_ner_model()
 
 
-def extract_medical_entities(text: str) -> Dict[str, List[Dict[str, Any]]]:
+def extract_medical_entities(text: str, escalate_to_llm: bool = True) -> Dict[str, List[Dict[str, Any]]]:
     """Extract medical entities from text"""
-    return model_manager.extract_medical_entities(text)
+    return model_manager.extract_medical_entities(text, escalate_to_llm)
+
+
+def extract_medical_entities_batch(texts: List[str], batch_size: int = 32, n_process: int = 1,
+                                   escalate_to_llm: bool = True) -> List[Dict[str, List[Dict[str, Any]]]]:
+    """Extract medical entities from many texts in one batched pass"""
+    return model_manager.extract_medical_entities_batch(texts, batch_size, n_process, escalate_to_llm)
+
+
+def escalate_merged_result(text: str, results: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+    """LLM escalation (Tier 3.5) for a merged result, with at most one call over the whole text"""
+    return model_manager.escalate_merged_result(text, results)
 
 
 def get_sentence_transformer(model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
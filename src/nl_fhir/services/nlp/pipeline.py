@@ -10,10 +10,16 @@ import time
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
-from .entity_extractor import MedicalEntityExtractor
+from .entity_extractor import get_entity_extractor
 from .rag_service import RAGService
 from .llm_processor import LLMProcessor
 from .diagnostic_report_patterns import extract_diagnostic_reports
+from .process_pool import NLPProcessPool
+from .extraction_cache import ExtractionCache
+from .segmenter import merge_segment_results
+from .model_managers.transformer_manager import TransformerManager
+from .quality.tier_predictor import get_tier_predictor
+from ...config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -22,11 +28,13 @@ class NLPPipeline:
     """Unified NLP pipeline integrating all Epic 2 components"""
     
     def __init__(self):
-        self.entity_extractor = MedicalEntityExtractor()
+        self.entity_extractor = get_entity_extractor()
         self.rag_service = RAGService()
         self.llm_processor = LLMProcessor()
         self.initialized = False
         self._executor = ThreadPoolExecutor(max_workers=3)
+        self._process_pool = self._create_process_pool()
+        self._extraction_cache = self._create_extraction_cache()
         
     def initialize(self) -> bool:
         """Initialize all NLP components"""
@@ -50,8 +58,15 @@ class NLPPipeline:
             logger.error(f"Failed to initialize NLP pipeline: {e}")
             return False
     
-    async def process_clinical_text(self, text: str, request_id: Optional[str] = None) -> Dict[str, Any]:
-        """Process clinical text through complete NLP pipeline"""
+    async def process_clinical_text(self, text: str, request_id: Optional[str] = None,
+                                    entities: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """
+        Process clinical text through complete NLP pipeline
+
+        Callers that already extracted entities (e.g. via extract_entities_batch_async for
+        bulk conversion) can pass them in to skip Stage 1. Otherwise completed results are
+        served from and stored in the extraction cache when it is enabled.
+        """
         
         if not self.initialized:
             if not self.initialize():
@@ -59,12 +74,21 @@ class NLPPipeline:
                 return self._create_error_response("Pipeline not initialized")
         
         start_time = time.time()
+        use_cache = self._extraction_cache is not None and entities is None
+        
+        if use_cache:
+            cached_response = await self._cache_call(self._extraction_cache.get, text)
+            if cached_response is not None:
+                cached_response["processing_time_ms"] = (time.time() - start_time) * 1000
+                logger.info(f"[{request_id}] NLP pipeline served from extraction cache")
+                return cached_response
         
         try:
             logger.info(f"[{request_id}] Starting NLP pipeline processing")
             
             # Stage 1: Entity Extraction
-            entities = await self._extract_entities_async(text, request_id)
+            if entities is None:
+                entities = await self._extract_entities_async(text, request_id)
             
             # Stage 2: Parallel Processing - RAG Enhancement, LLM processing, and DiagnosticReport extraction
             enhanced_entities_task = self._enhance_entities_async(entities, request_id)
@@ -101,14 +125,77 @@ class NLPPipeline:
             }
             
             logger.info(f"[{request_id}] NLP pipeline completed in {total_time:.3f}s")
+            if use_cache:
+                await self._cache_call(self._extraction_cache.set, text, response)
             return response
             
         except Exception as e:
             logger.error(f"[{request_id}] NLP pipeline processing failed: {e}")
             return self._create_error_response(str(e))
     
+    def _create_process_pool(self) -> Optional[NLPProcessPool]:
+        """Create the optional process-pool extraction backend from settings"""
+        settings = get_settings()
+        if not settings.nlp_process_pool_enabled:
+            return None
+        return NLPProcessPool(
+            max_workers=settings.nlp_process_pool_workers,
+            max_queue_depth=settings.nlp_process_pool_queue_depth,
+            preload_models=settings.nlp_process_pool_preload_models
+        )
+    
+    def _create_extraction_cache(self) -> Optional[ExtractionCache]:
+        """Create the optional extraction result cache from settings"""
+        settings = get_settings()
+        if not settings.nlp_cache_enabled:
+            return None
+        return ExtractionCache(
+            max_entries=settings.nlp_cache_max_entries,
+            ttl_seconds=settings.nlp_cache_ttl_seconds,
+            memory_enabled=settings.nlp_cache_memory_enabled,
+            disk_path=settings.nlp_cache_disk_path,
+            hmac_key=settings.nlp_cache_hmac_key.encode("utf-8") if settings.nlp_cache_hmac_key else None,
+            max_disk_entries=settings.nlp_cache_disk_max_entries
+        )
+    
+    async def _cache_call(self, method, *args) -> Any:
+        """Run a cache operation, off the event loop when the disk tier is involved"""
+        try:
+            if self._extraction_cache.has_disk_tier:
+                loop = asyncio.get_event_loop()
+                return await loop.run_in_executor(self._executor, method, *args)
+            return method(*args)
+        except Exception as e:
+            # A cache failure must never fail the request
+            logger.warning(f"Extraction cache operation failed: {type(e).__name__}")
+            return None
+    
     async def _extract_entities_async(self, text: str, request_id: Optional[str]) -> List[Any]:
         """Async wrapper for entity extraction"""
+        if self._process_pool is not None:
+            try:
+                segments = self.entity_extractor.segment_text(text)
+                if segments is None:
+                    nlp_results = await self._process_pool.extract(text, request_id)
+                else:
+                    # Chunks of a long note are spread across the worker processes; the LLM
+                    # escalation is decided once on the merged note
+                    segment_results = await asyncio.gather(*(
+                        self._process_pool.extract(segment.text, request_id, escalate_to_llm=False)
+                        for segment in segments
+                    ))
+                    loop = asyncio.get_event_loop()
+                    nlp_results = await loop.run_in_executor(
+                        self._executor,
+                        self.entity_extractor._escalate_segmented_note,
+                        text,
+                        merge_segment_results(segments, segment_results)
+                    )
+                return self.entity_extractor.entities_from_nlp_results(nlp_results, request_id)
+            except Exception as e:
+                # Saturated or broken pool: keep serving from the in-process thread pool
+                logger.warning(f"[{request_id}] Process pool extraction unavailable, using thread pool: {type(e).__name__}")
+        
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(
             self._executor,
@@ -117,6 +204,21 @@ class NLPPipeline:
             request_id
         )
     
+    async def extract_entities_batch_async(self, texts: List[str], request_ids: Optional[List[str]] = None,
+                                           batch_size: int = 32, n_process: int = 1) -> List[List[Any]]:
+        """Async wrapper for batched entity extraction (one nlp.pipe pass for many texts)"""
+        if not self.initialized:
+            self.initialize()
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            self.entity_extractor.extract_entities_batch,
+            texts,
+            request_ids,
+            batch_size,
+            n_process
+        )
+    
     async def _enhance_entities_async(self, entities: List[Any], request_id: Optional[str]) -> List[Dict[str, Any]]:
         """Async wrapper for RAG enhancement"""
         loop = asyncio.get_event_loop()
@@ -129,6 +231,9 @@ class NLPPipeline:
     
     async def _generate_structured_output_async(self, text: str, entities: List[Any], request_id: Optional[str]) -> Dict[str, Any]:
         """Async wrapper for LLM structured output"""
+        if self.llm_processor.uses_async_client:
+            # Escalations are awaited on the shared async client instead of blocking a worker
+            return await self.llm_processor.aprocess_clinical_text(text, entities, request_id, self._executor)
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(
             self._executor,
@@ -270,13 +375,19 @@ class NLPPipeline:
                 "llm_processor": self.llm_processor.initialized
             },
             "knowledge_base_stats": self.rag_service.get_knowledge_stats() if self.rag_service.initialized else {},
-            "processor_status": self.llm_processor.get_processor_status() if self.llm_processor.initialized else {}
+            "processor_status": self.llm_processor.get_processor_status() if self.llm_processor.initialized else {},
+            "process_pool": self._process_pool.get_metrics() if self._process_pool is not None else {"enabled": False},
+            "extraction_cache": self._extraction_cache.get_stats() if self._extraction_cache is not None else {"enabled": False},
+            "ner_batching": TransformerManager().get_batching_stats(),
+            "tier_prediction": get_tier_predictor().get_stats()
         }
     
     def shutdown(self):
         """Shutdown pipeline and cleanup resources"""
         try:
             self._executor.shutdown(wait=True)
+            if self._process_pool is not None:
+                self._process_pool.shutdown()
             logger.info("NLP pipeline shutdown completed")
         except Exception as e:
             logger.error(f"Error during pipeline shutdown: {e}")
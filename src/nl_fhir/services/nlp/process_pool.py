@@ -0,0 +1,186 @@
+"""
+Process-Pool Worker Tier for CPU-bound NLP Extraction
+Runs the 4-tier medical entity extraction in worker processes so spaCy/transformer
+work does not hold the GIL of the API process.
+HIPAA Compliant: No PHI in logs, clinical text only crosses the process boundary in memory
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .entity_record import EntityRecord
+
+logger = logging.getLogger(__name__)
+
+# Compact wire format for worker results: one tuple per entity instead of a dict
+# (text, confidence, start, end, method, source, attributes)
+CompactEntity = Tuple[str, float, int, int, Optional[str], Optional[str], Optional[Dict[str, Any]]]
+
+
+class ProcessPoolSaturatedError(RuntimeError):
+    """Raised when the worker queue is at its configured depth"""
+
+
+def _initialize_worker(preload_models: bool) -> None:
+    """Process initializer: load the extraction models once per worker"""
+    if not preload_models:
+        return
+
+    from .models import model_manager
+
+    # Load through the extractor's own managers: those are the ones extraction reads
+    extractor = model_manager.medical_extractor
+    start_time = time.time()
+    extractor.medspacy_manager.load_medspacy_clinical_engine()
+    extractor.transformer_manager.load_medical_ner_model()
+    logger.info(f"NLP worker process preloaded models in {time.time() - start_time:.2f}s")
+
+
+def _extract_in_worker(text: str, escalate_to_llm: bool = True) -> Dict[str, List[CompactEntity]]:
+    """Worker entry point: run the tiered extraction and return compact results"""
+    from .models import extract_medical_entities
+
+    return compact_results(extract_medical_entities(text, escalate_to_llm=escalate_to_llm))
+
+
+def compact_results(nlp_results: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[CompactEntity]]:
+    """Pack categorized entity dicts into tuples for cheap pickling"""
+    return {
+        category: [
+            (
+                entity.get("text", ""),
+                entity.get("confidence", 0.8),
+                entity.get("start", 0),
+                entity.get("end", len(entity.get("text", ""))),
+                entity.get("method"),
+                entity.get("source"),
+                entity.get("attributes") or None,
+            )
+            for entity in entities
+        ]
+        for category, entities in nlp_results.items()
+    }
+
+
+def expand_results(compact: Dict[str, List[CompactEntity]]) -> Dict[str, List[EntityRecord]]:
+    """Unpack worker results back into the categorized entity record format"""
+    expanded: Dict[str, List[EntityRecord]] = {}
+    for category, entities in compact.items():
+        expanded[category] = []
+        for text, confidence, start, end, method, source, attributes in entities:
+            entity = EntityRecord(text, confidence, start, end, method, source)
+            if attributes:
+                entity["attributes"] = attributes
+            expanded[category].append(entity)
+    return expanded
+
+
+class NLPProcessPool:
+    """Bounded process pool that runs medical entity extraction off the event loop"""
+
+    def __init__(self, max_workers: int = 2, max_queue_depth: int = 64, preload_models: bool = True):
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.preload_models = preload_models
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "total_latency_ms": 0.0,
+            "max_latency_ms": 0.0,
+        }
+
+    def start(self) -> bool:
+        """Start worker processes (idempotent)"""
+        with self._lock:
+            if self._executor is not None:
+                return True
+            try:
+                # spawn avoids forking a process that already holds model/thread state
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_initialize_worker,
+                    initargs=(self.preload_models,),
+                )
+                logger.info(f"NLP process pool started with {self.max_workers} workers "
+                            f"(queue depth {self.max_queue_depth})")
+                return True
+            except Exception as e:
+                logger.error(f"Failed to start NLP process pool: {e}")
+                self._executor = None
+                return False
+
+    @property
+    def is_running(self) -> bool:
+        return self._executor is not None
+
+    async def extract(self, text: str, request_id: Optional[str] = None,
+                      escalate_to_llm: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Run tiered extraction in a worker process and return categorized entity dicts
+        With escalate_to_llm=False the worker stops at Tier 3 (used for chunks of a long note)
+        """
+        if not self.start():
+            raise RuntimeError("NLP process pool unavailable")
+
+        with self._lock:
+            if self._in_flight >= self.max_queue_depth:
+                self._metrics["rejected"] += 1
+                raise ProcessPoolSaturatedError(
+                    f"NLP process pool queue full ({self._in_flight}/{self.max_queue_depth})"
+                )
+            self._in_flight += 1
+            self._metrics["submitted"] += 1
+
+        start_time = time.time()
+        success = False
+        try:
+            loop = asyncio.get_event_loop()
+            compact = await loop.run_in_executor(self._executor, _extract_in_worker, text, escalate_to_llm)
+            success = True
+            return expand_results(compact)
+        finally:
+            latency_ms = (time.time() - start_time) * 1000
+            with self._lock:
+                self._in_flight -= 1
+                self._metrics["completed" if success else "failed"] += 1
+                self._metrics["total_latency_ms"] += latency_ms
+                self._metrics["max_latency_ms"] = max(self._metrics["max_latency_ms"], latency_ms)
+            if not success:
+                logger.warning(f"[{request_id}] NLP worker extraction failed after {latency_ms:.1f}ms")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Pool utilisation and latency metrics"""
+        with self._lock:
+            finished = self._metrics["completed"] + self._metrics["failed"]
+            return {
+                "enabled": True,
+                "running": self.is_running,
+                "max_workers": self.max_workers,
+                "max_queue_depth": self.max_queue_depth,
+                "in_flight": self._in_flight,
+                "submitted": self._metrics["submitted"],
+                "completed": self._metrics["completed"],
+                "failed": self._metrics["failed"],
+                "rejected": self._metrics["rejected"],
+                "average_latency_ms": self._metrics["total_latency_ms"] / finished if finished else 0.0,
+                "max_latency_ms": self._metrics["max_latency_ms"],
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+            logger.info("NLP process pool shutdown completed")
@@ -4,6 +4,8 @@ Handles confidence scoring, validation, and quality assessment.
 """
 
 from .quality_scorer import QualityScorer
-from .escalation_manager import EscalationManager
+from .escalation_manager import EscalationManager, get_escalation_manager
+from .tier_predictor import TierFeatures, TierPredictor, get_tier_predictor
 
-__all__ = ["QualityScorer", "EscalationManager"]
\ No newline at end of file
+__all__ = ["QualityScorer", "EscalationManager", "get_escalation_manager",
+           "TierFeatures", "TierPredictor", "get_tier_predictor"]
\ No newline at end of file
@@ -5,10 +5,21 @@ Determines when to escalate to LLM based on confidence thresholds and medical sa
 
 import logging
 import os
-from typing import Dict, List, Any
+import threading
+from typing import Dict, List, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Indicator terms are fixed, so build them once instead of on every escalation check
+CLINICAL_INDICATORS = ('prescribe', 'medication', 'patient', 'mg', 'daily', 'order', 'diagnosis')
+PATIENT_INDICATORS = ('patient', 'mr.', 'mrs.', 'ms.', 'dr.')
+CATEGORY_WEIGHTS = {
+    'medications': 3.0,  # Critical for medical safety
+    'conditions': 3.0,
+    'dosages': 2.0,  # Important for medication safety
+    'frequencies': 2.0,
+}
+
 
 class EscalationManager:
     """Manages escalation decisions for medical entity extraction"""
@@ -59,8 +70,7 @@ class EscalationManager:
         if total_entities < self.min_entities_required:
             text_lower = text.lower()
             # Check if this looks like clinical text that should have more entities
-            clinical_indicators = ['prescribe', 'medication', 'patient', 'mg', 'daily', 'order', 'diagnosis']
-            if any(indicator in text_lower for indicator in clinical_indicators):
+            if any(indicator in text_lower for indicator in CLINICAL_INDICATORS):
                 logger.info(f"Escalating to LLM: Only {total_entities} entities found, expected more for clinical text")
                 return True
 
@@ -87,8 +97,7 @@ class EscalationManager:
         """Check if escalation needed for missing patient entities"""
 
         text_lower = text.lower()
-        patient_indicators = ['patient', 'mr.', 'mrs.', 'ms.', 'dr.']
-        has_patient_mention = any(indicator in text_lower for indicator in patient_indicators)
+        has_patient_mention = any(indicator in text_lower for indicator in PATIENT_INDICATORS)
         has_patient_entities = len(result.get('patients', [])) > 0
 
         if has_patient_mention and not has_patient_entities:
@@ -109,12 +118,7 @@ class EscalationManager:
 
             for category, entities in result.items():
                 # Medical safety: Higher weights for critical entity types
-                if category in ['medications', 'conditions']:
-                    weight = 3.0  # Critical for medical safety
-                elif category in ['dosages', 'frequencies']:
-                    weight = 2.0  # Important for medication safety
-                else:
-                    weight = 1.0  # Standard weight
+                weight = CATEGORY_WEIGHTS.get(category, 1.0)
 
                 for entity in entities:
                     confidence = entity.get('confidence', 0.0)
@@ -172,4 +176,27 @@ class EscalationManager:
             if min_entities >= 0:
                 self.min_entities_required = min_entities
             else:
-                logger.warning(f"Invalid min entities required: {min_entities}, must be >= 0")
\ No newline at end of file
+                logger.warning(f"Invalid min entities required: {min_entities}, must be >= 0")
+
+
+# Shared instance: configuration is read from the environment once and the manager
+# holds no per-request state, so every extractor and thread can reuse it
+_escalation_manager: Optional[EscalationManager] = None
+_escalation_manager_lock = threading.Lock()
+
+
+def get_escalation_manager() -> EscalationManager:
+    """Get the shared EscalationManager instance"""
+    global _escalation_manager
+    if _escalation_manager is None:
+        with _escalation_manager_lock:
+            if _escalation_manager is None:
+                _escalation_manager = EscalationManager()
+    return _escalation_manager
+
+
+def reset_escalation_manager() -> None:
+    """Drop the shared instance so the next call re-reads LLM_ESCALATION_* settings"""
+    global _escalation_manager
+    with _escalation_manager_lock:
+        _escalation_manager = None
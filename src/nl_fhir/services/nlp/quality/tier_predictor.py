@@ -0,0 +1,299 @@
+"""
+Tier Predictor for Medical Entity Extraction
+Predicts which extraction tier will settle a note from cheap features of the regex
+pass (length, abbreviation density, numeric density, known-term hit rate), so notes
+that history says always fall through MedSpaCy and Transformers start at the tier
+that will actually be used. The predictor is a calibrated outcome table: features
+are bucketed, and each bucket counts which tier was sufficient for the notes that
+ran the full tier walk. A prediction is only acted on once its bucket has enough
+samples and one tier clearly dominates; a fraction of confident predictions still
+run the full walk so accuracy keeps being measured against real outcomes.
+HIPAA Compliant: Only feature buckets and tier counts are recorded, never text
+"""
+
+import bisect
+import json
+import logging
+import os
+import random
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tiers in the order extract_medical_entities walks them
+TIERS = ("medspacy", "transformer_ner", "regex", "llm")
+
+# Bucket edges for each feature; a bucket is the index returned by bisect_right
+LENGTH_EDGES = (200, 1000, 4000)
+ABBREVIATION_EDGES = (0.02, 0.08, 0.2)
+NUMERIC_EDGES = (0.05, 0.15, 0.3)
+TERM_HIT_EDGES = (0.02, 0.05, 0.15)
+
+# Bucket counts are halved past this total so the table follows drift in the traffic
+MAX_BUCKET_SAMPLES = 500
+
+CLINICAL_ABBREVIATIONS = frozenset({
+    'po', 'iv', 'im', 'sc', 'sq', 'sl', 'pr', 'qd', 'od', 'bid', 'tid', 'qid', 'prn',
+    'qhs', 'hs', 'ac', 'pc', 'stat', 'npo', 'q4h', 'q6h', 'q8h', 'q12h', 'mg', 'mcg',
+    'ml', 'iu', 'b.i.d.', 't.i.d.', 'q.i.d.', 'p.r.n.', 'q.h.s.', 'a.c.', 'p.c.'
+})
+_ACRONYM = re.compile(r'^[A-Z]{2,5}$')
+_TOKEN_EDGE_PUNCTUATION = ',;:()[]"\''
+
+
+@dataclass(frozen=True)
+class TierFeatures:
+    """Cheap per-note features computed from the text and its regex extraction"""
+    length: int
+    abbreviation_density: float
+    numeric_density: float
+    term_hit_rate: float
+
+    @classmethod
+    def from_regex_pass(cls, text: str, regex_result: Mapping[str, List[Any]]) -> "TierFeatures":
+        tokens = [token.strip(_TOKEN_EDGE_PUNCTUATION) for token in text.split()]
+        tokens = [token for token in tokens if token]
+        token_count = max(len(tokens), 1)
+        abbreviations = sum(
+            1 for token in tokens
+            if _ACRONYM.match(token) or token.lower().rstrip('.') in CLINICAL_ABBREVIATIONS
+            or token.lower() in CLINICAL_ABBREVIATIONS
+        )
+        numerics = sum(1 for token in tokens if any(char.isdigit() for char in token))
+        term_hits = sum(len(entities) for entities in regex_result.values())
+        return cls(
+            length=len(text),
+            abbreviation_density=abbreviations / token_count,
+            numeric_density=numerics / token_count,
+            term_hit_rate=term_hits / token_count,
+        )
+
+    def bucket(self) -> str:
+        """Key of the outcome-table cell these features fall into"""
+        return ".".join(str(bisect.bisect_right(edges, value)) for edges, value in (
+            (LENGTH_EDGES, self.length),
+            (ABBREVIATION_EDGES, self.abbreviation_density),
+            (NUMERIC_EDGES, self.numeric_density),
+            (TERM_HIT_EDGES, self.term_hit_rate),
+        ))
+
+
+@dataclass(frozen=True)
+class TierPrediction:
+    """Predicted sufficient tier for one note"""
+    tier: str
+    confidence: float
+    samples: int
+    bucket: str
+    confident: bool
+
+    @property
+    def start_tier(self) -> str:
+        """Tier the walk may start at: Tier 3 also decides LLM escalation, so an LLM prediction starts there"""
+        return "regex" if self.tier == "llm" else self.tier
+
+    @property
+    def skips_tiers(self) -> bool:
+        return self.confident and self.start_tier != TIERS[0]
+
+
+class TierPredictor:
+    """Bucketed outcome table that predicts, and learns, the sufficient extraction tier"""
+
+    def __init__(self, enabled: bool = False, min_samples: int = 20, min_confidence: float = 0.9,
+                 audit_rate: float = 0.1, state_path: Optional[str] = None,
+                 save_every: int = 50, rng: Optional[random.Random] = None):
+        self.enabled = enabled
+        self.min_samples = max(1, min_samples)
+        self.min_confidence = min_confidence
+        self.audit_rate = min(max(audit_rate, 0.0), 1.0)
+        self.state_path = Path(state_path) if state_path else None
+        self.save_every = max(1, save_every)
+        self._rng = rng or random.Random()
+
+        self._lock = threading.Lock()
+        self._table: Dict[str, Dict[str, float]] = {}
+        # Running mean cost of attempting each tier, from full walks
+        self._tier_ms: Dict[str, Tuple[int, float]] = {}
+        self._outcomes_since_save = 0
+        self._stats = {
+            "predictions": 0,
+            "confident_predictions": 0,
+            "short_circuits": 0,
+            "audits": 0,
+            "scored_predictions": 0,
+            "correct_predictions": 0,
+            "outcomes_recorded": 0,
+            "tiers_skipped": 0,
+            "latency_saved_ms": 0.0,
+        }
+
+        if self.state_path is not None and self.state_path.exists():
+            self.load_state()
+
+    def predict(self, features: TierFeatures) -> TierPrediction:
+        """Most frequent sufficient tier in the features' bucket"""
+        bucket = features.bucket()
+        with self._lock:
+            counts = dict(self._table.get(bucket, {}))
+            self._stats["predictions"] += 1
+            total = sum(counts.values())
+            if total:
+                tier = max(TIERS, key=lambda name: counts.get(name, 0.0))
+                confidence = counts.get(tier, 0.0) / total
+            else:
+                tier, confidence = TIERS[0], 0.0
+            confident = total >= self.min_samples and confidence >= self.min_confidence
+            if confident:
+                self._stats["confident_predictions"] += 1
+        return TierPrediction(tier, confidence, int(total), bucket, confident)
+
+    def should_audit(self) -> bool:
+        """Whether a confident prediction should still run the full walk to be scored"""
+        return self._rng.random() < self.audit_rate
+
+    def record_outcome(self, features: TierFeatures, actual_tier: str,
+                       tier_timings_ms: Optional[Mapping[str, float]] = None,
+                       prediction: Optional[TierPrediction] = None) -> None:
+        """Learn from a note that ran the full tier walk and was settled by actual_tier"""
+        if actual_tier not in TIERS:
+            return
+        with self._lock:
+            self._add_outcome(features.bucket(), actual_tier, 1.0)
+            self._stats["outcomes_recorded"] += 1
+            for tier, elapsed_ms in (tier_timings_ms or {}).items():
+                count, mean = self._tier_ms.get(tier, (0, 0.0))
+                self._tier_ms[tier] = (count + 1, mean + (elapsed_ms - mean) / (count + 1))
+            if prediction is not None and prediction.confident:
+                self._stats["scored_predictions"] += 1
+                if prediction.tier == actual_tier:
+                    self._stats["correct_predictions"] += 1
+            self._outcomes_since_save += 1
+            save_due = self.state_path is not None and self._outcomes_since_save >= self.save_every
+        if save_due:
+            self.save_state()
+
+    def record_short_circuit(self, prediction: TierPrediction) -> None:
+        """Account for the tiers a confident prediction skipped"""
+        skipped = TIERS[:TIERS.index(prediction.start_tier)]
+        with self._lock:
+            self._stats["short_circuits"] += 1
+            self._stats["tiers_skipped"] += len(skipped)
+            self._stats["latency_saved_ms"] += sum(self._tier_ms.get(tier, (0, 0.0))[1] for tier in skipped)
+
+    def record_audit(self) -> None:
+        with self._lock:
+            self._stats["audits"] += 1
+
+    def fit(self, outcomes: Iterable[Tuple[TierFeatures, str]]) -> int:
+        """Calibrate the table from logged (features, sufficient tier) outcomes; returns how many were used"""
+        used = 0
+        with self._lock:
+            for features, tier in outcomes:
+                if tier in TIERS:
+                    self._add_outcome(features.bucket(), tier, 1.0)
+                    used += 1
+        return used
+
+    def _add_outcome(self, bucket: str, tier: str, weight: float) -> None:
+        counts = self._table.setdefault(bucket, {})
+        counts[tier] = counts.get(tier, 0.0) + weight
+        if sum(counts.values()) > MAX_BUCKET_SAMPLES:
+            for name in counts:
+                counts[name] /= 2
+
+    def export_state(self) -> Dict[str, Any]:
+        """Outcome table and tier costs as plain JSON data"""
+        with self._lock:
+            return {
+                "table": {bucket: dict(counts) for bucket, counts in self._table.items()},
+                "tier_ms": {tier: list(value) for tier, value in self._tier_ms.items()},
+            }
+
+    def import_state(self, state: Mapping[str, Any]) -> None:
+        with self._lock:
+            self._table = {
+                bucket: {tier: float(count) for tier, count in counts.items() if tier in TIERS}
+                for bucket, counts in state.get("table", {}).items()
+            }
+            self._tier_ms = {
+                tier: (int(value[0]), float(value[1]))
+                for tier, value in state.get("tier_ms", {}).items() if tier in TIERS
+            }
+
+    def save_state(self) -> None:
+        """Write the table to state_path; failures are logged and the table stays in memory"""
+        if self.state_path is None:
+            return
+        state = self.export_state()
+        temp_file = self.state_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(temp_file, self.state_path)
+            with self._lock:
+                self._outcomes_since_save = 0
+        except OSError as e:
+            logger.warning(f"Could not save tier predictor state: {e}")
+            temp_file.unlink(missing_ok=True)
+
+    def load_state(self) -> None:
+        """Read the table from state_path; a missing or corrupt file leaves the predictor untrained"""
+        if self.state_path is None:
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self.import_state(json.load(f))
+            logger.info(f"Loaded tier predictor state with {len(self._table)} feature buckets")
+        except (OSError, ValueError, TypeError, IndexError, AttributeError) as e:
+            logger.warning(f"Could not load tier predictor state, starting untrained: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Prediction accuracy, short-circuit counts and estimated latency saved"""
+        with self._lock:
+            scored = self._stats["scored_predictions"]
+            return {
+                "enabled": self.enabled,
+                "min_samples": self.min_samples,
+                "min_confidence": self.min_confidence,
+                "audit_rate": self.audit_rate,
+                "buckets": len(self._table),
+                "accuracy": self._stats["correct_predictions"] / scored if scored else None,
+                "average_tier_ms": {tier: value[1] for tier, value in self._tier_ms.items()},
+                **self._stats,
+            }
+
+
+# Shared instance: the table learns from every extractor, so they all feed the same one
+_tier_predictor: Optional[TierPredictor] = None
+_tier_predictor_lock = threading.Lock()
+
+
+def get_tier_predictor() -> TierPredictor:
+    """Get the shared TierPredictor, configured from TIER_PREDICTION_* settings"""
+    global _tier_predictor
+    if _tier_predictor is None:
+        with _tier_predictor_lock:
+            if _tier_predictor is None:
+                from ....config import get_settings
+                settings = get_settings()
+                _tier_predictor = TierPredictor(
+                    enabled=settings.tier_prediction_enabled,
+                    min_samples=settings.tier_prediction_min_samples,
+                    min_confidence=settings.tier_prediction_min_confidence,
+                    audit_rate=settings.tier_prediction_audit_rate,
+                    state_path=settings.tier_prediction_state_path,
+                )
+    return _tier_predictor
+
+
+def reset_tier_predictor() -> None:
+    """Drop the shared instance so the next call re-reads TIER_PREDICTION_* settings"""
+    global _tier_predictor
+    with _tier_predictor_lock:
+        _tier_predictor = None
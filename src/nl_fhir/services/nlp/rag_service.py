@@ -9,6 +9,10 @@ from typing import List, Dict, Any, Optional, Tuple
 import json
 import time
 
+from .terminology_index import TerminologyIndex
+from ..terminology_store import terminology_table
+from ...config import get_settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,11 +31,14 @@ class RAGService:
     
     def __init__(self):
         self.initialized = False
-        self._medical_knowledge = self._load_default_medical_knowledge()
+        self._medical_knowledge = self._load_medical_knowledge()
+        self._index: Optional[TerminologyIndex] = None
+        self._embedder = None
         
     def initialize(self) -> bool:
         """Initialize RAG service with medical knowledge base"""
         try:
+            self._build_index()
             logger.info("RAG service initialized with default medical knowledge")
             self.initialized = True
             return True
@@ -40,6 +47,33 @@ class RAGService:
             logger.error(f"Failed to initialize RAG service: {e}")
             return False
     
+    def _build_index(self) -> None:
+        """Build the lexical index (and embedding matrix when semantic search is enabled) once"""
+        index = TerminologyIndex(self._medical_knowledge)
+        
+        settings = get_settings()
+        if settings.rag_semantic_search_enabled:
+            if self._embedder is None:
+                from .models import get_sentence_transformer
+                self._embedder = get_sentence_transformer(settings.rag_embedding_model)
+            if self._embedder is not None:
+                index.build_embeddings(self._encode)
+            else:
+                logger.warning("Sentence transformer unavailable - RAG using lexical lookup only")
+        
+        self._index = index
+    
+    def _encode(self, texts: List[str]):
+        """Batch-encode texts into normalized embedding rows"""
+        return self._embedder.encode(texts, normalize_embeddings=True, convert_to_numpy=True,
+                                     show_progress_bar=False)
+    
+    def add_terminology(self, entity_type: str, terms: Dict[str, Dict[str, str]]) -> None:
+        """Add {term: {code, system, display}} rows (e.g. an RxNorm/LOINC extract) and reindex"""
+        # Store-backed sections are read-only views, so merge into a new dict
+        self._medical_knowledge[entity_type] = {**self._medical_knowledge.get(entity_type, {}), **terms}
+        self._build_index()
+    
     def enhance_entities(self, entities: List[Any], request_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Enhance extracted entities with medical terminology mappings"""
         
@@ -52,8 +86,9 @@ class RAGService:
         enhanced_entities = []
         
         try:
-            for entity in entities:
-                enhanced_entity = self._enhance_single_entity(entity)
+            semantic_hits = self._semantic_matches(entities)
+            for entity, entity_semantic_hits in zip(entities, semantic_hits):
+                enhanced_entity = self._enhance_single_entity(entity, entity_semantic_hits)
                 enhanced_entities.append(enhanced_entity)
             
             processing_time = time.time() - start_time
@@ -65,7 +100,25 @@ class RAGService:
             logger.error(f"[{request_id}] RAG enhancement failed: {e}")
             return []
     
-    def _enhance_single_entity(self, entity) -> Dict[str, Any]:
+    def _semantic_matches(self, entities: List[Any]) -> List[List[Tuple[int, float]]]:
+        """Embed all entities in one batch and score them against the terminology in one matrix multiply"""
+        index = self._index
+        if index is None or not index.has_embeddings or not entities:
+            return [[] for _ in entities]
+        
+        try:
+            vectors = self._encode([entity.text for entity in entities])
+            return index.semantic_top_k(
+                vectors,
+                [entity.entity_type.value for entity in entities],
+                k=3,
+                min_score=get_settings().rag_semantic_threshold
+            )
+        except Exception as e:
+            logger.warning(f"Semantic terminology lookup failed, using lexical matches only: {type(e).__name__}")
+            return [[] for _ in entities]
+    
+    def _enhance_single_entity(self, entity, semantic_hits: Optional[List[Tuple[int, float]]] = None) -> Dict[str, Any]:
         """Enhance a single entity with medical codes"""
         
         enhanced = {
@@ -80,7 +133,7 @@ class RAGService:
         }
         
         # Look up medical codes
-        codes = self._lookup_medical_codes(entity.text, entity.entity_type.value)
+        codes = self._lookup_medical_codes(entity.text, entity.entity_type.value, semantic_hits)
         enhanced["medical_codes"] = codes
         
         # Add standardized terminology
@@ -94,31 +147,39 @@ class RAGService:
         
         return enhanced
     
-    def _lookup_medical_codes(self, entity_text: str, entity_type: str) -> List[Dict[str, Any]]:
+    def _lookup_medical_codes(self, entity_text: str, entity_type: str,
+                              semantic_hits: Optional[List[Tuple[int, float]]] = None) -> List[Dict[str, Any]]:
         """Look up medical codes for entity text"""
         
-        codes = []
-        entity_lower = entity_text.lower()
+        if self._index is None:
+            self._build_index()
+        index = self._index
         
-        # Search in relevant knowledge base section
-        knowledge_section = self._medical_knowledge.get(entity_type, {})
+        entity_lower = entity_text.lower()
+        scored: Dict[int, float] = {}
         
-        for term, code_info in knowledge_section.items():
-            # Simple string matching - would be semantic search in full implementation
-            similarity = self._calculate_similarity(entity_lower, term.lower())
-            
+        # Only index candidates can clear the threshold; score them exactly as before
+        for term_id in index.candidates(entity_lower, entity_type, min_similarity=0.6, limit=3):
+            similarity = self._calculate_similarity(entity_lower, index.terms[term_id])
             if similarity > 0.6:  # Threshold for matching
-                codes.append({
-                    "code": code_info["code"],
-                    "system": code_info["system"],
-                    "display": code_info["display"],
-                    "confidence": similarity
-                })
+                scored[term_id] = similarity
         
-        # Sort by confidence
-        codes.sort(key=lambda c: c["confidence"], reverse=True)
+        # Semantic neighbours from the batched embedding lookup fill in what lexical matching missed
+        for term_id, score in semantic_hits or ():
+            scored.setdefault(term_id, score)
         
-        return codes[:3]  # Return top 3 matches
+        # Sort by confidence (knowledge-base order breaks ties)
+        ranked = sorted(scored.items(), key=lambda item: (-item[1], item[0]))[:3]  # Return top 3 matches
+        
+        return [
+            {
+                "code": index.code_infos[term_id]["code"],
+                "system": index.code_infos[term_id]["system"],
+                "display": index.code_infos[term_id]["display"],
+                "confidence": similarity
+            }
+            for term_id, similarity in ranked
+        ]
     
     def _calculate_similarity(self, text1: str, text2: str) -> float:
         """Calculate simple similarity score between two strings"""
@@ -142,6 +203,13 @@ class RAGService:
         
         return len(intersection) / len(union)
     
+    def _load_medical_knowledge(self) -> Dict[str, Any]:
+        """Default knowledge base with sections replaced by the compiled terminology store when configured"""
+        return {
+            entity_type: terminology_table(entity_type, terms)
+            for entity_type, terms in self._load_default_medical_knowledge().items()
+        }
+    
     def _load_default_medical_knowledge(self) -> Dict[str, Dict[str, Dict[str, str]]]:
         """Load default medical terminology knowledge base"""
         
@@ -227,7 +295,12 @@ class RAGService:
     def search_terminology(self, query: str, terminology_type: str = None, max_results: int = 10) -> List[Dict[str, Any]]:
         """Search medical terminology by query"""
         
+        if self._index is None:
+            self._build_index()
+        index = self._index
+        
         results = []
+        query_lower = query.lower()
         
         # Search in specific terminology type or all types
         search_types = [terminology_type] if terminology_type else self._medical_knowledge.keys()
@@ -236,12 +309,13 @@ class RAGService:
             if term_type not in self._medical_knowledge:
                 continue
                 
-            for term, code_info in self._medical_knowledge[term_type].items():
-                similarity = self._calculate_similarity(query.lower(), term.lower())
+            for term_id in index.candidates(query_lower, term_type, min_similarity=0.3, limit=max_results):
+                similarity = self._calculate_similarity(query_lower, index.terms[term_id])
                 
                 if similarity > 0.3:  # Lower threshold for search
+                    code_info = index.code_infos[term_id]
                     results.append({
-                        "term": term,
+                        "term": index.term_keys[term_id],
                         "type": term_type,
                         "code": code_info["code"],
                         "system": code_info["system"],
@@ -266,4 +340,7 @@ class RAGService:
             stats["by_type"][term_type] = term_count
             stats["total_terms"] += term_count
         
+        if self._index is not None:
+            stats["index"] = self._index.get_stats()
+        
         return stats
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""
+Clinical Note Segmenter
+Splits long clinical notes into sentence-aligned chunks that keep their character
+offsets, so each chunk can be extracted on its own (and in parallel) and the entities
+mapped back onto the original note.
+HIPAA Compliant: Offsets and lengths only, clinical text is never logged
+"""
+
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass, replace
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from .entity_record import EntityRecord
+
+# Words that end in a period without ending the sentence
+_ABBREVIATIONS = {
+    "dr", "mr", "mrs", "ms", "pt", "vs", "no", "st", "approx", "etc", "e.g", "i.e",
+    "p.o", "b.i.d", "t.i.d", "q.i.d", "q.d", "p.r.n", "q.h.s", "h.s", "a.m", "p.m",
+}
+
+# Candidate boundaries: line breaks, or sentence punctuation followed by spaces
+_BOUNDARY = re.compile(r"\n|(?<=[.!?])[ \t]+")
+
+
+@dataclass(frozen=True)
+class TextSegment:
+    """One chunk of a note: note[start:end] == text"""
+    start: int
+    end: int
+    text: str
+
+
+def _sentence_units(text: str) -> Iterator[Tuple[int, int]]:
+    """(start, end) of each sentence or line, trimmed of surrounding whitespace"""
+    start = 0
+    for match in _BOUNDARY.finditer(text):
+        if match.group() != "\n":
+            following = text[match.end():match.end() + 1]
+            if not following or not (following.isupper() or following.isdigit() or following in "([-*•"):
+                continue
+            words = text[max(0, match.start() - 12):match.start()].split()
+            if words and words[-1].lstrip("([").rstrip(".").lower() in _ABBREVIATIONS:
+                continue
+        yield start, match.start()
+        start = match.end()
+    yield start, len(text)
+
+
+def _split_long_unit(text: str, start: int, end: int, max_chars: int) -> Iterator[Tuple[int, int]]:
+    """Cut a sentence longer than max_chars at whitespace, or hard at max_chars"""
+    while end - start > max_chars:
+        cut = text.rfind(" ", start + 1, start + max_chars)
+        if cut <= start:
+            cut = start + max_chars
+        yield start, cut
+        start = cut
+        while start < end and text[start].isspace():
+            start += 1
+    if start < end:
+        yield start, end
+
+
+def split_sentences(text: str, max_chars: int = 1000) -> List[TextSegment]:
+    """
+    Every sentence or line of the note as its own segment, trimmed of whitespace
+    Sentences longer than max_chars are cut at whitespace into several segments.
+    """
+    sentences: List[TextSegment] = []
+    for unit_start, unit_end in _sentence_units(text):
+        while unit_start < unit_end and text[unit_start].isspace():
+            unit_start += 1
+        while unit_end > unit_start and text[unit_end - 1].isspace():
+            unit_end -= 1
+        if unit_start == unit_end:
+            continue
+        for piece_start, piece_end in _split_long_unit(text, unit_start, unit_end, max_chars):
+            sentences.append(TextSegment(piece_start, piece_end, text[piece_start:piece_end]))
+    return sentences
+
+
+def segment_clinical_text(text: str, max_chars: int = 1000) -> List[TextSegment]:
+    """
+    Pack consecutive sentences into chunks of at most max_chars characters
+    Chunks break only between sentences or lines unless one sentence alone is
+    longer than max_chars. Only whitespace between chunks is left out, so every
+    entity in the note falls inside exactly one chunk.
+    """
+    segments: List[TextSegment] = []
+    chunk_start = chunk_end = None
+
+    for sentence in split_sentences(text, max_chars):
+        if chunk_start is not None and sentence.end - chunk_start > max_chars:
+            segments.append(TextSegment(chunk_start, chunk_end, text[chunk_start:chunk_end]))
+            chunk_start = None
+        if chunk_start is None:
+            chunk_start = sentence.start
+        chunk_end = sentence.end
+
+    if chunk_start is not None:
+        segments.append(TextSegment(chunk_start, chunk_end, text[chunk_start:chunk_end]))
+    return segments
+
+
+def merge_segment_results(segments: Sequence[TextSegment],
+                          segment_results: Sequence[Dict[str, List[Mapping]]]
+                          ) -> Dict[str, List[EntityRecord]]:
+    """
+    Combine per-chunk categorized results into one result for the whole note
+    Entity offsets are shifted to note coordinates. An entity reported without a
+    span is located in its chunk by text. Entities reported twice for the same span and
+    category are kept once.
+    """
+    merged: Dict[str, List[EntityRecord]] = {}
+    seen = set()
+
+    for segment, nlp_results in zip(segments, segment_results, strict=True):
+        segment_lower = segment.text.lower()
+        # Repeated mentions without a span map to successive occurrences, not all to the first
+        search_from: Dict[Tuple[str, str], int] = {}
+        for category, entities in nlp_results.items():
+            bucket = merged.setdefault(category, [])
+            for entity in entities:
+                entity_text = entity.get("text", "")
+                local_start = entity.get("start", 0)
+                local_end = entity.get("end", local_start + len(entity_text))
+                if local_end <= local_start and entity_text:
+                    # Tiers such as LLM escalation report no span: find the text in its chunk
+                    needle = entity_text.lower()
+                    found = segment_lower.find(needle, search_from.get((category, needle), 0))
+                    if found < 0:
+                        found = segment_lower.find(needle)
+                    if found >= 0:
+                        local_start, local_end = found, found + len(entity_text)
+                        search_from[category, needle] = local_end
+
+                start, end = segment.start + local_start, segment.start + local_end
+                key = (category, start, end, entity_text.lower())
+                if key in seen:
+                    continue
+                seen.add(key)
+                bucket.append(replace(EntityRecord.from_mapping(entity), start=start, end=end))
+
+    return merged
@@ -0,0 +1,398 @@
+"""
+Terminology Index for RAG Code Lookup
+Built once from the medical knowledge base: lexical indexes that return only the terms
+that can clear a similarity threshold, plus an optional normalized embedding matrix
+for batched semantic top-k over every entity in a request.
+Sections served from a terminology store built with terminology_index_tables() read
+their postings from the memory-mapped file instead of being indexed in every process.
+HIPAA Compliant: Only terminology is indexed, entity text is never stored
+"""
+
+import bisect
+import logging
+from collections import defaultdict
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from ..terminology_store import TerminologyTable
+
+logger = logging.getLogger(__name__)
+
+# Substring postings are kept for every gram up to this length; longer queries are
+# narrowed through their rarest gram and verified with a substring check
+_MAX_GRAM = 3
+
+# Store tables holding a section's postings, named "<section>.index.<kind>"
+_INDEX_KINDS = ("terms", "exact", "grams", "gram_counts", "tokens", "token_counts", "meta")
+# Term ids are zero-padded so key order is id order and TerminologyTable.value_at finds them directly
+_TERM_ID_WIDTH = 10
+
+
+def _index_table_name(section: str, kind: str) -> str:
+    return f"{section}.index.{kind}"
+
+
+class _MemorySection:
+    """Postings for one knowledge-base section, built in memory"""
+
+    persisted = False
+
+    def __init__(self, section: Mapping):
+        self.term_keys: List[str] = []
+        self.terms: List[str] = []
+        self.code_infos: List[Dict[str, str]] = []
+        self._term_tokens: List[frozenset] = []
+        self._exact: Dict[str, List[int]] = defaultdict(list)
+        # token -> {term token count: term ids}
+        self._tokens: Dict[str, Dict[int, List[int]]] = defaultdict(lambda: defaultdict(list))
+        self._grams: Dict[str, List[int]] = defaultdict(list)
+        self.term_lengths: Set[int] = set()
+
+        for term, code_info in section.items():
+            self._add_term(term, code_info)
+
+    def _add_term(self, term: str, code_info: Dict[str, str]) -> None:
+        term_id = len(self.terms)
+        term_lower = term.lower()
+        self.terms.append(term_lower)
+        self.term_keys.append(term)
+        self.code_infos.append(code_info)
+
+        self._exact[term_lower].append(term_id)
+        self.term_lengths.add(len(term_lower))
+        term_tokens = frozenset(term_lower.split())
+        self._term_tokens.append(term_tokens)
+        for token in term_tokens:
+            self._tokens[token][len(term_tokens)].append(term_id)
+        grams = {
+            term_lower[start:start + size]
+            for size in range(1, _MAX_GRAM + 1)
+            for start in range(len(term_lower) - size + 1)
+        }
+        for gram in grams:
+            self._grams[gram].append(term_id)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def term(self, term_id: int) -> str:
+        return self.terms[term_id]
+
+    def term_key(self, term_id: int) -> str:
+        return self.term_keys[term_id]
+
+    def code_info(self, term_id: int) -> Dict[str, str]:
+        return self.code_infos[term_id]
+
+    def term_tokens(self, term_id: int) -> frozenset:
+        return self._term_tokens[term_id]
+
+    def iter_terms(self) -> Iterator[str]:
+        return iter(self.terms)
+
+    def exact_ids(self, term_lower: str) -> Sequence[int]:
+        return self._exact.get(term_lower, ())
+
+    def gram_ids(self, gram: str) -> Sequence[int]:
+        return self._grams.get(gram, ())
+
+    def gram_count(self, gram: str) -> int:
+        return len(self._grams.get(gram, ()))
+
+    def token_postings(self, token: str) -> Dict[int, List[int]]:
+        return self._tokens.get(token, {})
+
+    def token_count(self, token: str) -> int:
+        return sum(len(term_ids) for term_ids in self._tokens.get(token, {}).values())
+
+    def key_counts(self) -> Tuple[int, int]:
+        return len(self._tokens), len(self._grams)
+
+    def to_tables(self, name: str) -> Dict[str, Dict[str, Any]]:
+        return {
+            _index_table_name(name, "terms"): {
+                f"{term_id:0{_TERM_ID_WIDTH}d}": term for term_id, term in enumerate(self.term_keys)
+            },
+            _index_table_name(name, "exact"): dict(self._exact),
+            _index_table_name(name, "grams"): dict(self._grams),
+            _index_table_name(name, "gram_counts"): {gram: len(ids) for gram, ids in self._grams.items()},
+            _index_table_name(name, "tokens"): {token: dict(by_count) for token, by_count in self._tokens.items()},
+            _index_table_name(name, "token_counts"): {
+                token: sum(len(ids) for ids in by_count.values()) for token, by_count in self._tokens.items()
+            },
+            _index_table_name(name, "meta"): {"terms": len(self.terms), "term_lengths": sorted(self.term_lengths)},
+        }
+
+
+class _StoreSection:
+    """Postings for one section read from the terminology store; nothing is decoded up front"""
+
+    persisted = True
+
+    def __init__(self, table: TerminologyTable):
+        store = table.store
+        self._table = table
+        self._terms = store.table(_index_table_name(table.name, "terms"))
+        self._exact = store.table(_index_table_name(table.name, "exact"))
+        self._grams = store.table(_index_table_name(table.name, "grams"))
+        self._gram_counts = store.table(_index_table_name(table.name, "gram_counts"))
+        self._tokens = store.table(_index_table_name(table.name, "tokens"))
+        self._token_counts = store.table(_index_table_name(table.name, "token_counts"))
+        self.term_lengths: List[int] = store.get(_index_table_name(table.name, "meta"), "term_lengths")
+
+    @classmethod
+    def open(cls, section: Any) -> Optional["_StoreSection"]:
+        """Store-backed postings for section, or None when the store has none matching it"""
+        if not isinstance(section, TerminologyTable):
+            return None
+        store = section.store
+        if not all(store.has_table(_index_table_name(section.name, kind)) for kind in _INDEX_KINDS):
+            return None
+        if store.get(_index_table_name(section.name, "meta"), "terms") != len(section):
+            logger.warning(f"Stored index for {section.name} does not match the table, indexing in memory")
+            return None
+        return cls(section)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def term(self, term_id: int) -> str:
+        return self.term_key(term_id).lower()
+
+    def term_key(self, term_id: int) -> str:
+        return self._terms.value_at(term_id)
+
+    def code_info(self, term_id: int) -> Dict[str, str]:
+        return self._table[self.term_key(term_id)]
+
+    def term_tokens(self, term_id: int) -> frozenset:
+        return frozenset(self.term(term_id).split())
+
+    def iter_terms(self) -> Iterator[str]:
+        return (term.lower() for _, term in self._terms.items())
+
+    def exact_ids(self, term_lower: str) -> Sequence[int]:
+        return self._exact.get(term_lower, ())
+
+    def gram_ids(self, gram: str) -> Sequence[int]:
+        return self._grams.get(gram, ())
+
+    def gram_count(self, gram: str) -> int:
+        return self._gram_counts.get(gram, 0)
+
+    def token_postings(self, token: str) -> Dict[int, List[int]]:
+        return {int(count): term_ids for count, term_ids in self._tokens.get(token, {}).items()}
+
+    def token_count(self, token: str) -> int:
+        return self._token_counts.get(token, 0)
+
+    def key_counts(self) -> Tuple[int, int]:
+        return len(self._tokens), len(self._grams)
+
+
+class _TermView:
+    """Read-only sequence over one term attribute, addressed by global term id"""
+
+    def __init__(self, index: "TerminologyIndex", value: Callable[[int, int], Any]):
+        self._index = index
+        self._value = value
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, term_id: int) -> Any:
+        return self._value(*self._index._locate(term_id))
+
+
+def terminology_index_tables(name: str, section: Mapping) -> Dict[str, Dict[str, Any]]:
+    """
+    Store tables holding the lexical postings of one knowledge-base section
+
+    Build them into the same store file as the section table itself (see
+    scripts/build_terminology_store.py); TerminologyIndex then reads them through the
+    mmap instead of indexing the section in every process.
+    """
+    return _MemorySection(dict(section)).to_tables(name)
+
+
+class TerminologyIndex:
+    """Inverted lexical indexes and embedding matrix over {entity_type: {term: code_info}}"""
+
+    def __init__(self, knowledge: Dict[str, Mapping]):
+        # Term ids are assigned in knowledge-base order so ties sort like a linear scan
+        self._sections: Dict[str, Any] = {}
+        self._offsets: Dict[str, int] = {}
+        self._starts: List[int] = []
+        self._ordered: List[Any] = []
+        self._ordered_types: List[str] = []
+        self._size = 0
+        self._embedding_matrix: Optional[np.ndarray] = None
+        self._embedding_type_ids: Optional[np.ndarray] = None
+        self._type_ids: Dict[str, int] = {}
+
+        for entity_type, section in knowledge.items():
+            indexed = _StoreSection.open(section) or _MemorySection(section)
+            self._sections[entity_type] = indexed
+            self._offsets[entity_type] = self._size
+            self._starts.append(self._size)
+            self._ordered.append(indexed)
+            self._ordered_types.append(entity_type)
+            self._type_ids.setdefault(entity_type, len(self._type_ids))
+            self._size += len(indexed)
+
+        self.terms = _TermView(self, lambda position, term_id: self._ordered[position].term(term_id))
+        self.term_keys = _TermView(self, lambda position, term_id: self._ordered[position].term_key(term_id))
+        self.code_infos = _TermView(self, lambda position, term_id: self._ordered[position].code_info(term_id))
+        self.term_types = _TermView(self, lambda position, term_id: self._ordered_types[position])
+
+        persisted = [name for name, section in self._sections.items() if section.persisted]
+        logger.info(f"Terminology index built over {self._size} terms"
+                    + (f" (stored postings for {', '.join(persisted)})" if persisted else ""))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _locate(self, term_id: int) -> Tuple[int, int]:
+        """(section position, id within the section) of a global term id"""
+        if not 0 <= term_id < self._size:
+            raise IndexError(term_id)
+        position = bisect.bisect_right(self._starts, term_id) - 1
+        # Empty sections share their start with the next one; bisect_right lands on the last of them
+        return position, term_id - self._starts[position]
+
+    def candidates(self, query_lower: str, entity_type: str, min_similarity: float = 0.0,
+                   limit: Optional[int] = None) -> List[int]:
+        """
+        Ids (in knowledge-base order) of the terms in entity_type that can score above
+        min_similarity with RAGService._calculate_similarity
+
+        Covers exact matches, substrings either way and shared whitespace tokens. When
+        limit is given, "term contains query" matches (all scored 0.8) stop after the
+        first limit hits, since later ones can never outrank them.
+        """
+        section = self._sections.get(entity_type)
+        if section is None:
+            return []
+        offset = self._offsets[entity_type]
+        if not query_lower:
+            # The empty string is a substring of every term
+            return list(range(offset, offset + len(section)))
+
+        found: Set[int] = set()
+
+        # Query contains the term: probe every query substring of a known term length
+        for length in section.term_lengths:
+            for start in range(len(query_lower) - length + 1):
+                found.update(section.exact_ids(query_lower[start:start + length]))
+
+        # Term contains the query: short queries are indexed directly, longer ones are
+        # narrowed through their rarest gram and verified
+        if len(query_lower) <= _MAX_GRAM:
+            postings = section.gram_ids(query_lower)
+            found.update(postings[:limit] if limit else postings)
+        else:
+            rarest = min(
+                (query_lower[start:start + _MAX_GRAM] for start in range(len(query_lower) - _MAX_GRAM + 1)),
+                key=section.gram_count
+            )
+            hits = 0
+            for term_id in section.gram_ids(rarest):
+                if query_lower in section.term(term_id):
+                    found.add(term_id)
+                    hits += 1
+                    if limit and hits >= limit:
+                        break
+
+        # Shared tokens (word-overlap similarity). Jaccard > t needs t*|A| < |B| < |A|/t and
+        # more than t*|A| shared tokens, so only the rarest |A| - shared + 1 query tokens
+        # need scanning (prefix filtering)
+        query_tokens = set(query_lower.split())
+        min_count = min_similarity * len(query_tokens)
+        max_count = len(query_tokens) / min_similarity if min_similarity > 0 else float("inf")
+        required_shared = int(min_count) + 1 if min_similarity > 0 else 1
+        rarest_tokens = sorted(query_tokens, key=section.token_count)
+        for token in rarest_tokens[:max(len(query_tokens) - required_shared + 1, 0)]:
+            for count, term_ids in section.token_postings(token).items():
+                if not min_count <= count <= max_count:
+                    continue
+                if min_similarity <= 0:
+                    found.update(term_ids)
+                    continue
+                for term_id in term_ids:
+                    shared = len(query_tokens & section.term_tokens(term_id))
+                    # Same expression as the Jaccard score so float rounding agrees
+                    if shared / (len(query_tokens) + count - shared) > min_similarity:
+                        found.add(term_id)
+
+        return sorted(offset + term_id for term_id in found)
+
+    @property
+    def has_embeddings(self) -> bool:
+        return self._embedding_matrix is not None
+
+    def build_embeddings(self, encode: Callable[[List[str]], np.ndarray]) -> bool:
+        """Encode every term once into a row-normalized float32 matrix"""
+        if not self._size:
+            return False
+        try:
+            terms = [term for section in self._ordered for term in section.iter_terms()]
+            matrix = np.asarray(encode(terms), dtype=np.float32)
+            self._embedding_matrix = _normalize_rows(matrix)
+            self._embedding_type_ids = np.repeat(
+                np.array([self._type_ids[entity_type] for entity_type in self._sections], dtype=np.int32),
+                [len(section) for section in self._sections.values()]
+            )
+            logger.info(f"Terminology embedding matrix built: {self._embedding_matrix.shape}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to build terminology embeddings, using lexical lookup only: {e}")
+            self._embedding_matrix = None
+            self._embedding_type_ids = None
+            return False
+
+    def semantic_top_k(self, query_vectors: np.ndarray, entity_types: Sequence[str],
+                       k: int = 3, min_score: float = 0.0) -> List[List[Tuple[int, float]]]:
+        """
+        Cosine top-k for a batch of queries in one matrix multiply
+
+        Each query only competes against terms of its own entity type. Returns, per
+        query, (term_id, score) pairs with score >= min_score, best first.
+        """
+        if self._embedding_matrix is None or len(entity_types) == 0:
+            return [[] for _ in entity_types]
+
+        queries = _normalize_rows(np.asarray(query_vectors, dtype=np.float32))
+        scores = queries @ self._embedding_matrix.T
+        query_type_ids = np.array([self._type_ids.get(t, -1) for t in entity_types], dtype=np.int32)
+        scores[query_type_ids[:, None] != self._embedding_type_ids[None, :]] = -np.inf
+
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, columns in enumerate(top):
+            ranked = sorted(columns, key=lambda column: (-scores[row, column], column))
+            results.append([
+                (int(column), float(scores[row, column]))
+                for column in ranked if scores[row, column] >= min_score
+            ])
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        key_counts = [section.key_counts() for section in self._ordered]
+        return {
+            "terms": self._size,
+            "token_keys": sum(tokens for tokens, _ in key_counts),
+            "gram_keys": sum(grams for _, grams in key_counts),
+            "stored_sections": [name for name, section in self._sections.items() if section.persisted],
+            "embeddings": None if self._embedding_matrix is None else list(self._embedding_matrix.shape),
+        }
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
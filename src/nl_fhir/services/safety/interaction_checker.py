@@ -8,6 +8,8 @@ from enum import Enum
 from dataclasses import dataclass
 import re
 
+from ..terminology_store import terminology_table
+
 
 class InteractionSeverity(Enum):
     """Drug interaction severity levels"""
@@ -45,7 +47,7 @@ class DrugInteractionChecker:
     
     def __init__(self):
         self.interaction_database = self._initialize_interaction_database()
-        self.drug_name_normalizer = self._initialize_drug_normalizer()
+        self.drug_name_normalizer = terminology_table("drug_normalizer", self._initialize_drug_normalizer())
     
     def check_bundle_interactions(self, bundle: Dict[str, Any]) -> Dict[str, Any]:
         """
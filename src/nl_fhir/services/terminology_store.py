@@ -0,0 +1,419 @@
+"""
+Memory-Mapped Terminology Store
+Compiled, read-only code tables (RxNorm, LOINC, SNOMED CT, ICD-10, brand names) shared
+by every worker process through the OS page cache instead of per-process dict copies.
+
+File layout (little endian):
+    header   magic, version, entry count, section offsets
+    entries  (key offset, key length, value length) per entry, sorted by key bytes
+    order    entry numbers in build order, grouped by table
+    ranks    each entry's place in its table's build order (the inverse of order)
+    data     "<table>\\x00<key>" UTF-8 bytes followed by the JSON-encoded value
+
+Lookups binary-search the entries section, so opening a store costs the same for ten
+rows or ten million and only the touched pages are ever read. Mention lookups
+(TermMentionIndex) narrow the same sorted keys one character at a time.
+HIPAA Compliant: Terminology only, no patient data
+"""
+
+import bisect
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"NLFHIRTS"
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct("<8sIIQQQQ")
+_ENTRY = struct.Struct("<QII")
+_ORDER = struct.Struct("<I")
+_RANK = struct.Struct("<I")
+_SEPARATOR = b"\x00"
+
+
+class TerminologyStoreError(Exception):
+    """Raised when a terminology store file is missing, truncated or of another format"""
+
+
+class _SortedKeys:
+    """Sequence view of the sorted entry keys for the C bisect functions"""
+
+    __slots__ = ("_store",)
+
+    def __init__(self, store: "TerminologyStore"):
+        self._store = store
+
+    def __len__(self) -> int:
+        return self._store._count
+
+    def __getitem__(self, position: int) -> bytes:
+        return self._store._key_bytes(position)
+
+
+class TerminologyTable(Mapping):
+    """
+    Read-only mapping over one table of a store
+
+    Supports get/in/[]/len like the dicts it replaces; iteration follows the order the
+    rows were given to the builder, so first-match scans behave as before.
+    """
+
+    def __init__(self, store: "TerminologyStore", name: str, start: int, stop: int):
+        self._store = store
+        self.name = name
+        self._prefix = name.encode("utf-8") + _SEPARATOR
+        self._start = start
+        self._stop = stop
+
+    def __getitem__(self, key: str) -> Any:
+        position = self._store._find(self._prefix + key.encode("utf-8"), self._start, self._stop)
+        if position is None:
+            raise KeyError(key)
+        return self._store._value(position)
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        return self._store._find(self._prefix + key.encode("utf-8"), self._start, self._stop) is not None
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    @property
+    def store(self) -> "TerminologyStore":
+        return self._store
+
+    def value_at(self, index: int) -> Any:
+        """Value of the index-th row in key order (O(1); keys padded to one width sort numerically)"""
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._store._value(self._start + index)
+
+    def __iter__(self) -> Iterator[str]:
+        for position in self._store._build_order(self._start, self._stop):
+            yield self._store._key(position, len(self._prefix))
+
+    def items(self) -> Iterator[Tuple[str, Any]]:  # type: ignore[override]
+        prefix_length = len(self._prefix)
+        for position in self._store._build_order(self._start, self._stop):
+            yield self._store._key(position, prefix_length), self._store._value(position)
+
+    def mentions(self, text: str) -> Iterator[Tuple[int, str]]:
+        """
+        (build rank, key) of every key occurring in text as a substring
+
+        Each start offset narrows the table's sorted key range one byte at a time and
+        stops as soon as no key has that prefix, so the cost depends on the text and
+        log(table size), never on reading the table.
+        """
+        store = self._store
+        encoded = text.encode("utf-8")
+        prefix_length = len(self._prefix)
+        for start in range(len(encoded)):
+            if 0x80 <= encoded[start] < 0xC0:
+                continue  # UTF-8 continuation byte: no key starts here
+            low, high = self._start, self._stop
+            for end in range(start + 1, len(encoded) + 1):
+                probe = self._prefix + encoded[start:end]
+                low = bisect.bisect_left(store._keys, probe, low, high)
+                # UTF-8 never contains 0xFF, so this bounds the keys starting with probe
+                high = bisect.bisect_left(store._keys, probe + b"\xff", low, high)
+                if low == high:
+                    break
+                if store._key_bytes(low) == probe:
+                    yield store._rank(low), store._key(low, prefix_length)
+
+    def __repr__(self) -> str:
+        return f"TerminologyTable({self.name!r}, {len(self)} entries)"
+
+
+class TerminologyStore:
+    """Read-only memory-mapped terminology file with binary-search lookup"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        try:
+            with open(self.path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise TerminologyStoreError(f"Cannot open terminology store {self.path}: {e}") from e
+
+        if len(self._mmap) < _HEADER.size:
+            self._mmap.close()
+            raise TerminologyStoreError(f"Terminology store {self.path} is truncated")
+        magic, version, count, entries_offset, order_offset, ranks_offset, data_offset = \
+            _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mmap.close()
+            raise TerminologyStoreError(f"{self.path} is not a version {FORMAT_VERSION} terminology store")
+        if data_offset > len(self._mmap) or ranks_offset + count * _RANK.size > data_offset:
+            self._mmap.close()
+            raise TerminologyStoreError(f"Terminology store {self.path} is truncated")
+
+        self._count = count
+        self._entries_offset = entries_offset
+        self._order_offset = order_offset
+        self._ranks_offset = ranks_offset
+        self._keys = _SortedKeys(self)
+        self._tables = self._scan_tables()
+
+    def __enter__(self) -> "TerminologyStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    @property
+    def tables(self) -> List[str]:
+        return sorted(self._tables)
+
+    def has_table(self, name: str) -> bool:
+        return name in self._tables
+
+    def table(self, name: str) -> TerminologyTable:
+        """Mapping view of one table; an unknown table name raises KeyError"""
+        start, stop = self._tables[name]
+        return TerminologyTable(self, name, start, stop)
+
+    def get(self, table: str, key: str, default: Any = None) -> Any:
+        bounds = self._tables.get(table)
+        if bounds is None:
+            return default
+        position = self._find(table.encode("utf-8") + _SEPARATOR + key.encode("utf-8"), *bounds)
+        return default if position is None else self._value(position)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "entries": self._count,
+            "bytes": len(self._mmap),
+            "tables": {name: stop - start for name, (start, stop) in sorted(self._tables.items())},
+        }
+
+    def _scan_tables(self) -> Dict[str, Tuple[int, int]]:
+        """Locate each table's contiguous entry range with one binary search per table"""
+        tables = {}
+        position = 0
+        while position < self._count:
+            key = self._key_bytes(position)
+            name = key[:key.index(_SEPARATOR)]
+            # 0x01 sorts directly after the separator, so this is the end of the table
+            stop = bisect.bisect_left(self._keys, name + b"\x01", position)
+            tables[name.decode("utf-8")] = (position, stop)
+            position = stop
+        return tables
+
+    def _entry(self, position: int) -> Tuple[int, int, int]:
+        return _ENTRY.unpack_from(self._mmap, self._entries_offset + position * _ENTRY.size)
+
+    def _key_bytes(self, position: int) -> bytes:
+        key_offset, key_length, _ = self._entry(position)
+        return self._mmap[key_offset:key_offset + key_length]
+
+    def _key(self, position: int, prefix_length: int) -> str:
+        key_offset, key_length, _ = self._entry(position)
+        return self._mmap[key_offset + prefix_length:key_offset + key_length].decode("utf-8")
+
+    def _value(self, position: int) -> Any:
+        key_offset, key_length, value_length = self._entry(position)
+        value_offset = key_offset + key_length
+        return json.loads(self._mmap[value_offset:value_offset + value_length])
+
+    def _find(self, key: bytes, start: int, stop: int) -> Optional[int]:
+        position = bisect.bisect_left(self._keys, key, start, stop)
+        if position < stop and self._key_bytes(position) == key:
+            return position
+        return None
+
+    def _rank(self, position: int) -> int:
+        return _RANK.unpack_from(self._mmap, self._ranks_offset + position * _RANK.size)[0]
+
+    def _build_order(self, start: int, stop: int) -> Iterator[int]:
+        for offset in range(self._order_offset + start * _ORDER.size,
+                            self._order_offset + stop * _ORDER.size, _ORDER.size):
+            yield _ORDER.unpack_from(self._mmap, offset)[0]
+
+
+def build_terminology_store(path: Union[str, Path],
+                            tables: Mapping) -> Dict[str, int]:
+    """
+    Compile {table: {key: value} or iterable of (key, value)} into a store file
+
+    Values may be anything JSON serializable. Later duplicates of a key replace the
+    value but keep the first position, as with dict updates. The file is written to a
+    temporary name and renamed into place, so running workers keep their old mapping.
+    Returns the entry count per table.
+    """
+    path = Path(path)
+    rows: List[Tuple[bytes, bytes, int]] = []
+    counts: Dict[str, int] = {}
+    for name, table_rows in tables.items():
+        if not name or "\x00" in name:
+            raise ValueError(f"Invalid terminology table name: {name!r}")
+        ordered = dict(table_rows.items() if isinstance(table_rows, Mapping) else table_rows)
+        prefix = name.encode("utf-8") + _SEPARATOR
+        for key, value in ordered.items():
+            rows.append((prefix + str(key).encode("utf-8"),
+                         json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8"),
+                         len(rows)))
+        counts[name] = len(ordered)
+
+    rows.sort(key=lambda row: row[0])
+    count = len(rows)
+    entries_offset = _HEADER.size
+    order_offset = entries_offset + count * _ENTRY.size
+    ranks_offset = order_offset + count * _ORDER.size
+    data_offset = ranks_offset + count * _RANK.size
+
+    # Build order within each table: sorted positions ranked by the row's input sequence.
+    # Tables occupy the same contiguous ranges in both sections because they sort as units.
+    sorted_positions = sorted(range(count), key=lambda position: (_table_of(rows[position][0]), rows[position][2]))
+    ranks = [0] * count
+    table_start = 0
+    for order_index, position in enumerate(sorted_positions):
+        if order_index and _table_of(rows[position][0]) != _table_of(rows[sorted_positions[order_index - 1]][0]):
+            table_start = order_index
+        ranks[position] = order_index - table_start
+
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, count, entries_offset, order_offset, ranks_offset,
+                                 data_offset))
+            offset = data_offset
+            for key, value, _ in rows:
+                f.write(_ENTRY.pack(offset, len(key), len(value)))
+                offset += len(key) + len(value)
+            for position in sorted_positions:
+                f.write(_ORDER.pack(position))
+            for rank in ranks:
+                f.write(_RANK.pack(rank))
+            for key, value, _ in rows:
+                f.write(key)
+                f.write(value)
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    logger.info(f"Terminology store written to {path}: {count} entries in {len(counts)} tables")
+    return counts
+
+
+def _table_of(key: bytes) -> bytes:
+    return key[:key.index(_SEPARATOR)]
+
+
+_store: Optional[TerminologyStore] = None
+_store_path: Optional[str] = None
+_store_lock = threading.Lock()
+
+
+def get_terminology_store() -> Optional[TerminologyStore]:
+    """
+    Process-wide store opened from settings.terminology_store_path, or None
+
+    An unreadable file is logged once and the built-in tables stay in use.
+    """
+    global _store, _store_path
+    from ..config import get_settings
+
+    path = get_settings().terminology_store_path
+    if path != _store_path:
+        with _store_lock:
+            if path != _store_path:
+                store = None
+                if path:
+                    try:
+                        store = TerminologyStore(path)
+                        logger.info(f"Terminology store loaded: {store.get_stats()['tables']}")
+                    except TerminologyStoreError as e:
+                        logger.error(f"{e} - using built-in terminology tables")
+                # Publish the store before the path so a reader that sees the new path gets it
+                _store = store
+                _store_path = path
+    return _store
+
+
+def terminology_table(name: str, default: Any) -> Any:
+    """The named store table when a store is configured and has it, otherwise default"""
+    store = get_terminology_store()
+    if store is not None and store.has_table(name):
+        return store.table(name)
+    return default
+
+
+class TermMentionIndex:
+    """
+    First key of a code table mentioned in a text, without scanning the table
+
+    Replaces "for key, value in table.items(): if key in text" loops (keys also match
+    with underscores read as spaces); ties go to the key that comes first in the
+    table's iteration order, as in the loops it replaces.
+
+    Store-backed tables are probed through their sorted keys (TerminologyTable.mentions),
+    so setup is free and nothing is copied per process. Plain dicts get a keyword
+    automaton, built on first use and only up to MATCHER_MAX_KEYS keys; larger dicts
+    keep the linear scan. A store key containing both spaces and underscores only
+    matches literally.
+    """
+
+    MATCHER_MAX_KEYS = 5000
+
+    def __init__(self, table: Mapping):
+        self._table = table
+        self._keys: Optional[List[str]] = None
+        self._matcher = None
+        self._matcher_lock = threading.Lock()
+
+    def lookup(self, text: str) -> Optional[Tuple[str, Any]]:
+        """(key, value) of the first-ordered key occurring in text, or None"""
+        text = text.lower()
+        if isinstance(self._table, TerminologyTable):
+            key = self._first_store_mention(text)
+        elif len(self._table) <= self.MATCHER_MAX_KEYS:
+            key = self._first_matcher_mention(text)
+        else:
+            key = next((key for key in self._table if key.replace("_", " ") in text or key in text), None)
+        return None if key is None else (key, self._table[key])
+
+    def _first_store_mention(self, text: str) -> Optional[str]:
+        # Keys with underscores show up in the underscored copy of the text; each candidate
+        # is then checked against the original condition
+        candidates = dict(self._table.mentions(text))
+        spaced = text.replace(" ", "_")
+        if spaced != text:
+            candidates.update(self._table.mentions(spaced))
+        matches = [(rank, key) for rank, key in candidates.items()
+                   if key.replace("_", " ") in text or key in text]
+        return min(matches)[1] if matches else None
+
+    def _first_matcher_mention(self, text: str) -> Optional[str]:
+        if self._matcher is None:
+            with self._matcher_lock:
+                if self._matcher is None:
+                    # Imported here: the nlp package imports this module while it initializes
+                    from .nlp.keyword_matcher import KeywordMatcher
+
+                    self._keys = list(self._table)
+                    self._matcher = KeywordMatcher(
+                        (form, index)
+                        for index, key in enumerate(self._keys)
+                        for form in dict.fromkeys((key, key.replace("_", " ")))
+                    )
+        first = min((index for _, _, index in self._matcher.iter_matches(text)), default=None)
+        return None if first is None else self._keys[first]
@@ -0,0 +1,267 @@
+"""
+Tests for the async LLM escalation client against a local OpenAI-compatible stub server
+Covers connection reuse, the concurrency cap, single-flight deduplication and micro-batching.
+HIPAA Compliant: No PHI in test data
+"""
+
+import asyncio
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import openai
+import pytest
+
+from nl_fhir.services.nlp.llm.async_client import AsyncLLMClient
+from nl_fhir.services.nlp.llm.llm_processor import LLMProcessor
+
+NOTE_PATTERN = re.compile(r'Note (\d+): "(.*)"')
+TEXT_PATTERN = re.compile(r'Clinical Text: "(.*)"')
+# Captured at collection, before the session fixture in conftest mocks the sync client class
+REAL_OPENAI = openai.OpenAI
+
+
+class StubLLMServer:
+    """Answers chat completions with a tool call naming the first word of each note as a medication"""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.requests = []
+        self.client_ports = set()
+        self.active = 0
+        self.max_active = 0
+        self.drop_notes = set()
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}/v1"
+
+    def _structure(self, text):
+        return {"medications": [{"name": text.split()[0], "dosage": "500mg", "frequency": "daily"}]}
+
+    def _respond(self, body):
+        tool = body["tools"][0]["function"]["name"]
+        prompt = body["messages"][-1]["content"]
+        if tool == "ClinicalStructureBatch":
+            notes = [
+                {"note_id": int(number), **self._structure(text)}
+                for number, text in NOTE_PATTERN.findall(prompt) if int(number) not in self.drop_notes
+            ]
+            arguments = {"notes": notes}
+        else:
+            arguments = self._structure(TEXT_PATTERN.search(prompt).group(1))
+        return {
+            "id": "stub", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {
+                "role": "assistant", "content": None,
+                "tool_calls": [{"id": "call", "type": "function",
+                                "function": {"name": tool, "arguments": json.dumps(arguments)}}]
+            }}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub._lock:
+                    stub.requests.append(body)
+                    stub.client_ports.add(self.client_address[1])
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                time.sleep(stub.delay)
+                with stub._lock:
+                    stub.active -= 1
+                payload = json.dumps(stub._respond(body)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    with StubLLMServer() as server:
+        yield server
+
+
+@pytest.fixture
+def make_client(stub):
+    clients = []
+
+    def factory(**kwargs):
+        client = AsyncLLMClient(api_key="sk-stub", base_url=stub.base_url, timeout_seconds=5, **kwargs)
+        clients.append(client)
+        return client
+
+    # instructor type-checks against openai.OpenAI, which conftest replaces with a mock
+    with patch("openai.OpenAI", REAL_OPENAI):
+        yield factory
+    for client in clients:
+        client.close()
+
+
+def tool_names(stub):
+    return [request["tools"][0]["function"]["name"] for request in stub.requests]
+
+
+class TestAsyncLLMClient:
+    """Transport behaviour against the stub server"""
+
+    def test_extract_returns_structure(self, stub, make_client):
+        client = make_client()
+        result = client.extract("metformin 500mg daily", "req-1")
+        assert result["medications"][0]["name"] == "metformin"
+        assert tool_names(stub) == ["ClinicalStructure"]
+
+    def test_sequential_calls_reuse_connection(self, stub, make_client):
+        client = make_client()
+        for drug in ["metformin", "lisinopril", "warfarin"]:
+            client.extract(f"{drug} daily")
+        assert len(stub.requests) == 3
+        assert len(stub.client_ports) == 1
+
+    def test_identical_inflight_prompts_share_one_call(self, stub, make_client):
+        client = make_client()
+        futures = [client.submit("warfarin 5mg daily", f"req-{i}") for i in range(5)]
+        results = [future.result(5) for future in futures]
+
+        assert len(stub.requests) == 1
+        assert all(result == results[0] for result in results)
+        assert client.get_stats()["coalesced"] == 4
+        # Every caller gets its own copy
+        results[0]["medications"].clear()
+        assert results[1]["medications"]
+
+    def test_concurrency_cap(self, stub, make_client):
+        client = make_client(max_concurrency=2)
+        futures = [client.submit(f"drug{i} 10mg daily") for i in range(6)]
+        assert [future.result(5)["medications"][0]["name"] for future in futures] == [f"drug{i}" for i in range(6)]
+        assert stub.max_active <= 2
+        assert len(stub.requests) == 6
+
+    def test_micro_batching_short_notes(self, stub, make_client):
+        client = make_client(batch_enabled=True, batch_max_size=3, batch_window_ms=200)
+        futures = [client.submit(f"{drug} 10mg daily") for drug in ["aspirin", "digoxin", "insulin"]]
+        names = [future.result(5)["medications"][0]["name"] for future in futures]
+
+        assert names == ["aspirin", "digoxin", "insulin"]
+        assert tool_names(stub) == ["ClinicalStructureBatch"]
+        assert "note_id" not in futures[0].result()
+        assert client.get_stats()["batched_notes"] == 3
+
+    def test_batch_window_flushes_partial_batch(self, stub, make_client):
+        client = make_client(batch_enabled=True, batch_max_size=8, batch_window_ms=20)
+        futures = [client.submit(f"{drug} daily") for drug in ["aspirin", "digoxin"]]
+        assert [future.result(5)["medications"][0]["name"] for future in futures] == ["aspirin", "digoxin"]
+        assert tool_names(stub) == ["ClinicalStructureBatch"]
+
+    def test_unanswered_batch_note_is_sent_alone(self, stub, make_client):
+        stub.drop_notes = {2}
+        client = make_client(batch_enabled=True, batch_max_size=2, batch_window_ms=200)
+        futures = [client.submit(f"{drug} daily") for drug in ["aspirin", "digoxin"]]
+        assert [future.result(5)["medications"][0]["name"] for future in futures] == ["aspirin", "digoxin"]
+        assert tool_names(stub) == ["ClinicalStructureBatch", "ClinicalStructure"]
+
+    def test_long_notes_skip_batching(self, stub, make_client):
+        client = make_client(batch_enabled=True, batch_max_size=2, batch_window_ms=200, batch_max_chars=20)
+        result = client.extract("metformin " + "with a long clinical history " * 3)
+        assert result["medications"][0]["name"] == "metformin"
+        assert tool_names(stub) == ["ClinicalStructure"]
+
+    def test_errors_reach_every_waiter(self, make_client):
+        client = make_client()
+        with patch.object(client, "_call_single", side_effect=RuntimeError("upstream down")):
+            futures = [client.submit("aspirin daily") for _ in range(3)]
+            for future in futures:
+                with pytest.raises(RuntimeError):
+                    future.result(5)
+
+    @pytest.mark.asyncio
+    async def test_aextract_from_another_event_loop(self, stub, make_client):
+        client = make_client()
+        results = await asyncio.gather(client.aextract("heparin drip"), client.aextract("insulin sliding scale"))
+        assert [result["medications"][0]["name"] for result in results] == ["heparin", "insulin"]
+
+
+class TestProcessorUsesAsyncClient:
+    """LLMProcessor escalations route through the shared client when it is enabled"""
+
+    @pytest.fixture
+    def processor(self, make_client):
+        client = make_client()
+        with patch("nl_fhir.services.nlp.llm.processors.instructor_processor.get_async_llm_client",
+                   return_value=client):
+            processor = LLMProcessor()
+            processor.initialize()
+        assert processor.uses_async_client
+        return processor
+
+    def test_sync_escalation_from_worker_threads(self, stub, processor):
+        text = "Continue current regimen per cardiology"
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda i: processor.process_clinical_text(text, [], f"req-{i}"), range(4)))
+
+        assert all(result["method"] == "escalated_to_llm" for result in results)
+        assert results[0]["structured_output"]["medications"][0]["name"] == "continue"
+        # Four concurrent escalations of the same note make at most a couple of calls
+        assert len(stub.requests) < 4
+        assert processor.get_processor_status()["async_client"]["requests"] == 4
+
+    @pytest.mark.asyncio
+    async def test_async_escalation(self, stub, processor):
+        result = await processor.aprocess_clinical_text("Continue current regimen per cardiology", [], "req-async")
+        assert result["status"] == "completed"
+        assert result["method"] == "escalated_to_llm"
+        assert len(stub.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_sync_and_async_paths_agree(self):
+        processor = LLMProcessor()
+        processor.initialize()
+        text = "Start metformin 500mg twice daily"
+
+        def comparable(result):
+            return {key: value for key, value in result.items() if key != "processing_time_ms"}
+
+        with patch.object(processor.structured_output_processor, "should_escalate_to_llm", return_value=False):
+            assert comparable(processor.process_clinical_text(text, [], "req-sync")) == \
+                   comparable(await processor.aprocess_clinical_text(text, [], "req-async"))
+
+        with patch.object(processor.fallback_processor, "extract_clinical_structure",
+                          side_effect=RuntimeError("regex tier down")):
+            failed = processor.process_clinical_text(text, [], "req-sync")
+            assert comparable(failed) == comparable(await processor.aprocess_clinical_text(text, [], "req-async"))
+        assert failed["status"] == "failed"
+
+    def test_disabled_by_default(self):
+        processor = LLMProcessor()
+        processor.initialize()
+        assert not processor.uses_async_client
+        assert processor.get_processor_status()["async_client"] == {"enabled": False}
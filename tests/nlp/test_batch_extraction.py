@@ -0,0 +1,102 @@
+"""
+Tests for batched medical entity extraction (nlp.pipe) used by bulk conversion
+HIPAA Compliant: No PHI in test data
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from nl_fhir.models.request import ClinicalRequestAdvanced
+from nl_fhir.services.conversion import ConversionService
+from nl_fhir.services.nlp.entity_extractor import MedicalEntityExtractor
+from nl_fhir.services.nlp.extractors.medical_entity_extractor import (
+    MedicalEntityExtractor as TieredEntityExtractor,
+)
+
+SAMPLE_ORDERS = [
+    "Start patient on metformin 500mg twice daily",
+    "Prescribe amoxicillin 500mg three times daily for infection",
+    "Order CBC and lipid panel",
+    "",
+]
+
+
+class TestBatchExtraction:
+    """Batch extraction must match per-document extraction"""
+
+    def test_batch_matches_single_document_extraction(self):
+        extractor = TieredEntityExtractor()
+
+        batch_results = extractor.extract_medical_entities_batch(SAMPLE_ORDERS, batch_size=2)
+        single_results = [extractor.extract_medical_entities(text) for text in SAMPLE_ORDERS]
+
+        assert len(batch_results) == len(SAMPLE_ORDERS)
+        for batch_result, single_result in zip(batch_results, single_results):
+            assert set(batch_result) == set(single_result)
+            for category in single_result:
+                assert [e["text"] for e in batch_result[category]] == [e["text"] for e in single_result[category]]
+
+    def test_empty_batch(self):
+        assert TieredEntityExtractor().extract_medical_entities_batch([]) == []
+
+    def test_pipe_failure_falls_back_to_individual_extraction(self):
+        extractor = TieredEntityExtractor()
+
+        class BrokenPipeNLP:
+            def pipe(self, texts, batch_size, n_process):
+                raise RuntimeError("pipe unavailable")
+
+        with patch.object(extractor.medspacy_manager, "load_medspacy_clinical_engine", return_value=BrokenPipeNLP()), \
+             patch.object(extractor.medspacy_manager, "is_available", return_value=True), \
+             patch.object(extractor, "extract_medical_entities", return_value={"medications": []}) as single:
+            results = extractor.extract_medical_entities_batch(SAMPLE_ORDERS[:2])
+
+        assert results == [{"medications": []}, {"medications": []}]
+        assert single.call_count == 2
+
+    def test_unsettled_texts_share_one_tier2_call(self):
+        extractor = TieredEntityExtractor()
+        calls = []
+
+        def ner_pipeline(texts, **kwargs):
+            calls.append((texts, kwargs))
+            if isinstance(texts, str):
+                return []
+            return [[{"entity_group": "MEDICATION", "word": text.split()[-1], "score": 0.95,
+                      "start": 0, "end": 1}] for text in texts]
+
+        with patch.object(extractor.medspacy_manager, "load_medspacy_clinical_engine", return_value=None), \
+             patch.object(extractor.spacy_manager, "load_spacy_medical_nlp", return_value=None), \
+             patch.object(extractor.transformer_manager, "load_medical_ner_model", return_value=ner_pipeline), \
+             patch.object(extractor, "_is_extraction_sufficient", return_value=True), \
+             patch.object(extractor.escalation_manager, "should_escalate_to_llm", return_value=False):
+            results = extractor.extract_medical_entities_batch(["give warfarin", "give heparin", "give insulin"])
+
+        assert calls == [(["give warfarin", "give heparin", "give insulin"], {"batch_size": 3})]
+        assert [r["medications"][0]["text"] for r in results] == ["warfarin", "heparin", "insulin"]
+
+    def test_entity_extractor_batch_returns_entities_per_text(self):
+        extractor = MedicalEntityExtractor()
+        batch_entities = extractor.extract_entities_batch(SAMPLE_ORDERS[:3], ["r1", "r2", "r3"])
+
+        assert len(batch_entities) == 3
+        assert any("metformin" in e.text.lower() for e in batch_entities[0])
+
+
+class TestBulkConvertUsesBatchExtraction:
+    """bulk_convert extracts the whole batch once and passes entities per order"""
+
+    @pytest.mark.asyncio
+    async def test_precomputed_entities_forwarded_in_order(self):
+        service = ConversionService()
+        requests = [ClinicalRequestAdvanced(clinical_text=text) for text in SAMPLE_ORDERS[:3]]
+        batch_entities = [["a"], ["b"], ["c"]]
+
+        with patch.object(service, "_extract_batch_entities", AsyncMock(return_value=batch_entities)), \
+             patch.object(service, "convert_advanced", AsyncMock(return_value="ok")) as convert:
+            result = await service.bulk_convert(requests, "batch_test")
+
+        assert result["successful_orders"] == 3
+        forwarded = [call.kwargs["precomputed_entities"] for call in convert.call_args_list]
+        assert forwarded == batch_entities
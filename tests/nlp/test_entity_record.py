@@ -0,0 +1,81 @@
+"""
+Tests for compact entity records in categorized extraction results
+Records must read like the entity dicts they replace and serialize as plain dicts.
+HIPAA Compliant: No PHI in test data
+"""
+
+import json
+import pickle
+import sys
+from unittest.mock import MagicMock
+
+from nl_fhir.services.fhir.unified_pipeline import UnifiedFHIRPipeline
+from nl_fhir.services.nlp.entity_record import EntityRecord, entity_dicts
+from nl_fhir.services.nlp.extractors.regex_extractor import RegexExtractor
+from nl_fhir.services.nlp.process_pool import compact_results, expand_results
+
+
+class TestEntityRecord:
+    """Dict view, slots and label interning"""
+
+    def test_reads_and_writes_like_an_entity_dict(self):
+        record = EntityRecord("metformin", 0.9, 6, 15, "regex")
+        assert record == {"text": "metformin", "confidence": 0.9, "start": 6, "end": 15, "method": "regex"}
+        assert record.get("source") is None and "source" not in record
+
+        record["dosage"] = "500mg"
+        record.update({"frequency": "daily"})
+        assert {**record}["dosage"] == "500mg"
+        assert list(record) == ["text", "confidence", "start", "end", "method", "dosage", "frequency"]
+
+        copied = record.copy()
+        copied["dosage"] = "1000mg"
+        assert record["dosage"] == "500mg"
+
+    def test_compact_and_interned(self):
+        first = EntityRecord("aspirin", 0.8, method="".join(["re", "gex"]))
+        second = EntityRecord.from_mapping({"text": "heparin", "confidence": 0.8, "method": "".join(["reg", "ex"])})
+        assert not hasattr(first, "__dict__")
+        assert first.method is second.method is sys.intern("regex")
+        assert sys.getsizeof(first) < sys.getsizeof(first.to_dict())
+
+    def test_serializes_as_plain_dicts(self):
+        record = EntityRecord("aspirin", 0.8, 0, 7, "regex", extra={"route": "oral"})
+        assert json.loads(json.dumps(entity_dicts([record, {"text": "cbc"}]))) == [
+            {"text": "aspirin", "confidence": 0.8, "start": 0, "end": 7, "method": "regex", "route": "oral"},
+            {"text": "cbc"},
+        ]
+        assert pickle.loads(pickle.dumps(record)) == record
+
+
+class TestExtractorRecords:
+    """Extractors and the worker wire format produce records"""
+
+    def test_regex_extractor_and_worker_round_trip(self):
+        result = RegexExtractor().extract_entities("Start metformin 500mg twice daily. Order CBC.")
+        entities = [entity for entity_list in result.values() for entity in entity_list]
+        assert entities and all(isinstance(entity, EntityRecord) for entity in entities)
+
+        expanded = expand_results(compact_results(result))
+        assert expanded == result
+        assert all(isinstance(entity, EntityRecord) for entity_list in expanded.values() for entity in entity_list)
+
+
+class TestPipelineRecords:
+    """Unified pipeline carries records to the FHIR factories"""
+
+    async def test_factories_receive_records_and_api_gets_dicts(self):
+        pipeline = UnifiedFHIRPipeline()
+        pipeline.initialized = True
+        pipeline.resource_factory = MagicMock()
+        pipeline.resource_factory.create_medication_request.return_value = {"resourceType": "MedicationRequest"}
+        pipeline.bundle_assembler = MagicMock()
+        pipeline.bundle_assembler.create_transaction_bundle.side_effect = RuntimeError("not under test")
+        medication = {"text": "metformin", "confidence": 0.9, "dosage": "500mg"}
+
+        result = await pipeline.process_nlp_to_fhir({"medications": [medication]}, "records", validate_bundle=False)
+
+        received = pipeline.resource_factory.create_medication_request.call_args.args[0]
+        assert isinstance(received, EntityRecord) and received == medication
+        assert result.to_dict()["nlp_entities"]["medications"] == [medication]
+        assert type(result.to_dict()["nlp_entities"]["medications"][0]) is dict
@@ -0,0 +1,185 @@
+"""
+Tests for the content-addressed NLP extraction result cache
+HIPAA Compliant: No PHI in test data
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from nl_fhir.services.nlp.extraction_cache import ExtractionCache, extraction_fingerprint
+from nl_fhir.services.nlp.pipeline import NLPPipeline
+
+ORDER = "Start metformin 500mg twice daily"
+RESULT = {"status": "completed", "extracted_entities": {"entities": [{"text": "metformin"}]}}
+
+
+def make_cache(**kwargs):
+    kwargs.setdefault("fingerprint_provider", lambda: "fingerprint-a")
+    return ExtractionCache(**kwargs)
+
+
+class TestExtractionCache:
+    """Memory tier LRU/TTL behaviour and PHI-safe keys"""
+
+    def test_hit_after_set_returns_copy(self):
+        cache = make_cache()
+        assert cache.get(ORDER) is None
+        cache.set(ORDER, RESULT)
+
+        cached = cache.get(ORDER)
+        assert cached == RESULT
+        cached["status"] = "mutated"
+        assert cache.get(ORDER)["status"] == "completed"
+
+    def test_lru_eviction(self):
+        cache = make_cache(max_entries=2)
+        cache.set("order one", RESULT)
+        cache.set("order two", RESULT)
+        cache.get("order one")
+        cache.set("order three", RESULT)
+
+        assert cache.get("order two") is None
+        assert cache.get("order one") is not None
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        cache = make_cache(ttl_seconds=10)
+        with patch("nl_fhir.services.nlp.extraction_cache.time.time", return_value=1000.0):
+            cache.set(ORDER, RESULT)
+        with patch("nl_fhir.services.nlp.extraction_cache.time.time", return_value=1011.0):
+            assert cache.get(ORDER) is None
+        assert cache.get_stats()["expirations"] == 1
+
+    def test_fingerprint_change_invalidates(self):
+        fingerprint = {"value": "models-v1"}
+        cache = make_cache(fingerprint_provider=lambda: fingerprint["value"])
+        cache.set(ORDER, RESULT)
+
+        fingerprint["value"] = "models-v2"
+        assert cache.get(ORDER) is None
+
+    def test_key_is_digest_without_text(self):
+        key = make_cache().make_key(ORDER)
+        assert len(key) == 64
+        assert "metformin" not in key
+
+    def test_key_depends_on_hmac_key(self):
+        assert make_cache(hmac_key=b"secret-a").make_key(ORDER) != make_cache(hmac_key=b"secret-b").make_key(ORDER)
+        assert make_cache(hmac_key=b"secret-a").make_key(ORDER) == make_cache(hmac_key=b"secret-a").make_key(ORDER)
+
+    def test_case_and_whitespace_are_distinct_keys(self):
+        # Cached entity offsets must stay valid for every text sharing a key
+        cache = make_cache()
+        assert cache.make_key(ORDER) != cache.make_key(ORDER.upper())
+        assert cache.make_key(ORDER) != cache.make_key(ORDER + " ")
+
+    def test_metrics_recorded_per_tier(self):
+        cache = make_cache()
+        with patch("nl_fhir.monitoring.metrics.MetricsCollector.record_cache_access") as record:
+            cache.get(ORDER)
+            cache.set(ORDER, RESULT)
+            cache.get(ORDER)
+
+        assert [call.args for call in record.call_args_list] == [
+            (False, "nlp_extraction_memory"),
+            (True, "nlp_extraction_memory"),
+        ]
+
+    def test_default_fingerprint_is_stable(self):
+        assert extraction_fingerprint() == extraction_fingerprint()
+
+    @pytest.mark.parametrize("name, value", [("llm_escalation_threshold", 0.99), ("medspacy_enabled", None),
+                                             ("nlp_ner_backend", "onnx"), ("nlp_ner_model_revision", "abc123"),
+                                             ("nlp_segmentation_enabled", None),
+                                             ("tier_prediction_enabled", None),
+                                             ("terminology_store_path", "/tmp/terms.db")])
+    def test_default_fingerprint_covers_extraction_settings(self, monkeypatch, name, value):
+        from nl_fhir.config import get_settings
+
+        settings = get_settings()
+        before = extraction_fingerprint()
+        monkeypatch.setattr(settings, name, (not getattr(settings, name)) if value is None else value)
+        assert extraction_fingerprint() != before
+
+
+class TestExtractionCacheDiskTier:
+    """Disk tier survives restarts and stores no raw text in file names"""
+
+    def test_disk_entries_shared_across_instances(self, tmp_path):
+        make_cache(disk_path=str(tmp_path)).set(ORDER, RESULT)
+
+        files = list(tmp_path.glob("*.json"))
+        assert len(files) == 1
+        assert "metformin" not in files[0].name
+
+        fresh = make_cache(disk_path=str(tmp_path))
+        assert fresh.get(ORDER) == RESULT
+        assert fresh.get_stats()["disk_hits"] == 1
+        # Promoted to memory on the disk hit
+        assert fresh.get(ORDER) == RESULT
+        assert fresh.get_stats()["memory_hits"] == 1
+
+    def test_disk_only_tier(self, tmp_path):
+        cache = make_cache(disk_path=str(tmp_path), memory_enabled=False)
+        cache.set(ORDER, RESULT)
+        assert cache.get(ORDER) == RESULT
+        assert cache.get_stats()["entries"] == 0
+
+    def test_corrupt_entry_is_discarded(self, tmp_path):
+        cache = make_cache(disk_path=str(tmp_path), memory_enabled=False)
+        (tmp_path / f"{cache.make_key(ORDER)}.json").write_text("{not json")
+        assert cache.get(ORDER) is None
+        assert not list(tmp_path.glob("*.json"))
+
+
+    def test_disk_tier_is_bounded(self, tmp_path):
+        cache = make_cache(disk_path=str(tmp_path), memory_enabled=False, max_disk_entries=10)
+        for i in range(25):
+            cache.set(f"order {i}", RESULT)
+
+        assert len(list(tmp_path.glob("*.json"))) <= 10
+        assert cache.get_stats()["disk_entries"] == len(list(tmp_path.glob("*.json")))
+        assert cache.get("order 24") == RESULT
+
+
+class TestPipelineUsesExtractionCache:
+    """process_clinical_text serves repeated text from the cache"""
+
+    @pytest.mark.asyncio
+    async def test_second_request_skips_extraction(self):
+        pipeline = NLPPipeline()
+        pipeline.initialized = True
+        pipeline._extraction_cache = make_cache()
+
+        with patch.object(pipeline, "_extract_entities_async", AsyncMock(return_value=[])) as extract, \
+             patch.object(pipeline, "_enhance_entities_async", AsyncMock(return_value=[])), \
+             patch.object(pipeline, "_generate_structured_output_async", AsyncMock(return_value={})), \
+             patch.object(pipeline, "_extract_diagnostic_reports_async", AsyncMock(return_value=[])):
+            first = await pipeline.process_clinical_text(ORDER, "req-1")
+            second = await pipeline.process_clinical_text(ORDER, "req-2")
+
+        assert extract.call_count == 1
+        assert second["status"] == "completed"
+        assert second["extracted_entities"] == first["extracted_entities"]
+        assert pipeline.get_pipeline_status()["extraction_cache"]["memory_hits"] == 1
+        pipeline.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_precomputed_entities_bypass_cache(self):
+        pipeline = NLPPipeline()
+        pipeline.initialized = True
+        pipeline._extraction_cache = make_cache()
+
+        with patch.object(pipeline, "_enhance_entities_async", AsyncMock(return_value=[])), \
+             patch.object(pipeline, "_generate_structured_output_async", AsyncMock(return_value={})), \
+             patch.object(pipeline, "_extract_diagnostic_reports_async", AsyncMock(return_value=[])):
+            await pipeline.process_clinical_text(ORDER, "req-1", entities=[])
+
+        assert pipeline._extraction_cache.get_stats()["stores"] == 0
+        pipeline.shutdown()
+
+    def test_cache_disabled_by_default(self):
+        pipeline = NLPPipeline()
+        assert pipeline.get_pipeline_status()["extraction_cache"] == {"enabled": False}
+        pipeline.shutdown()
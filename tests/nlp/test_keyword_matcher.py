@@ -0,0 +1,100 @@
+"""
+Tests for the Aho-Corasick keyword matcher used by the keyword extraction pass
+HIPAA Compliant: No PHI in test data
+"""
+
+import pytest
+
+from nl_fhir.services.nlp.entity_extractor import EntityType, MedicalEntity, MedicalEntityExtractor
+from nl_fhir.services.nlp.keyword_matcher import KeywordMatcher
+
+SAMPLE_TEXTS = [
+    "Start metformin 500mg and order CBC with complete blood count",
+    "Albuterol inhaler PRN; albuterol nebulizer q4h; levalbuterol if needed",
+    "Hydrochlorothiazide 25mg daily, check BMP and basic metabolic panel",
+    "metformin,metformin.METFORMIN metformins premetformin",
+    "Order chest x-ray, CT scan and EKG/ECG; hemoglobin A1c and HbA1c",
+    "Folic acid 1mg daily with blood glucose monitoring",
+    "",
+    "no matching keywords here",
+]
+
+
+def scan_keyword_entities(extractor, text):
+    """Reference implementation: the previous per-keyword str.find scan"""
+    entities = []
+    text_lower = text.lower()
+    for keywords, entity_type in ((extractor._medication_keywords, EntityType.MEDICATION),
+                                  (extractor._lab_test_keywords, EntityType.LAB_TEST)):
+        for keyword in keywords:
+            start = 0
+            while True:
+                pos = text_lower.find(keyword.lower(), start)
+                if pos == -1:
+                    break
+                if (pos == 0 or not text[pos-1].isalnum()) and \
+                   (pos + len(keyword) == len(text) or not text[pos + len(keyword)].isalnum()):
+                    entities.append(MedicalEntity(
+                        text=text[pos:pos+len(keyword)],
+                        entity_type=entity_type,
+                        start_char=pos,
+                        end_char=pos + len(keyword),
+                        confidence=0.6,
+                        attributes={"keyword_match": True},
+                        source="keyword"
+                    ))
+                start = pos + 1
+    return entities
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return MedicalEntityExtractor()
+
+
+class TestKeywordMatcher:
+    """Automaton reports every (overlapping) occurrence"""
+
+    def test_overlapping_and_suffix_matches(self):
+        matcher = KeywordMatcher([("he", 1), ("she", 2), ("his", 3), ("hers", 4)])
+        matches = sorted(matcher.iter_matches("ushers"))
+        assert matches == [(1, 4, 2), (2, 4, 1), (2, 6, 4)]
+
+    def test_duplicate_keywords_report_each_payload(self):
+        matcher = KeywordMatcher([("aspirin", "a"), ("ASPIRIN", "b")])
+        assert [payload for _, _, payload in matcher.iter_matches("aspirin")] == ["a", "b"]
+        assert len(matcher) == 2
+
+    def test_keywords_added_after_build(self):
+        matcher = KeywordMatcher([("cbc", 0)])
+        matcher.add_keywords([("bc", 1)])
+        assert sorted(matcher.iter_matches("cbc")) == [(0, 3, 0), (1, 3, 1)]
+
+    def test_empty_text_and_keyword(self):
+        matcher = KeywordMatcher([("", 0), ("tsh", 1)])
+        assert list(matcher.iter_matches("")) == []
+        assert len(matcher) == 1
+
+
+class TestKeywordExtractionParity:
+    """Single-pass keyword extraction must match the per-keyword scan exactly"""
+
+    @pytest.mark.parametrize("text", SAMPLE_TEXTS)
+    def test_matches_reference_scan(self, extractor, text):
+        assert extractor._extract_keyword_entities(text) == scan_keyword_entities(extractor, text)
+
+    @pytest.mark.parametrize("text", SAMPLE_TEXTS)
+    def test_merged_output_unchanged(self, extractor, text):
+        merged = extractor._merge_overlapping_entities(extractor._extract_keyword_entities(text))
+        expected = extractor._merge_overlapping_entities(scan_keyword_entities(extractor, text))
+        assert merged == expected
+
+    def test_word_boundaries_respected(self, extractor):
+        entities = extractor._extract_keyword_entities("metformins premetformin metformin")
+        assert [(e.start_char, e.end_char) for e in entities] == [(24, 33)]
+
+    def test_pattern_fallback_includes_keyword_matches(self, extractor):
+        # "folic acid" has no dosage-shaped pattern match; only the keyword pass finds it
+        entities = extractor._extract_with_patterns("Continue folic acid and check CBC", "kw-fallback", 0.0)
+        keyword_hits = {(e.text.lower(), e.entity_type) for e in entities if e.source == "keyword"}
+        assert ("folic acid", EntityType.MEDICATION) in keyword_hits
@@ -0,0 +1,124 @@
+"""
+Tests for serialized MedSpaCy pipeline snapshots
+A snapshot is used only when its signature, fingerprint and payload digest match.
+HIPAA Compliant: No PHI in test data
+"""
+
+import hashlib
+import json
+import pickle
+from unittest.mock import patch
+
+import pytest
+
+from nl_fhir.config import get_settings
+from nl_fhir.services.nlp.model_managers import medspacy_snapshot
+from nl_fhir.services.nlp.model_managers.medspacy_manager import MedSpacyManager
+
+pytestmark = pytest.mark.skipif(not MedSpacyManager().is_available(), reason="medspaCy not installed")
+
+KEY = b"test-snapshot-key"
+TEXT = "Patient denies chest pain. Start 500mg amoxicillin twice daily. No history of hypertension."
+
+
+def describe(nlp):
+    return [(ent.start_char, ent.end_char, ent.label_, ent._.is_negated) for ent in nlp(TEXT).ents]
+
+
+@pytest.fixture(scope="module")
+def built():
+    return MedSpacyManager().build_medspacy_clinical_engine()
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, built):
+    medspacy_snapshot.save_pipeline_snapshot(built, tmp_path, MedSpacyManager().pipeline_fingerprint(), KEY)
+    return tmp_path
+
+
+class TestPipelineSnapshot:
+    """Save/load round trip and rejection of stale or damaged snapshots"""
+
+    def test_round_trip_keeps_rules_and_output(self, built, snapshot_dir):
+        restored = medspacy_snapshot.load_pipeline_snapshot(snapshot_dir, MedSpacyManager().pipeline_fingerprint(), KEY)
+
+        assert restored is not None
+        assert restored.pipe_names == built.pipe_names
+        assert len(restored.get_pipe("medspacy_target_matcher").rules) == \
+               len(built.get_pipe("medspacy_target_matcher").rules)
+        assert describe(restored) == describe(built)
+        manifest = json.loads((snapshot_dir / medspacy_snapshot.MANIFEST_FILE_NAME).read_text())
+        assert manifest["target_rules"] == len(MedSpacyManager()._get_clinical_target_rules())
+
+    def test_fingerprint_follows_rules_and_packages(self):
+        manager = MedSpacyManager()
+        rules = manager._get_clinical_target_rules()
+        fingerprint = medspacy_snapshot.pipeline_fingerprint("en_core_web_sm", rules)
+
+        assert medspacy_snapshot.pipeline_fingerprint("en_core_web_sm", rules[:-1]) != fingerprint
+        assert medspacy_snapshot.pipeline_fingerprint("en_core_sci_sm", rules) != fingerprint
+        with patch.object(medspacy_snapshot, "_package_version", return_value="99.0"):
+            assert medspacy_snapshot.pipeline_fingerprint("en_core_web_sm", rules) != fingerprint
+
+    def test_stale_missing_and_tampered_snapshots_are_ignored(self, snapshot_dir, tmp_path_factory):
+        fingerprint = MedSpacyManager().pipeline_fingerprint()
+        assert medspacy_snapshot.load_pipeline_snapshot(snapshot_dir, "other-fingerprint", KEY) is None
+        assert medspacy_snapshot.load_pipeline_snapshot(tmp_path_factory.mktemp("empty"), fingerprint, KEY) is None
+
+        payload = snapshot_dir / medspacy_snapshot.PAYLOAD_FILE_NAME
+        payload.write_bytes(payload.read_bytes()[:-1] + b"\x00")
+        with patch.object(medspacy_snapshot.pickle, "loads") as loads:
+            assert medspacy_snapshot.load_pipeline_snapshot(snapshot_dir, fingerprint, KEY) is None
+        loads.assert_not_called()
+
+    def test_tampered_payload_with_rewritten_manifest_is_refused(self, snapshot_dir):
+        fingerprint = MedSpacyManager().pipeline_fingerprint()
+        payload = pickle.dumps({"not": "a pipeline"})
+        (snapshot_dir / medspacy_snapshot.PAYLOAD_FILE_NAME).write_bytes(payload)
+        manifest_path = snapshot_dir / medspacy_snapshot.MANIFEST_FILE_NAME
+        manifest = json.loads(manifest_path.read_text())
+        manifest.update(payload_sha256=hashlib.sha256(payload).hexdigest(), payload_bytes=len(payload))
+        manifest_path.write_text(json.dumps(manifest))
+
+        with patch.object(medspacy_snapshot.pickle, "loads") as loads:
+            assert medspacy_snapshot.load_pipeline_snapshot(snapshot_dir, fingerprint, KEY) is None
+            # Re-signing needs the key: one signed with another key is refused too
+            manifest["signature"] = medspacy_snapshot.manifest_signature(manifest, b"attacker-key")
+            manifest_path.write_text(json.dumps(manifest))
+            assert medspacy_snapshot.load_pipeline_snapshot(snapshot_dir, fingerprint, KEY) is None
+        loads.assert_not_called()
+
+    def test_snapshots_are_not_loaded_without_a_key(self, snapshot_dir):
+        with patch.object(medspacy_snapshot.pickle, "loads") as loads:
+            assert medspacy_snapshot.load_pipeline_snapshot(snapshot_dir, MedSpacyManager().pipeline_fingerprint(),
+                                                            None) is None
+        loads.assert_not_called()
+        with pytest.raises(ValueError):
+            medspacy_snapshot.save_pipeline_snapshot(object(), snapshot_dir, "fingerprint", b"")
+
+
+class TestManagerUsesSnapshot:
+    """MedSpacyManager deserializes the configured snapshot instead of building"""
+
+    @pytest.fixture
+    def manager(self):
+        with patch.dict(MedSpacyManager._shared_models, {}, clear=True), \
+             patch.dict(MedSpacyManager._shared_status, {}, clear=True):
+            yield MedSpacyManager()
+
+    def test_matching_snapshot_skips_build(self, manager, snapshot_dir, built, monkeypatch):
+        monkeypatch.setattr(get_settings(), "medspacy_snapshot_path", str(snapshot_dir))
+        monkeypatch.setattr(get_settings(), "medspacy_snapshot_hmac_key", KEY.decode())
+        with patch.object(MedSpacyManager, "build_medspacy_clinical_engine") as build:
+            nlp = manager.load_medspacy_clinical_engine()
+        build.assert_not_called()
+        assert describe(nlp) == describe(built)
+
+    def test_stale_snapshot_falls_back_to_build(self, manager, snapshot_dir, monkeypatch):
+        monkeypatch.setattr(get_settings(), "medspacy_snapshot_path", str(snapshot_dir))
+        monkeypatch.setattr(get_settings(), "medspacy_snapshot_hmac_key", KEY.decode())
+        with patch.object(MedSpacyManager, "pipeline_fingerprint", return_value="rules-changed"), \
+             patch.object(MedSpacyManager, "build_medspacy_clinical_engine",
+                          wraps=manager.build_medspacy_clinical_engine) as build:
+            assert manager.load_medspacy_clinical_engine() is not None
+        build.assert_called_once()
@@ -0,0 +1,179 @@
+"""
+Tests for Tier 2 NER backend selection and the ONNX parity comparison
+HIPAA Compliant: No PHI in test data
+"""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from nl_fhir.config import get_settings
+from nl_fhir.services.nlp.model_managers import onnx_ner, transformer_manager
+from nl_fhir.services.nlp.model_managers.transformer_manager import TransformerManager
+
+MODEL = "test/medical-ner"
+
+
+def entity(group, start, end, score=0.9):
+    return {"entity_group": group, "start": start, "end": end, "score": score, "word": "x"}
+
+
+class TestCompareNEROutputs:
+    """Entity-level agreement between backends"""
+
+    def test_identical_outputs(self):
+        outputs = [[entity("MEDICATION", 0, 7)], [], [entity("DOSAGE", 8, 13), entity("FREQUENCY", 14, 19)]]
+        parity = onnx_ner.compare_ner_outputs(outputs, outputs)
+        assert parity["f1"] == 1.0
+        assert parity["identical_text_rate"] == 1.0
+        assert parity["mismatched_texts"] == []
+
+    def test_missing_and_extra_entities(self):
+        reference = [[entity("MEDICATION", 0, 7), entity("DOSAGE", 8, 13)], [entity("DISEASE", 0, 12)]]
+        candidate = [[entity("MEDICATION", 0, 7, score=0.85)], [entity("DISEASE", 0, 12), entity("DOSAGE", 20, 25)]]
+        parity = onnx_ner.compare_ner_outputs(reference, candidate)
+
+        assert parity["matched_entities"] == 2
+        assert parity["precision"] == pytest.approx(2 / 3)
+        assert parity["recall"] == pytest.approx(2 / 3)
+        assert parity["mismatched_texts"] == [0, 1]
+        assert parity["max_score_delta"] == pytest.approx(0.05)
+
+    def test_boundary_shift_is_a_mismatch(self):
+        parity = onnx_ner.compare_ner_outputs([[entity("MEDICATION", 0, 7)]], [[entity("medication", 0, 8)]])
+        assert parity["matched_entities"] == 0
+        assert parity["f1"] == 0.0
+
+    def test_export_dirs_per_precision(self, tmp_path):
+        int8 = onnx_ner.onnx_model_dir(tmp_path, "org/Medical-NER", quantize=True)
+        fp32 = onnx_ner.onnx_model_dir(tmp_path, "org/Medical-NER", quantize=False)
+        assert int8 != fp32
+        assert int8.parent == fp32.parent
+        assert int8.parent.parent.parent == tmp_path
+
+    def test_export_dirs_per_revision(self, tmp_path):
+        pinned = onnx_ner.onnx_model_dir(tmp_path, "org/Medical-NER", quantize=True, revision="abc123")
+        assert pinned != onnx_ner.onnx_model_dir(tmp_path, "org/Medical-NER", quantize=True, revision="main")
+        assert pinned.parent.name == "abc123"
+
+    def test_export_downloads_the_pinned_revision(self, tmp_path):
+        exported = MagicMock()
+        exported.save_pretrained.side_effect = lambda d: (d / onnx_ner.EXPORTED_FILE_NAME).write_bytes(b"onnx")
+        with patch.object(onnx_ner, "ONNX_AVAILABLE", True), \
+             patch.object(onnx_ner, "ORTModelForTokenClassification", create=True) as ort_model, \
+             patch.object(onnx_ner, "AutoTokenizer", create=True) as tokenizer:
+            ort_model.from_pretrained.return_value = exported
+            model_dir = onnx_ner.export_onnx_ner_model("org/Medical-NER", tmp_path, quantize=False,
+                                                       revision="abc123")
+
+        assert model_dir == onnx_ner.onnx_model_dir(tmp_path, "org/Medical-NER", False, "abc123")
+        assert ort_model.from_pretrained.call_args.kwargs["revision"] == "abc123"
+        assert tokenizer.from_pretrained.call_args.kwargs["revision"] == "abc123"
+
+    def test_export_is_published_atomically(self, tmp_path):
+        target = onnx_ner.onnx_model_dir(tmp_path, "org/Medical-NER", quantize=False)
+
+        def failing_write(directory):
+            (directory / onnx_ner.EXPORTED_FILE_NAME).write_bytes(b"partial")
+            raise RuntimeError("export interrupted")
+
+        with pytest.raises(RuntimeError):
+            onnx_ner._export_atomically(target, onnx_ner.EXPORTED_FILE_NAME, failing_write)
+        assert not target.exists() and list(target.parent.iterdir()) == []
+
+        onnx_ner._export_atomically(target, onnx_ner.EXPORTED_FILE_NAME,
+                                    lambda directory: (directory / onnx_ner.EXPORTED_FILE_NAME).write_bytes(b"first"))
+        # A worker finishing second keeps the published export and cleans up its own
+        onnx_ner._export_atomically(target, onnx_ner.EXPORTED_FILE_NAME,
+                                    lambda directory: (directory / onnx_ner.EXPORTED_FILE_NAME).write_bytes(b"second"))
+        assert (target / onnx_ner.EXPORTED_FILE_NAME).read_bytes() == b"first"
+        assert [path.name for path in target.parent.iterdir()] == [target.name]
+
+
+class TestBackendSelection:
+    """TransformerManager builds the configured backend and falls back to PyTorch"""
+
+    @pytest.fixture
+    def manager(self):
+        torch_pipeline = MagicMock(return_value=[], name="pytorch")
+        with patch.object(transformer_manager, "TRANSFORMERS_AVAILABLE", True), \
+             patch.object(transformer_manager, "pipeline", MagicMock(return_value=torch_pipeline), create=True), \
+             patch.dict(TransformerManager._shared_models, {}), \
+             patch.dict(TransformerManager._shared_status, {}), \
+             patch.dict(TransformerManager._shared_backends, {}):
+            yield TransformerManager(), torch_pipeline
+
+    def test_pytorch_by_default(self, manager, monkeypatch):
+        manager, torch_pipeline = manager
+        monkeypatch.setattr(get_settings(), "nlp_ner_model_revision", "abc123")
+        assert manager.load_medical_ner_model(MODEL) is torch_pipeline
+        assert manager.get_ner_backend(MODEL) == "pytorch"
+        assert transformer_manager.pipeline.call_args.kwargs["revision"] == "abc123"
+
+    def test_onnx_backend_when_configured(self, manager, monkeypatch):
+        manager, _ = manager
+        monkeypatch.setattr(get_settings(), "nlp_ner_backend", "onnx")
+        monkeypatch.setattr(get_settings(), "nlp_ner_onnx_intra_op_threads", 2)
+        onnx_pipeline = MagicMock(return_value=[], name="onnx")
+        lock_held_during_export = []
+
+        def export_model(model_name, cache_dir, quantize, revision):
+            lock_held_during_export.append(manager._load_lock(model_name).locked())
+
+        with patch.object(onnx_ner, "ONNX_AVAILABLE", True), \
+             patch.object(onnx_ner, "export_onnx_ner_model", side_effect=export_model) as export, \
+             patch.object(onnx_ner, "load_onnx_ner_pipeline", return_value=onnx_pipeline) as load:
+            assert manager.load_medical_ner_model(MODEL) is onnx_pipeline
+
+        # The export runs before the load, outside the model's load lock
+        assert lock_held_during_export == [False]
+        assert export.call_args.kwargs["quantize"] is True
+        assert load.call_args.kwargs["quantize"] is True
+        assert load.call_args.kwargs["intra_op_threads"] == 2
+        assert export.call_args.kwargs["revision"] == load.call_args.kwargs["revision"] == "main"
+        assert manager.get_ner_backend(MODEL) == "onnx-int8"
+
+    def test_onnx_unavailable_falls_back(self, manager, monkeypatch):
+        manager, torch_pipeline = manager
+        monkeypatch.setattr(get_settings(), "nlp_ner_backend", "onnx")
+        with patch.object(onnx_ner, "ONNX_AVAILABLE", False):
+            assert manager.load_medical_ner_model(MODEL) is torch_pipeline
+        assert manager.get_ner_backend(MODEL) == "pytorch"
+
+    def test_onnx_export_failure_falls_back(self, manager, monkeypatch):
+        manager, torch_pipeline = manager
+        monkeypatch.setattr(get_settings(), "nlp_ner_backend", "onnx")
+        with patch.object(onnx_ner, "ONNX_AVAILABLE", True), \
+             patch.object(onnx_ner, "export_onnx_ner_model", side_effect=RuntimeError("export failed")), \
+             patch.object(onnx_ner, "load_onnx_ner_pipeline", side_effect=RuntimeError("export failed")):
+            assert manager.load_medical_ner_model(MODEL) is torch_pipeline
+        assert manager.get_ner_backend(MODEL) == "pytorch"
+
+    def test_slow_load_does_not_block_other_models(self, manager, monkeypatch):
+        manager, torch_pipeline = manager
+        monkeypatch.setattr(get_settings(), "nlp_ner_batching_enabled", True)
+        release = threading.Event()
+        slow_pipeline = MagicMock(return_value=[], name="slow")
+
+        def build(task, model, **kwargs):
+            if model == "slow/ner":
+                release.wait(10)
+                return slow_pipeline
+            return torch_pipeline
+
+        with patch.object(transformer_manager, "pipeline", side_effect=build), \
+             patch.dict(TransformerManager._shared_batchers, {}):
+            slow_load = threading.Thread(target=manager.load_medical_ner_model, args=("slow/ner",))
+            slow_load.start()
+            try:
+                # Another model loads and gets its batcher while the slow one is still loading
+                assert manager.load_medical_ner_model(MODEL) is torch_pipeline
+                assert manager.get_ner_batcher(MODEL) is not None
+                assert slow_load.is_alive()
+            finally:
+                release.set()
+                slow_load.join(10)
+                for batcher in TransformerManager._shared_batchers.values():
+                    batcher.close()
+        assert manager.load_medical_ner_model("slow/ner") is slow_pipeline
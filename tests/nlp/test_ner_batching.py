@@ -0,0 +1,157 @@
+"""
+Tests for the dynamic batching queue in front of the transformer NER pipeline
+Concurrent callers must share forward passes and still get back their own entities.
+HIPAA Compliant: No PHI in test data
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from nl_fhir.config import get_settings
+from nl_fhir.services.nlp.model_managers.ner_batcher import NERBatcher
+from nl_fhir.services.nlp.model_managers.transformer_manager import TransformerManager
+
+
+class FakeNERPipeline:
+    """Tags the first word of each text; records the size of every call"""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _entities(self, text):
+        if text == "poison":
+            raise ValueError("tokenizer failure")
+        word = text.split()[0]
+        return [{"entity_group": "MEDICATION", "word": word, "score": 0.9, "start": 0, "end": len(word)}]
+
+    def __call__(self, inputs, batch_size=None):
+        with self._lock:
+            self.calls.append(len(inputs) if isinstance(inputs, list) else 1)
+        time.sleep(self.delay)
+        if isinstance(inputs, list):
+            return [self._entities(text) for text in inputs]
+        return self._entities(inputs)
+
+
+@pytest.fixture
+def ner_pipeline():
+    return FakeNERPipeline()
+
+
+@pytest.fixture
+def make_batcher(ner_pipeline):
+    batchers = []
+
+    def factory(**kwargs):
+        batcher = NERBatcher(ner_pipeline, **kwargs)
+        batchers.append(batcher)
+        return batcher
+
+    yield factory
+    for batcher in batchers:
+        batcher.close()
+
+
+def run_concurrently(batcher, texts):
+    with ThreadPoolExecutor(max_workers=len(texts)) as pool:
+        return list(pool.map(batcher, texts))
+
+
+class TestNERBatcher:
+    """Queue dispatch, scatter and metrics"""
+
+    def test_concurrent_requests_share_one_forward_pass(self, ner_pipeline, make_batcher):
+        batcher = make_batcher(max_batch_size=8, max_wait_ms=500)
+        texts = [f"drug{i} 10mg daily" for i in range(8)]
+        results = run_concurrently(batcher, texts)
+
+        assert [result[0]["word"] for result in results] == [f"drug{i}" for i in range(8)]
+        assert ner_pipeline.calls == [8]
+        stats = batcher.get_stats()
+        assert stats["batches"] == 1
+        assert stats["full_batches"] == 1
+        assert stats["average_batch_size"] == 8
+
+    def test_batches_never_exceed_max_size(self, ner_pipeline, make_batcher):
+        batcher = make_batcher(max_batch_size=4, max_wait_ms=50)
+        results = run_concurrently(batcher, [f"drug{i} daily" for i in range(10)])
+
+        assert [result[0]["word"] for result in results] == [f"drug{i}" for i in range(10)]
+        assert max(ner_pipeline.calls) <= 4
+        assert sum(ner_pipeline.calls) == 10
+        assert batcher.get_stats()["largest_batch"] <= 4
+
+    def test_window_flushes_partial_batch(self, ner_pipeline, make_batcher):
+        batcher = make_batcher(max_batch_size=64, max_wait_ms=20)
+        start = time.perf_counter()
+        assert batcher("aspirin 81mg daily")[0]["word"] == "aspirin"
+        assert time.perf_counter() - start < 1.0
+        assert ner_pipeline.calls == [1]
+        assert batcher.get_stats()["max_wait_ms_observed"] < 500
+
+    def test_failed_item_only_fails_its_caller(self, ner_pipeline, make_batcher):
+        batcher = make_batcher(max_batch_size=3, max_wait_ms=500)
+        futures = [batcher.submit(text) for text in ["aspirin daily", "poison", "heparin drip"]]
+
+        assert futures[0].result(5)[0]["word"] == "aspirin"
+        assert futures[2].result(5)[0]["word"] == "heparin"
+        with pytest.raises(ValueError):
+            futures[1].result(5)
+        assert batcher.get_stats()["failed_batches"] == 1
+
+    def test_short_batch_result_falls_back_to_items(self):
+        class ShortPipeline(FakeNERPipeline):
+            def __call__(self, inputs, batch_size=None):
+                outputs = super().__call__(inputs, batch_size)
+                return outputs[:-1] if isinstance(inputs, list) else outputs
+
+        batcher = NERBatcher(ShortPipeline(), max_batch_size=3, max_wait_ms=500)
+        try:
+            futures = [batcher.submit(text) for text in ["aspirin daily", "heparin drip", "insulin scale"]]
+            assert [future.result(5)[0]["word"] for future in futures] == ["aspirin", "heparin", "insulin"]
+            assert batcher.get_stats()["failed_batches"] == 1
+        finally:
+            batcher.close()
+
+    def test_close_drains_queue_and_rejects_new_requests(self, make_batcher):
+        batcher = make_batcher(max_batch_size=8, max_wait_ms=1000)
+        future = batcher.submit("insulin sliding scale")
+        batcher.close()
+        assert future.result(5)[0]["word"] == "insulin"
+        with pytest.raises(RuntimeError):
+            batcher.submit("metformin")
+
+
+class TestTransformerManagerBatching:
+    """The manager hands out one shared batcher per loaded model when enabled"""
+
+    @pytest.fixture
+    def loaded_model(self, ner_pipeline):
+        with patch.dict(TransformerManager._shared_models, {"test/ner": ner_pipeline}), \
+             patch.dict(TransformerManager._shared_batchers, {}):
+            yield ner_pipeline
+            for batcher in TransformerManager._shared_batchers.values():
+                batcher.close()
+
+    def test_disabled_by_default(self, loaded_model):
+        assert TransformerManager().get_ner_batcher("test/ner") is None
+
+    def test_shared_batcher_when_enabled(self, loaded_model, monkeypatch):
+        settings = get_settings()
+        monkeypatch.setattr(settings, "nlp_ner_batching_enabled", True)
+        monkeypatch.setattr(settings, "nlp_ner_batch_max_size", 4)
+
+        batcher = TransformerManager().get_ner_batcher("test/ner")
+        assert batcher is not None
+        assert batcher.max_batch_size == 4
+        assert TransformerManager().get_ner_batcher("test/ner") is batcher
+        assert TransformerManager().get_ner_batcher("not/loaded") is None
+
+        run_concurrently(batcher, ["warfarin 5mg", "digoxin 0.125mg"])
+        assert TransformerManager().get_batching_stats()["test/ner"]["requests"] == 2
@@ -0,0 +1,95 @@
+"""
+Tests for the process-pool NLP extraction backend
+HIPAA Compliant: No PHI in test data
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from nl_fhir.services.nlp.pipeline import NLPPipeline
+from nl_fhir.services.nlp.process_pool import (
+    NLPProcessPool,
+    ProcessPoolSaturatedError,
+    _initialize_worker,
+    compact_results,
+    expand_results,
+)
+
+
+class TestCompactResults:
+    """Worker results round-trip through the compact tuple format"""
+
+    def test_round_trip_preserves_entity_fields(self):
+        nlp_results = {
+            "medications": [
+                {"text": "metformin", "confidence": 0.8, "start": 17, "end": 26,
+                 "method": "medspacy_clinical", "clinical_context": {"is_negated": False}}
+            ],
+            "dosages": [{"text": "500mg", "confidence": 0.85, "start": 27, "end": 32}],
+            "conditions": [],
+        }
+
+        expanded = expand_results(compact_results(nlp_results))
+
+        assert expanded["medications"] == [
+            {"text": "metformin", "confidence": 0.8, "start": 17, "end": 26, "method": "medspacy_clinical"}
+        ]
+        assert expanded["dosages"] == nlp_results["dosages"]
+        assert expanded["conditions"] == []
+
+
+class TestWorkerPreload:
+    """Workers preload the models extraction actually uses"""
+
+    def test_preload_goes_through_the_extractor_managers(self):
+        from nl_fhir.services.nlp.models import model_manager
+
+        extractor = model_manager.medical_extractor
+        with patch.object(extractor.medspacy_manager, "load_medspacy_clinical_engine") as medspacy, \
+             patch.object(extractor.transformer_manager, "load_medical_ner_model") as ner:
+            _initialize_worker(True)
+        medspacy.assert_called_once_with()
+        ner.assert_called_once_with()
+
+
+class TestNLPProcessPool:
+    """Process pool dispatch, saturation and metrics"""
+
+    @pytest.mark.asyncio
+    async def test_extract_in_worker_process(self):
+        pool = NLPProcessPool(max_workers=1, max_queue_depth=4, preload_models=False)
+        try:
+            results = await pool.extract("Start patient on metformin 500mg twice daily", "pool-test")
+        finally:
+            pool.shutdown()
+
+        assert any("metformin" in e["text"].lower() for e in results["medications"])
+        metrics = pool.get_metrics()
+        assert metrics["completed"] == 1
+        assert metrics["failed"] == 0
+        assert metrics["in_flight"] == 0
+        assert metrics["running"] is False
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_work(self):
+        pool = NLPProcessPool(max_workers=1, max_queue_depth=0, preload_models=False)
+        try:
+            with pytest.raises(ProcessPoolSaturatedError):
+                await pool.extract("Order CBC")
+        finally:
+            pool.shutdown()
+
+        assert pool.get_metrics()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_pipeline_falls_back_to_threads_when_pool_fails(self):
+        pipeline = NLPPipeline()
+        pipeline._process_pool = NLPProcessPool(max_workers=1)
+        try:
+            with patch.object(pipeline._process_pool, "extract", AsyncMock(side_effect=ProcessPoolSaturatedError())):
+                entities = await pipeline._extract_entities_async("Start patient on metformin 500mg daily", "fallback")
+        finally:
+            pipeline.shutdown()
+
+        assert any("metformin" in e.text.lower() for e in entities)
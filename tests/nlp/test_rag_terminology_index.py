@@ -0,0 +1,236 @@
+"""
+Tests for the indexed RAG terminology lookup
+Index-backed lookups must rank exactly like the previous linear scan; the optional
+embedding path scores all entities of a request in one batch.
+HIPAA Compliant: No PHI in test data
+"""
+
+import random
+import zlib
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from nl_fhir.config import get_settings
+from nl_fhir.services import terminology_store
+from nl_fhir.services.nlp import terminology_index
+from nl_fhir.services.nlp.entity_extractor import EntityType, MedicalEntity
+from nl_fhir.services.nlp.rag_service import RAGService
+from nl_fhir.services.nlp.terminology_index import TerminologyIndex, terminology_index_tables
+from nl_fhir.services.terminology_store import build_terminology_store
+
+QUERIES = [
+    "metformin", "Metformin 500mg", "cbc", "complete blood count", "blood count",
+    "basic metabolic panel", "metabolic", "panel", "a", "", " ", "glucose serum",
+    "type 2 diabetes", "diabetes", "hypertension", "infection", "c", "hba1c test",
+]
+
+
+def linear_lookup(service, entity_text, entity_type):
+    """Previous implementation: score every term of the section"""
+    codes = []
+    entity_lower = entity_text.lower()
+    for term, code_info in service._medical_knowledge.get(entity_type, {}).items():
+        similarity = service._calculate_similarity(entity_lower, term.lower())
+        if similarity > 0.6:
+            codes.append({
+                "code": code_info["code"],
+                "system": code_info["system"],
+                "display": code_info["display"],
+                "confidence": similarity
+            })
+    codes.sort(key=lambda c: c["confidence"], reverse=True)
+    return codes[:3]
+
+
+def linear_search(service, query, terminology_type=None, max_results=10):
+    results = []
+    search_types = [terminology_type] if terminology_type else service._medical_knowledge.keys()
+    for term_type in search_types:
+        if term_type not in service._medical_knowledge:
+            continue
+        for term, code_info in service._medical_knowledge[term_type].items():
+            similarity = service._calculate_similarity(query.lower(), term.lower())
+            if similarity > 0.3:
+                results.append({
+                    "term": term, "type": term_type, "code": code_info["code"],
+                    "system": code_info["system"], "display": code_info["display"],
+                    "similarity": similarity
+                })
+    results.sort(key=lambda r: r["similarity"], reverse=True)
+    return results[:max_results]
+
+
+def synthetic_terms(count, seed=7):
+    rng = random.Random(seed)
+    words = ["blood", "serum", "panel", "glucose", "count", "plasma", "urine", "acid", "level",
+             "total", "free", "metformin", "hydrochloride", "oral", "tablet", "extended", "release"]
+    terms = {}
+    while len(terms) < count:
+        term = " ".join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+        if rng.random() < 0.3:
+            term += f" {rng.randint(1, 500)}"
+        terms[term] = {"code": str(len(terms)), "system": "http://loinc.org", "display": term.title()}
+    return terms
+
+
+class FakeEmbedder:
+    """Deterministic character-trigram hashing embedder"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        vectors = np.zeros((len(texts), 64), dtype=np.float32)
+        for row, text in enumerate(texts):
+            padded = f"  {text.lower()}  "
+            for start in range(len(padded) - 2):
+                vectors[row, zlib.crc32(padded[start:start + 3].encode()) % 64] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+@pytest.fixture
+def service():
+    rag = RAGService()
+    rag.initialize()
+    return rag
+
+
+class TestIndexedLookupParity:
+    """Index candidates + exact rescoring reproduce the linear scan"""
+
+    @pytest.mark.parametrize("query", QUERIES)
+    @pytest.mark.parametrize("entity_type", ["medication", "lab_test", "condition", "procedure"])
+    def test_lookup_matches_linear_scan(self, service, query, entity_type):
+        assert service._lookup_medical_codes(query, entity_type) == linear_lookup(service, query, entity_type)
+
+    @pytest.mark.parametrize("query", QUERIES)
+    def test_search_matches_linear_scan(self, service, query):
+        assert service.search_terminology(query) == linear_search(service, query)
+        assert service.search_terminology(query, "lab_test", 2) == linear_search(service, query, "lab_test", 2)
+
+    def test_large_terminology_parity(self, service):
+        service.add_terminology("lab_test", synthetic_terms(3000))
+        rng = random.Random(11)
+        terms = list(service._medical_knowledge["lab_test"])
+        queries = [rng.choice(terms) for _ in range(40)]
+        queries += [term.split()[0] for term in queries[:20]]
+        queries += ["blood glucose level", "serum", "acid panel total", "lev", "plasma 12"]
+        for query in queries:
+            assert service._lookup_medical_codes(query, "lab_test") == linear_lookup(service, query, "lab_test"), query
+            assert service.search_terminology(query, max_results=5) == linear_search(service, query, max_results=5), query
+
+    def test_candidates_cover_every_positive_score(self, service):
+        index = TerminologyIndex(service._medical_knowledge)
+        for query in QUERIES:
+            query_lower = query.lower()
+            expected = [
+                term_id for term_id, term in enumerate(index.terms)
+                if index.term_types[term_id] == "lab_test"
+                and service._calculate_similarity(query_lower, term) > 0
+            ]
+            assert set(expected) <= set(index.candidates(query_lower, "lab_test"))
+
+
+class TestStoredIndex:
+    """Sections compiled into the terminology store are looked up through the mmap"""
+
+    @pytest.fixture
+    def stored_service(self, tmp_path, monkeypatch):
+        knowledge = RAGService()._load_default_medical_knowledge()
+        lab_tests = {**knowledge["lab_test"], **synthetic_terms(3000)}
+        tables = {"lab_test": lab_tests, "medication": knowledge["medication"]}
+        tables.update(terminology_index_tables("lab_test", lab_tests))
+        tables.update(terminology_index_tables("medication", knowledge["medication"]))
+        path = tmp_path / "terminology.nlts"
+        build_terminology_store(path, tables)
+        monkeypatch.setattr(get_settings(), "terminology_store_path", str(path))
+        monkeypatch.setattr(terminology_store, "_store", None)
+        monkeypatch.setattr(terminology_store, "_store_path", None)
+
+        indexed_in_memory = []
+        memory_section = terminology_index._MemorySection
+        monkeypatch.setattr(terminology_index, "_MemorySection",
+                            lambda section: indexed_in_memory.append(len(section)) or memory_section(section))
+        rag = RAGService()
+        rag.initialize()
+        yield rag, lab_tests, indexed_in_memory
+        terminology_store._store.close()
+
+    def test_stored_sections_are_not_reindexed(self, stored_service):
+        rag, lab_tests, indexed_in_memory = stored_service
+        assert rag._index.get_stats()["stored_sections"] == ["medication", "lab_test"]
+        assert len(lab_tests) not in indexed_in_memory
+        assert len(indexed_in_memory) == len(rag._medical_knowledge) - 2
+
+    def test_stored_lookups_match_linear_scan_and_memory_index(self, stored_service):
+        rag, lab_tests, _ = stored_service
+        in_memory = TerminologyIndex({name: dict(section) for name, section in rag._medical_knowledge.items()})
+        rng = random.Random(5)
+        queries = QUERIES + [rng.choice(list(lab_tests)) for _ in range(30)] + ["blood glucose level", "lev"]
+        for query in queries:
+            assert rag._lookup_medical_codes(query, "lab_test") == linear_lookup(rag, query, "lab_test"), query
+            assert rag.search_terminology(query, max_results=5) == linear_search(rag, query, max_results=5), query
+            for threshold in (0.0, 0.3, 0.6):
+                assert (rag._index.candidates(query.lower(), "lab_test", threshold)
+                        == in_memory.candidates(query.lower(), "lab_test", threshold)), query
+        assert [rag._index.term_keys[i] for i in range(len(in_memory))] == list(in_memory.term_keys)
+
+    def test_index_not_matching_the_table_is_ignored(self, tmp_path):
+        path = tmp_path / "stale.nlts"
+        tables = {"lab_test": synthetic_terms(20)}
+        tables.update(terminology_index_tables("lab_test", synthetic_terms(10)))
+        build_terminology_store(path, tables)
+        with terminology_store.TerminologyStore(path) as store:
+            index = TerminologyIndex({"lab_test": store.table("lab_test")})
+            assert index.get_stats()["stored_sections"] == [] and len(index) == 20
+
+
+class TestSemanticLookup:
+    """Embedding matrix path: one encode call and one matrix multiply per request"""
+
+    @pytest.fixture
+    def semantic_service(self):
+        rag = RAGService()
+        embedder = FakeEmbedder()
+        rag._embedder = embedder
+        with patch("nl_fhir.services.nlp.rag_service.get_settings") as settings:
+            settings.return_value.rag_semantic_search_enabled = True
+            settings.return_value.rag_semantic_threshold = 0.5
+            rag.initialize()
+            yield rag, embedder
+
+    def test_entities_encoded_in_one_batch(self, semantic_service):
+        rag, embedder = semantic_service
+        entities = [
+            MedicalEntity("metformine", EntityType.MEDICATION, 0, 10, 0.9, {}, "test"),
+            MedicalEntity("hemoglobin", EntityType.LAB_TEST, 11, 21, 0.9, {}, "test"),
+            MedicalEntity("hypertensive", EntityType.CONDITION, 22, 34, 0.9, {}, "test"),
+        ]
+        with patch("nl_fhir.services.nlp.rag_service.get_settings") as settings:
+            settings.return_value.rag_semantic_threshold = 0.5
+            enhanced = rag.enhance_entities(entities, "req-1")
+
+        # One call for the terminology at initialize, one for all request entities
+        assert len(embedder.calls) == 2
+        assert embedder.calls[1] == ["metformine", "hemoglobin", "hypertensive"]
+        assert enhanced[0]["primary_code"]["code"] == "6809"
+        assert enhanced[2]["primary_code"]["code"] == "I10"
+
+    def test_semantic_matches_stay_within_entity_type(self, semantic_service):
+        rag, _ = semantic_service
+        index = rag._index
+        vectors = FakeEmbedder().encode(["metformin", "metformin"])
+        hits = index.semantic_top_k(vectors, ["medication", "condition"], k=3, min_score=0.0)
+        assert all(index.term_types[term_id] == "medication" for term_id, _ in hits[0])
+        assert all(index.term_types[term_id] == "condition" for term_id, _ in hits[1])
+        assert index.terms[hits[0][0][0]] == "metformin"
+
+    def test_lexical_only_without_embedder(self, service):
+        assert not service._index.has_embeddings
+        entity = MedicalEntity("metformin", EntityType.MEDICATION, 0, 9, 0.9, {}, "test")
+        assert service.enhance_entities([entity])[0]["primary_code"]["code"] == "6809"
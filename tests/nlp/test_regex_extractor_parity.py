@@ -0,0 +1,91 @@
+"""
+Parity tests for the RegexExtractor lowercase fast path
+The case-sensitive patterns run on lowercased text must produce exactly the output
+of the original IGNORECASE patterns run on the original text.
+HIPAA Compliant: No PHI in test data
+"""
+
+import random
+
+import pytest
+
+from nl_fhir.services.nlp.extractors.regex_extractor import RegexExtractor
+
+CLINICAL_TEXTS = [
+    "Patient John Smith needs to start metformin 500mg twice daily for type 2 diabetes.",
+    "PRESCRIBE AMOXICILLIN 500 MG TID; ORDER CBC AND LIPID PANEL",
+    "Order CBC, CMP, PT/INR and D-dimer. Check TSH and vitamin D.",
+    "Weight: 18.5kg. Give amoxicillin 45mg/kg/day divided q12h PO",
+    "patient: Maria Garcia with hypertension on Lisinopril 10 mg daily",
+    "Diagnosed with metastatic breast cancer; administer paclitaxel 175 mg/m² IV every 3 weeks",
+    "Albuterol 2.5mg nebulized q4h prn, then prednisone 40mg once daily x5 days",
+    "Start Warfarin 5mg\nDraw INR in 3 days\nmonitor for bleeding",
+    "Patient suffers from recurrent urinary tract infection; send urinalysis and blood cultures",
+    "medication review only, no changes",
+    "Café staff note: patient José needs ibuprofen 400mg",  # non-ASCII uses the original patterns
+    "",
+]
+
+VOCABULARY = [
+    "patient", "Patient:", "John", "needs", "start", "order", "give", "prescribed", "medication",
+    "metformin", "Metformin", "IBUPROFEN", "rituximab", "pt", "ptt", "cbc", "lipid", "panel",
+    "500mg", "2.5 mg", "10 units", "20mg/kg/day", "70kg", "weight:", "daily", "twice", "a",
+    "bid", "q6h", "3 times per day", "every 4 hours", "has", "diabetes", "infection", "disease",
+    "check", "draw", "troponin", "with", "and", ",", ".", ";", "\n", "IV", "oral",
+]
+
+
+def reference_extract(extractor, text):
+    """Original behaviour: every pattern with IGNORECASE on the original text"""
+    result = {
+        "medications": [], "dosages": [], "frequencies": [], "patients": [],
+        "conditions": [], "procedures": [], "lab_tests": [], "weights": []
+    }
+    extractor._extract_medications(text, result)
+    extractor._extract_simple_medications(text, result)
+    extractor._extract_lab_tests(text, result)
+    extractor._extract_frequencies(text, result)
+    extractor._extract_patients(text, result)
+    extractor._extract_conditions(text, result)
+    extractor._extract_weights(text, result)
+    return result
+
+
+def random_texts(count, seed=1234):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        words = [rng.choice(VOCABULARY) for _ in range(rng.randint(3, 25))]
+        words = [word.upper() if rng.random() < 0.15 else word for word in words]
+        texts.append(" ".join(words))
+    return texts
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return RegexExtractor()
+
+
+class TestRegexExtractorParity:
+    """Lowercase fast path output is identical to IGNORECASE matching"""
+
+    def test_all_patterns_have_folded_twins(self, extractor):
+        assert set(extractor._folded_patterns) == set(extractor._patterns)
+
+    @pytest.mark.parametrize("text", CLINICAL_TEXTS)
+    def test_clinical_texts(self, extractor, text):
+        assert extractor.extract_entities(text) == reference_extract(extractor, text)
+
+    def test_randomized_texts(self, extractor):
+        for text in random_texts(300):
+            assert extractor.extract_entities(text) == reference_extract(extractor, text), text
+
+    def test_entity_text_keeps_original_case(self, extractor):
+        result = extractor.extract_entities("Start METFORMIN 500MG daily")
+        assert result["medications"][0]["text"] == "METFORMIN"
+        assert result["dosages"][0]["text"] == "500MG"
+
+    def test_pattern_info_unchanged(self, extractor):
+        info = extractor.get_pattern_info()
+        assert set(info) == set(extractor._patterns)
+        assert "metformin" in info["medication_pattern"]
@@ -0,0 +1,213 @@
+"""
+Tests for long-note segmentation and segment-parallel extraction
+Chunks must cover the whole note and entities must come back at note offsets.
+HIPAA Compliant: No PHI in test data
+"""
+
+import re
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from nl_fhir.config import get_settings
+from nl_fhir.services.nlp import models
+from nl_fhir.services.nlp.entity_extractor import MedicalEntityExtractor
+from nl_fhir.services.nlp.segmenter import TextSegment, merge_segment_results, segment_clinical_text
+
+ORDERS = [
+    "metformin 500mg twice daily",
+    "lisinopril 10mg daily",
+    "atorvastatin 40mg at bedtime",
+    "warfarin 5mg daily",
+    "amoxicillin 500mg three times daily",
+    "furosemide 20mg daily",
+]
+
+
+def discharge_summary(days: int = 40) -> str:
+    lines = ["DISCHARGE SUMMARY", "", "HOSPITAL COURSE:"]
+    for day in range(days):
+        lines.append(f"Day {day}: Seen by Dr. Lee. Continue {ORDERS[day % len(ORDERS)]} for chronic management. "
+                     f"Vitals stable.")
+    lines += ["", "MEDICATIONS:", *(f"- {order}" for order in ORDERS)]
+    return "\n".join(lines)
+
+
+def non_space(text: str) -> str:
+    return re.sub(r"\s+", "", text)
+
+
+class TestSegmentClinicalText:
+    """Chunk boundaries and coverage"""
+
+    def test_chunks_are_exact_slices_covering_the_note(self):
+        note = discharge_summary()
+        segments = segment_clinical_text(note, max_chars=400)
+
+        assert len(segments) > 1
+        for segment in segments:
+            assert note[segment.start:segment.end] == segment.text
+            assert len(segment.text) <= 400
+        assert all(a.end <= b.start for a, b in zip(segments, segments[1:]))
+        # Only whitespace falls between chunks
+        assert non_space("".join(segment.text for segment in segments)) == non_space(note)
+
+    def test_breaks_between_sentences_not_inside_them(self):
+        note = "Seen by Dr. Lee today. Takes metformin 500mg b.i.d. Then improved. Follow up in 2 weeks."
+        segments = segment_clinical_text(note, max_chars=45)
+        assert [segment.text for segment in segments] == [
+            "Seen by Dr. Lee today.",
+            "Takes metformin 500mg b.i.d. Then improved.",
+            "Follow up in 2 weeks.",
+        ]
+
+    def test_long_sentence_is_cut_at_whitespace(self):
+        note = " ".join(["heparin"] * 50)
+        segments = segment_clinical_text(note, max_chars=64)
+        assert all(len(segment.text) <= 64 for segment in segments)
+        assert all(set(segment.text.split()) == {"heparin"} for segment in segments)
+        assert non_space("".join(segment.text for segment in segments)) == non_space(note)
+
+    def test_short_note_is_one_segment(self):
+        assert segment_clinical_text("Start aspirin 81mg daily.", max_chars=1000) == [
+            TextSegment(0, 25, "Start aspirin 81mg daily.")
+        ]
+
+
+class TestMergeSegmentResults:
+    """Offset shifting, span recovery and deduplication"""
+
+    def test_offsets_shift_to_note_coordinates(self):
+        note = "Start aspirin daily.\nStart heparin drip."
+        segments = [TextSegment(0, 20, note[:20]), TextSegment(21, 40, note[21:])]
+        merged = merge_segment_results(segments, [
+            {"medications": [{"text": "aspirin", "start": 6, "end": 13}]},
+            {"medications": [{"text": "heparin", "start": 6, "end": 13}]},
+        ])
+        assert [(e["text"], note[e["start"]:e["end"]]) for e in merged["medications"]] == [
+            ("aspirin", "aspirin"), ("heparin", "heparin")
+        ]
+
+    def test_spanless_entities_are_located_in_order(self):
+        note = "Lasix 20mg now. Lasix 40mg tomorrow."
+        segments = [TextSegment(0, len(note), note)]
+        merged = merge_segment_results(segments, [{"medications": [
+            {"text": "Lasix", "start": 0, "end": 0},
+            {"text": "lasix", "start": 0, "end": 0},
+            {"text": "not in note", "start": 0, "end": 0},
+        ]}])
+        assert [(e["start"], e["end"]) for e in merged["medications"]] == [(0, 5), (16, 21), (0, 0)]
+
+    def test_duplicate_reports_are_kept_once(self):
+        segment = TextSegment(10, 30, "Start aspirin daily.")
+        entity = {"text": "aspirin", "start": 6, "end": 13}
+        merged = merge_segment_results([segment], [{"medications": [entity, dict(entity)], "dosages": [entity]}])
+        assert len(merged["medications"]) == 1
+        assert len(merged["dosages"]) == 1
+
+    def test_result_count_must_match_segments(self):
+        segments = [TextSegment(0, 20, "Start aspirin daily."), TextSegment(21, 40, "Start heparin drip.")]
+        with pytest.raises(ValueError):
+            merge_segment_results(segments, [{"medications": []}])
+
+
+class TestSegmentedExtraction:
+    """MedicalEntityExtractor splits long notes and keeps note offsets"""
+
+    @pytest.fixture
+    def extractor(self, monkeypatch):
+        settings = get_settings()
+        monkeypatch.setattr(settings, "nlp_segmentation_enabled", True)
+        monkeypatch.setattr(settings, "nlp_segment_min_chars", 1000)
+        monkeypatch.setattr(settings, "nlp_segment_max_chars", 600)
+        return MedicalEntityExtractor()
+
+    def test_only_long_notes_are_segmented(self, extractor, monkeypatch):
+        assert extractor.segment_text("Start aspirin 81mg daily.") is None
+        assert len(extractor.segment_text(discharge_summary())) > 1
+        monkeypatch.setattr(get_settings(), "nlp_segmentation_enabled", False)
+        assert extractor.segment_text(discharge_summary()) is None
+
+    def test_entities_map_back_to_note_offsets(self, extractor):
+        note = discharge_summary()
+        entities = extractor.extract_entities(note, "seg-test")
+
+        spanned = [entity for entity in entities if entity.end_char > entity.start_char]
+        assert spanned
+        for entity in spanned:
+            assert note[entity.start_char:entity.end_char].lower() == entity.text.lower()
+        # Medications from the last chunk are found too
+        last_chunk_start = extractor.segment_text(note)[-1].start
+        assert any(entity.start_char >= last_chunk_start for entity in spanned)
+
+    def test_batch_path_matches_single_path(self, extractor):
+        note = discharge_summary()
+        single = extractor.extract_entities(note)
+        batch = extractor.extract_entities_batch([note, "Start aspirin 81mg daily."])
+
+        assert len(batch) == 2
+        assert [(e.text, e.start_char, e.end_char) for e in batch[0]] == \
+               [(e.text, e.start_char, e.end_char) for e in single]
+
+    def test_llm_escalation_runs_once_per_note(self, extractor):
+        note = discharge_summary()
+        escalation = MagicMock()
+        escalation.should_escalate_to_llm.return_value = True
+        # More entities than Tiers 1-3 found, so the LLM result is kept
+        llm_result = {"medications": [{"text": "warfarin", "confidence": 0.9, "start": 0, "end": 0}] * 500}
+        tiered = models.model_manager.medical_extractor
+
+        with patch("nl_fhir.services.nlp.extractors.medical_entity_extractor.get_escalation_manager",
+                   return_value=escalation), \
+             patch.object(tiered.tier_predictor, "enabled", False), \
+             patch.object(tiered.llm_extractor, "extract_entities_with_llm", return_value=llm_result) as llm:
+            single = extractor.extract_entities(note)
+            batch = extractor.extract_entities_batch([note])
+            unescalated = extractor.extract_entities_batch([note], escalate_to_llm=False)
+            assert llm.call_count == 2
+            escalated = extractor.escalate_note_entities(note, unescalated[0])
+
+        # One call over the whole note per extraction, never one per chunk
+        assert [call.args[0] for call in llm.call_args_list] == [note, note, note]
+        for entities in (single, batch[0], escalated):
+            assert {entity.text for entity in entities} == {"warfarin"}
+            assert any(entity.end_char > entity.start_char for entity in entities)
+            assert all(note[entity.start_char:entity.end_char] == "warfarin"
+                       for entity in entities if entity.end_char > entity.start_char)
+
+    @pytest.mark.asyncio
+    async def test_process_pool_escalates_once_per_note(self, extractor):
+        from nl_fhir.services.nlp.pipeline import NLPPipeline
+        from nl_fhir.services.nlp.process_pool import (
+            NLPProcessPool,
+            _extract_in_worker,
+            expand_results,
+        )
+
+        note = discharge_summary()
+        escalation = MagicMock()
+        escalation.should_escalate_to_llm.return_value = True
+        llm_result = {"medications": [{"text": "warfarin", "confidence": 0.9, "start": 0, "end": 0}] * 500}
+        tiered = models.model_manager.medical_extractor
+
+        async def extract_in_process(text, request_id=None, escalate_to_llm=True):
+            # Same worker entry point, run in this process so the LLM patch applies
+            return expand_results(_extract_in_worker(text, escalate_to_llm))
+
+        pipeline = NLPPipeline()
+        pipeline.entity_extractor = extractor
+        pipeline._process_pool = NLPProcessPool(max_workers=1)
+        try:
+            with patch("nl_fhir.services.nlp.extractors.medical_entity_extractor.get_escalation_manager",
+                       return_value=escalation), \
+                 patch.object(tiered.tier_predictor, "enabled", False), \
+                 patch.object(tiered.llm_extractor, "extract_entities_with_llm", return_value=llm_result) as llm, \
+                 patch.object(pipeline._process_pool, "extract", side_effect=extract_in_process) as pool_extract:
+                entities = await pipeline._extract_entities_async(note, "pool-seg")
+        finally:
+            pipeline.shutdown()
+
+        assert pool_extract.call_count == len(extractor.segment_text(note))
+        assert all(call.kwargs["escalate_to_llm"] is False for call in pool_extract.call_args_list)
+        assert [call.args[0] for call in llm.call_args_list] == [note]
+        assert {entity.text for entity in entities} == {"warfarin"}
@@ -0,0 +1,51 @@
+"""
+Tests for shared (process-wide) escalation manager and entity extractor instances
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from nl_fhir.services.nlp.entity_extractor import get_entity_extractor, EntityType
+from nl_fhir.services.nlp.extractors.medical_entity_extractor import MedicalEntityExtractor
+from nl_fhir.services.nlp.quality.escalation_manager import (
+    get_escalation_manager,
+    reset_escalation_manager,
+)
+
+
+class TestSharedEscalationManager:
+    """EscalationManager is built once and reused across extractors and threads"""
+
+    def test_same_instance_across_threads(self):
+        reset_escalation_manager()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            managers = list(pool.map(lambda _: get_escalation_manager(), range(32)))
+        assert all(manager is managers[0] for manager in managers)
+
+    def test_extractors_share_manager(self):
+        assert MedicalEntityExtractor().escalation_manager is MedicalEntityExtractor().escalation_manager
+
+    def test_reset_rereads_environment(self, monkeypatch):
+        monkeypatch.setenv("LLM_ESCALATION_THRESHOLD", "0.6")
+        extractor = MedicalEntityExtractor()
+        reset_escalation_manager()
+        try:
+            assert get_escalation_manager().escalation_threshold == 0.6
+            # Existing extractors see the reset too
+            assert extractor.escalation_manager is get_escalation_manager()
+        finally:
+            monkeypatch.delenv("LLM_ESCALATION_THRESHOLD")
+            reset_escalation_manager()
+
+
+class TestSharedEntityExtractor:
+    """The shared entity extractor keeps working across repeated calls"""
+
+    def test_shared_instance(self):
+        assert get_entity_extractor() is get_entity_extractor()
+
+    def test_precompiled_patterns_extract_entities(self):
+        entities = get_entity_extractor()._extract_pattern_entities("Give 500 mg PO twice daily")
+        types = {entity.entity_type for entity in entities}
+        assert EntityType.DOSAGE in types
+        assert EntityType.FREQUENCY in types
+        assert EntityType.ROUTE in types
@@ -0,0 +1,120 @@
+"""
+Tests for the tier pre-classifier in front of the 4-tier extraction walk
+Confident predictions must skip the tiers above the predicted one, and full walks must calibrate it.
+HIPAA Compliant: No PHI in test data
+"""
+
+import random
+from unittest.mock import MagicMock, patch
+
+from nl_fhir.services.nlp.entity_record import EntityRecord
+from nl_fhir.services.nlp.extractors.medical_entity_extractor import MedicalEntityExtractor
+from nl_fhir.services.nlp.quality.tier_predictor import TierFeatures, TierPredictor
+
+NOTE = "Start metformin 500mg PO BID and order CBC, BMP q6h"
+REGEX_RESULT = {"medications": [EntityRecord("metformin", 0.8, 6, 15, "regex")],
+                "dosages": [EntityRecord("500mg", 0.8, 16, 21, "regex")]}
+
+
+def never_audit():
+    rng = random.Random()
+    rng.random = lambda: 1.0
+    return rng
+
+
+class TestTierPredictor:
+    """Features, calibration, persistence and metrics"""
+
+    def test_features_from_regex_pass(self):
+        features = TierFeatures.from_regex_pass(NOTE, REGEX_RESULT)
+        assert features.length == len(NOTE)
+        # PO, BID, CBC, BMP and q6h out of 10 tokens; 500mg and q6h carry digits
+        assert features.abbreviation_density == 0.5
+        assert features.numeric_density == 0.2
+        assert features.term_hit_rate == 0.2
+        assert features.bucket() == "0.3.2.3"
+
+    def test_prediction_needs_samples_and_agreement(self):
+        predictor = TierPredictor(enabled=True, min_samples=5, min_confidence=0.8)
+        features = TierFeatures.from_regex_pass(NOTE, REGEX_RESULT)
+        assert not predictor.predict(features).confident
+
+        assert predictor.fit([(features, "llm")] * 4) == 4
+        assert not predictor.predict(features).confident
+
+        predictor.fit([(features, "llm")] * 4 + [(features, "medspacy")])
+        prediction = predictor.predict(features)
+        assert prediction.confident and prediction.tier == "llm" and prediction.start_tier == "regex"
+        assert prediction.skips_tiers and prediction.samples == 9
+
+    def test_accuracy_and_latency_saved(self):
+        predictor = TierPredictor(enabled=True, min_samples=1, min_confidence=0.5)
+        features = TierFeatures.from_regex_pass(NOTE, REGEX_RESULT)
+        predictor.record_outcome(features, "regex", {"medspacy": 40.0, "transformer_ner": 60.0})
+        prediction = predictor.predict(features)
+
+        predictor.record_outcome(features, "regex", {"medspacy": 20.0}, prediction)
+        predictor.record_outcome(features, "medspacy", {"medspacy": 30.0}, prediction)
+        predictor.record_short_circuit(prediction)
+
+        stats = predictor.get_stats()
+        assert stats["scored_predictions"] == 2 and stats["accuracy"] == 0.5
+        assert stats["tiers_skipped"] == 2
+        assert stats["latency_saved_ms"] == 90.0  # mean Tier 1 (30ms) + mean Tier 2 (60ms)
+
+    def test_state_round_trip(self, tmp_path):
+        state_path = tmp_path / "predictor.json"
+        features = TierFeatures.from_regex_pass(NOTE, REGEX_RESULT)
+        predictor = TierPredictor(enabled=True, min_samples=3, state_path=str(state_path), save_every=3)
+        for _ in range(3):
+            predictor.record_outcome(features, "transformer_ner", {"medspacy": 25.0})
+        assert state_path.exists()
+
+        reloaded = TierPredictor(enabled=True, min_samples=3, state_path=str(state_path))
+        assert reloaded.predict(features).tier == "transformer_ner"
+        assert reloaded.get_stats()["average_tier_ms"] == {"medspacy": 25.0}
+
+        state_path.write_text("not json")
+        assert TierPredictor(state_path=str(state_path)).get_stats()["buckets"] == 0
+
+
+class TestExtractorShortCircuit:
+    """extract_medical_entities starts at the predicted tier"""
+
+    def make_extractor(self, predictor):
+        extractor = MedicalEntityExtractor()
+        extractor.tier_predictor = predictor
+        extractor.regex_extractor = MagicMock()
+        extractor.regex_extractor.extract_entities.return_value = REGEX_RESULT
+        extractor.escalation_manager = MagicMock()
+        extractor.escalation_manager.should_escalate_to_llm.return_value = False
+        return extractor
+
+    def test_confident_prediction_skips_upper_tiers(self):
+        predictor = TierPredictor(enabled=True, min_samples=2, rng=never_audit())
+        predictor.fit([(TierFeatures.from_regex_pass(NOTE, REGEX_RESULT), "regex")] * 2)
+        extractor = self.make_extractor(predictor)
+
+        with patch.object(extractor, "_extract_with_all_tiers") as full_walk:
+            assert extractor.extract_medical_entities(NOTE) is REGEX_RESULT
+        full_walk.assert_not_called()
+        extractor.regex_extractor.extract_entities.assert_called_once_with(NOTE)
+        assert predictor.get_stats()["short_circuits"] == 1
+
+    def test_full_walk_records_the_settling_tier(self):
+        predictor = TierPredictor(enabled=True, min_samples=2)
+        extractor = self.make_extractor(predictor)
+
+        with patch.object(extractor.medspacy_manager, "load_medspacy_clinical_engine", return_value=None), \
+             patch.object(extractor.spacy_manager, "load_spacy_medical_nlp", return_value=None), \
+             patch.object(extractor.transformer_manager, "load_medical_ner_model", return_value=None), \
+             patch("nl_fhir.services.nlp.extractors.medical_entity_extractor.model_warmup_service") as warmup:
+            warmup.is_tier_warming.return_value = False
+            assert extractor.extract_medical_entities(NOTE) is REGEX_RESULT
+            assert extractor.extract_medical_entities(NOTE) is REGEX_RESULT
+
+        # The regex pass that produced the features is reused as the Tier 3 result
+        assert extractor.regex_extractor.extract_entities.call_count == 2
+        stats = predictor.get_stats()
+        assert stats["outcomes_recorded"] == 2 and "medspacy" in stats["average_tier_ms"]
+        assert predictor.predict(TierFeatures.from_regex_pass(NOTE, REGEX_RESULT)).tier == "regex"
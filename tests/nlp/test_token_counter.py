@@ -0,0 +1,74 @@
+"""
+Tests for cached token counting used in LLM budget decisions
+A note is encoded once per counter however many budget checks it goes through.
+HIPAA Compliant: No PHI in test data
+"""
+
+from nl_fhir.services.nlp.llm.utils.token_counter import TokenCounter
+
+NOTE = "Start metformin 500mg twice daily. Order CBC and BMP. Follow up in 2 weeks."
+
+
+class WordEncoding:
+    """Stands in for a tiktoken encoding: one token per whitespace-separated word"""
+
+    def __init__(self):
+        self.encode_calls = 0
+        self.batch_calls = 0
+
+    def encode(self, text):
+        self.encode_calls += 1
+        return text.split()
+
+    def encode_batch(self, texts):
+        self.batch_calls += 1
+        return [text.split() for text in texts]
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+def counter_with(encoding, cache_size=128):
+    counter = TokenCounter(cache_size=cache_size)
+    counter.encoding = encoding
+    counter.clear_cache()
+    return counter
+
+
+class TestTokenCache:
+    """Repeated counts, checks and truncation share one encoding"""
+
+    def test_budget_decisions_encode_the_note_once(self):
+        encoding = WordEncoding()
+        counter = counter_with(encoding)
+
+        assert counter.count_tokens(NOTE) == 14
+        assert counter.check_token_limit(NOTE, max_tokens=20)
+        assert not counter.check_token_limit(NOTE, max_tokens=5)
+        assert counter.truncate_to_limit(NOTE, max_tokens=3) == "Start metformin 500mg"
+        assert counter.truncate_to_limit(NOTE, max_tokens=50) == NOTE
+        assert encoding.encode_calls == 1
+
+    def test_cache_is_bounded(self):
+        encoding = WordEncoding()
+        counter = counter_with(encoding, cache_size=2)
+        for text in ("a", "b", "c", "a"):
+            counter.count_tokens(text)
+        assert encoding.encode_calls == 4  # "a" was evicted by "c"
+        assert list(counter._token_cache) == ["c", "a"]
+
+    def test_count_tokens_many_batches_uncached_texts(self):
+        encoding = WordEncoding()
+        counter = counter_with(encoding)
+        counter.count_tokens("order CBC")
+
+        counts = counter.count_tokens_many(["order CBC", NOTE, "daily aspirin", NOTE])
+        assert counts == [2, 14, 2, 14]
+        assert encoding.batch_calls == 1
+        assert encoding.encode_calls == 1
+
+    def test_approximation_without_tokenizer(self):
+        counter = counter_with(None)
+        assert counter.count_tokens("x" * 40) == 10
+        assert counter.count_tokens_many(["x" * 40, "x" * 8]) == [10, 2]
+        assert counter.truncate_to_limit("x" * 40, max_tokens=2) == "x" * 8
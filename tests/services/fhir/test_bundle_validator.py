@@ -0,0 +1,106 @@
+"""
+Tests for single-pass FHIR bundle validation
+The bundle is parsed and walked once, and the issue list matches validating each entry on its own.
+HIPAA Compliant: No PHI in test data
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from nl_fhir.services.fhir import validator as validator_module
+from nl_fhir.services.fhir.validator import FHIRValidator
+
+requires_fhir_resources = pytest.mark.skipif(not validator_module.FHIR_AVAILABLE,
+                                             reason="fhir.resources not installed")
+
+
+def observation(index, status="final", subject="Patient/p1"):
+    return {
+        "resourceType": "Observation", "id": f"o{index}", "status": status,
+        "code": {"coding": [{"system": "http://loinc.org", "code": "8867-4"}, {"system": "urn:local", "code": "hr"}]},
+        "subject": {"reference": subject},
+    }
+
+
+def make_bundle(*resources):
+    return {"resourceType": "Bundle", "id": "b1", "type": "collection",
+            "entry": [{"fullUrl": f"urn:uuid:{i}", "resource": resource} for i, resource in enumerate(resources)]}
+
+
+def issue_list(result):
+    return [(issue["severity"], issue["type"], issue["location"], issue["message"]) for issue in result["issues"]]
+
+
+class TestSinglePassScan:
+    """One walk yields the same references and codings as the separate extractors"""
+
+    def test_scan_matches_separate_walks(self):
+        validator = FHIRValidator()
+        resource = {**observation(0), "contained": [{"resourceType": "Patient", "id": "c1",
+                                                      "managingOrganization": {"reference": "bad ref"}}],
+                    "category": [{"coding": {"system": "http://x", "code": "y", "reference": "Group/g1"}}]}
+        scan = validator._scan_tree(resource)
+        assert scan.references == validator._extract_references(resource)
+        assert scan.codings == validator._extract_codings(resource)
+
+    def test_entry_slices_are_relative_to_the_resource(self):
+        validator = FHIRValidator()
+        bundle = make_bundle(observation(0), observation(1, subject="bad ref"))
+        marks = validator._entry_resource_marks(bundle["entry"])
+        scan = validator._scan_tree(bundle, marks=marks)
+        entry = scan.slice(marks["entry[1].resource"][1])
+        assert entry.references == [("subject.reference", "bad ref")]
+        assert entry.codings == validator._extract_codings(bundle["entry"][1]["resource"])
+
+
+class TestValidateBundle:
+    """Issue list and parse count of validate_bundle"""
+
+    def test_issues_match_per_entry_validation(self):
+        validator = FHIRValidator()
+        bundle = make_bundle(observation(0), observation(1, status="bogus", subject="Patient/missing"),
+                             {"resourceType": "Patient", "id": "p1", "gender": "male"})
+        result = validator.validate_bundle(bundle)
+        issues = issue_list(result)
+
+        expected = issue_list(validator.validate_resource(bundle))
+        for i, entry in enumerate(bundle["entry"]):
+            for severity, type_, location, message in issue_list(validator.validate_resource(entry["resource"])):
+                expected.append((severity, type_, f"entry[{i}].resource.{location}", message))
+        expected.extend(issue_list({"issues": validator._validate_bundle_integrity(bundle, None)}))
+        assert issues == expected
+        assert ("warning", "references", "subject.reference", "Reference to missing resource: Patient/missing") in issues
+        assert not result["is_valid"]
+
+    @requires_fhir_resources
+    def test_valid_entries_are_not_parsed_again(self):
+        validator = FHIRValidator()
+        bundle = make_bundle(*(observation(i) for i in range(5)))
+        bundle["entry"].append({"resource": {"resourceType": "Patient", "id": "p1", "gender": "male"}})
+
+        parsed_types = []
+        original = validator._validate_with_fhir_resources
+
+        def counting(resource, resource_type):
+            parsed_types.append(resource_type)
+            return original(resource, resource_type)
+
+        with patch.object(validator, "_validate_with_fhir_resources", side_effect=counting):
+            result = validator.validate_bundle(bundle)
+        assert parsed_types == ["Bundle"]
+        assert len(result["resource_validations"]) == 6
+
+    @requires_fhir_resources
+    def test_entries_with_parse_errors_are_reparsed(self):
+        validator = FHIRValidator()
+        broken = {"resourceType": "MedicationRequest", "id": "m1", "status": "active", "intent": "order",
+                  "subject": {"reference": "Patient/p1"}}
+        bundle = make_bundle(observation(0), broken)
+        assert validator._entries_with_structure_issues(
+            validator._validate_with_fhir_resources(bundle, "Bundle")) == {1}
+
+        result = validator.validate_bundle(bundle)
+        entry_structure = [issue for issue in result["resource_validations"][1]["issues"] if issue["type"] == "structure"]
+        assert entry_structure and entry_structure[0]["location"].startswith("entry[1].resource.")
+        assert not [issue for issue in result["resource_validations"][0]["issues"] if issue["type"] == "structure"]
@@ -0,0 +1,107 @@
+"""
+Tests for the bounded LRU caches behind FHIRPerformanceManager
+Eviction order, byte limits, background expiry and striping must keep the manager's cache API unchanged.
+HIPAA Compliant: No PHI in test data
+"""
+
+import threading
+from unittest.mock import patch
+
+from nl_fhir.services.fhir.cache_store import CacheSweeper, LRUTTLCache, StripedLRUCache
+from nl_fhir.services.fhir.performance_manager import FHIRPerformanceManager
+
+
+class TestLRUTTLCacheLimits:
+    """Byte limits and sweeping"""
+
+    def test_byte_limit_evicts_least_recently_used(self):
+        cache = LRUTTLCache(max_entries=100, max_bytes=30, sizeof=len)
+        cache.put("a", "x" * 10)
+        cache.put("b", "y" * 10)
+        cache.get("a")
+        cache.put("c", "z" * 15)
+        assert cache.get("b") is None and cache.get("a") and cache.get("c")
+        assert cache.bytes == 25
+
+        cache.put("huge", "w" * 31)
+        assert cache.get("huge") is None and len(cache) == 2
+        assert cache.get_stats()["rejected"] == 1
+
+    def test_sweep_drops_only_expired_entries(self):
+        cache = LRUTTLCache(ttl_seconds=10)
+        with patch("nl_fhir.services.fhir.cache_store.time.monotonic", side_effect=[100.0, 105.0, 106.0, 112.0]):
+            cache.put("old", 1)
+            cache.put("new", 2)
+            cache.get("old")  # recency does not extend the TTL
+            assert cache.sweep_expired() == 1
+        assert len(cache) == 1 and cache.get_stats()["expirations"] == 1
+
+    def test_background_sweeper_expires_unread_entries(self):
+        cache = LRUTTLCache(ttl_seconds=0)
+        cache.put("a", 1)
+        sweeper = CacheSweeper(interval_seconds=0.01)
+        sweeper.register(cache)
+        try:
+            for _ in range(200):
+                if not len(cache):
+                    break
+                threading.Event().wait(0.01)
+        finally:
+            sweeper.stop()
+        assert len(cache) == 0 and sweeper.expired >= 1
+
+
+class TestStripedLRUCache:
+    """Limits split over stripes, stats aggregated"""
+
+    def test_limits_and_stats_cover_all_stripes(self):
+        cache = StripedLRUCache(max_entries=64, stripes=8)
+        for i in range(500):
+            cache.put(f"k{i}", i)
+        assert cache.stripes == 8 and len(cache) <= 64
+        stats = cache.get_stats()
+        assert stats["stores"] == 500 and stats["evictions"] == 500 - len(cache)
+
+        small = StripedLRUCache(max_entries=2, stripes=16)
+        assert small.stripes == 2
+
+    def test_concurrent_puts_respect_the_entry_limit(self):
+        cache = StripedLRUCache(max_entries=128, stripes=4)
+
+        def writer(offset):
+            for i in range(1000):
+                cache.put(f"{offset}-{i}", i)
+                cache.get(f"{offset}-{i // 2}")
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = cache.get_stats()
+        assert len(cache) <= 128 and stats["stores"] == 8000
+        assert stats["entries"] + stats["evictions"] == 8000
+
+
+class TestPerformanceManagerCaches:
+    """FHIRPerformanceManager keeps its cache API on the new store"""
+
+    def test_lru_eviction_and_stats(self):
+        manager = FHIRPerformanceManager(cache_size=2, cache_stripes=1)
+        manager.cache_validation_result("a", {"is_valid": True})
+        manager.cache_validation_result("b", {"is_valid": False})
+        assert manager.get_cached_validation_result("a") == {"is_valid": True}
+        manager.cache_validation_result("c", {"is_valid": True})
+
+        assert manager.get_cached_validation_result("b") is None
+        assert manager.cache_stats == {"hits": 1, "misses": 1, "evictions": 1}
+        assert manager.get_performance_summary() == {"message": "No performance data available"}
+
+        manager.clear_caches()
+        assert manager.cache_stats == {"hits": 0, "misses": 0, "evictions": 0}
+
+    def test_optimized_settings_reach_the_caches(self):
+        manager = FHIRPerformanceManager(cache_size=100)
+        manager.get_cached_validation_result("missing")
+        manager.optimize_performance_settings()
+        assert manager.validation_cache.ttl_seconds == manager.optimization_settings["cache_ttl_seconds"] == 5400
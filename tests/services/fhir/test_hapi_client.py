@@ -0,0 +1,268 @@
+"""
+Tests for pooled HAPI FHIR connections
+Runs HAPIFHIRClient and HAPIFailoverManager against a local stub FHIR server and checks that
+consecutive requests reuse one keep-alive connection.
+HIPAA Compliant: No PHI in test data
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from nl_fhir.services.fhir.failover_manager import HAPIFailoverManager
+from nl_fhir.services.fhir.hapi_client import HAPIFHIRClient, HAPISearchPageError
+
+BUNDLE = {"resourceType": "Bundle", "type": "collection",
+          "entry": [{"resource": {"resourceType": "Patient", "id": "p1"}}]}
+OBSERVATION_PAGES = 3
+PAGE_SIZE = 2
+
+
+class StubFHIRHandler(BaseHTTPRequestHandler):
+    """Minimal HAPI stand-in: metadata, $validate, read and search"""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without this keep-alive responses stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/fhir+json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _search_page(self, offset):
+        """HAPI-style paging: later pages are read from the base URL with _getpages"""
+        entries = [{"resource": {"resourceType": "Observation", "id": f"o{offset + i}"}} for i in range(PAGE_SIZE)]
+        page = {"resourceType": "Bundle", "type": "searchset", "total": OBSERVATION_PAGES * PAGE_SIZE, "entry": entries}
+        if offset + PAGE_SIZE < OBSERVATION_PAGES * PAGE_SIZE:
+            next_url = f"?_getpages=stub&_getpagesoffset={offset + PAGE_SIZE}"
+            if not self.server.relative_links:
+                next_url = f"http://{self.server.link_host or self.headers['Host']}/fhir{next_url}"
+            page["link"] = [{"relation": "self", "url": "ignored"}, {"relation": "next", "url": next_url}]
+        self._send(200, page)
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path, self.client_address[1]))
+        if "/Observation" in self.path:
+            self._search_page(0)
+        elif "_getpages=stub" in self.path:
+            offset = int(self.path.rsplit("=", 1)[1])
+            if offset in self.server.failing_offsets:
+                self._send(500, {"resourceType": "OperationOutcome"})
+            else:
+                self._search_page(offset)
+        elif self.path.endswith("/metadata"):
+            self._send(200, {"resourceType": "CapabilityStatement", "fhirVersion": "4.0.1",
+                             "software": {"name": "stub"}, "rest": [{"resource": [{"type": "Patient"}]}]})
+        elif "/Patient/p1" in self.path:
+            self._send(200, {"resourceType": "Patient", "id": "p1"})
+        elif "/Patient?" in self.path:
+            self._send(200, {"resourceType": "Bundle", "type": "searchset", "total": 1,
+                             "entry": [{"resource": {"resourceType": "Patient", "id": "p1"}}]})
+        else:
+            self._send(404, {"resourceType": "OperationOutcome"})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(("POST", self.path, self.client_address[1]))
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        time.sleep(self.server.validate_delay)
+        with self.server.lock:
+            self.server.in_flight -= 1
+        severity = "error" if body.get("type") != "collection" else "warning"
+        self._send(200, {"resourceType": "OperationOutcome",
+                         "issue": [{"severity": severity, "diagnostics": "stub issue"}]})
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubFHIRHandler)
+    server.requests = []
+    server.lock = threading.Lock()
+    server.in_flight = server.max_in_flight = 0
+    server.validate_delay = 0
+    server.relative_links = False
+    server.link_host = None
+    server.failing_offsets = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}/fhir"
+    server.shutdown()
+    server.server_close()
+
+
+def client_ports(server, method):
+    return {port for request_method, _, port in server.requests if request_method == method}
+
+
+class TestPooledClient:
+    """HAPIFHIRClient reuses connections"""
+
+    async def test_requests_share_one_keep_alive_connection(self, stub_server):
+        server, url = stub_server
+        client = HAPIFHIRClient(base_url=url, timeout=5)
+        results = [await client.validate_bundle(BUNDLE, f"req-{i}") for i in range(5)]
+        patient = await client.get_patient("p1")
+        search = await client.search_resources("Patient", {"name": "test"})
+        capabilities = await client.get_server_capabilities()
+        await client.aclose()
+
+        assert all(r["validation_source"] == "hapi_fhir" and r["is_valid"] for r in results)
+        assert results[0]["warnings"] == ["stub issue"]
+        assert patient["id"] == "p1" and search["total"] == 1 and capabilities["software_name"] == "stub"
+        assert len(client_ports(server, "POST")) == 1
+        stats = client.get_pool_stats()
+        assert stats["requests"] == 8 and stats["async_clients_created"] == 1
+
+    async def test_unreachable_server_falls_back(self, stub_server):
+        server, url = stub_server
+        server.shutdown()
+        server.server_close()
+        client = HAPIFHIRClient(base_url=url, timeout=2)
+        client.initialized = True
+        result = await client.validate_bundle(BUNDLE)
+        assert result["validation_source"] == "fallback" and result["is_valid"]
+
+
+class TestFailoverClients:
+    """HAPIFailoverManager keeps one pooled client per endpoint"""
+
+    async def test_operations_and_health_checks_reuse_the_endpoint_client(self, stub_server):
+        server, url = stub_server
+        manager = HAPIFailoverManager()
+        for endpoint in list(manager.endpoints):
+            await manager.remove_endpoint(endpoint.name)
+        manager.add_endpoint("stub", url, priority=1, timeout=5)
+        endpoint = manager.endpoints[0]
+        await manager._check_endpoint_health(endpoint)
+        manager.initialized = True
+
+        shared = HAPIFHIRClient(base_url="http://127.0.0.1:9/unused")
+        for _ in range(3):
+            result = await manager.execute_with_failover(shared.validate_bundle, BUNDLE)
+            assert result["validation_source"] == "hapi_fhir"
+
+        client = manager.clients["stub"]
+        assert await manager.get_client(endpoint) is client and shared.base_url == "http://127.0.0.1:9/unused"
+        assert endpoint.status.value == "healthy" and endpoint.successful_requests == 4
+        assert len(client_ports(server, "POST") | client_ports(server, "GET")) == 1
+        assert manager.get_endpoint_status()["endpoints"][0]["connection_pool"]["requests"] == 4
+        await manager.shutdown()
+        assert manager.clients == {}
+
+    async def test_replaced_and_removed_clients_are_closed(self, stub_server):
+        _, url = stub_server
+        manager = HAPIFailoverManager()
+        for endpoint in list(manager.endpoints):
+            await manager.remove_endpoint(endpoint.name)
+        manager.add_endpoint("stub", url, priority=1, timeout=5)
+        endpoint = manager.endpoints[0]
+
+        first = await manager.get_client(endpoint)
+        endpoint.url = url + "/moved"
+        with patch.object(first, "aclose", AsyncMock()) as first_close:
+            second = await manager.get_client(endpoint)
+        assert second is not first and first_close.await_count == 1
+
+        with patch.object(second, "aclose", AsyncMock()) as second_close:
+            await manager.remove_endpoint("stub")
+        assert second_close.await_count == 1 and manager.clients == {}
+
+
+class TestBatchValidationAndPaging:
+    """validate_bundles and iter_search_resources"""
+
+    async def test_batch_validation_is_concurrent_capped_and_ordered(self, stub_server):
+        server, url = stub_server
+        server.validate_delay = 0.05
+        client = HAPIFHIRClient(base_url=url, timeout=5)
+        client.initialized = True
+        bundles = [{**BUNDLE, "type": "collection" if i % 2 else "transaction"} for i in range(10)]
+
+        results = await client.validate_bundles(bundles, "batch", max_concurrency=3)
+        await client.aclose()
+
+        assert [r["is_valid"] for r in results] == [bool(i % 2) for i in range(10)]
+        assert server.max_in_flight == 3
+        assert len(client_ports(server, "POST")) == 3
+
+    async def test_search_follows_next_links_lazily(self, stub_server):
+        server, url = stub_server
+        client = HAPIFHIRClient(base_url=url, timeout=5)
+        client.initialized = True
+
+        ids = [resource["id"] async for resource in client.iter_search_resources("Observation", {"code": "8867-4"})]
+        assert ids == [f"o{i}" for i in range(OBSERVATION_PAGES * PAGE_SIZE)]
+        assert client.get_pool_stats()["search_pages"] == OBSERVATION_PAGES
+
+        server.requests.clear()
+        search = client.iter_search_resources("Observation", {}, max_pages=5)
+        first = await search.__anext__()
+        await asyncio.sleep(0.2)
+        # The second page was requested while the caller was still on the first one, and no further
+        prefetched = [path for _, path, _ in server.requests if "_getpages" in path]
+        await search.aclose()
+        await client.aclose()
+        assert first["id"] == "o0"
+        assert prefetched == ["/fhir?_getpages=stub&_getpagesoffset=2"]
+
+        limited = HAPIFHIRClient(base_url=url, timeout=5)
+        limited.initialized = True
+        assert len([r async for r in limited.iter_search_resources("Observation", {}, max_pages=2)]) == 2 * PAGE_SIZE
+        await limited.aclose()
+
+    async def test_relative_next_links_resolve_against_the_base_url(self, stub_server):
+        server, url = stub_server
+        server.relative_links = True
+        client = HAPIFHIRClient(base_url=url, timeout=5)
+        client.initialized = True
+
+        ids = [resource["id"] async for resource in client.iter_search_resources("Observation", {})]
+        await client.aclose()
+        assert ids == [f"o{i}" for i in range(OBSERVATION_PAGES * PAGE_SIZE)]
+        assert [path for _, path, _ in server.requests if "_getpages" in path] == [
+            "/fhir/?_getpages=stub&_getpagesoffset=2", "/fhir/?_getpages=stub&_getpagesoffset=4"
+        ]
+
+    async def test_foreign_next_links_are_rebased_onto_the_base_url(self, stub_server):
+        server, url = stub_server
+        server.link_host = "fhir.attacker.example:8443"
+        client = HAPIFHIRClient(base_url=url, timeout=5)
+        client.initialized = True
+
+        ids = [resource["id"] async for resource in client.iter_search_resources("Observation", {})]
+        await client.aclose()
+        # Every page came from the configured server, not the host named in the links
+        assert ids == [f"o{i}" for i in range(OBSERVATION_PAGES * PAGE_SIZE)]
+        assert [path for _, path, _ in server.requests if "_getpages" in path] == [
+            "/fhir?_getpages=stub&_getpagesoffset=2", "/fhir?_getpages=stub&_getpagesoffset=4"
+        ]
+
+    async def test_failed_later_page_raises(self, stub_server):
+        server, url = stub_server
+        server.failing_offsets = {4}
+        client = HAPIFHIRClient(base_url=url, timeout=5)
+        client.initialized = True
+
+        ids = []
+        with pytest.raises(HAPISearchPageError):
+            async for resource in client.iter_search_resources("Observation", {}):
+                ids.append(resource["id"])
+        assert ids == [f"o{i}" for i in range(2 * PAGE_SIZE)]
+
+        # A first page that cannot be fetched still yields nothing, like search_resources
+        assert [r async for r in client.iter_search_resources("Unknown", {})] == []
+        await client.aclose()
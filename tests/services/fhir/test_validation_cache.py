@@ -0,0 +1,112 @@
+"""
+Tests for the content-addressed FHIR validation cache
+Keys must change with any content change, and reused results must equal fresh validation.
+HIPAA Compliant: No PHI in test data
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from nl_fhir.services.fhir.performance_manager import FHIRPerformanceManager
+from nl_fhir.services.fhir.validation_cache import ContentHasher, LRUTTLCache
+from nl_fhir.services.fhir.validation_service import FHIRValidationService
+from nl_fhir.services.fhir.validator import FHIRValidator
+
+
+def patient_bundle(family="Alpha", gender="male"):
+    return {"resourceType": "Bundle", "id": "b1", "type": "collection", "entry": [
+        {"resource": {"resourceType": "Patient", "id": "p1", "gender": gender, "name": [{"family": family}]}},
+        {"resource": {"resourceType": "Observation", "id": "o1", "status": "final",
+                      "code": {"coding": [{"system": "http://loinc.org", "code": "8867-4"}]},
+                      "subject": {"reference": "Patient/p1"}}},
+    ]}
+
+
+def issue_list(result):
+    return [(issue["severity"], issue["type"], issue["location"], issue["message"]) for issue in result["issues"]]
+
+
+class TestContentHasher:
+    """Keyed digests of canonical JSON"""
+
+    def test_same_shape_different_content_gets_different_keys(self):
+        hasher = ContentHasher(b"test-key")
+        assert hasher.digest(patient_bundle("Alpha")) != hasher.digest(patient_bundle("Bravo"))
+        # The old shape-only hash collided on exactly this pair
+        manager = FHIRPerformanceManager()
+        assert manager.generate_bundle_hash(patient_bundle("Alpha")) != manager.generate_bundle_hash(patient_bundle("Bravo"))
+
+    def test_key_order_independent_and_keyed(self):
+        bundle = patient_bundle()
+        reordered = dict(reversed(list(bundle.items())))
+        assert ContentHasher(b"k1").digest(bundle) == ContentHasher(b"k1").digest(reordered)
+        assert ContentHasher(b"k1").digest(bundle) != ContentHasher(b"k2").digest(bundle)
+
+
+class TestLRUTTLCache:
+    """Bounded, expiring store"""
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LRUTTLCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_entries_expire_after_ttl(self):
+        cache = LRUTTLCache(ttl_seconds=10)
+        with patch("nl_fhir.services.fhir.cache_store.time.monotonic", side_effect=[100.0, 105.0, 111.0]):
+            cache.put("a", 1)
+            assert cache.get("a") == 1
+            assert cache.get("a") is None
+        assert cache.get_stats()["expirations"] == 1 and len(cache) == 0
+
+
+class TestResourceMemo:
+    """Entry resources reused across bundles"""
+
+    def test_memoized_resources_give_the_same_issues_without_reparsing(self):
+        memo = LRUTTLCache(max_entries=100)
+        validator = FHIRValidator(memo, ContentHasher(b"k"))
+        first = validator.validate_bundle(patient_bundle(gender="bogus"))
+
+        changed = patient_bundle(gender="bogus")
+        changed["entry"][1]["resource"]["status"] = "amended"
+        with patch.object(validator, "_validate_with_fhir_resources",
+                          wraps=validator._validate_with_fhir_resources) as parse:
+            second = validator.validate_bundle(changed)
+        parsed_bundle = parse.call_args_list[0].args[0]
+        # The unchanged Patient is served from the memo and left out of the parse
+        assert "resource" not in parsed_bundle["entry"][0] and "resource" in parsed_bundle["entry"][1]
+
+        assert issue_list(second) == issue_list(FHIRValidator().validate_bundle(changed))
+        assert issue_list(first)[:2] == issue_list(second)[:2]
+        assert memo.get_stats()["hits"] == 1
+
+
+class TestValidationServiceCache:
+    """FHIRValidationService serves repeats of identical content only"""
+
+    @pytest.fixture
+    def service(self):
+        service = FHIRValidationService()
+        service.cache = LRUTTLCache(max_entries=10)
+        service.hapi_client = AsyncMock()
+        service.hapi_client.validate_bundle.return_value = None
+        service.local_validator = FHIRValidator()
+        service.initialized = True
+        return service
+
+    async def test_identical_bundle_hits_and_changed_bundle_misses(self, service):
+        first = await service.validate_bundle(patient_bundle("Alpha"))
+        first["recommendations"].append("mutated by caller")
+        again = await service.validate_bundle(patient_bundle("Alpha"))
+        other = await service.validate_bundle(patient_bundle("Bravo"))
+
+        assert service.hapi_client.validate_bundle.await_count == 2
+        assert "mutated by caller" not in again["recommendations"]
+        assert other["is_valid"] == first["is_valid"]
+        assert service.cache.get_stats()["hits"] == 1
@@ -0,0 +1,290 @@
+"""
+Tests for incremental re-conversion of edited clinical text
+Only edited sentences are re-extracted; unchanged FHIR resources keep their ids.
+HIPAA Compliant: No PHI in test data
+"""
+
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from nl_fhir.config import Settings
+from nl_fhir.models.request import ClinicalRequestAdvanced
+from nl_fhir.services import conversion as conversion_module
+from nl_fhir.services.conversion import ConversionService
+from nl_fhir.services.fhir import bundle_assembler
+from nl_fhir.services.fhir.bundle_assembler import FHIRBundleAssembler
+from nl_fhir.services.incremental_conversion import (
+    ConversionSnapshot,
+    ConversionSnapshotStore,
+    ResourceReuse,
+    index_entities,
+    reextract_entities,
+)
+from nl_fhir.services.nlp.entity_extractor import EntityType, MedicalEntity
+
+NOTE = "Start metformin 500mg daily.\nOrder CBC today.\nPatient has hypertension."
+
+KEYWORDS = {"metformin": EntityType.MEDICATION, "lisinopril": EntityType.MEDICATION,
+            "cbc": EntityType.LAB_TEST, "hypertension": EntityType.CONDITION}
+
+
+def fake_extract(text):
+    """Keyword extraction standing in for the tiered NLP"""
+    entities = []
+    for keyword, entity_type in KEYWORDS.items():
+        start = text.lower().find(keyword)
+        if start >= 0:
+            entities.append(MedicalEntity(keyword, entity_type, start, start + len(keyword), 0.9, {}, "test"))
+    return sorted(entities, key=lambda e: e.start_char)
+
+
+def counting_batch(calls):
+    def extract_batch(texts):
+        calls.append(list(texts))
+        return [fake_extract(text) for text in texts]
+    return extract_batch
+
+
+def bundle_ids(bundle):
+    # Entries that failed Bundle validation come back as dicts, the rest as BundleEntry models
+    return {entry["resource"]["id"] if isinstance(entry, dict) else entry.resource.id for entry in bundle["entry"]}
+
+
+def spans(text, entities):
+    return [(entity.text, text[entity.start_char:entity.end_char].lower()) for entity in entities]
+
+
+class TestSentenceReuse:
+    """index_entities and reextract_entities"""
+
+    def snapshot(self, text=NOTE):
+        sentence_entities, note_entities = index_entities(text, fake_extract(text), max_chars=1000)
+        return ConversionSnapshot("fp", sentence_entities, note_entities)
+
+    def test_only_edited_sentences_are_extracted(self):
+        calls = []
+        edited = "Allergic to penicillin.\n" + NOTE.replace("metformin 500mg", "lisinopril 10mg")
+        entities, stats = reextract_entities(edited, self.snapshot(), counting_batch(calls), max_chars=1000)
+
+        assert calls == [["Allergic to penicillin.", "Start lisinopril 10mg daily."]]
+        assert stats["reextracted_sentences"] == 2
+        assert stats["reused_sentences"] == 2
+        # Reused entities moved with their sentences
+        assert spans(edited, entities) == [("lisinopril", "lisinopril"), ("cbc", "cbc"),
+                                           ("hypertension", "hypertension")]
+
+    def test_unchanged_text_extracts_nothing(self):
+        calls = []
+        entities, stats = reextract_entities(NOTE, self.snapshot(), counting_batch(calls), max_chars=1000)
+        assert calls == []
+        assert stats["reextracted_sentences"] == 0
+        assert [(e.text, e.start_char, e.end_char) for e in entities] == \
+               [(e.text, e.start_char, e.end_char) for e in fake_extract(NOTE)]
+
+    def test_short_batch_result_raises(self):
+        edited = NOTE.replace("metformin 500mg", "lisinopril 10mg") + "\nAllergic to penicillin."
+        with pytest.raises(ValueError):
+            reextract_entities(edited, self.snapshot(), lambda texts: [fake_extract(texts[0])], max_chars=1000)
+
+    def test_spanless_entities_follow_their_sentence(self):
+        llm_entity = MedicalEntity("CBC", EntityType.LAB_TEST, 0, 0, 0.7, {}, "llm")
+        lost = MedicalEntity("warfarin", EntityType.MEDICATION, 0, 0, 0.7, {}, "llm")
+        sentence_entities, note_entities = index_entities(NOTE, [llm_entity, lost], max_chars=1000)
+
+        assert sentence_entities["Order CBC today."] == [llm_entity]
+        assert note_entities == [lost]
+
+        snapshot = ConversionSnapshot("fp", sentence_entities, note_entities)
+        entities, stats = reextract_entities(NOTE.replace("Order CBC today.", "Order CBC now."), snapshot,
+                                             counting_batch([]), max_chars=1000)
+        assert llm_entity not in entities
+        assert stats["reused_note_entities"] == 0
+
+    def test_assembled_note_is_escalated_once(self):
+        escalations = []
+
+        def escalate(text, entities):
+            escalations.append((text, [entity.text for entity in entities]))
+            return entities + [MedicalEntity("aspirin", EntityType.MEDICATION, 0, 0, 0.7, {}, "llm")]
+
+        edited = NOTE.replace("Order CBC today.", "Order CBC now.").replace("metformin", "lisinopril")
+        entities, stats = reextract_entities(edited, self.snapshot(), counting_batch([]), max_chars=1000,
+                                             escalate=escalate)
+        assert escalations == [(edited, ["lisinopril", "cbc", "hypertension"])]
+        assert entities[-1].text == "aspirin" and stats["llm_escalated"] is True
+
+        _, stats = reextract_entities(NOTE, self.snapshot(), counting_batch([]), max_chars=1000, escalate=escalate)
+        assert len(escalations) == 1 and stats["llm_escalated"] is False
+
+
+class TestResourceReuse:
+    """Resources reused by input fingerprint and occurrence"""
+
+    def test_matching_inputs_reuse_the_previous_resource(self):
+        first = ResourceReuse()
+        created = first.get_or_create("Condition", ["hypertension", "p1"], lambda: {"id": "c1"})
+        second = ResourceReuse(first.resources)
+        create = MagicMock(return_value={"id": "c2"})
+
+        assert second.get_or_create("Condition", ["hypertension", "p1"], create) == created
+        assert second.get_or_create("Condition", ["diabetes", "p1"], create) == {"id": "c2"}
+        assert create.call_count == 1
+        assert second.get_stats() == {"reused_resources": 1, "created_resources": 1}
+
+    def test_repeated_inputs_get_distinct_resources(self):
+        first = ResourceReuse()
+        first.get_or_create("Observation", ["bp"], lambda: {"id": "o1"})
+        second = ResourceReuse(first.resources)
+        ids = [second.get_or_create("Observation", ["bp"], lambda: {"id": str(uuid4())})["id"] for _ in range(2)]
+        assert ids[0] == "o1" and ids[1] != "o1"
+
+
+class TestSnapshotStore:
+    """LRU, TTL and fingerprint checks"""
+
+    def snapshot(self, fingerprint="fp"):
+        return ConversionSnapshot(fingerprint, {}, [])
+
+    def test_lru_eviction(self):
+        store = ConversionSnapshotStore(max_entries=2)
+        for result_id in ("a", "b"):
+            store.set(result_id, self.snapshot())
+        store.get("a")
+        store.set("c", self.snapshot())
+        assert store.get("b") is None
+        assert store.get("a") is not None
+        assert store.get_stats()["evictions"] == 1
+
+    def test_expired_and_foreign_fingerprint_miss(self):
+        store = ConversionSnapshotStore(ttl_seconds=60)
+        store.set("a", self.snapshot("fp-old"))
+        assert store.get("a", "fp-new") is None
+        assert store.get("a", "fp-old") is not None
+        with patch("nl_fhir.services.incremental_conversion.time.time", return_value=time.time() + 61):
+            assert store.get("a") is None
+
+
+class TestBundleEntryReuse:
+    """Validated entries of unchanged resources are not rebuilt"""
+
+    def test_cached_entries_skip_validation(self):
+        assembler = FHIRBundleAssembler()
+        resources = [{"resourceType": "Patient", "id": f"p{i}"} for i in range(3)]
+        entry_cache = {}
+        assembler.create_transaction_bundle(resources, "req-1", entry_cache)
+        assert set(entry_cache) == {"p0", "p1", "p2"}
+
+        reused = {"p0": entry_cache["p0"], "p1": entry_cache["p1"]}
+        with patch.object(bundle_assembler.BundleEntry, "parse_obj", wraps=bundle_assembler.BundleEntry.parse_obj) as parse:
+            bundle = assembler.create_transaction_bundle(resources + [{"resourceType": "Patient", "id": "p3"}],
+                                                         "req-2", reused)
+        assert parse.call_count == 2  # p2 and p3
+        assert [entry["resource"]["id"] for entry in bundle["entry"]] == ["p0", "p1", "p2", "p3"]
+
+
+class TestIncrementalConvert:
+    """convert_advanced with previous_result_id"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        # Snapshots hold clinical text in process memory, so the feature is opt-in
+        monkeypatch.setattr(conversion_module.get_settings(), "incremental_conversion_enabled", True)
+
+        def fake_pipeline_result(text, request_id=None, entities=None):
+            entities = entities if entities is not None else fake_extract(text)
+            return {
+                "status": "completed",
+                "extracted_entities": {"entities": [
+                    {"text": e.text, "type": e.entity_type.value, "start_char": e.start_char,
+                     "end_char": e.end_char, "confidence": e.confidence, "source": e.source, "attributes": {}}
+                    for e in entities
+                ]},
+                "structured_output": {},
+            }
+
+        pipeline = MagicMock()
+        pipeline.process_clinical_text = AsyncMock(side_effect=fake_pipeline_result)
+        factory = MagicMock()
+        for method in ("create_patient_resource", "create_practitioner_resource", "create_encounter_resource",
+                       "create_medication_request", "create_service_request", "create_condition_resource"):
+            resource_type = method.replace("create_", "").replace("_resource", "").title().replace("_", "")
+            getattr(factory, method).side_effect = (
+                lambda *args, resource_type=resource_type, **kwargs: {"resourceType": resource_type, "id": str(uuid4())}
+            )
+        factory.create_task_resource.return_value = None
+        factory.create_diagnostic_report.return_value = None
+        extractor = MagicMock()
+        extractor.extract_entities_batch.side_effect = (
+            lambda texts, escalate_to_llm=True: [fake_extract(text) for text in texts]
+        )
+        extractor.escalate_note_entities.side_effect = lambda text, entities: entities
+
+        with patch.object(conversion_module, "get_nlp_pipeline", AsyncMock(return_value=pipeline)), \
+             patch.object(conversion_module, "get_fhir_resource_factory", AsyncMock(return_value=factory)), \
+             patch.object(conversion_module, "get_entity_extractor", return_value=extractor), \
+             patch.object(conversion_module, "get_hapi_client", AsyncMock(side_effect=RuntimeError("offline"))), \
+             patch.object(conversion_module, "get_snapshot_store", return_value=ConversionSnapshotStore()), \
+             patch.object(conversion_module, "extraction_fingerprint", return_value="fp"), \
+             patch.object(ConversionService, "_extract_vitals_from_text", return_value=[]):
+            yield ConversionService(), factory, extractor
+
+    @pytest.mark.asyncio
+    async def test_edit_reuses_unchanged_entities_and_resources(self, service):
+        service, factory, extractor = service
+        first = await service.convert_advanced(ClinicalRequestAdvanced(clinical_text=NOTE), store_snapshot=True)
+        assert first.result_id == first.request_id
+        assert first.incremental is None
+
+        edited = NOTE.replace("metformin", "lisinopril")
+        second = await service.convert_advanced(
+            ClinicalRequestAdvanced(clinical_text=edited, previous_result_id=first.result_id), store_snapshot=True
+        )
+
+        # Edited sentences are not escalated one by one; the assembled note is escalated once
+        extractor.extract_entities_batch.assert_called_once_with(["Start lisinopril 500mg daily."],
+                                                                 escalate_to_llm=False)
+        extractor.escalate_note_entities.assert_called_once()
+        assert second.incremental["applied"] is True
+        assert second.incremental["reextracted_sentences"] == 1
+
+        # Only the MedicationRequest is rebuilt; Patient, Practitioner, Encounter,
+        # ServiceRequest and Condition keep their ids
+        first_ids, second_ids = bundle_ids(first.fhir_bundle), bundle_ids(second.fhir_bundle)
+        assert len(first_ids - second_ids) == len(second_ids - first_ids) == 1
+        assert second.incremental["created_resources"] == 1
+        assert second.incremental["reused_resources"] == 5
+        assert factory.create_patient_resource.call_count == 1
+        assert factory.create_medication_request.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_result_id_runs_full_conversion(self, service):
+        service, _, extractor = service
+        response = await service.convert_advanced(
+            ClinicalRequestAdvanced(clinical_text=NOTE, previous_result_id="missing")
+        )
+        assert response.incremental == {"applied": False, "reason": "previous_result_unavailable"}
+        assert response.fhir_bundle is not None
+        extractor.extract_entities_batch.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_snapshot_only_when_requested_and_not_for_bulk_items(self, service):
+        service, _, _ = service
+        store = conversion_module.get_snapshot_store()
+        default = await service.convert_advanced(ClinicalRequestAdvanced(clinical_text=NOTE))
+        bulk_item = await service.convert_advanced(ClinicalRequestAdvanced(clinical_text=NOTE),
+                                                   precomputed_entities=fake_extract(NOTE), store_snapshot=True)
+        assert default.result_id is None and bulk_item.result_id is None
+        assert store.get_stats()["stores"] == 0
+
+    @pytest.mark.asyncio
+    async def test_disabled_setting_stores_nothing(self, service, monkeypatch):
+        service, _, extractor = service
+        monkeypatch.setattr(conversion_module.get_settings(), "incremental_conversion_enabled", False)
+        store = conversion_module.get_snapshot_store()
+        response = await service.convert_advanced(ClinicalRequestAdvanced(clinical_text=NOTE), store_snapshot=True)
+        assert response.result_id is None
+        assert store.get_stats()["stores"] == 0
+        assert Settings.model_fields["incremental_conversion_enabled"].default is False
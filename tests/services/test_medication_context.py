@@ -0,0 +1,59 @@
+"""
+Tests for one-pass route/dosage/frequency enrichment of medications
+Lookups in the note index must agree with scanning each medication's context window.
+HIPAA Compliant: No PHI in test data
+"""
+
+from nl_fhir.services.conversion import ConversionService
+from nl_fhir.services.medication_context import MedicationContextIndex
+
+NOTE = ("Start metformin 500mg by mouth twice daily with breakfast and dinner.\n"
+        "Heparin 5000 units sc every 12 hours while admitted to the ward.\n"
+        "Continue warfarin 5 mg qhs and recheck the INR on Monday morning.\n"
+        "Morphine 2 mg IV every 4 hours for pain.")
+
+
+class TestMedicationContextIndex:
+    """Window lookups against the note index"""
+
+    def test_route_dosage_and_frequency_per_medication(self):
+        index = MedicationContextIndex(NOTE)
+        assert index.route("metformin") == ("oral", "by mouth")
+        assert index.dosage("metformin") == "500mg"
+        assert index.frequency("metformin") == ("twice daily", "twice daily")
+
+        assert index.route("Heparin") == ("subcutaneous", "sc")
+        assert index.dosage("Heparin") == "5000 units"
+        assert index.frequency("heparin") == ("every 12 hours", "every 12 hours")
+
+        assert index.frequency("warfarin") == ("at bedtime", "qhs")
+        assert index.route("morphine") == ("iv", "iv")
+        assert index.frequency("morphine")[0] == "every 4 hours"
+
+    def test_abbreviations_only_match_whole_words(self):
+        index = MedicationContextIndex("Give insulin now, reviewed with trivia")
+        assert index.route("insulin") is None
+        # Inside a word ("shiv", "ascorbic") the abbreviation does not count
+        assert MedicationContextIndex("ascorbic acid shiv taken").route("acid") is None
+        assert MedicationContextIndex("aspirin then iv").route("aspirin") == ("iv", "iv")
+
+    def test_unknown_medication_has_no_window(self):
+        index = MedicationContextIndex(NOTE)
+        assert index.locate("lisinopril") == -1
+        assert index.route("lisinopril") is None
+        assert index.dosage("lisinopril") is None
+
+
+class TestConversionEnrichment:
+    """ConversionService defaults and the shared index"""
+
+    def test_defaults_and_shared_index(self):
+        service = ConversionService.__new__(ConversionService)
+        index = MedicationContextIndex(NOTE)
+
+        assert service._extract_route_from_context("lisinopril", NOTE, "t", index) == "oral"
+        assert service._extract_dosage_from_context("lisinopril", NOTE, "t", index) == "As directed"
+        assert service._extract_frequency_from_context("lisinopril", NOTE, "t", index) == "As needed"
+        assert service._extract_dosage_from_context("warfarin", NOTE, "t", index) == "5 mg"
+        # Without an index the method builds one for the note
+        assert service._extract_route_from_context("Morphine", NOTE, "t") == "iv"
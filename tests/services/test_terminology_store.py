@@ -0,0 +1,259 @@
+"""
+Tests for the memory-mapped terminology store
+Store-backed tables must answer lookups and iterate exactly like the dicts they replace.
+HIPAA Compliant: No PHI in test data
+"""
+
+import random
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from nl_fhir.config import get_settings
+from nl_fhir.services import terminology_store
+from nl_fhir.services.fhir.factories.clinical_factory import ClinicalResourceFactory
+from nl_fhir.services.nlp.rag_service import RAGService
+from nl_fhir.services.safety.interaction_checker import DrugInteractionChecker
+from nl_fhir.services.terminology_store import (
+    TerminologyStore,
+    TerminologyStoreError,
+    TermMentionIndex,
+    build_terminology_store,
+)
+
+TABLES = {
+    "lab_test_loinc": {"cbc": "58410-2", "glucose": "2345-7", "hba1c": "4548-4"},
+    "lab": {"zzz": "sorts before lab_test_loinc keys"},
+    "condition_codes": {"hypertension": {"icd10": "I10", "snomed": "38341003"}},
+    "drug_normalizer": {"coumadin": "warfarin", "café au lait": "unicode key"},
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / "terminology.nlts"
+    build_terminology_store(path, TABLES)
+    with TerminologyStore(path) as opened:
+        yield opened
+
+
+@pytest.fixture
+def configured_store(tmp_path, monkeypatch):
+    """Point settings at a store built from rows that differ from the built-in tables"""
+    path = tmp_path / "terminology.nlts"
+    build_terminology_store(path, {
+        "medication": {"semaglutide": {"code": "1991302", "system": "http://www.nlm.nih.gov/research/umls/rxnorm",
+                                       "display": "Semaglutide"}},
+        "lab_test_loinc": {"ferritin": "2276-4"},
+        "condition_codes": {"gout": {"icd10": "M10.9", "snomed": "90560007"}},
+        "drug_normalizer": {"ozempic": "semaglutide"},
+    })
+    monkeypatch.setattr(get_settings(), "terminology_store_path", str(path))
+    monkeypatch.setattr(terminology_store, "_store", None)
+    monkeypatch.setattr(terminology_store, "_store_path", None)
+    yield path
+    if terminology_store._store is not None:
+        terminology_store._store.close()
+
+
+class TestTerminologyStore:
+    """Binary format round trip and lookup semantics"""
+
+    def test_round_trip(self, store):
+        assert store.tables == sorted(TABLES)
+        assert len(store) == sum(len(rows) for rows in TABLES.values())
+        for name, rows in TABLES.items():
+            table = store.table(name)
+            assert dict(table.items()) == rows
+            assert len(table) == len(rows)
+            for key, value in rows.items():
+                assert key in table
+                assert table[key] == value
+                assert store.get(name, key) == value
+
+    def test_missing_keys_and_tables(self, store):
+        table = store.table("lab_test_loinc")
+        assert "zzz" not in table
+        assert table.get("cb") is None
+        assert store.get("lab_test_loinc", "missing", "fallback") == "fallback"
+        assert store.get("no_such_table", "cbc") is None
+        assert not store.has_table("no_such_table")
+        with pytest.raises(KeyError):
+            table["missing"]
+
+    def test_iteration_keeps_build_order(self, store):
+        assert list(store.table("lab_test_loinc")) == ["cbc", "glucose", "hba1c"]
+        assert list(store.table("drug_normalizer")) == ["coumadin", "café au lait"]
+
+    def test_duplicate_keys_behave_like_dict_updates(self, tmp_path):
+        path = tmp_path / "dupes.nlts"
+        build_terminology_store(path, {"t": [("b", 1), ("a", 2), ("b", 3)]})
+        with TerminologyStore(path) as store:
+            assert list(store.table("t").items()) == [("b", 3), ("a", 2)]
+
+    def test_randomized_parity_with_dict(self, tmp_path):
+        rng = random.Random(5)
+        rows = {}
+        while len(rows) < 2000:
+            key = "".join(rng.choice("abcdé xyz0123") for _ in range(rng.randint(1, 12)))
+            rows[key] = {"code": str(len(rows))}
+        path = tmp_path / "random.nlts"
+        build_terminology_store(path, {"medication": rows, "medicatio": {"x": 1}})
+
+        with TerminologyStore(path) as store:
+            table = store.table("medication")
+            assert list(table) == list(rows)
+            for key in rng.sample(list(rows), 200):
+                assert table[key] == rows[key]
+            for _ in range(200):
+                probe = "".join(rng.choice("abcdé xyz0123") for _ in range(rng.randint(1, 12)))
+                assert (probe in table) == (probe in rows)
+
+    def test_rejects_foreign_and_truncated_files(self, tmp_path):
+        foreign = tmp_path / "foreign.nlts"
+        foreign.write_bytes(b"not a terminology store at all, just some bytes")
+        with pytest.raises(TerminologyStoreError):
+            TerminologyStore(foreign)
+
+        path = tmp_path / "truncated.nlts"
+        build_terminology_store(path, TABLES)
+        path.write_bytes(path.read_bytes()[:40])
+        with pytest.raises(TerminologyStoreError):
+            TerminologyStore(path)
+
+        with pytest.raises(TerminologyStoreError):
+            TerminologyStore(tmp_path / "missing.nlts")
+
+
+class TestTermMentionIndex:
+    """Mention lookup must pick the same row as the first-match table scan"""
+
+    @staticmethod
+    def scan(table, text):
+        for key, value in table.items():
+            if key.replace("_", " ") in text or key in text:
+                return key, value
+        return None
+
+    @pytest.mark.parametrize("text", ["order cbc and glucose", "hba1c", "glucose then cbc", "no labs", ""])
+    def test_matches_first_key_scan(self, store, text):
+        table = store.table("lab_test_loinc")
+        assert TermMentionIndex(table).lookup(text) == self.scan(table, text)
+
+    def test_underscore_keys_match_spaced_text(self):
+        codes = {"heart_failure": "I50.9", "failure": "R69"}
+        assert TermMentionIndex(codes).lookup("acute heart failure") == ("heart_failure", "I50.9")
+
+    def test_randomized_store_parity_with_scan(self, tmp_path):
+        rng = random.Random(9)
+        words = ["heart", "failure", "acute", "renal", "café", "type", "2", "cbc", "panel"]
+        codes = {}
+        for _ in range(60):
+            codes["_".join(rng.sample(words, rng.randint(1, 3)))] = f"C{len(codes)}"
+        path = tmp_path / "codes.nlts"
+        build_terminology_store(path, {"codes": codes})
+        with TerminologyStore(path) as opened:
+            table = opened.table("codes")
+            index = TermMentionIndex(table)
+            for _ in range(200):
+                text = " ".join(rng.choices(words, k=rng.randint(0, 6)))
+                assert index.lookup(text) == self.scan(table, text)
+                assert TermMentionIndex(codes).lookup(text) == self.scan(codes, text)
+
+    def test_store_index_cost_does_not_grow_with_table_size(self, tmp_path):
+        reads = {}
+        for size in (100, 20000):
+            path = tmp_path / f"codes-{size}.nlts"
+            build_terminology_store(path, {"codes": {f"term_{i:05d}": str(i) for i in range(size)},
+                                           "other": {"glucose": "2345-7"}})
+            with TerminologyStore(path) as opened:
+                with patch.object(opened, "_entry", wraps=opened._entry) as entry:
+                    index = TermMentionIndex(opened.table("codes"))
+                    built = entry.call_count
+                    assert index.lookup("order term 00042 and term_00042 today") == ("term_00042", "42")
+                reads[size] = (built, entry.call_count - built)
+
+        # Nothing is read to build the index; a lookup reads O(log n) keys per probe
+        assert reads[100][0] == reads[20000][0] == 0
+        assert reads[20000][1] < 3 * reads[100][1]
+
+    def test_clinical_factory_index_parity(self):
+        factory = ClinicalResourceFactory(None, None, None)
+        for text in ["basic metabolic panel", "cbc with diff", "type 2 diabetes mellitus", "acute mi", "nothing"]:
+            assert factory._lab_test_index.lookup(text) == self.scan(factory._lab_test_loinc, text)
+            assert factory._condition_index.lookup(text) == self.scan(factory._condition_codes, text)
+
+
+class TestServicesUseConfiguredStore:
+    """RAG, clinical factory and interaction checker read tables from the store"""
+
+    def test_builtin_tables_without_store(self):
+        assert terminology_store.get_terminology_store() is None
+        assert isinstance(DrugInteractionChecker().drug_name_normalizer, dict)
+
+    def test_rag_lookup_from_store(self, configured_store):
+        rag = RAGService()
+        assert rag.initialize()
+        assert rag._lookup_medical_codes("semaglutide", "medication")[0]["code"] == "1991302"
+        # Sections the store does not carry keep the built-in terms
+        assert rag._lookup_medical_codes("hypertension", "condition")[0]["code"] == "I10"
+        rag.add_terminology("medication", {"tirzepatide": {"code": "2601723", "system": "rxnorm",
+                                                           "display": "Tirzepatide"}})
+        assert rag._lookup_medical_codes("tirzepatide", "medication")[0]["code"] == "2601723"
+
+    def test_interaction_checker_normalizer_from_store(self, configured_store):
+        checker = DrugInteractionChecker()
+        assert checker.drug_name_normalizer is not None
+        assert checker.drug_name_normalizer.get("ozempic", "ozempic") == "semaglutide"
+        assert checker.drug_name_normalizer.get("aspirin", "aspirin") == "aspirin"
+
+    def test_clinical_factory_codes_from_store(self, configured_store):
+        factory = ClinicalResourceFactory(None, None, None)
+        assert factory._create_condition_code({"name": "gout"})["coding"][0]["code"] == "M10.9"
+        assert factory._create_service_request_code({"name": "ferritin"})["coding"][0]["code"] == "2276-4"
+
+    def test_store_built_from_defaults_matches_builtin_tables(self, tmp_path, monkeypatch):
+        builtin = ClinicalResourceFactory(None, None, None)
+        path = tmp_path / "defaults.nlts"
+        build_terminology_store(path, {
+            "lab_test_loinc": builtin._lab_test_loinc,
+            "condition_codes": builtin._condition_codes,
+        })
+        monkeypatch.setattr(get_settings(), "terminology_store_path", str(path))
+        monkeypatch.setattr(terminology_store, "_store", None)
+        monkeypatch.setattr(terminology_store, "_store_path", None)
+
+        stored = ClinicalResourceFactory(None, None, None)
+        assert not isinstance(stored._lab_test_loinc, dict)
+        for name in ["cbc", "basic metabolic panel", "glucose level", "diabetes mellitus", "heart failure",
+                     "acute mi", "unknown finding"]:
+            data = {"name": name}
+            assert stored._create_condition_code(data) == builtin._create_condition_code(data)
+            assert stored._create_service_request_code(data) == builtin._create_service_request_code(data)
+        terminology_store._store.close()
+
+    def test_concurrent_first_calls_open_one_store(self, configured_store):
+        opened = []
+        original = terminology_store.TerminologyStore
+
+        def counting_store(path):
+            opened.append(path)
+            return original(path)
+
+        barrier = threading.Barrier(8)
+        results = []
+
+        def first_call():
+            barrier.wait()
+            results.append(terminology_store.get_terminology_store())
+
+        with patch.object(terminology_store, "TerminologyStore", side_effect=counting_store):
+            threads = [threading.Thread(target=first_call) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert len(opened) == 1
+        assert len({id(store) for store in results}) == 1
@@ -0,0 +1,87 @@
+"""
+Tests for concurrent bulk conversion (bounded parallelism, timeouts, ordering)
+HIPAA Compliant: No PHI in test data
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from nl_fhir.models.request import ClinicalRequestAdvanced
+from nl_fhir.models.response import ErrorResponse
+from nl_fhir.services.conversion import ConversionService
+
+
+def _requests(count):
+    return [ClinicalRequestAdvanced(clinical_text=f"Start patient on metformin {i}00mg daily") for i in range(count)]
+
+
+@pytest.fixture
+def service():
+    service = ConversionService()
+    with patch.object(service, "_extract_batch_entities", AsyncMock(side_effect=lambda reqs, _: [None] * len(reqs))):
+        yield service
+
+
+class TestConcurrentBulkConvert:
+    """Bulk conversion runs orders concurrently but returns them in request order"""
+
+    @pytest.mark.asyncio
+    async def test_results_preserve_request_order(self, service):
+        async def fake_convert(request, request_id, precomputed_entities=None):
+            # Later orders finish first
+            order_number = int(request_id.rsplit("_", 1)[1])
+            await asyncio.sleep(0.01 * (5 - order_number))
+            return request_id
+
+        with patch.object(service, "convert_advanced", side_effect=fake_convert):
+            result = await service.bulk_convert(_requests(5), "batch_order", max_concurrency=5)
+
+        assert result["results"] == [f"batch_order_order_{i}" for i in range(1, 6)]
+        assert result["successful_orders"] == 5
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit_is_respected(self, service):
+        in_flight = 0
+        peak = 0
+
+        async def fake_convert(request, request_id, precomputed_entities=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return request_id
+
+        with patch.object(service, "convert_advanced", side_effect=fake_convert):
+            await service.bulk_convert(_requests(8), "batch_limit", max_concurrency=3)
+
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_order_timeout_becomes_error_response(self, service):
+        async def fake_convert(request, request_id, precomputed_entities=None):
+            if request_id.endswith("_2"):
+                await asyncio.sleep(1)
+            return request_id
+
+        with patch.object(service, "convert_advanced", side_effect=fake_convert):
+            result = await service.bulk_convert(_requests(3), "batch_timeout", order_timeout_seconds=0.05)
+
+        assert result["successful_orders"] == 2
+        assert result["failed_orders"] == 1
+        assert isinstance(result["results"][1], ErrorResponse)
+        assert result["results"][1].error_code == "CONVERSION_TIMEOUT"
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_in_completion_order(self, service):
+        async def fake_convert(request, request_id, precomputed_entities=None):
+            await asyncio.sleep(0.05 if request_id.endswith("_1") else 0)
+            return request_id
+
+        with patch.object(service, "convert_advanced", side_effect=fake_convert):
+            items = [item async for item in service.bulk_convert_stream(_requests(2), "batch_stream", max_concurrency=2)]
+
+        assert [item["order_index"] for item in items] == [1, 0]
+        assert all(item["status"] == "completed" for item in items)
@@ -6,6 +6,8 @@ Tests NLP model pre-loading for optimal first-request performance
 
 import pytest
 import asyncio
+import threading
+import time
 from unittest.mock import patch, MagicMock
 
 from src.nl_fhir.services.model_warmup import ModelWarmupService, model_warmup_service
@@ -187,5 +189,148 @@ class TestModelWarmupService:
         assert isinstance(model_warmup_service, ModelWarmupService)
 
 
+def loaded(delay=0.0, status="success"):
+    """Stand-in for a blocking tier loader"""
+    def load():
+        time.sleep(delay)
+        return {"status": status, "load_time_seconds": delay}
+    return load
+
+
+class TestTierReadiness:
+    """Concurrent background warmup with per-tier readiness"""
+
+    def test_initial_tier_state(self, warmup_service):
+        assert warmup_service.get_tier_readiness() == {
+            "regex": "ready", "medspacy": "idle", "transformer_ner": "idle", "embeddings": "idle"
+        }
+        assert not warmup_service.fast_tiers_ready()
+        assert not warmup_service.is_tier_warming("medspacy")
+
+    @pytest.mark.asyncio
+    async def test_tiers_load_concurrently(self, warmup_service):
+        with patch.object(warmup_service, "_load_medspacy", loaded(0.3)), \
+             patch.object(warmup_service, "_load_transformer_ner", loaded(0.3)), \
+             patch.object(warmup_service, "_load_embeddings", loaded(0.3)):
+            start = time.perf_counter()
+            result = await warmup_service.warmup_models()
+            elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.8
+        assert result["models_loaded"] is True
+        assert set(result["results"]) == {"medspacy_clinical", "transformer_ner", "embeddings"}
+        assert set(warmup_service.get_tier_readiness().values()) == {"ready"}
+
+    @pytest.mark.asyncio
+    async def test_background_warmup_serves_fast_tiers_first(self, warmup_service):
+        release = threading.Event()
+
+        def slow_transformer():
+            release.wait(5)
+            return {"status": "success"}
+
+        with patch.object(warmup_service, "_load_medspacy", loaded()), \
+             patch.object(warmup_service, "_load_transformer_ner", slow_transformer), \
+             patch.object(warmup_service, "_load_embeddings", loaded(status="failed")):
+            task = warmup_service.start_background_warmup()
+            assert warmup_service.is_tier_warming("medspacy")
+            assert not warmup_service.fast_tiers_ready()
+
+            for _ in range(100):
+                if warmup_service.fast_tiers_ready():
+                    break
+                await asyncio.sleep(0.01)
+            assert warmup_service.fast_tiers_ready()
+            assert warmup_service.is_tier_warming("transformer_ner")
+            assert warmup_service.get_warmup_status()["status"] == "in_progress"
+
+            release.set()
+            result = await task
+
+        assert result["results"]["embeddings"]["status"] == "failed"
+        assert warmup_service.get_tier_readiness()["transformer_ner"] == "ready"
+        assert warmup_service.get_tier_readiness()["embeddings"] == "failed"
+        assert not warmup_service.is_ready()
+
+    @pytest.mark.asyncio
+    async def test_failed_medspacy_does_not_block_readiness(self, warmup_service):
+        with patch.object(warmup_service, "_load_medspacy", loaded(status="failed")), \
+             patch.object(warmup_service, "_load_transformer_ner", loaded()), \
+             patch.object(warmup_service, "_load_embeddings", loaded()):
+            await warmup_service.warmup_models()
+        assert warmup_service.fast_tiers_ready()
+        assert not warmup_service.is_tier_warming("medspacy")
+
+    @pytest.mark.asyncio
+    async def test_stop_cancels_pending_warmup(self, warmup_service):
+        release = threading.Event()
+        with patch.object(warmup_service, "_load_medspacy", lambda: release.wait(5) and {"status": "success"}), \
+             patch.object(warmup_service, "_load_transformer_ner", loaded()), \
+             patch.object(warmup_service, "_load_embeddings", loaded()):
+            task = warmup_service.start_background_warmup()
+            await asyncio.sleep(0.05)
+            await warmup_service.stop_background_warmup()
+            release.set()
+        assert task.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_readiness_reports_tiers(self):
+        from src.nl_fhir.services.monitoring import MonitoringService
+
+        with patch.object(model_warmup_service, "tier_status",
+                          {"regex": "ready", "medspacy": "ready", "transformer_ner": "warming",
+                           "embeddings": "warming"}):
+            readiness = await MonitoringService().get_readiness()
+        assert readiness["checks"]["nlp_models_loaded"] is True
+        assert readiness["nlp_tiers"]["transformer_ner"] == "warming"
+
+    def test_extractor_skips_warming_tiers(self):
+        from src.nl_fhir.services.nlp.extractors import medical_entity_extractor
+
+        extractor = medical_entity_extractor.MedicalEntityExtractor()
+        extractor.medspacy_manager = MagicMock()
+        extractor.spacy_manager = MagicMock()
+        extractor.transformer_manager = MagicMock()
+        warming = ModelWarmupService()
+        warming.tier_status.update(medspacy="warming", transformer_ner="warming")
+
+        with patch.object(medical_entity_extractor, "model_warmup_service", warming):
+            result = extractor.extract_medical_entities("Start metformin 500mg twice daily")
+            batch = extractor.extract_medical_entities_batch(["Start metformin 500mg twice daily"])
+
+        assert any(med["text"].lower() == "metformin" for med in result["medications"])
+        assert batch == [result]
+        extractor.medspacy_manager.load_medspacy_clinical_engine.assert_not_called()
+        extractor.spacy_manager.load_spacy_medical_nlp.assert_not_called()
+        extractor.transformer_manager.load_medical_ner_model.assert_not_called()
+
+    def test_slow_ner_load_does_not_block_embeddings(self):
+        from src.nl_fhir.services.nlp.model_managers import transformer_manager
+
+        manager = transformer_manager.TransformerManager()
+        release = threading.Event()
+        embedder = MagicMock()
+        embedder.encode.return_value = [0.1]
+
+        def slow_pipeline(*args, **kwargs):
+            release.wait(10)
+            return MagicMock(return_value=[])
+
+        with patch.object(transformer_manager, "TRANSFORMERS_AVAILABLE", True), \
+             patch.object(transformer_manager, "pipeline", side_effect=slow_pipeline, create=True), \
+             patch.object(transformer_manager, "SentenceTransformer", return_value=embedder, create=True), \
+             patch.dict(transformer_manager.TransformerManager._shared_models, {}), \
+             patch.dict(transformer_manager.TransformerManager._shared_status, {}):
+            slow_load = threading.Thread(target=manager.load_medical_ner_model, args=("slow/ner",))
+            slow_load.start()
+            try:
+                # Embeddings load while the NER model is still loading
+                assert manager.load_sentence_transformer("test/embeddings") is embedder
+                assert slow_load.is_alive()
+            finally:
+                release.set()
+                slow_load.join(10)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
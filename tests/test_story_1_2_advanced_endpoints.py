@@ -365,6 +365,32 @@ class TestBulkConversionEndpoint:
         assert data["successful_orders"] >= 1  # At least some should succeed
         assert data["failed_orders"] >= 0     # Some may fail
 
+    def test_bulk_convert_stream_ndjson(self):
+        """Test streaming bulk conversion emits one NDJSON line per order plus a summary"""
+        import json
+
+        request_data = {
+            "orders": [
+                {"clinical_text": "Start patient on lisinopril 10mg daily"},
+                {"clinical_text": "Order CBC and basic metabolic panel"}
+            ],
+            "batch_id": "test_stream_batch",
+            "max_concurrency": 2
+        }
+
+        response = client.post("/api/v1/bulk-convert/stream", json=request_data)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        lines = [json.loads(line) for line in response.text.splitlines() if line]
+        results = [line for line in lines if line["type"] == "result"]
+        summary = lines[-1]
+
+        assert sorted(item["order_index"] for item in results) == [0, 1]
+        assert summary["type"] == "summary"
+        assert summary["total_orders"] == 2
+        assert summary["successful_orders"] + summary["failed_orders"] == 2
+
 
 class TestErrorHandlingAndLogging:
     """Test comprehensive error handling for Stories 1.2 and 1.3"""